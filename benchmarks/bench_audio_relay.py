@@ -0,0 +1,81 @@
+"""
+Micro-benchmark: per-frame cost of the realtime audio relay, before and after the fast path
+
+Run with:
+    PYTHONPATH=src python benchmarks/bench_audio_relay.py
+"""
+import base64
+import json
+import os
+import time
+
+from utils.audio_relay import CODEC_NAME, TwilioFrames, audio_append_frame, parse_audio_delta, parse_twilio_media
+
+ROUNDS = 20000
+REPEATS = 5
+
+# 20ms of 8kHz g711 u-law per Twilio frame; OpenAI deltas are typically larger
+TWILIO_PAYLOAD = base64.b64encode(os.urandom(160)).decode()
+OPENAI_DELTA = base64.b64encode(os.urandom(2400)).decode()
+TWILIO_MEDIA = json.dumps({
+    "event": "media", "sequenceNumber": "4",
+    "media": {"track": "inbound", "chunk": "3", "timestamp": "140", "payload": TWILIO_PAYLOAD},
+    "streamSid": "MZ18ad3ab5a668481ce02b83e7395059f0",
+}, separators=(',', ':'))
+AUDIO_DELTA = json.dumps({
+    "type": "response.audio.delta", "event_id": "event_AP3b8S3", "response_id": "resp_AP3b8S",
+    "item_id": "item_AP3b8S", "output_index": 0, "content_index": 0, "delta": OPENAI_DELTA,
+}, separators=(',', ':'))
+
+
+def legacy_inbound(message):
+    data = json.loads(message)
+    timestamp = int(data['media']['timestamp'])
+    return timestamp, json.dumps({"type": "input_audio_buffer.append", "audio": data['media']['payload']})
+
+
+def fast_inbound(message):
+    timestamp, payload = parse_twilio_media(message)
+    return timestamp, audio_append_frame(payload)
+
+
+def legacy_outbound(message, stream_sid):
+    response = json.loads(message)
+    audio_payload = base64.b64encode(base64.b64decode(response['delta'])).decode('utf-8')
+    # Starlette's send_json serializes with json.dumps
+    return json.dumps({"event": "media", "streamSid": stream_sid, "media": {"payload": audio_payload}}), response.get('item_id')
+
+
+def fast_outbound(message, frames):
+    delta, item_id = parse_audio_delta(message)
+    return frames.media(delta), item_id
+
+
+def best_of(fn, *args):
+    best = float('inf')
+    for _ in range(REPEATS):
+        started = time.perf_counter()
+        for _ in range(ROUNDS):
+            fn(*args)
+        best = min(best, time.perf_counter() - started)
+    return best / ROUNDS * 1e6
+
+
+def main():
+    stream_sid = "MZ18ad3ab5a668481ce02b83e7395059f0"
+    frames = TwilioFrames(stream_sid)
+    assert json.loads(fast_inbound(TWILIO_MEDIA)[1]) == json.loads(legacy_inbound(TWILIO_MEDIA)[1])
+    assert json.loads(fast_outbound(AUDIO_DELTA, frames)[0]) == json.loads(legacy_outbound(AUDIO_DELTA, stream_sid)[0])
+
+    print(f"Control event codec: {CODEC_NAME}")
+    for name, legacy, fast in (
+        ("Twilio -> OpenAI (media)", lambda: legacy_inbound(TWILIO_MEDIA), lambda: fast_inbound(TWILIO_MEDIA)),
+        ("OpenAI -> Twilio (audio delta)", lambda: legacy_outbound(AUDIO_DELTA, stream_sid), lambda: fast_outbound(AUDIO_DELTA, frames)),
+    ):
+        legacy_us = best_of(legacy)
+        fast_us = best_of(fast)
+        print(f"{name:32s} legacy {legacy_us:7.2f} us/frame   fast path {fast_us:6.2f} us/frame   ({legacy_us / fast_us:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+"""
+Memory per cached profile: json.loads dicts vs CompactProfile
+
+The corpus is PROFILES variants of uncleaned_data.txt standing in for distinct
+people: ids, names, headline, summary, position titles and descriptions differ
+per variant, while the companies, schools, skills and enum-like values are the
+sample's, as they would be for colleagues at the same employers. Each variant
+is parsed from its own JSON body so no strings are shared by accident. Memory
+is what the stored profiles keep alive, measured with tracemalloc.
+
+Run with:
+    PYTHONPATH=src python benchmarks/bench_compact_profile.py
+"""
+import ast
+import copy
+import json
+import os
+import time
+import tracemalloc
+
+from models.compact_profile import CompactProfile, CompanyTable
+from services.field_projection import PROFILE_PROJECTION
+
+SAMPLE_PATH = os.path.join(os.path.dirname(__file__), '..', 'uncleaned_data.txt')
+PROFILES = 500
+
+
+def variant_body(sample, index):
+    profile = copy.deepcopy(sample)
+    profile['id'] = sample['id'] + index
+    for key in ('username', 'firstName', 'lastName', 'headline', 'summary'):
+        profile[key] = f"{sample[key]} {index}"
+    for section in ('position', 'fullPositions'):
+        for position in profile.get(section) or []:
+            position['title'] = f"{position['title']} {index}"
+            position['description'] = f"{position['description']} {index}"
+    return json.dumps(profile, ensure_ascii=False).encode('utf-8')
+
+
+def measure(name, build, bodies):
+    started = time.perf_counter()
+    store = [build(body) for body in bodies]
+    seconds = time.perf_counter() - started
+    del store
+
+    tracemalloc.start()
+    store = [build(body) for body in bodies]
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    print(f"{name:<22} {size / len(store) / 1024:7.1f} KiB/profile  build {seconds / len(store) * 1e6:7.1f} us/profile")
+    return store
+
+
+def main():
+    with open(SAMPLE_PATH, 'r', encoding='utf-8') as file:
+        sample = ast.literal_eval(file.read())
+    bodies = [variant_body(sample, index) for index in range(PROFILES)]
+    companies = CompanyTable()
+    CompactProfile(json.loads(bodies[0]), CompanyTable())
+
+    print(f"{PROFILES} profiles, {sum(map(len, bodies)) / PROFILES / 1024:.1f} KiB of JSON each")
+    measure("raw dict", json.loads, bodies)
+    measure("projected dict", lambda body: PROFILE_PROJECTION(json.loads(body)), bodies)
+    # The parse is part of the build but its dict is garbage once compacted
+    measure("compact raw", lambda body: CompactProfile(json.loads(body), companies), bodies)
+    store = measure("compact projected", lambda body: CompactProfile(PROFILE_PROJECTION(json.loads(body)), companies), bodies)
+    print(f"shared company records: {len(companies)} for {sum(len(profile.sections['fullPositions']) for profile in store)} positions")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,75 @@
+"""
+Cleaning cost: every structure-aware chunk through the LLM vs local rendering with escalated free text
+
+The LLM is simulated (no network): each call takes CALL_OVERHEAD seconds plus
+its output tokens at TOKENS_PER_SECOND, run through the same worker pool as the
+agent, with sleeps scaled down by TIME_SCALE and reported unscaled.
+
+Run with:
+    PYTHONPATH=src python benchmarks/bench_local_cleaner.py
+"""
+import ast
+import asyncio
+import os
+import time
+
+from config.settings import CLEANING_MAX_CONCURRENCY
+from services.chunk_cleaning_service import iter_cleaned_chunks
+from services.local_cleaner import LocalCleaner
+from services.structure_splitter import StructureSplitter
+from utils.tokens import count_tokens
+
+SAMPLE_PATH = os.path.join(os.path.dirname(__file__), '..', 'uncleaned_data.txt')
+
+# Approximate prompt tokens around each chunk: the layout cleaning prompt vs the free text prompt
+CLEANING_PROMPT_TOKENS = 260
+FREE_TEXT_PROMPT_TOKENS = 70
+
+CALL_OVERHEAD = 0.4  # seconds
+TOKENS_PER_SECOND = 80  # output tokens, roughly one output token per input token when cleaning
+TIME_SCALE = 0.02
+
+
+async def simulated_llm(chunk):
+    await asyncio.sleep((CALL_OVERHEAD + count_tokens(chunk) / TOKENS_PER_SECOND) * TIME_SCALE)
+    return chunk
+
+
+async def run_llm(chunks):
+    started = time.perf_counter()
+    async for _ in iter_cleaned_chunks(chunks, simulated_llm, concurrency=CLEANING_MAX_CONCURRENCY):
+        pass
+    return (time.perf_counter() - started) / TIME_SCALE
+
+
+def report(name, local_seconds, chunks, prompt_tokens):
+    tokens = sum(count_tokens(chunk) for chunk in chunks) + prompt_tokens * len(chunks)
+    llm_seconds = asyncio.run(run_llm(chunks)) if chunks else 0.0
+    print(
+        f"{name:<22} {len(chunks):3d} LLM calls  {tokens:6d} input tokens  "
+        f"local {local_seconds * 1e3:6.2f} ms  LLM ~{llm_seconds:5.2f} s"
+    )
+
+
+def timed(function):
+    started = time.perf_counter()
+    result = function()
+    return result, time.perf_counter() - started
+
+
+def main():
+    with open(SAMPLE_PATH, 'r', encoding='utf-8') as file:
+        sample = ast.literal_eval(file.read())
+    count_tokens('load the tokenizer before timing')
+
+    chunks, seconds = timed(lambda: StructureSplitter().split(sample))
+    report("full LLM", seconds, chunks, CLEANING_PROMPT_TOKENS)
+
+    for mode in ('auto', 'all'):
+        pre_cleaned, seconds = timed(lambda: LocalCleaner(escalate=mode).prepare(sample))
+        render_seconds = timed(pre_cleaned.render)[1]
+        report(f"local, escalate={mode}", seconds + render_seconds, pre_cleaned.escalated_texts(), FREE_TEXT_PROMPT_TOKENS)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,60 @@
+"""
+Tokens sent to the cleaning LLM: character chunks of the repr dump vs structure-aware chunks
+
+Run with:
+    PYTHONPATH=src python benchmarks/bench_structure_splitter.py
+"""
+import ast
+import os
+import time
+
+from services.structure_splitter import StructureSplitter
+from utils.tokens import count_tokens
+
+SAMPLE_PATH = os.path.join(os.path.dirname(__file__), '..', 'uncleaned_data.txt')
+CHUNK_SIZE = 2000
+CHUNK_OVERLAP = 200
+ROUNDS = 20
+
+
+def legacy_chunks(text):
+    """TextCleaningAgent's previous splitting: RecursiveCharacterTextSplitter(2000, overlap 200) over str(data)"""
+    try:
+        from langchain.text_splitter import RecursiveCharacterTextSplitter
+    except ImportError:
+        # Same window arithmetic without langchain; a repr dump has almost no separators to split on
+        step = CHUNK_SIZE - CHUNK_OVERLAP
+        return [text[start:start + CHUNK_SIZE] for start in range(0, max(1, len(text) - CHUNK_OVERLAP), step)]
+    return RecursiveCharacterTextSplitter(chunk_size=CHUNK_SIZE, chunk_overlap=CHUNK_OVERLAP).split_text(text)
+
+
+def report(name, chunks, seconds):
+    tokens = [count_tokens(chunk) for chunk in chunks]
+    print(
+        f"{name:<12} {len(chunks):3d} chunks  {sum(tokens):6d} tokens  "
+        f"max {max(tokens):5d} tokens/chunk  {seconds * 1e3:7.2f} ms/split"
+    )
+    return sum(tokens)
+
+
+def timed(split):
+    started = time.perf_counter()
+    for _ in range(ROUNDS):
+        chunks = split()
+    return chunks, (time.perf_counter() - started) / ROUNDS
+
+
+def main():
+    with open(SAMPLE_PATH, 'r', encoding='utf-8') as file:
+        sample = ast.literal_eval(file.read())
+    text = str(sample)
+    splitter = StructureSplitter()
+
+    print(f"input {len(text)} chars, {count_tokens(text)} tokens as repr")
+    legacy_tokens = report("character", *timed(lambda: legacy_chunks(text)))
+    structure_tokens = report("structure", *timed(lambda: splitter.split(sample)))
+    print(f"tokens sent per profile: {structure_tokens / legacy_tokens:.1%} of the character splitter")
+
+
+if __name__ == '__main__':
+    main()
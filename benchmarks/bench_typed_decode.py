@@ -0,0 +1,72 @@
+"""
+Decoding a RapidAPI profile body: json.loads dicts vs typed models validated straight from bytes
+
+Time is the best of REPEATS runs of ROUNDS decodes; memory is what the decoded
+objects keep alive (tracemalloc, averaged over KEPT objects) and the peak
+allocated while decoding one body.
+
+Run with:
+    PYTHONPATH=src python benchmarks/bench_typed_decode.py
+"""
+import ast
+import json
+import os
+import time
+import tracemalloc
+
+from models.decoders import decode_profile
+from models.linkedin_types import LinkedInProfileScraperResponse
+from services.field_projection import PROFILE_PROJECTION
+
+SAMPLE_PATH = os.path.join(os.path.dirname(__file__), '..', 'uncleaned_data.txt')
+ROUNDS = 200
+REPEATS = 5
+KEPT = 100
+
+
+def timed(decode, body):
+    best = float('inf')
+    for _ in range(REPEATS):
+        started = time.perf_counter()
+        for _ in range(ROUNDS):
+            decode(body)
+        best = min(best, time.perf_counter() - started)
+    return best / ROUNDS
+
+
+def memory(decode, body):
+    tracemalloc.start()
+    kept = [decode(body) for _ in range(KEPT)]
+    retained = tracemalloc.get_traced_memory()[0] / len(kept)
+    del kept
+    tracemalloc.reset_peak()
+    baseline = tracemalloc.get_traced_memory()[0]
+    decode(body)
+    peak = tracemalloc.get_traced_memory()[1] - baseline
+    tracemalloc.stop()
+    return retained, peak
+
+
+def main():
+    with open(SAMPLE_PATH, 'r', encoding='utf-8') as file:
+        body = json.dumps(ast.literal_eval(file.read()), ensure_ascii=False).encode('utf-8')
+    decode_profile(body)
+    decode_profile(body, cleaned=True)
+
+    decoders = [
+        ("json.loads", json.loads),
+        ("json.loads + projection", lambda data: PROFILE_PROJECTION(json.loads(data))),
+        ("dict then model", lambda data: LinkedInProfileScraperResponse(**json.loads(data))),
+        ("typed", decode_profile),
+        ("typed cleaned", lambda data: decode_profile(data, cleaned=True)),
+    ]
+
+    print(f"input {len(body)} bytes, best of {REPEATS} x {ROUNDS} rounds")
+    for name, decode in decoders:
+        seconds = timed(decode, body)
+        retained, peak = memory(decode, body)
+        print(f"{name:<24} {seconds * 1e6:8.1f} us/profile  retained {retained / 1024:6.1f} KiB  peak {peak / 1024:6.1f} KiB")
+
+
+if __name__ == '__main__':
+    main()
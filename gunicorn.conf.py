@@ -0,0 +1,26 @@
+"""
+Gunicorn preset for multi-process mode
+
+Run from the repository root:
+    WEB_CONCURRENCY=4 gunicorn -c gunicorn.conf.py
+
+Each worker is a uvicorn event loop. A Twilio media stream is a single websocket
+connection, so a call stays on the worker that accepted it; the LinkedIn cache,
+RapidAPI rate limit, fetch leases and personas are shared through
+SHARED_STATE_DB_PATH.
+"""
+import os
+
+wsgi_app = "main:app"
+pythonpath = "src"
+worker_class = "uvicorn.workers.UvicornWorker"
+workers = int(os.getenv("WEB_CONCURRENCY", 4))
+bind = f"0.0.0.0:{os.getenv('PORT', 5050)}"
+
+# Share state between workers even if WEB_CONCURRENCY was not exported to the app
+raw_env = [f"WEB_CONCURRENCY={workers}"]
+
+# Calls last up to MAX_CALL_DURATION (10 minutes): don't kill workers mid-call
+timeout = 0
+graceful_timeout = 10 * 60 + 30
+keepalive = 30
@@ -64,4 +64,130 @@ RAPIDAPI_KEY = os.getenv('RAPIDAPI_KEY')
 RAPIDAPI_HOST = os.getenv('RAPIDAPI_HOST', 'linkedin-data-api.p.rapidapi.com')
 
 if not RAPIDAPI_KEY:
-    print("Warning: RapidAPI key not found in environment variables") 
\ No newline at end of file
+    print("Warning: RapidAPI key not found in environment variables") 
+
+# Shared HTTP connection pool for upstream (RapidAPI) calls
+HTTP_POOL_LIMIT = int(os.getenv('HTTP_POOL_LIMIT', 100))  # Total open connections
+HTTP_POOL_LIMIT_PER_HOST = int(os.getenv('HTTP_POOL_LIMIT_PER_HOST', 20))
+HTTP_KEEPALIVE_TIMEOUT = float(os.getenv('HTTP_KEEPALIVE_TIMEOUT', 30))  # seconds
+HTTP_DNS_CACHE_TTL = int(os.getenv('HTTP_DNS_CACHE_TTL', 300))  # seconds
+HTTP_REQUEST_TIMEOUT = float(os.getenv('HTTP_REQUEST_TIMEOUT', 30))  # seconds
+
+# LinkedIn response cache
+LINKEDIN_CACHE_MAX_BYTES = int(os.getenv('LINKEDIN_CACHE_MAX_BYTES', 64 * 1024 * 1024))  # In-process LRU tier
+LINKEDIN_CACHE_DB_PATH = os.getenv('LINKEDIN_CACHE_DB_PATH')  # Optional SQLite tier, disabled when unset
+# TTLs in seconds per resource type - profiles change less often than posts
+LINKEDIN_CACHE_TTLS = {
+    'profile': int(os.getenv('LINKEDIN_CACHE_TTL_PROFILE', 24 * 60 * 60)),
+    'company': int(os.getenv('LINKEDIN_CACHE_TTL_COMPANY', 24 * 60 * 60)),
+    'profile_posts': int(os.getenv('LINKEDIN_CACHE_TTL_PROFILE_POSTS', 60 * 60)),
+    'company_posts': int(os.getenv('LINKEDIN_CACHE_TTL_COMPANY_POSTS', 60 * 60)),
+}
+# Expired entries are kept this long (seconds) to be served while RapidAPI is failing
+LINKEDIN_CACHE_MAX_STALE = int(os.getenv('LINKEDIN_CACHE_MAX_STALE', 7 * 24 * 60 * 60))
+
+# Per-branch timeouts (seconds) for /linkedin/enriched-profile fan-out
+ENRICHMENT_BRANCH_TIMEOUTS = {
+    'posts': float(os.getenv('ENRICHMENT_POSTS_TIMEOUT', 10)),
+    'currentCompany': float(os.getenv('ENRICHMENT_COMPANY_TIMEOUT', 8)),
+    'recentCompanyPosts': float(os.getenv('ENRICHMENT_COMPANY_POSTS_TIMEOUT', 10)),
+}
+
+# POST /linkedin/profiles:batch
+BATCH_DEFAULT_CONCURRENCY = int(os.getenv('BATCH_DEFAULT_CONCURRENCY', 8))
+BATCH_MAX_CONCURRENCY = int(os.getenv('BATCH_MAX_CONCURRENCY', 32))
+BATCH_MAX_PROFILES = int(os.getenv('BATCH_MAX_PROFILES', 1000))
+
+# Client-side RapidAPI rate limiting (adapted at runtime from x-ratelimit-* headers)
+RAPIDAPI_RATE_LIMIT_PER_SECOND = float(os.getenv('RAPIDAPI_RATE_LIMIT_PER_SECOND', 5))
+RAPIDAPI_RATE_LIMIT_BURST = int(os.getenv('RAPIDAPI_RATE_LIMIT_BURST', 5))
+# Below this fraction of the quota left, calls are paced to last until the quota resets
+RAPIDAPI_QUOTA_RESERVE_RATIO = float(os.getenv('RAPIDAPI_QUOTA_RESERVE_RATIO', 0.1))
+
+# Retries and circuit breaking for RapidAPI calls
+RAPIDAPI_ATTEMPT_TIMEOUT = float(os.getenv('RAPIDAPI_ATTEMPT_TIMEOUT', 10))  # seconds per attempt
+RAPIDAPI_RETRY_ATTEMPTS = int(os.getenv('RAPIDAPI_RETRY_ATTEMPTS', 3))
+RAPIDAPI_RETRY_BASE_DELAY = float(os.getenv('RAPIDAPI_RETRY_BASE_DELAY', 0.25))
+RAPIDAPI_RETRY_MAX_DELAY = float(os.getenv('RAPIDAPI_RETRY_MAX_DELAY', 4))
+RAPIDAPI_RETRY_BUDGET_RATIO = float(os.getenv('RAPIDAPI_RETRY_BUDGET_RATIO', 0.2))  # Retries per request
+CIRCUIT_FAILURE_THRESHOLD = int(os.getenv('CIRCUIT_FAILURE_THRESHOLD', 5))
+CIRCUIT_RECOVERY_TIMEOUT = float(os.getenv('CIRCUIT_RECOVERY_TIMEOUT', 30))  # seconds
+
+# Persona compaction for realtime session instructions
+PERSONA_TOKEN_BUDGET = int(os.getenv('PERSONA_TOKEN_BUDGET', 1500))
+PERSONA_MAX_POSTS = int(os.getenv('PERSONA_MAX_POSTS', 5))
+PERSONA_POST_MAX_TOKENS = int(os.getenv('PERSONA_POST_MAX_TOKENS', 120))
+TOKENIZER_ENCODING = os.getenv('TOKENIZER_ENCODING', 'o200k_base')  # gpt-4o family
+
+# Precompiled personas selected per call through Twilio stream parameters
+CALL_TYPES = ['hiring_manager', 'sales']
+DEFAULT_CALL_TYPE = os.getenv('DEFAULT_CALL_TYPE', 'hiring_manager')
+DEFAULT_PERSONA_PATH = os.getenv('DEFAULT_PERSONA_PATH', 'test/profile_data_response.json')
+PERSONA_STORE_MAX_ENTRIES = int(os.getenv('PERSONA_STORE_MAX_ENTRIES', 256))
+
+# Pre-connected OpenAI Realtime sessions, handed to calls as they are answered
+OPENAI_REALTIME_URL = os.getenv('OPENAI_REALTIME_URL', 'wss://api.openai.com/v1/realtime?model=gpt-4o-realtime-preview-2024-10-01')
+REALTIME_CONNECT_TIMEOUT = float(os.getenv('REALTIME_CONNECT_TIMEOUT', 10))  # seconds
+REALTIME_POOL_MIN_SIZE = int(os.getenv('REALTIME_POOL_MIN_SIZE', 1))
+REALTIME_POOL_MAX_SIZE = int(os.getenv('REALTIME_POOL_MAX_SIZE', 10))
+REALTIME_POOL_CALLS_PER_MINUTE = float(os.getenv('REALTIME_POOL_CALLS_PER_MINUTE', 2))  # Expected call rate
+REALTIME_POOL_MAX_IDLE_AGE = float(os.getenv('REALTIME_POOL_MAX_IDLE_AGE', 10 * 60))  # seconds, below the API session limit
+REALTIME_POOL_CHECK_INTERVAL = float(os.getenv('REALTIME_POOL_CHECK_INTERVAL', 15))  # seconds between health checks
+
+# JSON codec for realtime relay control events: auto (orjson, then msgspec, if installed), orjson, msgspec or json
+RELAY_JSON_CODEC = os.getenv('RELAY_JSON_CODEC', 'auto')
+
+# Finished calls kept with their full timings in GET /metrics
+CALL_METRICS_RECENT_CALLS = int(os.getenv('CALL_METRICS_RECENT_CALLS', 100))
+
+# Multi-process mode: worker processes, and the SQLite file they share the LinkedIn cache,
+# RapidAPI rate limit, fetch leases and personas through (single process keeps them in memory)
+WEB_CONCURRENCY = int(os.getenv('WEB_CONCURRENCY', 1))
+SHARED_STATE_DB_PATH = os.getenv('SHARED_STATE_DB_PATH') or ('.cache/shared_state.db' if WEB_CONCURRENCY > 1 else None)
+SHARED_LEASE_TTL = float(os.getenv('SHARED_LEASE_TTL', 30))  # seconds a worker may hold an upstream fetch lease
+SHARED_LEASE_POLL_INTERVAL = float(os.getenv('SHARED_LEASE_POLL_INTERVAL', 0.05))  # seconds
+
+# Outbound (OpenAI -> Twilio) audio buffer, sizes in base64 payload bytes (8000 per second of g711 audio is ~10.7k)
+OUTBOUND_BUFFER_MAX_BYTES = int(os.getenv('OUTBOUND_BUFFER_MAX_BYTES', 512 * 1024))  # Hard cap, oldest audio dropped past it
+OUTBOUND_BUFFER_HIGH_WATERMARK = int(os.getenv('OUTBOUND_BUFFER_HIGH_WATERMARK', 256 * 1024))
+OUTBOUND_BUFFER_LOW_WATERMARK = int(os.getenv('OUTBOUND_BUFFER_LOW_WATERMARK', 64 * 1024))
+OUTBOUND_OVERFLOW_POLICY = os.getenv('OUTBOUND_OVERFLOW_POLICY', 'merge')  # merge or drop, above the high watermark
+
+# LLM cleaning of scraped profile text (TextCleaningAgent), chunks are cleaned concurrently
+CLEANING_MAX_CONCURRENCY = int(os.getenv('CLEANING_MAX_CONCURRENCY', 4))
+CLEANING_REQUESTS_PER_MINUTE = float(os.getenv('CLEANING_REQUESTS_PER_MINUTE', 60))  # Budget across all cleans
+CLEANING_MAX_ATTEMPTS = int(os.getenv('CLEANING_MAX_ATTEMPTS', 3))  # Per chunk
+CLEANING_RETRY_BASE_DELAY = float(os.getenv('CLEANING_RETRY_BASE_DELAY', 1))  # seconds
+CLEANING_RETRY_MAX_DELAY = float(os.getenv('CLEANING_RETRY_MAX_DELAY', 20))  # seconds
+# Content-addressed cache of cleaned chunks, keyed by chunk text, prompt version and model (disabled when the path is empty)
+CLEANED_CHUNK_CACHE_PATH = os.getenv('CLEANED_CHUNK_CACHE_PATH', '.cache/cleaned_chunks.db')
+CLEANED_CHUNK_CACHE_MAX_BYTES = int(os.getenv('CLEANED_CHUNK_CACHE_MAX_BYTES', 64 * 1024 * 1024))
+CLEANING_CHUNK_TOKENS = int(os.getenv('CLEANING_CHUNK_TOKENS', 800))  # Token budget of one chunk from the structure-aware splitter
+# Render profile data locally and only send free text that needs fixing to the LLM (false sends whole chunks)
+CLEANING_LOCAL_FIRST = os.getenv('CLEANING_LOCAL_FIRST', 'true').lower() == 'true'
+CLEANING_ESCALATE = os.getenv('CLEANING_ESCALATE', 'auto')  # Free text sent to the LLM: auto (heuristics), all or none
+CLEANING_FREE_TEXT_MIN_WORDS = int(os.getenv('CLEANING_FREE_TEXT_MIN_WORDS', 12))  # Shorter free text is never escalated
+
+# Decode RapidAPI profile and company bodies through the pydantic schemas in models/linkedin_types.py
+# (validated, unknown fields dropped) instead of json.loads
+LINKEDIN_TYPED_DECODE = os.getenv('LINKEDIN_TYPED_DECODE', 'false').lower() == 'true'
+
+# Incremental refresh: last enriched profile per URL that refreshes are diffed against (in memory when the path is empty)
+PROFILE_SNAPSHOT_DB_PATH = os.getenv('PROFILE_SNAPSHOT_DB_PATH', '.cache/profile_snapshots.db')
+PROFILE_SNAPSHOT_MAX_ENTRIES = int(os.getenv('PROFILE_SNAPSHOT_MAX_ENTRIES', 1000))
+PROFILE_REFRESH_MAX_POST_PAGES = int(os.getenv('PROFILE_REFRESH_MAX_POST_PAGES', 3))  # Pages walked back looking for the last seen post
+
+# Streaming posts fetch: pages walked at most per stream, and what persona building pulls before ranking down to PERSONA_MAX_POSTS
+POSTS_STREAM_MAX_PAGES = int(os.getenv('POSTS_STREAM_MAX_PAGES', 5))
+PERSONA_POSTS_FETCH_LIMIT = int(os.getenv('PERSONA_POSTS_FETCH_LIMIT', 20))
+PERSONA_POSTS_MAX_AGE_DAYS = float(os.getenv('PERSONA_POSTS_MAX_AGE_DAYS', 365))
+
+# Prewarm queue: personas for scheduled calls are built in the background before the call arrives
+PREWARM_QUEUE_DB_PATH = os.getenv('PREWARM_QUEUE_DB_PATH', '.cache/prewarm_queue.db')
+PREWARM_WORKERS = int(os.getenv('PREWARM_WORKERS', 2))  # Per worker process
+PREWARM_MAX_ATTEMPTS = int(os.getenv('PREWARM_MAX_ATTEMPTS', 4))
+PREWARM_RETRY_BASE_DELAY = float(os.getenv('PREWARM_RETRY_BASE_DELAY', 5))
+PREWARM_RETRY_MAX_DELAY = float(os.getenv('PREWARM_RETRY_MAX_DELAY', 120))
+PREWARM_POLL_INTERVAL = float(os.getenv('PREWARM_POLL_INTERVAL', 2))  # Idle workers check for due jobs at least this often
+PREWARM_JOB_TIMEOUT = float(os.getenv('PREWARM_JOB_TIMEOUT', 120))  # A running job older than this is taken over (crashed worker)
+PREWARM_RETENTION = float(os.getenv('PREWARM_RETENTION', 7 * 24 * 60 * 60))  # Jobs are kept this long past their call time
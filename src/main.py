@@ -1,12 +1,68 @@
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 import uvicorn
 from routes.call_routes import router as call_router
-from routes.linkedin_routes import router as linkedin_router
-from config.settings import PORT
+from routes.linkedin_routes import router as linkedin_router, upstream_error_handler
+from config.settings import PORT, WEB_CONCURRENCY, REALTIME_POOL_CALLS_PER_MINUTE
+from services.http_client import create_client_session
+from services.linkedin_scraper_service import LinkedInScraperService, UPSTREAM_ERRORS
+from services.linkedin_cache import create_linkedin_cache
+from services.persona_store import create_persona_store
+from services.prewarm_queue import PrewarmWorkerPool, create_prewarm_queue
+from services.profile_refresh import create_profile_snapshot_store
+from services.realtime_pool import RealtimeConnectionPool
+from utils.shared_state import create_rate_limiter, create_leases
+from utils.call_metrics import CallMetricsRegistry
 
-app = FastAPI()
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # One pooled HTTP session per app, so upstream connections are reused across requests
+    app.state.http_session = create_client_session()
+    app.state.linkedin_cache = create_linkedin_cache()
+    app.state.profile_snapshots = create_profile_snapshot_store()
+    # Shared through SQLite across worker processes when WEB_CONCURRENCY > 1
+    app.state.rate_limiter = create_rate_limiter()
+    app.state.leases = create_leases()
+    app.state.linkedin_scraper = LinkedInScraperService(
+        session=app.state.http_session,
+        cache=app.state.linkedin_cache,
+        rate_limiter=app.state.rate_limiter,
+        leases=app.state.leases,
+        snapshots=app.state.profile_snapshots,
+    )
+    # Compiled once here so call setup only does a lookup
+    app.state.persona_store = create_persona_store()
+    # Personas of scheduled calls are built in the background before the call arrives
+    app.state.prewarm_queue = create_prewarm_queue()
+    app.state.prewarm = PrewarmWorkerPool(app.state.prewarm_queue, app.state.linkedin_scraper, app.state.persona_store)
+    await app.state.prewarm.start()
+    app.state.call_metrics = CallMetricsRegistry()
+    # Calls are spread over the workers and each call stays on the worker that accepted its websocket
+    app.state.realtime_pool = RealtimeConnectionPool(calls_per_minute=REALTIME_POOL_CALLS_PER_MINUTE / WEB_CONCURRENCY)
+    await app.state.realtime_pool.start()
+    try:
+        yield
+    finally:
+        await app.state.prewarm.close()
+        await app.state.realtime_pool.close()
+        await app.state.http_session.close()
+        app.state.linkedin_cache.close()
+        app.state.profile_snapshots.close()
+        app.state.rate_limiter.close()
+        if app.state.leases is not None:
+            app.state.leases.close()
+        app.state.persona_store.close()
+        app.state.prewarm_queue.close()
+
+app = FastAPI(lifespan=lifespan)
 app.include_router(call_router)
 app.include_router(linkedin_router)
+for error in UPSTREAM_ERRORS:
+    app.add_exception_handler(error, upstream_error_handler)
 
 if __name__ == "__main__":
-    uvicorn.run(app, host="0.0.0.0", port=PORT)
\ No newline at end of file
+    if WEB_CONCURRENCY > 1:
+        # Workers import the app themselves, which needs the import string
+        uvicorn.run("main:app", host="0.0.0.0", port=PORT, workers=WEB_CONCURRENCY)
+    else:
+        uvicorn.run(app, host="0.0.0.0", port=PORT)
\ No newline at end of file
@@ -0,0 +1,259 @@
+import sys
+import weakref
+from typing import Any, Dict, Optional, Tuple
+
+# Names, titles and enum-like values (employmentType, staffCountRange, country codes) repeat
+# across profiles and are interned; longer free text is kept as is
+INTERN_MAX_LENGTH = 80
+
+_DATE_KEYS = frozenset(('year', 'month', 'day'))
+
+# Slot value of a key the source dictionary did not have, unlike an explicit None
+MISSING = object()
+
+# Company fields of a position, as (record slot, position key)
+_COMPANY_FIELDS = (
+    ('id', 'companyId'),
+    ('name', 'companyName'),
+    ('username', 'companyUsername'),
+    ('industry', 'companyIndustry'),
+    ('staff_count_range', 'companyStaffCountRange'),
+    ('url', 'companyURL'),
+    ('logo', 'companyLogo'),
+    ('extra_info', 'extraInfo'),
+)
+_COMPANY_KEYS = frozenset(key for _, key in _COMPANY_FIELDS)
+_POSITION_SECTIONS = ('position', 'positions', 'fullPositions')
+
+
+class DateValue(tuple):
+    """A `{"year", "month", "day"}` date as a shared (year, month, day) tuple"""
+    __slots__ = ()
+
+    def to_dict(self) -> Dict[str, int]:
+        return {'year': self[0], 'month': self[1], 'day': self[2]}
+
+
+_dates: Dict[Tuple[Any, Any, Any], DateValue] = {}
+
+
+def _intern(value: Any) -> Any:
+    if isinstance(value, str) and len(value) <= INTERN_MAX_LENGTH:
+        return sys.intern(value)
+    return value
+
+
+def compact_value(value: Any) -> Any:
+    """
+    Compact a JSON value: interned keys and short strings, tuples for lists, shared dates
+
+    Use `expand_value` to get the JSON value back.
+    """
+    if isinstance(value, dict):
+        if value.keys() == _DATE_KEYS:
+            key = (value['year'], value['month'], value['day'])
+            date = _dates.get(key)
+            if date is None:
+                date = _dates[key] = DateValue(key)
+            return date
+        return {sys.intern(key): compact_value(item) for key, item in value.items()}
+    if isinstance(value, list):
+        return tuple(compact_value(item) for item in value)
+    return _intern(value)
+
+
+def expand_value(value: Any) -> Any:
+    """Inverse of `compact_value`"""
+    if isinstance(value, DateValue):
+        return value.to_dict()
+    if isinstance(value, dict):
+        return {key: expand_value(item) for key, item in value.items()}
+    if isinstance(value, tuple):
+        return [expand_value(item) for item in value]
+    return value
+
+
+def _freeze(value: Any) -> Any:
+    """Hashable form of a compacted value, used as a deduplication key"""
+    if isinstance(value, dict):
+        return tuple((key, _freeze(item)) for key, item in value.items())
+    if isinstance(value, tuple) and not isinstance(value, DateValue):
+        return ('[]',) + tuple(_freeze(item) for item in value)
+    return value
+
+
+class CompanyRecord:
+    """Company fields of a position, shared by every position and profile at the same company"""
+    __slots__ = tuple(slot for slot, _ in _COMPANY_FIELDS) + ('__weakref__',)
+
+    def __init__(self, fields: Dict[str, Any]):
+        for slot, key in _COMPANY_FIELDS:
+            setattr(self, slot, fields.get(key, MISSING))
+
+    def to_dict(self) -> Dict[str, Any]:
+        result = {}
+        for slot, key in _COMPANY_FIELDS:
+            value = getattr(self, slot)
+            if value is not MISSING:
+                result[key] = expand_value(value)
+        return result
+
+
+class CompanyTable:
+    """
+    Company records deduplicated by company id
+
+    Records are shared by every profile compacted with the same table and are
+    dropped once no profile refers to them any more. Positions that carry the
+    same company id but disagree on its fields (e.g. a company renamed between
+    two scrapes) get separate records, so no profile loses its own values.
+    """
+
+    def __init__(self):
+        self._records: "weakref.WeakValueDictionary[Any, CompanyRecord]" = weakref.WeakValueDictionary()
+
+    def get(self, fields: Dict[str, Any]) -> CompanyRecord:
+        """Shared record for already compacted company fields"""
+        key = (fields.get('companyId') or fields.get('companyName'), _freeze(fields))
+        record = self._records.get(key)
+        if record is None:
+            record = CompanyRecord(fields)
+            self._records[key] = record
+        return record
+
+    def __len__(self) -> int:
+        return len(self._records)
+
+
+shared_companies = CompanyTable()
+
+
+class _Entity:
+    """Slotted entity: known keys in slots, anything else in `extra`"""
+    __slots__ = ('extra',)
+    FIELDS: Tuple[Tuple[str, str], ...] = ()
+
+    def _load(self, data: Dict[str, Any], skip=frozenset()):
+        known = set(skip)
+        for slot, key in self.FIELDS:
+            known.add(key)
+            setattr(self, slot, data.get(key, MISSING))
+        extra = {key: value for key, value in data.items() if key not in known}
+        self.extra = extra or None
+
+    def to_dict(self) -> Dict[str, Any]:
+        result = {}
+        for slot, key in self.FIELDS:
+            value = getattr(self, slot)
+            if value is not MISSING:
+                result[key] = expand_value(value)
+        if self.extra:
+            result.update(expand_value(self.extra))
+        return result
+
+
+class PositionRecord(_Entity):
+    FIELDS = (
+        ('title', 'title'),
+        ('description', 'description'),
+        ('location', 'location'),
+        ('employment_type', 'employmentType'),
+        ('start', 'start'),
+        ('end', 'end'),
+    )
+    __slots__ = ('company',) + tuple(slot for slot, _ in FIELDS)
+
+    def __init__(self, data: Dict[str, Any], companies: CompanyTable):
+        company_fields = {key: value for key, value in data.items() if key in _COMPANY_KEYS}
+        self.company = companies.get(company_fields) if company_fields else None
+        self._load(data, skip=_COMPANY_KEYS)
+
+    def to_dict(self) -> Dict[str, Any]:
+        result = self.company.to_dict() if self.company is not None else {}
+        result.update(super().to_dict())
+        return result
+
+
+class EducationRecord(_Entity):
+    FIELDS = (
+        ('school_name', 'schoolName'),
+        ('degree', 'degree'),
+        ('field_of_study', 'fieldOfStudy'),
+        ('grade', 'grade'),
+        ('description', 'description'),
+        ('activities', 'activities'),
+        ('start', 'start'),
+        ('end', 'end'),
+    )
+    __slots__ = tuple(slot for slot, _ in FIELDS)
+
+    def __init__(self, data: Dict[str, Any]):
+        self._load(data)
+
+
+class CompactProfile(_Entity):
+    """
+    Memory-compact form of a LinkedIn profile dictionary
+
+    Positions, educations and the profile header live in slotted records, the
+    company fields of each position in a `CompanyRecord` shared through a
+    `CompanyTable`, skills in a tuple of interned names. Every other section
+    (languages, certifications, honors, ...) is kept through `compact_value`.
+    Identical entries of `position` and `fullPositions` share one record.
+    `to_dict()` gives the profile dictionary back. Slots of keys the source did
+    not have hold `MISSING`, so absent keys stay absent and explicit None values
+    are kept.
+    """
+    FIELDS = (
+        ('id', 'id'),
+        ('username', 'username'),
+        ('first_name', 'firstName'),
+        ('last_name', 'lastName'),
+        ('headline', 'headline'),
+        ('summary', 'summary'),
+    )
+    __slots__ = ('sections', 'skills') + tuple(slot for slot, _ in FIELDS)
+
+    def __init__(self, data: Dict[str, Any], companies: Optional[CompanyTable] = None):
+        """
+        Args:
+            data: Profile dictionary, raw or after `PROFILE_PROJECTION`
+            companies: Table the company records are shared through, the module-wide one by default
+        """
+        companies = shared_companies if companies is None else companies
+        data = compact_value(data)
+        self._load(data)
+
+        sections = self.extra or {}
+        self.extra = None
+        positions: Dict[Any, PositionRecord] = {}
+        for section in _POSITION_SECTIONS:
+            items = sections.get(section)
+            if isinstance(items, tuple):
+                records = []
+                for item in items:
+                    key = _freeze(item)
+                    if key not in positions:
+                        positions[key] = PositionRecord(item, companies)
+                    records.append(positions[key])
+                sections[section] = tuple(records)
+        if isinstance(sections.get('educations'), tuple):
+            sections['educations'] = tuple(EducationRecord(item) for item in sections['educations'])
+
+        skills = sections.get('skills')
+        self.skills = None
+        if isinstance(skills, tuple) and all(isinstance(skill, dict) and skill.keys() == {'name'} for skill in skills):
+            self.skills = tuple(skill['name'] for skill in skills)
+            del sections['skills']
+        self.sections = sections or None
+
+    def to_dict(self) -> Dict[str, Any]:
+        result = super().to_dict()
+        if self.skills is not None:
+            result['skills'] = [{'name': name} for name in self.skills]
+        for key, value in (self.sections or {}).items():
+            if isinstance(value, tuple) and value and isinstance(value[0], (PositionRecord, EducationRecord)):
+                result[key] = [record.to_dict() for record in value]
+            else:
+                result[key] = expand_value(value)
+        return result
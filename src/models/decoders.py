@@ -0,0 +1,52 @@
+from functools import lru_cache
+from typing import Any, Dict, Type, TypeVar, Union
+
+from pydantic import BaseModel, TypeAdapter
+
+from models.linkedin_types import (
+    CleanedLinkedInCompanyResponse,
+    CleanedLinkedInProfileScraperResponse,
+    LinkedInCompanyResponse,
+    LinkedInProfileScraperResponse,
+)
+
+ModelT = TypeVar('ModelT', bound=BaseModel)
+
+
+@lru_cache(maxsize=None)
+def get_adapter(model: Type[ModelT]) -> TypeAdapter:
+    """Validator for `model`, built once per process; building one compiles the whole schema"""
+    return TypeAdapter(model)
+
+
+def decode(model: Type[ModelT], body: Union[bytes, str]) -> ModelT:
+    """
+    Parse a JSON response body straight into `model`
+
+    pydantic-core parses and validates in one pass, so no intermediate dict is
+    built and fields the model does not declare are skipped rather than copied.
+
+    Raises:
+        pydantic.ValidationError: When the body is not valid JSON or does not match the schema
+    """
+    return get_adapter(model).validate_json(body)
+
+
+def decode_profile(body: Union[bytes, str], cleaned: bool = False) -> Union[LinkedInProfileScraperResponse, CleanedLinkedInProfileScraperResponse]:
+    """Profile response body as a typed model, projected to the cleaned fields when `cleaned`"""
+    return decode(CleanedLinkedInProfileScraperResponse if cleaned else LinkedInProfileScraperResponse, body)
+
+
+def decode_company(body: Union[bytes, str], cleaned: bool = False) -> Union[LinkedInCompanyResponse, CleanedLinkedInCompanyResponse]:
+    """Company details response body as a typed model, projected to the cleaned fields when `cleaned`"""
+    return decode(CleanedLinkedInCompanyResponse if cleaned else LinkedInCompanyResponse, body)
+
+
+def to_data(model: BaseModel) -> Dict[str, Any]:
+    """
+    Plain dict of a decoded model, for callers working with response dictionaries
+
+    Only fields present in the response are included, so the result has the
+    same keys as `json.loads` of the body minus the fields the model skips.
+    """
+    return model.model_dump(exclude_unset=True)
@@ -13,6 +13,11 @@ class DateInfo(BaseModel):
     month: Optional[int] = None
     day: Optional[int] = None
 
+class Image(BaseModel):
+    url: Optional[str] = None
+    width: Optional[int] = None
+    height: Optional[int] = None
+
 class Education(BaseModel):
     start: Optional[DateInfo] = None
     end: Optional[DateInfo] = None
@@ -24,6 +29,8 @@ class Education(BaseModel):
     activities: Optional[str] = None
     url: Optional[str] = None
     schoolId: Optional[str] = None
+    logo: Optional[List[Image]] = None
+    logos: Optional[List[Image]] = None
 
 class MultiLocale(BaseModel):
     en_US: Optional[str] = None
@@ -66,6 +73,67 @@ class SupportedLocale(BaseModel):
 class MultiLocaleText(BaseModel):
     en: Optional[str] = None
 
+class FullPosition(BaseModel):
+    companyId: Optional[int] = None
+    companyName: Optional[str] = None
+    companyUsername: Optional[str] = None
+    companyIndustry: Optional[str] = None
+    companyStaffCountRange: Optional[str] = None
+    companyURL: Optional[str] = None
+    companyLogo: Optional[str] = None
+    title: Optional[str] = None
+    multiLocaleTitle: Optional[MultiLocale] = None
+    multiLocaleCompanyName: Optional[MultiLocale] = None
+    location: Optional[str] = None
+    description: Optional[str] = None
+    employmentType: Optional[str] = None
+    start: Optional[DateInfo] = None
+    end: Optional[DateInfo] = None
+
+class Language(BaseModel):
+    name: Optional[str] = None
+    proficiency: Optional[str] = None
+
+class TimePeriod(BaseModel):
+    start: Optional[DateInfo] = None
+    end: Optional[DateInfo] = None
+
+class IssuingCompany(BaseModel):
+    name: Optional[str] = None
+    universalName: Optional[str] = None
+    logo: Optional[str] = None
+    staffCountRange: Optional[Dict[str, Any]] = None
+    headquarter: Optional[Dict[str, Any]] = None
+
+class Certification(BaseModel):
+    name: Optional[str] = None
+    authority: Optional[str] = None
+    start: Optional[DateInfo] = None
+    end: Optional[DateInfo] = None
+    timePeriod: Optional[TimePeriod] = None
+    company: Optional[IssuingCompany] = None
+
+class Course(BaseModel):
+    name: Optional[str] = None
+    number: Optional[str] = None
+    company: Optional[IssuingCompany] = None
+
+class Honor(BaseModel):
+    title: Optional[str] = None
+    description: Optional[str] = None
+    issuer: Optional[str] = None
+    issuerLogo: Optional[str] = None
+    issuedOn: Optional[DateInfo] = None
+
+class Volunteering(BaseModel):
+    title: Optional[str] = None
+    start: Optional[DateInfo] = None
+    end: Optional[DateInfo] = None
+    companyName: Optional[str] = None
+    CompanyId: Optional[str] = None
+    companyUrl: Optional[str] = None
+    companyLogo: Optional[str] = None
+
 class LinkedInProfileScraperResponse(BaseModel):
     id: Optional[int] = None
     urn: Optional[str] = None
@@ -74,26 +142,29 @@ class LinkedInProfileScraperResponse(BaseModel):
     lastName: Optional[str] = None
     isTopVoice: Optional[bool] = None
     isCreator: Optional[bool] = None
+    isPremium: Optional[bool] = None
     profilePicture: Optional[str] = None
-    backgroundImage: List[BackgroundImage] = None
+    profilePictures: Optional[List[Image]] = None
+    backgroundImage: Optional[List[BackgroundImage]] = None
     summary: Optional[str] = None
     headline: Optional[str] = None
     geo: Optional[GeoLocation] = None
-    educations: List[Education] = None
-    positions: List[Position] = None
-    fullPositions: List[Position] = None
-    skills: List[Skill] = None
-    projects: Dict = None
-    supportedLocales: List[SupportedLocale] = None
+    languages: Optional[List[Language]] = None
+    educations: Optional[List[Education]] = None
+    position: Optional[List[FullPosition]] = None
+    positions: Optional[List[Position]] = None
+    fullPositions: Optional[List[FullPosition]] = None
+    skills: Optional[List[Skill]] = None
+    courses: Optional[List[Course]] = None
+    certifications: Optional[List[Certification]] = None
+    honors: Optional[List[Honor]] = None
+    projects: Optional[Dict[str, Any]] = None
+    volunteering: Optional[List[Volunteering]] = None
+    supportedLocales: Optional[List[SupportedLocale]] = None
     multiLocaleFirstName: Optional[MultiLocaleText] = None
     multiLocaleLastName: Optional[MultiLocaleText] = None
     multiLocaleHeadline: Optional[MultiLocaleText] = None
 
-class Image(BaseModel):
-    url: Optional[str] = None
-    width: Optional[int] = None
-    height: Optional[int] = None
-
 class Headquarter(BaseModel):
     geographicArea: Optional[str] = None
     country: Optional[str] = None
@@ -144,71 +215,33 @@ class LinkedInCompanyData(BaseModel):
     description: Optional[str] = None
     type: Optional[str] = None
     phone: Optional[str] = None
-    investorsCrunchbaseUrl: Optional[str]
-    leadInvestors: Optional[List[Dict[str, str]]]
-    fundingRoundCrunchbaseUrl: Optional[str]
-    fundingType: Optional[str]
-    moneyRaised: Optional[MoneyRaised]
-    numOtherInvestors: Optional[int]
-    announcedOn: Optional[AnnouncedOn]
-
-class FundingData(BaseModel):
-    updatedAt: Optional[str]
-    updatedDate: Optional[str]
-    numFundingRounds: Optional[int]
-    lastFundingRound: Optional[LastFundingRound]
-
-class LinkedInCompanyData(BaseModel):
-    id: Optional[str]
-    name: Optional[str]
-    universalName: Optional[str]
-    linkedinUrl: Optional[str]
-    tagline: Optional[str]
-    description: Optional[str]
-    type: Optional[str]
-    phone: Optional[str]
-    Images: Optional[Dict[str, str]]
-    isClaimable: Optional[bool]
-    backgroundCoverImages: Optional[List[Image]]
-    logos: Optional[List[Image]]
-    staffCount: Optional[int]
-    headquarter: Optional[Headquarter]
-    locations: Optional[List[Dict[str, Any]]]
-    industries: Optional[List[str]]
-    specialities: Optional[List[str]]
-    website: Optional[str]
-    founded: Optional[str]
-    callToAction: Optional[CallToAction]
-    followerCount: Optional[int]
-    staffCountRange: Optional[str]
-    crunchbaseUrl: Optional[str]
-    fundingData: Optional[FundingData]
+    Images: Optional[Dict[str, str]] = None
+    isClaimable: Optional[bool] = None
+    backgroundCoverImages: Optional[List[Image]] = None
+    logos: Optional[List[Image]] = None
+    staffCount: Optional[int] = None
+    headquarter: Optional[Headquarter] = None
+    locations: Optional[List[Dict[str, Any]]] = None
+    industries: Optional[List[str]] = None
+    specialities: Optional[List[str]] = None
+    website: Optional[str] = None
+    founded: Optional[Any] = None
+    callToAction: Optional[CallToAction] = None
+    followerCount: Optional[int] = None
+    staffCountRange: Optional[Any] = None
+    crunchbaseUrl: Optional[str] = None
+    fundingData: Optional[FundingData] = None
 
 class LinkedInCompanyResponse(BaseModel):
-    success: bool
-    message: str
-    data: Optional[LinkedInCompanyData]
+    success: Optional[bool] = None
+    message: Optional[str] = None
+    data: Optional[LinkedInCompanyData] = None
 
 class Geo(BaseModel):
     country: Optional[str] = None
     city: Optional[str] = None
     full: Optional[str] = None
 
-class FullPosition(BaseModel):
-    companyId: Optional[int] = None
-    companyName: Optional[str] = None
-    companyUsername: Optional[str] = None
-    companyIndustry: Optional[str] = None
-    companyStaffCountRange: Optional[str] = None
-    title: Optional[str] = None
-    multiLocaleTitle: Optional[MultiLocale] = None
-    multiLocaleCompanyName: Optional[MultiLocale] = None
-    location: Optional[str] = None
-    description: Optional[str] = None
-    employmentType: Optional[str] = None
-    start: Optional[DateInfo] = None
-    end: Optional[DateInfo] = None
-
 class UserProfile(BaseModel):
     id: Optional[int] = None
     username: Optional[str] = None
@@ -230,6 +263,10 @@ class UserProfile(BaseModel):
     multiLocaleLastName: Optional[MultiLocaleText] = None
     multiLocaleHeadline: Optional[MultiLocaleText] = None
 
+# Cleaned* models are the PROFILE_PROJECTION / COMPANY_PROJECTION output as
+# schemas: decoding a response straight into them never builds the dropped
+# pictures, logos and tracking URLs.
+
 class CleanedCompanyExtraInfo(BaseModel):
     headquarter: Optional[Dict[str, str]] = None
     locations: Optional[List[str]] = None
@@ -249,7 +286,6 @@ class CleanedEducation(BaseModel):
     schoolName: Optional[str] = None
     description: Optional[str] = None
     activities: Optional[str] = None
-    schoolId: Optional[str] = None
 
 class CleanedSkill(BaseModel):
     name: Optional[str] = None
@@ -264,6 +300,40 @@ class CleanedPosition(BaseModel):
     companyName: Optional[str] = None
     extraInfo: Optional[CleanedCompanyExtraInfo] = None
 
+class CleanedFullPosition(BaseModel):
+    companyId: Optional[int] = None
+    companyName: Optional[str] = None
+    companyUsername: Optional[str] = None
+    companyIndustry: Optional[str] = None
+    companyStaffCountRange: Optional[str] = None
+    title: Optional[str] = None
+    multiLocaleTitle: Optional[MultiLocale] = None
+    multiLocaleCompanyName: Optional[MultiLocale] = None
+    location: Optional[str] = None
+    description: Optional[str] = None
+    employmentType: Optional[str] = None
+    start: Optional[DateInfo] = None
+    end: Optional[DateInfo] = None
+
+class CleanedIssuingCompany(BaseModel):
+    name: Optional[str] = None
+    universalName: Optional[str] = None
+    staffCountRange: Optional[Dict[str, Any]] = None
+    headquarter: Optional[Dict[str, Any]] = None
+
+class CleanedCertification(BaseModel):
+    name: Optional[str] = None
+    authority: Optional[str] = None
+    start: Optional[DateInfo] = None
+    end: Optional[DateInfo] = None
+    timePeriod: Optional[TimePeriod] = None
+    company: Optional[CleanedIssuingCompany] = None
+
+class CleanedCourse(BaseModel):
+    name: Optional[str] = None
+    number: Optional[str] = None
+    company: Optional[CleanedIssuingCompany] = None
+
 class CleanedLinkedInProfileScraperResponse(BaseModel):
     id: Optional[int] = None
     urn: Optional[str] = None
@@ -272,14 +342,66 @@ class CleanedLinkedInProfileScraperResponse(BaseModel):
     lastName: Optional[str] = None
     isTopVoice: Optional[bool] = None
     isCreator: Optional[bool] = None
+    isPremium: Optional[bool] = None
     summary: Optional[str] = None
     headline: Optional[str] = None
     geo: Optional[GeoLocation] = None
+    languages: List[Language] = []
     educations: List[CleanedEducation] = []
+    position: List[CleanedFullPosition] = []
     positions: List[CleanedPosition] = []
-    fullPositions: List[CleanedPosition] = []
+    fullPositions: List[CleanedFullPosition] = []
     skills: List[CleanedSkill] = []
+    courses: List[CleanedCourse] = []
+    certifications: List[CleanedCertification] = []
+    honors: List[Honor] = []
+    volunteering: List[Volunteering] = []
     supportedLocales: List[SupportedLocale] = []
     multiLocaleFirstName: Optional[MultiLocaleText] = None
     multiLocaleLastName: Optional[MultiLocaleText] = None
-    multiLocaleHeadline: Optional[MultiLocaleText] = None 
\ No newline at end of file
+    multiLocaleHeadline: Optional[MultiLocaleText] = None
+
+class CleanedCallToAction(BaseModel):
+    callToActionType: Optional[str] = None
+    visible: Optional[bool] = None
+    callToActionMessage: Optional[CallToActionMessage] = None
+
+class CleanedLastFundingRound(BaseModel):
+    leadInvestors: Optional[List[Dict[str, str]]] = None
+    fundingType: Optional[str] = None
+    moneyRaised: Optional[MoneyRaised] = None
+    numOtherInvestors: Optional[int] = None
+    announcedOn: Optional[AnnouncedOn] = None
+
+class CleanedFundingData(BaseModel):
+    updatedAt: Optional[str] = None
+    updatedDate: Optional[str] = None
+    numFundingRounds: Optional[int] = None
+    lastFundingRound: Optional[CleanedLastFundingRound] = None
+
+class CleanedLinkedInCompanyData(BaseModel):
+    id: Optional[str] = None
+    name: Optional[str] = None
+    universalName: Optional[str] = None
+    linkedinUrl: Optional[str] = None
+    tagline: Optional[str] = None
+    description: Optional[str] = None
+    type: Optional[str] = None
+    phone: Optional[str] = None
+    isClaimable: Optional[bool] = None
+    staffCount: Optional[int] = None
+    headquarter: Optional[Headquarter] = None
+    locations: Optional[List[Dict[str, Any]]] = None
+    industries: Optional[List[str]] = None
+    specialities: Optional[List[str]] = None
+    website: Optional[str] = None
+    founded: Optional[Any] = None
+    callToAction: Optional[CleanedCallToAction] = None
+    followerCount: Optional[int] = None
+    staffCountRange: Optional[Any] = None
+    fundingData: Optional[CleanedFundingData] = None
+
+class CleanedLinkedInCompanyResponse(BaseModel):
+    success: Optional[bool] = None
+    message: Optional[str] = None
+    data: Optional[CleanedLinkedInCompanyData] = None
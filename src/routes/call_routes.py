@@ -1,8 +1,17 @@
-from fastapi import APIRouter, Request, WebSocket
+from datetime import datetime, timezone
+from typing import Optional
+from urllib.parse import parse_qs
+from fastapi import APIRouter, Depends, HTTPException, Request, WebSocket
 from fastapi.responses import HTMLResponse, JSONResponse
+from pydantic import BaseModel
 from twilio.twiml.voice_response import VoiceResponse, Connect
 
-from services.openai_service import handle_media_stream
+from config.settings import CALL_TYPES
+from routes.linkedin_routes import get_linkedin_scraper
+from services.linkedin_scraper_service import LinkedInScraperService, PERSONA_POSTS_CUTOFF
+from services.openai_service import handle_media_stream, get_persona_store, get_call_metrics
+from services.persona_store import normalize_profile_key
+from services.prewarm_queue import PrewarmWorkerPool
 
 router = APIRouter()
 
@@ -10,16 +19,50 @@ router = APIRouter()
 async def index_page():
     return {"message": "Twilio Media Stream Server is running!"}
 
+async def get_caller(request: Request) -> Optional[str]:
+    """Caller number Twilio sends with the webhook, as a query parameter (GET) or form field (POST)"""
+    caller = request.query_params.get('From')
+    content_type = request.headers.get('content-type', '')
+    if caller is None and request.method == 'POST' and content_type.startswith('application/x-www-form-urlencoded'):
+        caller = (parse_qs((await request.body()).decode('utf-8')).get('From') or [None])[0]
+    return caller
+
 @router.api_route("/incoming-call", methods=["GET", "POST"])
-async def handle_incoming_call(request: Request):
-    """Handle incoming call and return TwiML response to connect to Media Stream."""
-    
+async def handle_incoming_call(
+    request: Request,
+    profile: Optional[str] = None,
+    call_type: Optional[str] = None,
+    call: Optional[str] = None,
+):
+    """
+    Handle incoming call and return TwiML response to connect to Media Stream.
+
+    `profile` and `call_type` (query parameters, e.g. on the Twilio webhook URL) select
+    the persona; they are passed to /media-stream as <Stream> parameters. Without
+    `profile`, a call scheduled through /scheduled-calls for `call` (a stream key)
+    or for the caller's number selects it.
+    """
+    if call_type is not None and call_type not in CALL_TYPES:
+        raise HTTPException(status_code=400, detail=f"Unknown call_type, expected one of {CALL_TYPES}")
+
+    prewarm_queue = getattr(request.app.state, 'prewarm_queue', None)
+    call_key = call or await get_caller(request)
+    if prewarm_queue is not None and call_key:
+        job = await prewarm_queue.mark_connected(call_key)
+        if job is not None and not profile:
+            profile, call_type = job.profile_url, call_type or job.call_type
+            print(f"Scheduled call {job.call_key}: persona {job.status}")
+
+    # No pause needed: the realtime session is pre-connected and only the persona is sent on answer
     response = VoiceResponse()
-    response.pause(length=1)
     host = request.url.hostname
     connect = Connect()
     # Pass parameters in the WebSocket URL
-    connect.stream(url=f'wss://{host}/media-stream')
+    stream = connect.stream(url=f'wss://{host}/media-stream')
+    if profile:
+        stream.parameter(name='profile', value=profile)
+    if call_type:
+        stream.parameter(name='call_type', value=call_type)
     response.append(connect)
     return HTMLResponse(content=str(response), media_type="application/xml")
 
@@ -27,4 +70,134 @@ async def handle_incoming_call(request: Request):
 async def media_stream_endpoint(
     websocket: WebSocket,
 ):
-    await handle_media_stream(websocket) 
\ No newline at end of file
+    await handle_media_stream(websocket)
+
+class personaRequest(BaseModel):
+    profile_url: str
+    call_type: str = CALL_TYPES[0]
+
+@router.post("/personas", response_model=None)
+async def create_persona(
+    request: Request,
+    persona_request: personaRequest,
+    scraper: LinkedInScraperService = Depends(get_linkedin_scraper),
+):
+    """
+    Fetch and compile the persona for a profile ahead of calls that select it
+    """
+    if persona_request.call_type not in CALL_TYPES:
+        raise HTTPException(status_code=400, detail=f"Unknown call_type, expected one of {CALL_TYPES}")
+
+    profile_data = await scraper.get_enriched_profile(
+        persona_request.profile_url, cleanup=True, posts_cutoff=PERSONA_POSTS_CUTOFF
+    )
+    if not profile_data:
+        raise HTTPException(
+            status_code=404,
+            detail="Could not fetch LinkedIn profile data"
+        )
+
+    persona = await get_persona_store(request.app).put(persona_request.profile_url, persona_request.call_type, profile_data)
+    return JSONResponse(status_code=201, content={
+        "profile": persona.profile,
+        "call_type": persona.call_type,
+        "bytes": persona.size,
+    })
+
+@router.post("/personas/refresh", response_model=None)
+async def refresh_persona(
+    request: Request,
+    persona_request: personaRequest,
+    scraper: LinkedInScraperService = Depends(get_linkedin_scraper),
+):
+    """
+    Refresh the profile behind a persona and recompile the persona only if the profile changed
+    """
+    if persona_request.call_type not in CALL_TYPES:
+        raise HTTPException(status_code=400, detail=f"Unknown call_type, expected one of {CALL_TYPES}")
+
+    refresh = await scraper.refresh_enriched_profile(persona_request.profile_url)
+    if refresh is None:
+        raise HTTPException(
+            status_code=404,
+            detail="Could not fetch LinkedIn profile data"
+        )
+
+    store = get_persona_store(request.app)
+    persona = await store.get(persona_request.profile_url, persona_request.call_type)
+    # get() falls back to the default persona, which does not count as this profile's
+    stored = persona is not None and persona.profile == normalize_profile_key(persona_request.profile_url)
+    rebuilt = refresh.diff.initial or bool(refresh.diff.changed) or not stored
+    if rebuilt:
+        persona = await store.put(persona_request.profile_url, persona_request.call_type, refresh.profile)
+
+    return JSONResponse(status_code=200, content={
+        "profile": persona.profile,
+        "call_type": persona.call_type,
+        "bytes": persona.size,
+        "rebuilt": rebuilt,
+        "diff": refresh.to_dict(),
+    })
+
+class scheduledCallRequest(BaseModel):
+    call: str  # Caller phone number, or a stream key passed as `call` on the webhook URL
+    profile_url: str
+    call_type: str = CALL_TYPES[0]
+    call_at: datetime  # Naive times are taken as UTC
+
+def get_prewarm(request: Request) -> PrewarmWorkerPool:
+    prewarm = getattr(request.app.state, 'prewarm', None)
+    if prewarm is None:
+        raise HTTPException(status_code=404, detail="Prewarm queue is not running")
+    return prewarm
+
+@router.post("/scheduled-calls", response_model=None)
+async def schedule_call(request: Request, call_request: scheduledCallRequest):
+    """
+    Register an upcoming call so its persona is built in the background before it arrives
+    """
+    if call_request.call_type not in CALL_TYPES:
+        raise HTTPException(status_code=400, detail=f"Unknown call_type, expected one of {CALL_TYPES}")
+
+    call_at = call_request.call_at
+    if call_at.tzinfo is None:
+        call_at = call_at.replace(tzinfo=timezone.utc)
+    job = await get_prewarm(request).schedule(
+        call_request.call, call_request.profile_url, call_request.call_type, call_at.timestamp()
+    )
+    return JSONResponse(status_code=202, content=job.to_dict())
+
+@router.get("/scheduled-calls/stats", response_class=JSONResponse)
+async def get_scheduled_call_stats(request: Request):
+    """Jobs per status and how far ahead of call time personas became ready"""
+    return get_prewarm(request).get_stats()
+
+@router.get("/scheduled-calls/{call}", response_class=JSONResponse)
+async def get_scheduled_call(request: Request, call: str):
+    job = get_prewarm(request).queue.get(call)
+    if job is None:
+        raise HTTPException(status_code=404, detail="No call scheduled for this number or stream")
+    return job.to_dict()
+
+@router.delete("/scheduled-calls/{call}", response_class=JSONResponse)
+async def cancel_scheduled_call(request: Request, call: str):
+    if not await get_prewarm(request).queue.cancel(call):
+        raise HTTPException(status_code=404, detail="No call scheduled for this number or stream")
+    return {"cancelled": True}
+
+@router.get("/personas/stats", response_class=JSONResponse)
+async def get_persona_stats(request: Request):
+    return get_persona_store(request.app).get_stats()
+
+@router.get("/realtime-pool/stats", response_class=JSONResponse)
+async def get_realtime_pool_stats(request: Request):
+    realtime_pool = getattr(request.app.state, 'realtime_pool', None)
+    if realtime_pool is None:
+        raise HTTPException(status_code=404, detail="Realtime pool is not running")
+    return realtime_pool.get_stats()
+
+
+@router.get("/metrics", response_class=JSONResponse)
+async def get_call_metrics_endpoint(request: Request):
+    """Per-call latency histograms and relay counters, active and recent calls keyed by stream SID"""
+    return get_call_metrics(request.app).get_stats()
@@ -1,22 +1,68 @@
-from fastapi import APIRouter, HTTPException
-from fastapi.responses import JSONResponse
+import asyncio
+import json
+from typing import List, Optional
+from fastapi import APIRouter, Depends, HTTPException, Request
+from fastapi.responses import JSONResponse, StreamingResponse
 from pydantic import BaseModel
-from services.linkedin_scraper_service import LinkedInScraperService
+from config.settings import BATCH_DEFAULT_CONCURRENCY, BATCH_MAX_CONCURRENCY, BATCH_MAX_PROFILES
+from services.linkedin_scraper_service import LinkedInScraperService, UPSTREAM_ERRORS
+from services.linkedin_batch_service import iter_profiles_batch
 
 
 router = APIRouter(prefix="/linkedin", tags=["linkedin"])
 
+async def upstream_error_handler(request: Request, exc: Exception) -> JSONResponse:
+    """
+    Answer RapidAPI outages with 503 (504 for timeouts) rather than 404, which means the profile does not exist
+
+    Registered on the app for every UPSTREAM_ERRORS type.
+    """
+    status_code = 504 if isinstance(exc, asyncio.TimeoutError) else 503
+    return JSONResponse(status_code=status_code, content={"detail": f"LinkedIn data is temporarily unavailable: {exc}"})
+
+async def get_linkedin_scraper(request: Request):
+    """Provide the app-wide scraper that shares the pooled HTTP session"""
+    scraper = getattr(request.app.state, 'linkedin_scraper', None)
+    if scraper is not None:
+        yield scraper
+        return
+
+    # App started without its lifespan (e.g. TestClient outside a `with` block)
+    scraper = LinkedInScraperService()
+    try:
+        yield scraper
+    finally:
+        await scraper.close()
+
+def get_streaming_linkedin_scraper(request: Request) -> LinkedInScraperService:
+    """
+    Provide the scraper to routes that return a StreamingResponse
+
+    FastAPI exits yield dependencies before the response body is sent, so the
+    fallback of get_linkedin_scraper would already be closed while the stream
+    runs. The fallback is returned open here; the route releases it with
+    release_streaming_scraper once it is done with it.
+    """
+    return getattr(request.app.state, 'linkedin_scraper', None) or LinkedInScraperService()
+
+async def release_streaming_scraper(request: Request, scraper: LinkedInScraperService):
+    """Close the scraper from get_streaming_linkedin_scraper unless it is the app-wide one"""
+    if scraper is not getattr(request.app.state, 'linkedin_scraper', None):
+        await scraper.close()
+
 class linkedinProfileRequest(BaseModel):
     profile_url: str
     cleanup: bool = False
     include_posts: bool = False
     
 @router.post("/profile", response_model=None)
-async def get_linkedin_profile(request: linkedinProfileRequest):
+async def get_linkedin_profile(
+    request: linkedinProfileRequest,
+    scraper: LinkedInScraperService = Depends(get_linkedin_scraper),
+):
     """
     Fetch LinkedIn profile data for a given profile URL
     """
-    scraper = LinkedInScraperService()
     profile_data = await scraper.get_profile_data(str(request.profile_url), request.cleanup)
     
     if not profile_data:
@@ -29,3 +75,222 @@ async def get_linkedin_profile(request: linkedinProfileRequest):
         await scraper.add_posts_to_profile_data(profile_data)
     
     return JSONResponse(status_code=200, content=profile_data)
+
+
+class linkedinEnrichedProfileRequest(BaseModel):
+    profile_url: str
+    include_posts: bool = True
+    include_company: bool = True
+
+@router.post("/enriched-profile", response_model=None)
+async def get_enriched_linkedin_profile(
+    request: linkedinEnrichedProfileRequest,
+    cleanup: bool = False,
+    scraper: LinkedInScraperService = Depends(get_linkedin_scraper),
+):
+    """
+    Fetch LinkedIn profile data together with its posts, current company details and company posts
+    """
+    profile_data = await scraper.get_enriched_profile(
+        str(request.profile_url),
+        cleanup=cleanup,
+        include_posts=request.include_posts,
+        include_company=request.include_company,
+    )
+
+    if not profile_data:
+        raise HTTPException(
+            status_code=404,
+            detail="Could not fetch LinkedIn profile data"
+        )
+
+    return JSONResponse(status_code=200, content=profile_data)
+
+@router.post("/enriched-profile/refresh", response_model=None)
+async def refresh_enriched_linkedin_profile(
+    request: linkedinEnrichedProfileRequest,
+    scraper: LinkedInScraperService = Depends(get_linkedin_scraper),
+):
+    """
+    Re-fetch a cleaned enriched profile, only new posts included, and report which sections changed
+    """
+    refresh = await scraper.refresh_enriched_profile(
+        str(request.profile_url),
+        include_posts=request.include_posts,
+        include_company=request.include_company,
+    )
+
+    if refresh is None:
+        raise HTTPException(
+            status_code=404,
+            detail="Could not fetch LinkedIn profile data"
+        )
+
+    return JSONResponse(status_code=200, content={"diff": refresh.to_dict(), "profile": refresh.profile})
+
+def get_text_cleaning_agent(request: Request):
+    """App-wide cleaning agent, created on first use so its LLM rate budget is shared by every request"""
+    agent = getattr(request.app.state, 'text_cleaning_agent', None)
+    if agent is None:
+        # Imported here so the langchain stack is only loaded when cleaning is used
+        from services.agents.text_cleaning_agent import TextCleaningAgent
+        agent = request.app.state.text_cleaning_agent = TextCleaningAgent()
+    return agent
+
+async def fetch_profile_to_clean(
+    http_request: Request,
+    request: linkedinEnrichedProfileRequest,
+    scraper: LinkedInScraperService,
+):
+    # The cleaning stream only needs the fetched profile, so the scraper is released here
+    try:
+        profile_data = await scraper.get_enriched_profile(
+            str(request.profile_url),
+            cleanup=True,
+            include_posts=request.include_posts,
+            include_company=request.include_company,
+        )
+    finally:
+        await release_streaming_scraper(http_request, scraper)
+
+    if not profile_data:
+        raise HTTPException(
+            status_code=404,
+            detail="Could not fetch LinkedIn profile data"
+        )
+    return profile_data
+
+def format_sse(event: dict) -> str:
+    """One server-sent event, named after the event status"""
+    return f"event: {event['status']}\ndata: {json.dumps(event)}\n\n"
+
+@router.post("/enriched-profile/clean", response_model=None)
+async def clean_enriched_linkedin_profile(
+    http_request: Request,
+    request: linkedinEnrichedProfileRequest,
+    scraper: LinkedInScraperService = Depends(get_streaming_linkedin_scraper),
+    agent = Depends(get_text_cleaning_agent),
+):
+    """
+    Fetch an enriched profile and clean it with the LLM, streaming one NDJSON line per cleaned chunk and section
+
+    The last line has status "done" and carries the full cleaned text.
+    """
+    profile_data = await fetch_profile_to_clean(http_request, request, scraper)
+
+    async def stream_progress():
+        async for event in agent.astream_clean(profile_data):
+            yield json.dumps(event) + "\n"
+
+    return StreamingResponse(stream_progress(), media_type="application/x-ndjson")
+
+async def clean_events_response(
+    http_request: Request,
+    request: linkedinEnrichedProfileRequest,
+    sections_only: bool,
+    scraper: LinkedInScraperService,
+    agent,
+) -> StreamingResponse:
+    profile_data = await fetch_profile_to_clean(http_request, request, scraper)
+
+    async def stream_events():
+        async for event in agent.astream_clean(profile_data):
+            if sections_only and event["status"] not in ("section", "done"):
+                continue
+            yield format_sse(event)
+
+    return StreamingResponse(
+        stream_events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+@router.post("/enriched-profile/clean/events", response_model=None)
+async def stream_clean_enriched_linkedin_profile(
+    http_request: Request,
+    request: linkedinEnrichedProfileRequest,
+    sections_only: bool = False,
+    scraper: LinkedInScraperService = Depends(get_streaming_linkedin_scraper),
+    agent = Depends(get_text_cleaning_agent),
+):
+    """
+    Same stream as /enriched-profile/clean as server-sent events
+
+    Each "section" event carries a finished section of the cleaned text, in
+    order, so persona building can start on the profile while posts are still
+    being cleaned. With `sections_only`, chunk progress events are left out.
+    The stream ends with a "done" event.
+    """
+    return await clean_events_response(http_request, request, sections_only, scraper, agent)
+
+@router.get("/enriched-profile/clean/events", response_model=None)
+async def stream_clean_enriched_linkedin_profile_get(
+    http_request: Request,
+    profile_url: str,
+    include_posts: bool = True,
+    include_company: bool = True,
+    sections_only: bool = False,
+    scraper: LinkedInScraperService = Depends(get_streaming_linkedin_scraper),
+    agent = Depends(get_text_cleaning_agent),
+):
+    """
+    GET form of POST /enriched-profile/clean/events, for browser EventSource clients
+
+    The request fields are query parameters, e.g. `?profile_url=...&sections_only=true`.
+    """
+    request = linkedinEnrichedProfileRequest(
+        profile_url=profile_url, include_posts=include_posts, include_company=include_company
+    )
+    return await clean_events_response(http_request, request, sections_only, scraper, agent)
+
+class linkedinBatchProfilesRequest(BaseModel):
+    profile_urls: List[str]
+    cleanup: bool = False
+    include_posts: bool = False
+    include_company: bool = False
+    concurrency: Optional[int] = None
+
+@router.post("/profiles:batch", response_model=None)
+async def get_linkedin_profiles_batch(
+    http_request: Request,
+    request: linkedinBatchProfilesRequest,
+    scraper: LinkedInScraperService = Depends(get_streaming_linkedin_scraper),
+):
+    """
+    Fetch many LinkedIn profiles, streaming one NDJSON line per profile as soon as it completes
+    """
+    if len(request.profile_urls) > BATCH_MAX_PROFILES:
+        await release_streaming_scraper(http_request, scraper)
+        raise HTTPException(
+            status_code=413,
+            detail=f"A batch can contain at most {BATCH_MAX_PROFILES} profiles"
+        )
+
+    concurrency = min(request.concurrency or BATCH_DEFAULT_CONCURRENCY, BATCH_MAX_CONCURRENCY)
+
+    async def stream_results():
+        # The stream owns the scraper: it runs after the route has returned
+        try:
+            async for result in iter_profiles_batch(
+                scraper,
+                [str(url) for url in request.profile_urls],
+                cleanup=request.cleanup,
+                include_posts=request.include_posts,
+                include_company=request.include_company,
+                concurrency=concurrency,
+            ):
+                yield json.dumps(result) + "\n"
+        finally:
+            await release_streaming_scraper(http_request, scraper)
+
+    return StreamingResponse(stream_results(), media_type="application/x-ndjson")
+
+@router.get("/stats", response_model=None)
+@router.get("/cache/stats", response_model=None)
+async def get_linkedin_stats(scraper: LinkedInScraperService = Depends(get_linkedin_scraper)):
+    """
+    Return cache, request coalescing, rate limiting and resilience counters of the LinkedIn scraper
+
+    /cache/stats is kept as an alias; the cache counters are under "cache" (null when disabled).
+    """
+    return JSONResponse(status_code=200, content=scraper.get_stats())
@@ -2,13 +2,43 @@ from langchain_openai import OpenAI
 from langchain.text_splitter import RecursiveCharacterTextSplitter
 from langchain.chains import LLMChain
 from langchain.prompts import PromptTemplate
+import asyncio
+import hashlib
 import os
+from typing import Any, AsyncIterator, Callable, Dict, List, Optional, Union
+
+from config.settings import CLEANING_MAX_CONCURRENCY, CLEANING_MAX_ATTEMPTS, CLEANING_LOCAL_FIRST
+from services.chunk_cache import CleanedChunkCache, create_cleaned_chunk_cache
+from services.chunk_cleaning_service import SectionAssembler, create_cleaning_rate_limiter, iter_cached_cleaned_chunks
+from services.local_cleaner import SECTION_SEPARATOR, LocalCleaner
+from services.persona_store import parse_profile_details
+from services.structure_splitter import StructureSplitter
+from utils.rate_limiter import RateLimiter
 
 OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
 
 class TextCleaningAgent:
-    def __init__(self, api_key = OPENAI_API_KEY, chunk_size=2000, chunk_overlap=200):
+    def __init__(
+        self,
+        api_key = OPENAI_API_KEY,
+        chunk_size=2000,
+        chunk_overlap=200,
+        concurrency: int = CLEANING_MAX_CONCURRENCY,
+        max_attempts: int = CLEANING_MAX_ATTEMPTS,
+        rate_limiter: Optional[RateLimiter] = None,
+        cache: Optional[CleanedChunkCache] = None,
+        local_first: bool = CLEANING_LOCAL_FIRST,
+    ):
         self.llm = OpenAI(api_key=api_key, temperature=0.1)  # Low temperature for consistency
+        self.concurrency = concurrency
+        self.max_attempts = max_attempts
+        self.rate_limiter = rate_limiter or create_cleaning_rate_limiter()
+        self.cache = cache if cache is not None else create_cleaned_chunk_cache()
+        # Profile data is rendered locally, only free text that needs fixing goes to the LLM
+        self.local_first = local_first
+        self.local_cleaner = LocalCleaner()
+        # Profile data is split along its structure, the character splitter only handles free text
+        self.structure_splitter = StructureSplitter()
         self.text_splitter = RecursiveCharacterTextSplitter(
             chunk_size=chunk_size,
             chunk_overlap=chunk_overlap,
@@ -38,22 +68,198 @@ class TextCleaningAgent:
 
             Cleaned text:
             <profile_information>
-            {profile_information}
+            {{profile_information}}
             </profile_information>
             
             <profile_posts>
-            {profile_posts}
+            {{profile_posts}}
             </profile_posts>
             
             <company_posts>
-            {company_posts}
+            {{company_posts}}
             </company_posts>
             """
         )
         
         self.chain = LLMChain(llm=self.llm, prompt=self.cleaning_prompt)
+
+        self.free_text_prompt = PromptTemplate(
+            input_variables=["text"],
+            template="""
+            Fix grammatical errors, typos and punctuation in the following text from a LinkedIn profile.
+            Rules:
+            1. DO NOT remove any information
+            2. DO NOT add new information
+            3. Keep the original wording, line breaks and bullet points as much as possible
+            4. Answer with the corrected text only
+
+            Text to fix:
+            {text}
+
+            Fixed text:
+            """
+        )
+
+        self.free_text_chain = LLMChain(llm=self.llm, prompt=self.free_text_prompt)
+        # Part of the cleaned chunk cache key, so editing a prompt invalidates earlier results
+        self.prompt_version = hashlib.sha256(self.cleaning_prompt.template.encode('utf-8')).hexdigest()[:16]
+        self.free_text_prompt_version = hashlib.sha256(self.free_text_prompt.template.encode('utf-8')).hexdigest()[:16]
     
     def clean_text(self, input_file_path, output_file_path):
+        """Synchronous wrapper around `aclean_text`, for callers outside an event loop"""
+        return asyncio.run(self.aclean_text(input_file_path, output_file_path))
+
+    async def aclean_chunk(self, chunk: str) -> str:
+        """Clean one chunk with a single LLM call"""
+        return await self.chain.arun(text_chunk=chunk)
+
+    async def aclean_free_text(self, text: str) -> str:
+        """Fix one free text field (summary, description, post body) with a single LLM call"""
+        return (await self.free_text_chain.arun(text=text)).strip()
+
+    def split(self, data: Union[Dict[str, Any], str]) -> List[str]:
+        """
+        Break profile data or text into chunks for the LLM
+
+        Args:
+            data: Profile dictionary, or text (a JSON or Python repr dump of one is parsed first)
+
+        Returns:
+            Structure-aware chunks for profile data, character chunks for other text
+        """
+        if isinstance(data, str):
+            data = parse_profile_details(data)
+        if isinstance(data, dict):
+            return self.structure_splitter.split(data)
+        return self.text_splitter.split_text(data)
+
+    async def astream_clean(self, data: Union[Dict[str, Any], str]) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Clean text chunk by chunk, concurrently, yielding progress and each section as it completes
+
+        With `local_first`, profile data is rendered into the cleaning layout by
+        `LocalCleaner` and the chunks are only the free text fields it escalates;
+        other input is split and every chunk goes through the cleaning prompt.
+        Progress events come from `iter_cached_cleaned_chunks`: chunks found in the
+        cleaned chunk cache first, then the others in completion order. As soon as
+        every chunk of the next output section is done, a "section" event carries
+        its final text: the `<profile_information>`, `<profile_posts>` and
+        `<company_posts>` blocks for profile data, each cleaned chunk otherwise.
+        Sections come in output order, so appending `separator + text` of each one
+        rebuilds the full text. The last event has status "done" and carries the
+        whole cleaned text plus the cache hit rate of this clean; a chunk that
+        failed every attempt keeps its original text so no information is lost.
+
+        Args:
+            data: Profile dictionary or raw text to clean
+
+        Yields:
+            Progress event dictionaries, {"status": "section", "section", "position", "separator", "text"}
+            dictionaries, then {"status": "done", "text", "failed", "cache"}
+        """
+        if isinstance(data, str):
+            data = parse_profile_details(data)
+        pre_cleaned = self.local_cleaner.prepare(data) if self.local_first and isinstance(data, dict) else None
+        if pre_cleaned is not None:
+            chunks = pre_cleaned.escalated_texts()
+            clean_chunk, prompt_version = self.aclean_free_text, self.free_text_prompt_version
+            sections, separator = pre_cleaned.section_chunks(), SECTION_SEPARATOR
+        else:
+            chunks = self.split(data)
+            clean_chunk, prompt_version = self.aclean_chunk, self.prompt_version
+            sections, separator = {f"chunk_{index}": [index] for index in range(len(chunks))}, '\n'
+        assembler = SectionAssembler(sections, chunks)
+        rendered = []
+        failed = []
+        hits = 0
+
+        def section_events():
+            for section in assembler.ready():
+                if pre_cleaned is not None:
+                    text = pre_cleaned.render_section(section, assembler.cleaned)
+                else:
+                    text = assembler.cleaned[sections[section][0]]
+                rendered.append(text)
+                yield {
+                    "status": "section",
+                    "section": section,
+                    "position": len(rendered) - 1,
+                    "total_sections": len(sections),
+                    "separator": separator if len(rendered) > 1 else '',
+                    "text": text,
+                }
+
+        # Sections without LLM work (often all of them for profile data) are ready right away
+        for event in section_events():
+            yield event
+
+        async for event in iter_cached_cleaned_chunks(
+            chunks,
+            clean_chunk,
+            self.cache,
+            prompt_version,
+            self.llm.model_name,
+            concurrency=self.concurrency,
+            rate_limiter=self.rate_limiter,
+            max_attempts=self.max_attempts,
+        ):
+            if event["status"] == "ok":
+                assembler.complete(event["index"], event["text"])
+                hits += event["cached"]
+            elif event["status"] == "error":
+                assembler.complete(event["index"])
+                failed.append(event["index"])
+            yield event
+            for section_event in section_events():
+                yield section_event
+
+        cache_stats = {
+            "hits": hits,
+            "misses": len(chunks) - hits,
+            "hit_rate": round(hits / len(chunks), 3) if chunks else None,
+        }
+        print(f"Cleaned {len(chunks)} chunks, cache hits {hits}/{len(chunks)}")
+        yield {
+            "status": "done",
+            "total": len(chunks),
+            "text": separator.join(rendered),
+            "local": pre_cleaned is not None,
+            "failed": sorted(failed),
+            "cache": cache_stats,
+        }
+
+    async def astream_sections(self, data: Union[Dict[str, Any], str]) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Cleaned sections of `data` as they complete, in output order
+
+        Yields:
+            The "section" events of `astream_clean`
+        """
+        async for event in self.astream_clean(data):
+            if event["status"] == "section":
+                yield event
+
+    async def aclean_text(
+        self,
+        input_file_path,
+        output_file_path,
+        on_progress: Optional[Callable[[Dict[str, Any]], None]] = None,
+    ):
+        """
+        Clean a text file without blocking the event loop, appending each section to the output as it completes
+
+        The output file is truncated first and every cleaned section is written
+        and flushed as soon as it is ready, so readers can pick up the profile
+        section while posts are still being cleaned.
+
+        Args:
+            input_file_path: File with the raw text
+            output_file_path: File the cleaned text is written to
+            on_progress: Called with each progress and section event
+
+        Returns:
+            The cleaned text
+        """
         try:
             with open(input_file_path, 'r', encoding='utf-8') as file:
                 text = file.read()
@@ -61,21 +267,17 @@ class TextCleaningAgent:
             raise Exception(f"Input file not found: {input_file_path}")
         except Exception as e:
             raise Exception(f"Error reading file: {str(e)}")
-        
-        # Split text into manageable chunks
-        chunks = self.text_splitter.split_text(text)
-        
-        # Process each chunk
-        cleaned_chunks = []
-        for chunk in chunks:
-            cleaned_chunk = self.chain.run(text_chunk=chunk)
-            cleaned_chunks.append(cleaned_chunk)
-        
-        # Combine cleaned chunks
-        final_text = '\n'.join(cleaned_chunks)
-        
-        # Save the cleaned text
-        with open(output_file_path, 'w', encoding='utf-8') as file:
-            file.write(final_text)
-        
+
+        final_text = ''
+        with open(output_file_path, 'w', encoding='utf-8') as output:
+            async for event in self.astream_clean(text):
+                if event["status"] == "done":
+                    final_text = event["text"]
+                    continue
+                if event["status"] == "section":
+                    output.write(event["separator"] + event["text"])
+                    output.flush()
+                if on_progress is not None:
+                    on_progress(event)
+
         return final_text
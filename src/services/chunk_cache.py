@@ -0,0 +1,194 @@
+import hashlib
+import sqlite3
+import time
+import unicodedata
+from dataclasses import dataclass, asdict
+from typing import Dict, Optional
+
+from config.settings import CLEANED_CHUNK_CACHE_PATH, CLEANED_CHUNK_CACHE_MAX_BYTES
+from utils.shared_state import connect_shared_db, disable_busy_wait, retry_when_locked
+
+
+def normalize_chunk(text: str) -> str:
+    """Canonical form of a chunk, so whitespace and Unicode variants share one cache entry"""
+    return ' '.join(unicodedata.normalize('NFC', text).split())
+
+
+def make_chunk_key(chunk: str, prompt_version: str, model: str) -> str:
+    """Content address of a cleaned chunk: the normalized text cleaned by one prompt and model"""
+    digest = hashlib.sha256()
+    for part in (prompt_version, model, normalize_chunk(chunk)):
+        digest.update(part.encode('utf-8'))
+        digest.update(b'\0')
+    return digest.hexdigest()
+
+
+@dataclass
+class ChunkCacheStats:
+    hits: int = 0
+    misses: int = 0
+    sets: int = 0
+    evictions: int = 0
+
+    def to_dict(self) -> Dict[str, int]:
+        return asdict(self)
+
+
+class CleanedChunkCache:
+    """
+    Persistent content-addressed store of LLM-cleaned chunks
+
+    Entries never expire, the key already changes with the chunk, the prompt or
+    the model. The table is bounded by the total size of the cleaned text; past
+    `max_bytes` the least recently used entries are evicted. SQLite keeps the
+    cache across restarts and shares it between worker processes.
+
+    The total size is kept in a one-row table updated with every insert and
+    eviction, so a set never sums the whole table. Hits are not written back one
+    by one: their `used_at` updates are batched and flushed before evicting.
+    """
+
+    # Hits whose `used_at` update is held back before writing them together
+    TOUCH_BATCH = 64
+
+    def __init__(self, db_path: str, max_bytes: int = CLEANED_CHUNK_CACHE_MAX_BYTES):
+        self.db_path = db_path
+        self.max_bytes = max_bytes
+        self.stats = ChunkCacheStats()
+        self._touched: Dict[str, float] = {}
+        self._conn = connect_shared_db(db_path)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS cleaned_chunks ("
+            "key TEXT PRIMARY KEY, value TEXT NOT NULL, size INTEGER NOT NULL, used_at REAL NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS cleaned_chunks_used_at ON cleaned_chunks (used_at)")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS cleaned_chunks_size (id INTEGER PRIMARY KEY CHECK (id = 0), bytes INTEGER NOT NULL)"
+        )
+        # Caches created before the total was tracked are summed once
+        self._conn.execute(
+            "INSERT OR IGNORE INTO cleaned_chunks_size (id, bytes) "
+            "SELECT 0, COALESCE(SUM(size), 0) FROM cleaned_chunks"
+        )
+        # Read and written from the cleaning stream, so locks held by other workers are waited out asynchronously
+        disable_busy_wait(self._conn)
+
+    async def get(self, key: str) -> Optional[str]:
+        row = await retry_when_locked(self._select, key)
+        if row is None:
+            self.stats.misses += 1
+            return None
+
+        self.stats.hits += 1
+        self._touched[key] = time.time()
+        if len(self._touched) >= self.TOUCH_BATCH:
+            await retry_when_locked(self._flush_touched)
+        return row[0]
+
+    def _select(self, key: str):
+        return self._conn.execute("SELECT value FROM cleaned_chunks WHERE key = ?", (key,)).fetchone()
+
+    def _flush_touched(self):
+        self._conn.execute("BEGIN IMMEDIATE")
+        try:
+            self._write_touched()
+            self._conn.execute("COMMIT")
+        except BaseException:
+            self._conn.execute("ROLLBACK")
+            raise
+        self._touched.clear()
+
+    def _write_touched(self):
+        self._conn.executemany(
+            "UPDATE cleaned_chunks SET used_at = ? WHERE key = ?",
+            [(used_at, key) for key, used_at in self._touched.items()],
+        )
+
+    async def set(self, key: str, value: str):
+        size = len(value.encode('utf-8'))
+        if size > self.max_bytes:
+            # Never let a single oversized entry flush the whole cache
+            return
+
+        await retry_when_locked(self._insert, key, value, size)
+        self.stats.sets += 1
+
+    def _insert(self, key: str, value: str, size: int):
+        self._conn.execute("BEGIN IMMEDIATE")
+        try:
+            row = self._conn.execute("SELECT size FROM cleaned_chunks WHERE key = ?", (key,)).fetchone()
+            self._conn.execute(
+                "INSERT OR REPLACE INTO cleaned_chunks (key, value, size, used_at) VALUES (?, ?, ?, ?)",
+                (key, value, size, time.time()),
+            )
+            total = self._add_bytes(size - (row[0] if row is not None else 0))
+            evicting = total > self.max_bytes
+            if evicting:
+                # Evict in the order of the latest hits, not the last flushed ones
+                self._write_touched()
+                self._evict(total)
+            self._conn.execute("COMMIT")
+        except BaseException:
+            self._conn.execute("ROLLBACK")
+            raise
+        if evicting:
+            self._touched.clear()
+
+    def _add_bytes(self, delta: int) -> int:
+        self._conn.execute("UPDATE cleaned_chunks_size SET bytes = bytes + ?", (delta,))
+        return self.total_bytes()
+
+    def _evict(self, total: int):
+        evicted = 0
+        while total > self.max_bytes:
+            rows = self._conn.execute(
+                "SELECT key, size FROM cleaned_chunks ORDER BY used_at LIMIT ?", (self.TOUCH_BATCH,)
+            ).fetchall()
+            if not rows:
+                break
+            for key, size in rows:
+                if total <= self.max_bytes:
+                    break
+                self._conn.execute("DELETE FROM cleaned_chunks WHERE key = ?", (key,))
+                total -= size
+                evicted += 1
+        self._conn.execute("UPDATE cleaned_chunks_size SET bytes = ?", (total,))
+        self.stats.evictions += evicted
+
+    def total_bytes(self) -> int:
+        return self._conn.execute("SELECT bytes FROM cleaned_chunks_size").fetchone()[0]
+
+    async def clear(self):
+        await retry_when_locked(self._clear)
+
+    def _clear(self):
+        self._conn.execute("BEGIN IMMEDIATE")
+        try:
+            self._conn.execute("DELETE FROM cleaned_chunks")
+            self._conn.execute("UPDATE cleaned_chunks_size SET bytes = 0")
+            self._conn.execute("COMMIT")
+        except BaseException:
+            self._conn.execute("ROLLBACK")
+            raise
+        self._touched.clear()
+
+    def get_stats(self) -> Dict[str, int]:
+        stats = self.stats.to_dict()
+        stats['entries'] = self._conn.execute("SELECT COUNT(*) FROM cleaned_chunks").fetchone()[0]
+        stats['bytes'] = self.total_bytes()
+        stats['max_bytes'] = self.max_bytes
+        return stats
+
+    def close(self):
+        try:
+            if self._touched:
+                self._flush_touched()
+        except sqlite3.OperationalError as e:
+            # Only recency hints are lost
+            print(f"Could not record cleaned chunk cache hits on close: {e}")
+        self._conn.close()
+
+
+def create_cleaned_chunk_cache() -> Optional[CleanedChunkCache]:
+    """Build the cleaned chunk cache from settings, None when it is disabled"""
+    return CleanedChunkCache(CLEANED_CHUNK_CACHE_PATH) if CLEANED_CHUNK_CACHE_PATH else None
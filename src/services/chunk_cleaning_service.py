@@ -0,0 +1,206 @@
+import asyncio
+import random
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, Optional
+
+from config.settings import (
+    CLEANING_MAX_CONCURRENCY, CLEANING_REQUESTS_PER_MINUTE, CLEANING_MAX_ATTEMPTS, CLEANING_RETRY_BASE_DELAY,
+    CLEANING_RETRY_MAX_DELAY,
+)
+from services.chunk_cache import CleanedChunkCache, make_chunk_key
+from utils.rate_limiter import Priority, RateLimiter
+
+
+def create_cleaning_rate_limiter(requests_per_minute: float = CLEANING_REQUESTS_PER_MINUTE) -> RateLimiter:
+    """Request budget for cleaning LLM calls, shared by every clean running in the process"""
+    rate = requests_per_minute / 60
+    return RateLimiter(rate=rate, burst=max(1, int(rate)))
+
+
+def retry_delay(attempt: int, base_delay: float = CLEANING_RETRY_BASE_DELAY, max_delay: float = CLEANING_RETRY_MAX_DELAY) -> float:
+    """Exponential backoff with full jitter before retry number `attempt` (starting at 1)"""
+    return random.uniform(0, min(max_delay, base_delay * (2 ** (attempt - 1))))
+
+
+async def iter_cleaned_chunks(
+    chunks: List[str],
+    clean_chunk: Callable[[str], Awaitable[str]],
+    concurrency: int = CLEANING_MAX_CONCURRENCY,
+    rate_limiter: Optional[RateLimiter] = None,
+    max_attempts: int = CLEANING_MAX_ATTEMPTS,
+    priority: Priority = Priority.INTERACTIVE,
+) -> AsyncIterator[Dict[str, Any]]:
+    """
+    Clean chunks with a bounded worker pool, yielding progress as each chunk completes
+
+    Events are yielded in completion order; each carries the `index` of its
+    chunk so callers can reassemble the text in input order. A failed chunk is
+    retried on its own, with backoff, while the other chunks carry on. Closing
+    the iterator early cancels the remaining work.
+
+    Args:
+        chunks: Text chunks to clean
+        clean_chunk: Coroutine function cleaning one chunk (one LLM call)
+        concurrency: Maximum number of chunks cleaned at the same time
+        rate_limiter: Request budget that each attempt, retries included, waits on
+        max_attempts: Attempts per chunk before it is reported as failed
+        priority: Rate limiter scheduling class
+
+    Yields:
+        {"index", "total", "completed", "status", "attempts", "text" | "error"} dictionaries,
+        with status "retry" for an attempt that failed and will be repeated, then "ok" or "error"
+    """
+    total = len(chunks)
+    concurrency = max(1, min(concurrency, total or 1))
+    max_attempts = max(1, max_attempts)
+    pending: asyncio.Queue = asyncio.Queue()
+    for item in enumerate(chunks):
+        pending.put_nowait(item)
+
+    events: asyncio.Queue = asyncio.Queue()
+    completed = 0
+
+    async def clean_with_retries(index: int, chunk: str):
+        for attempt in range(1, max_attempts + 1):
+            if rate_limiter is not None:
+                await rate_limiter.acquire(priority)
+            try:
+                return attempt, await clean_chunk(chunk)
+            except Exception as e:
+                if attempt == max_attempts:
+                    raise
+                await events.put({"index": index, "total": total, "status": "retry", "attempts": attempt, "error": str(e)})
+                await asyncio.sleep(retry_delay(attempt))
+
+    async def worker():
+        while True:
+            try:
+                index, chunk = pending.get_nowait()
+            except asyncio.QueueEmpty:
+                return
+
+            # Every chunk produces exactly one final event, failures included
+            event = {"index": index, "total": total}
+            try:
+                attempts, text = await clean_with_retries(index, chunk)
+                event.update(status="ok", attempts=attempts, text=text)
+            except Exception as e:
+                event.update(status="error", attempts=max_attempts, error=str(e))
+            await events.put(event)
+
+    workers = [asyncio.create_task(worker()) for _ in range(concurrency)]
+    try:
+        while completed < total:
+            event = await events.get()
+            if event["status"] != "retry":
+                completed += 1
+            event["completed"] = completed
+            yield event
+    finally:
+        for task in workers:
+            task.cancel()
+        await asyncio.gather(*workers, return_exceptions=True)
+
+
+async def iter_cached_cleaned_chunks(
+    chunks: List[str],
+    clean_chunk: Callable[[str], Awaitable[str]],
+    cache: Optional[CleanedChunkCache],
+    prompt_version: str,
+    model: str,
+    **kwargs,
+) -> AsyncIterator[Dict[str, Any]]:
+    """
+    `iter_cleaned_chunks` in front of the cleaned chunk cache
+
+    Chunks already cleaned with the same prompt version and model are yielded
+    first, with `cached` set, and never reach the LLM. Identical chunks in one
+    clean (e.g. a company post repeated across sections) are cleaned once.
+    Successful results are written back to the cache.
+
+    Args:
+        chunks: Text chunks to clean
+        clean_chunk: Coroutine function cleaning one chunk (one LLM call)
+        cache: Cleaned chunk cache, or None to clean every chunk
+        prompt_version: Identifies the cleaning prompt, part of the cache key
+        model: LLM model name, part of the cache key
+        **kwargs: Passed on to `iter_cleaned_chunks`
+
+    Yields:
+        `iter_cleaned_chunks` events with a `cached` flag, one final event per chunk of `chunks`
+    """
+    total = len(chunks)
+    completed = 0
+
+    # Chunks to send to the LLM, one per distinct key, and every index sharing it
+    pending_keys: List[str] = []
+    indices_by_key: Dict[str, List[int]] = {}
+    cached_by_key: Dict[str, str] = {}
+    for index, chunk in enumerate(chunks):
+        key = make_chunk_key(chunk, prompt_version, model)
+        if key in indices_by_key:
+            indices_by_key[key].append(index)
+            continue
+        if key not in cached_by_key:
+            cached = await cache.get(key) if cache is not None else None
+            if cached is None:
+                pending_keys.append(key)
+                indices_by_key[key] = [index]
+                continue
+            cached_by_key[key] = cached
+        completed += 1
+        yield {
+            "index": index, "total": total, "completed": completed, "status": "ok", "attempts": 0,
+            "text": cached_by_key[key], "cached": True,
+        }
+
+    unique_chunks = [chunks[indices_by_key[key][0]] for key in pending_keys]
+    async for event in iter_cleaned_chunks(unique_chunks, clean_chunk, **kwargs):
+        key = pending_keys[event["index"]]
+        if event["status"] == "retry":
+            yield {**event, "index": indices_by_key[key][0], "total": total, "completed": completed, "cached": False}
+            continue
+
+        if event["status"] == "ok" and cache is not None:
+            await cache.set(key, event["text"])
+        for index in indices_by_key[key]:
+            completed += 1
+            yield {**event, "index": index, "total": total, "completed": completed, "cached": False}
+
+
+class SectionAssembler:
+    """
+    Releases output sections in order as soon as every chunk they are built from is cleaned
+
+    Sections are released strictly in layout order, so each one can be appended
+    to the output as it comes: a later section that finishes first waits for the
+    ones before it.
+
+    Args:
+        sections: Section name to the indices of the chunks it is built from, in output order
+        chunks: Text chunks being cleaned; a chunk that fails keeps its original text
+    """
+
+    def __init__(self, sections: Dict[str, List[int]], chunks: List[str]):
+        self.cleaned = list(chunks)
+        self._order = list(sections)
+        self._waiting = {section: set(indices) for section, indices in sections.items()}
+        self._released = 0
+
+    def complete(self, index: int, text: Optional[str] = None):
+        """Record a final chunk event; `text` is None for a chunk that failed every attempt"""
+        if text is not None:
+            self.cleaned[index] = text
+        for waiting in self._waiting.values():
+            waiting.discard(index)
+
+    def ready(self) -> List[str]:
+        """Sections that can be emitted now, in order; each is returned once"""
+        ready = []
+        while self._released < len(self._order) and not self._waiting[self._order[self._released]]:
+            ready.append(self._order[self._released])
+            self._released += 1
+        return ready
+
+    @property
+    def released(self) -> int:
+        return self._released
@@ -0,0 +1,227 @@
+import re
+from typing import Any, Callable, Dict, Iterable, Optional
+
+# One path segment: a key (or `*` for any key), optionally followed by `[*]` for "every list item"
+_SEGMENT = re.compile(r'^(?P<key>[^\[\]]+)(?P<items>\[\*\])?$')
+
+
+class _Node:
+    __slots__ = ('children', 'items', 'deny', 'allow', 'keep_all')
+
+    def __init__(self):
+        self.children: Dict[str, "_Node"] = {}
+        self.items: Optional["_Node"] = None  # Applied to each element when the value is a list
+        self.deny = set()
+        self.allow: Optional[set] = None  # Keys kept at this level when an allow spec reaches it
+        self.keep_all = False  # The allow spec ends here, keep the whole subtree
+
+
+def _parse(path: str):
+    segments = []
+    for raw in path.split('.'):
+        match = _SEGMENT.match(raw.strip())
+        if not match:
+            raise ValueError(f"Invalid projection path segment {raw!r} in {path!r}")
+        segments.append((match.group('key'), bool(match.group('items'))))
+    return segments
+
+
+def _descend(node: _Node, key: str, items: bool) -> _Node:
+    child = node.children.get(key)
+    if child is None:
+        child = node.children[key] = _Node()
+    if items:
+        if child.items is None:
+            child.items = _Node()
+        child = child.items
+    return child
+
+
+def _build_tree(deny: Iterable[str], allow: Optional[Iterable[str]]) -> _Node:
+    root = _Node()
+
+    for path in allow or ():
+        node = root
+        for key, items in _parse(path):
+            if node.allow is None:
+                node.allow = set()
+            node.allow.add(key)
+            node = _descend(node, key, items)
+        node.keep_all = True
+
+    for path in deny:
+        segments = _parse(path)
+        node = root
+        for key, items in segments[:-1]:
+            node = _descend(node, key, items)
+        key, items = segments[-1]
+        if items:
+            # `a[*]` as the last segment denies the list itself
+            raise ValueError(f"Deny path {path!r} cannot end with [*]")
+        node.deny.add(key)
+
+    return root
+
+
+def _restricts_keys(node: _Node) -> bool:
+    return node.allow is not None and not node.keep_all and '*' not in node.allow
+
+
+def _has_dict_work(node: _Node) -> bool:
+    return bool(node.deny) or _restricts_keys(node) or any(
+        _has_work(child) for child in node.children.values()
+    )
+
+
+def _has_work(node: _Node) -> bool:
+    return _has_dict_work(node) or (node.items is not None and _has_work(node.items))
+
+
+class _CodeGenerator:
+    """
+    Emit the source of a walker specialized for one projection tree
+
+    Every key lookup, loop and pop is spelled out, so walking a payload costs no
+    per-node dispatch or closure calls.
+    """
+
+    def __init__(self):
+        self.lines = []
+        self.constants = {}
+        self._names = 0
+
+    def variable(self) -> str:
+        self._names += 1
+        return f"v{self._names}"
+
+    def constant(self, value) -> str:
+        name = f"ALLOW_{len(self.constants)}"
+        self.constants[name] = value
+        return name
+
+    def emit(self, indent: int, line: str):
+        self.lines.append("    " * indent + line)
+
+    def value(self, node: _Node, var: str, indent: int):
+        has_dict = _has_dict_work(node)
+        has_items = node.items is not None and _has_work(node.items)
+        if has_items:
+            item = self.variable()
+            self.emit(indent, f"if type({var}) is list:")
+            self.emit(indent + 1, f"for {item} in {var}:")
+            self.value(node.items, item, indent + 2)
+            if has_dict:
+                self.emit(indent, f"elif type({var}) is dict:")
+                self.mapping(node, var, indent + 1)
+        elif has_dict:
+            self.emit(indent, f"if type({var}) is dict:")
+            self.mapping(node, var, indent + 1)
+
+    def mapping(self, node: _Node, var: str, indent: int):
+        if _restricts_keys(node):
+            allowed = self.constant(frozenset(node.allow))
+            self.emit(indent, f"for key in [key for key in {var} if key not in {allowed}]:")
+            self.emit(indent + 1, f"del {var}[key]")
+
+        for key in sorted(node.deny):
+            self.emit(indent, f"if {key!r} in {var}:")
+            self.emit(indent + 1, f"del {var}[{key!r}]")
+
+        for key, child in node.children.items():
+            if not _has_work(child):
+                continue
+            child_var = self.variable()
+            if key == '*':
+                self.emit(indent, f"for {child_var} in {var}.values():")
+                self.value(child, child_var, indent + 1)
+            else:
+                self.emit(indent, f"{child_var} = {var}.get({key!r})")
+                self.value(child, child_var, indent)
+
+
+def _compile(root: _Node) -> Callable[[Any], Any]:
+    generator = _CodeGenerator()
+    generator.emit(0, "def walk(v0):")
+    if _has_work(root):
+        generator.value(root, "v0", 1)
+    generator.emit(1, "return v0")
+
+    source = "\n".join(generator.lines)
+    namespace = dict(generator.constants)
+    exec(compile(source, "<field_projection>", "exec"), namespace)
+    walk = namespace["walk"]
+    walk.source = source
+    return walk
+
+
+class FieldProjection:
+    """
+    Declarative allow/deny projection compiled once into a specialized walker
+
+    Paths are dot separated keys; `key[*]` descends into every item of a list and
+    `*` matches any key of a dict, e.g. `positions[*].extraInfo.website`. Deny paths
+    remove the last key. Allow paths, when given, keep only the listed keys at every
+    level they pass through (the full subtree below the last key is kept).
+
+    The spec is compiled into straight-line Python once, at construction. The walker
+    edits the payload in place in a single pass and returns it, without copying any
+    of the data.
+    """
+
+    def __init__(self, deny: Iterable[str] = (), allow: Optional[Iterable[str]] = None):
+        self.deny = tuple(deny)
+        self.allow = tuple(allow) if allow is not None else None
+        self._walk = _compile(_build_tree(self.deny, self.allow))
+
+    @property
+    def source(self) -> str:
+        """Generated walker source, useful when debugging a spec"""
+        return self._walk.source
+
+    def __call__(self, data: Any) -> Any:
+        return self._walk(data)
+
+
+# Shared by /linkedin/profile cleanup; covers both `position` (current API) and `positions`
+_POSITION_NOISE = ('logos', 'companyLogo', 'companyURL', 'extraInfo.website')
+
+PROFILE_PROJECTION = FieldProjection(deny=[
+    'profilePicture',
+    'profilePictures',
+    'backgroundImage',
+    'projects',
+    'skills[*].passedSkillAssessment',
+    'skills[*].endorsementsCount',
+    'educations[*].url',
+    'educations[*].schoolId',
+    'educations[*].logos',
+    'educations[*].logo',
+    *(f'{section}[*].{field}' for section in ('position', 'positions', 'fullPositions') for field in _POSITION_NOISE),
+    'certifications[*].company.logo',
+    'courses[*].company.logo',
+])
+
+_POST_NOISE = ('profilePicture', 'profilePictures', 'url', 'postUrl', 'shareUrl')
+
+# Applied to a single post (profile or company post)
+POST_PROJECTION = FieldProjection(deny=[
+    *_POST_NOISE,
+    'author.profilePicture',
+    'author.profilePictures',
+    'author.url',
+    *(f'sharedPost.{field}' for field in _POST_NOISE),
+    'sharedPost.author.profilePicture',
+    'sharedPost.author.profilePictures',
+    'sharedPost.author.url',
+])
+
+# Applied to the {"success", "message", "data"} company details payload
+COMPANY_PROJECTION = FieldProjection(deny=[
+    'data.Images',
+    'data.logos',
+    'data.backgroundCoverImages',
+    'data.callToAction.url',
+    'data.crunchbaseUrl',
+    'data.fundingData.lastFundingRound.investorsCrunchbaseUrl',
+    'data.fundingData.lastFundingRound.fundingRoundCrunchbaseUrl',
+])
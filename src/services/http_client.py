@@ -0,0 +1,33 @@
+import aiohttp
+
+from config.settings import (
+    HTTP_POOL_LIMIT,
+    HTTP_POOL_LIMIT_PER_HOST,
+    HTTP_KEEPALIVE_TIMEOUT,
+    HTTP_DNS_CACHE_TTL,
+    HTTP_REQUEST_TIMEOUT,
+)
+
+
+def create_client_session() -> aiohttp.ClientSession:
+    """
+    Create the long-lived aiohttp session shared by all upstream calls
+
+    The connector keeps connections alive between requests, so repeated calls to
+    the same host reuse an open TCP+TLS connection instead of handshaking again.
+    Must be called from inside a running event loop.
+
+    Returns:
+        aiohttp.ClientSession backed by a pooled TCPConnector
+    """
+    connector = aiohttp.TCPConnector(
+        limit=HTTP_POOL_LIMIT,
+        limit_per_host=HTTP_POOL_LIMIT_PER_HOST,
+        keepalive_timeout=HTTP_KEEPALIVE_TIMEOUT,
+        ttl_dns_cache=HTTP_DNS_CACHE_TTL,
+        use_dns_cache=True,
+    )
+    return aiohttp.ClientSession(
+        connector=connector,
+        timeout=aiohttp.ClientTimeout(total=HTTP_REQUEST_TIMEOUT),
+    )
@@ -0,0 +1,81 @@
+import asyncio
+from typing import Any, AsyncIterator, Dict, List
+
+from services.linkedin_scraper_service import LinkedInScraperService
+from utils.rate_limiter import Priority
+
+
+async def iter_profiles_batch(
+    scraper: LinkedInScraperService,
+    profile_urls: List[str],
+    cleanup: bool = False,
+    include_posts: bool = False,
+    include_company: bool = False,
+    concurrency: int = 8,
+    priority: Priority = Priority.BATCH,
+) -> AsyncIterator[Dict[str, Any]]:
+    """
+    Fetch many profiles with a bounded worker pool, yielding each result as it completes
+
+    Results are yielded in completion order, not input order; each carries the
+    `index` of its URL in `profile_urls`. The result queue is bounded by the pool
+    size, so a slow consumer pauses the workers instead of results piling up in
+    memory. Closing the iterator early cancels the remaining work.
+
+    Args:
+        scraper: Shared LinkedIn scraper service
+        profile_urls: LinkedIn profile URLs to fetch
+        cleanup: Remove URLs and pictures from the data
+        include_posts: Add the profile's posts
+        include_company: Add current company details and company posts
+        concurrency: Maximum number of profiles fetched at the same time
+        priority: Rate limiter scheduling class, so interactive requests go first
+
+    Yields:
+        {"index", "profile_url", "status", "data" | "error"} dictionaries
+    """
+    concurrency = max(1, min(concurrency, len(profile_urls) or 1))
+    pending: asyncio.Queue = asyncio.Queue()
+    for item in enumerate(profile_urls):
+        pending.put_nowait(item)
+
+    results: asyncio.Queue = asyncio.Queue(maxsize=concurrency)
+
+    async def fetch_one(profile_url: str):
+        if include_posts or include_company:
+            return await scraper.get_enriched_profile(
+                profile_url,
+                cleanup=cleanup,
+                include_posts=include_posts,
+                include_company=include_company,
+                priority=priority,
+            )
+        return await scraper.get_profile_data(profile_url, cleanup, priority)
+
+    async def worker():
+        while True:
+            try:
+                index, profile_url = pending.get_nowait()
+            except asyncio.QueueEmpty:
+                return
+
+            # Every URL produces exactly one result, failures included
+            result = {"index": index, "profile_url": profile_url}
+            try:
+                data = await fetch_one(profile_url)
+                if data:
+                    result.update(status="ok", data=data)
+                else:
+                    result.update(status="error", error="Could not fetch LinkedIn profile data")
+            except Exception as e:
+                result.update(status="error", error=str(e))
+            await results.put(result)
+
+    workers = [asyncio.create_task(worker()) for _ in range(concurrency)]
+    try:
+        for _ in range(len(profile_urls)):
+            yield await results.get()
+    finally:
+        for task in workers:
+            task.cancel()
+        await asyncio.gather(*workers, return_exceptions=True)
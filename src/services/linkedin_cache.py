@@ -0,0 +1,307 @@
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, asdict
+from typing import Optional, Dict, Tuple
+from urllib.parse import urlsplit, unquote
+
+from config.settings import LINKEDIN_CACHE_MAX_BYTES, LINKEDIN_CACHE_DB_PATH, LINKEDIN_CACHE_TTLS, LINKEDIN_CACHE_MAX_STALE, SHARED_STATE_DB_PATH
+from utils.shared_state import connect_shared_db, disable_busy_wait, retry_when_locked
+
+RESOURCE_PROFILE = 'profile'
+RESOURCE_COMPANY = 'company'
+RESOURCE_PROFILE_POSTS = 'profile_posts'
+RESOURCE_COMPANY_POSTS = 'company_posts'
+
+DEFAULT_TTL = 60 * 60
+
+
+def normalize_linkedin_url(linkedin_url: str) -> str:
+    """
+    Normalize a LinkedIn URL so that equivalent variants share one cache key
+
+    `linkedin.com/in/x`, `https://www.linkedin.com/in/X/` and `...in/x?trk=abc`
+    all normalize to `linkedin.com/in/x`.
+
+    Args:
+        linkedin_url: LinkedIn profile or company URL, with or without scheme
+
+    Returns:
+        Normalized `host/path` string
+    """
+    url = str(linkedin_url).strip()
+    if '://' not in url:
+        url = f"https://{url}"
+
+    parts = urlsplit(url)
+    host = parts.netloc.lower().split('@')[-1].split(':')[0]
+    # Mobile and country subdomains (www., m., il., ...) serve the same profile
+    if host == 'linkedin.com' or host.endswith('.linkedin.com'):
+        host = 'linkedin.com'
+
+    path = unquote(parts.path).lower().rstrip('/')
+    # Query string (?trk=, ?originalSubdomain=) and fragment never change the profile
+    return f"{host}{path}"
+
+
+def normalize_username(username: str) -> str:
+    """Normalize a profile/company username for use as a cache key"""
+    return str(username).strip().strip('/').lower()
+
+
+@dataclass
+class CacheStats:
+    hits: int = 0
+    misses: int = 0
+    evictions: int = 0
+    expirations: int = 0
+    memory_hits: int = 0
+    disk_hits: int = 0
+    stale_hits: int = 0
+    sets: int = 0
+
+    def to_dict(self) -> Dict[str, int]:
+        return asdict(self)
+
+
+class MemoryLRUTier:
+    """
+    In-process LRU bounded by the total bytes of the stored values
+
+    Expired entries are kept for `max_stale` seconds past their expiry so they can
+    still be served as a fallback while the upstream is failing.
+    """
+
+    def __init__(self, max_bytes: int, stats: CacheStats, max_stale: float = 0.0):
+        self.max_bytes = max_bytes
+        self.max_stale = max_stale
+        self.stats = stats
+        self.current_bytes = 0
+        self._entries: "OrderedDict[str, Tuple[float, bytes]]" = OrderedDict()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, key: str, now: float) -> Optional[Tuple[float, bytes]]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+
+        expires_at, _ = entry
+        if expires_at + self.max_stale <= now:
+            self._remove(key)
+            return None
+
+        self._entries.move_to_end(key)
+        return entry
+
+    def set(self, key: str, value: bytes, expires_at: float):
+        size = len(key) + len(value)
+        if size > self.max_bytes:
+            # Never let a single oversized entry flush the whole tier
+            return
+
+        if key in self._entries:
+            self._remove(key)
+
+        self._entries[key] = (expires_at, value)
+        self.current_bytes += size
+
+        while self.current_bytes > self.max_bytes:
+            oldest_key = next(iter(self._entries))
+            self._remove(oldest_key)
+            self.stats.evictions += 1
+
+    def delete(self, key: str):
+        if key in self._entries:
+            self._remove(key)
+
+    def clear(self):
+        self._entries.clear()
+        self.current_bytes = 0
+
+    def _remove(self, key: str):
+        _, value = self._entries.pop(key)
+        self.current_bytes -= len(key) + len(value)
+
+
+class SQLiteTier:
+    """
+    On-disk tier that survives restarts and is shared by worker processes
+
+    Lookups run on the event loop, so the connection never waits on a lock held
+    by another worker; a locked statement is retried asynchronously instead.
+    """
+
+    def __init__(self, db_path: str, max_stale: float = 0.0):
+        self.db_path = db_path
+        self.max_stale = max_stale
+        self._conn = connect_shared_db(db_path)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS linkedin_cache ("
+            "key TEXT PRIMARY KEY, value BLOB NOT NULL, expires_at REAL NOT NULL)"
+        )
+        disable_busy_wait(self._conn)
+
+    async def get(self, key: str, now: float) -> Optional[Tuple[float, bytes]]:
+        row = await retry_when_locked(self._select, key)
+        if row is None:
+            return None
+
+        expires_at, value = row
+        if expires_at + self.max_stale <= now:
+            await self.delete(key)
+            return None
+        return expires_at, bytes(value)
+
+    def _select(self, key: str):
+        return self._conn.execute(
+            "SELECT expires_at, value FROM linkedin_cache WHERE key = ?", (key,)
+        ).fetchone()
+
+    async def set(self, key: str, value: bytes, expires_at: float):
+        await retry_when_locked(
+            self._conn.execute,
+            "INSERT OR REPLACE INTO linkedin_cache (key, value, expires_at) VALUES (?, ?, ?)",
+            (key, value, expires_at),
+        )
+
+    async def delete(self, key: str):
+        await retry_when_locked(self._conn.execute, "DELETE FROM linkedin_cache WHERE key = ?", (key,))
+
+    async def purge_expired(self, now: float) -> int:
+        cursor = await retry_when_locked(
+            self._conn.execute, "DELETE FROM linkedin_cache WHERE expires_at <= ?", (now - self.max_stale,)
+        )
+        return cursor.rowcount
+
+    async def clear(self):
+        await retry_when_locked(self._conn.execute, "DELETE FROM linkedin_cache")
+
+    def close(self):
+        self._conn.close()
+
+
+class LinkedInCache:
+    """
+    Tiered cache for raw RapidAPI response bodies
+
+    Values are the undecoded response bytes, so every hit is decoded into a fresh
+    dict and callers (e.g. clean_data) can mutate the result safely.
+    """
+
+    def __init__(
+        self,
+        max_memory_bytes: int = LINKEDIN_CACHE_MAX_BYTES,
+        disk_path: Optional[str] = None,
+        ttls: Optional[Dict[str, int]] = None,
+        max_stale: float = LINKEDIN_CACHE_MAX_STALE,
+    ):
+        self.stats = CacheStats()
+        self.ttls = dict(LINKEDIN_CACHE_TTLS if ttls is None else ttls)
+        self.memory = MemoryLRUTier(max_memory_bytes, self.stats, max_stale)
+        self.disk = SQLiteTier(disk_path, max_stale) if disk_path else None
+
+    @staticmethod
+    def make_key(resource: str, identifier: str) -> str:
+        if resource == RESOURCE_PROFILE:
+            identifier = normalize_linkedin_url(identifier)
+        else:
+            identifier = normalize_username(identifier)
+        return f"{resource}:{identifier}"
+
+    async def get(self, resource: str, identifier: str) -> Optional[bytes]:
+        """
+        Look up a cached response body
+
+        Args:
+            resource: One of the RESOURCE_* types
+            identifier: Profile URL or username, normalized before lookup
+
+        Returns:
+            Cached response bytes or None on a miss
+        """
+        now = time.time()
+        entry, tier = await self._lookup(self.make_key(resource, identifier), now)
+        if entry is None or entry[0] <= now:
+            if entry is not None:
+                self.stats.expirations += 1
+            self.stats.misses += 1
+            return None
+
+        self.stats.hits += 1
+        if tier == 'memory':
+            self.stats.memory_hits += 1
+        else:
+            self.stats.disk_hits += 1
+        return entry[1]
+
+    async def get_stale(self, resource: str, identifier: str) -> Optional[bytes]:
+        """
+        Look up a response body even if its TTL has passed
+
+        Used as a fallback while the upstream is failing; entries are kept for
+        LINKEDIN_CACHE_MAX_STALE seconds past their expiry.
+        """
+        entry, _ = await self._lookup(self.make_key(resource, identifier), time.time())
+        if entry is None:
+            return None
+        self.stats.stale_hits += 1
+        return entry[1]
+
+    async def _lookup(self, key: str, now: float) -> Tuple[Optional[Tuple[float, bytes]], Optional[str]]:
+        entry = self.memory.get(key, now)
+        if entry is not None:
+            return entry, 'memory'
+
+        if self.disk is not None:
+            entry = await self.disk.get(key, now)
+            if entry is not None:
+                # Promote to the memory tier for subsequent lookups
+                self.memory.set(key, entry[1], entry[0])
+                return entry, 'disk'
+
+        return None, None
+
+    async def set(self, resource: str, identifier: str, value: bytes):
+        """Store a response body with the TTL configured for its resource type"""
+        key = self.make_key(resource, identifier)
+        ttl = self.ttls.get(resource, DEFAULT_TTL)
+        if ttl <= 0:
+            return
+
+        expires_at = time.time() + ttl
+        self.memory.set(key, value, expires_at)
+        if self.disk is not None:
+            await self.disk.set(key, value, expires_at)
+        self.stats.sets += 1
+
+    async def invalidate(self, resource: str, identifier: str):
+        key = self.make_key(resource, identifier)
+        self.memory.delete(key)
+        if self.disk is not None:
+            await self.disk.delete(key)
+
+    async def clear(self):
+        self.memory.clear()
+        if self.disk is not None:
+            await self.disk.clear()
+
+    def get_stats(self) -> Dict[str, int]:
+        stats = self.stats.to_dict()
+        stats['memory_entries'] = len(self.memory)
+        stats['memory_bytes'] = self.memory.current_bytes
+        stats['memory_max_bytes'] = self.memory.max_bytes
+        return stats
+
+    def close(self):
+        if self.disk is not None:
+            self.disk.close()
+
+
+def create_linkedin_cache() -> LinkedInCache:
+    """Build the app-wide cache from settings, on the shared SQLite file in multi-process mode"""
+    return LinkedInCache(
+        max_memory_bytes=LINKEDIN_CACHE_MAX_BYTES,
+        disk_path=LINKEDIN_CACHE_DB_PATH or SHARED_STATE_DB_PATH,
+        max_stale=LINKEDIN_CACHE_MAX_STALE,
+    )
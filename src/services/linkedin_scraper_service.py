@@ -1,200 +1,699 @@
+import json
+import time
+import asyncio
 import aiohttp
-from typing import Optional, Dict, Any
+from dataclasses import dataclass, field
+from typing import AsyncIterator, Awaitable, Callable, Optional, Dict, Any, Union
 from urllib.parse import quote
 
-from config.settings import RAPIDAPI_KEY, RAPIDAPI_HOST
+from config.settings import (
+    RAPIDAPI_KEY,
+    RAPIDAPI_HOST,
+    ENRICHMENT_BRANCH_TIMEOUTS,
+    RAPIDAPI_ATTEMPT_TIMEOUT,
+    RAPIDAPI_RETRY_ATTEMPTS,
+    RAPIDAPI_RETRY_BASE_DELAY,
+    RAPIDAPI_RETRY_MAX_DELAY,
+    RAPIDAPI_RETRY_BUDGET_RATIO,
+    CIRCUIT_FAILURE_THRESHOLD,
+    CIRCUIT_RECOVERY_TIMEOUT,
+    SHARED_LEASE_POLL_INTERVAL,
+    LINKEDIN_TYPED_DECODE,
+    PROFILE_REFRESH_MAX_POST_PAGES,
+    POSTS_STREAM_MAX_PAGES,
+    PERSONA_POSTS_FETCH_LIMIT,
+    PERSONA_POSTS_MAX_AGE_DAYS,
+)
+from models.decoders import decode_company, decode_profile, to_data
 from models.linkedin_types import CleanedLinkedInProfileScraperResponse, LinkedInProfileScraperResponse
+from services.http_client import create_client_session
+from services.field_projection import PROFILE_PROJECTION, POST_PROJECTION, COMPANY_PROJECTION
+from utils.linkedin_payloads import post_items
+from services.profile_refresh import (
+    ProfileDiff,
+    ProfileSnapshotStore,
+    diff_profiles,
+    merge_posts,
+    post_key,
+    split_new_posts,
+)
+from services.linkedin_cache import (
+    LinkedInCache,
+    RESOURCE_PROFILE,
+    RESOURCE_COMPANY,
+    RESOURCE_PROFILE_POSTS,
+    RESOURCE_COMPANY_POSTS,
+)
+from utils.single_flight import SingleFlight
+from utils.rate_limiter import RateLimiter, Priority
+from utils.shared_state import SharedLeases
+from utils.tokens import count_tokens
+from utils.resilience import (
+    CircuitBreaker,
+    CircuitOpenError,
+    RetryBudget,
+    RetryPolicy,
+    UpstreamError,
+    RETRYABLE_STATUSES,
+    is_breaker_failure,
+)
 
-USE_TYPES = False
+# Upstream unavailable (5xx/429 after retries, open circuit, network error, timeout), as opposed
+# to a resource that does not exist; the fetch methods raise these instead of returning None
+UPSTREAM_ERRORS = (CircuitOpenError, UpstreamError, aiohttp.ClientError, asyncio.TimeoutError)
+
+@dataclass
+class ProfileRefresh:
+    """
+    Result of `LinkedInScraperService.refresh_enriched_profile`
+
+    Args:
+        profile: Refreshed enriched profile, cleaned
+        diff: Sections that changed since the stored version
+        new_posts: New posts found, per posts section
+        post_pages: Posts pages fetched, per posts section
+    """
+    profile: Dict[str, Any]
+    diff: ProfileDiff
+    new_posts: Dict[str, int] = field(default_factory=dict)
+    post_pages: Dict[str, int] = field(default_factory=dict)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {**self.diff.to_dict(), 'new_posts': self.new_posts, 'post_pages': self.post_pages}
+
+@dataclass(frozen=True)
+class PostCutoff:
+    """
+    When a posts stream stops; None disables a limit
+
+    Args:
+        max_posts: Posts yielded at most
+        max_age_days: Posts older than this are skipped, and no page past the first old post is fetched
+        max_tokens: Total tokens of the yielded post texts
+        max_pages: Pages fetched at most
+    """
+    max_posts: Optional[int] = None
+    max_age_days: Optional[float] = None
+    max_tokens: Optional[int] = None
+    max_pages: int = POSTS_STREAM_MAX_PAGES
+
+# Posts pulled for persona building; the compactor ranks them down to PERSONA_MAX_POSTS
+PERSONA_POSTS_CUTOFF = PostCutoff(max_posts=PERSONA_POSTS_FETCH_LIMIT, max_age_days=PERSONA_POSTS_MAX_AGE_DAYS)
 
 class LinkedInScraperService:
-    def __init__(self):
+    def __init__(
+        self,
+        session: Optional[aiohttp.ClientSession] = None,
+        cache: Optional[LinkedInCache] = None,
+        rate_limiter: Optional[RateLimiter] = None,
+        retry_policy: Optional[RetryPolicy] = None,
+        leases: Optional[SharedLeases] = None,
+        typed_decode: bool = LINKEDIN_TYPED_DECODE,
+        snapshots: Optional[ProfileSnapshotStore] = None,
+    ):
+        """
+        Args:
+            session: Shared pooled aiohttp session. When omitted, the service lazily
+                creates (and owns) its own session on first use.
+            cache: Optional response cache consulted before every upstream call
+            rate_limiter: Optional limiter every upstream call must acquire a token from
+            retry_policy: Backoff policy for transient upstream failures, built from
+                settings when omitted
+            leases: Cross-process fetch leases for multi-worker mode. A worker that
+                does not get the lease waits for the holder's result in the shared
+                cache tier instead of repeating the upstream call.
+            snapshots: Last cleaned enriched profile per URL, recorded by
+                `get_enriched_profile` and diffed against by `refresh_enriched_profile`
+        """
         self.headers = {
             'x-rapidapi-key': RAPIDAPI_KEY,
             'x-rapidapi-host': RAPIDAPI_HOST
         }
         self.base_url = f"https://{RAPIDAPI_HOST}"
+        self._session = session
+        self._owns_session = session is None
+        self.cache = cache
+        self.rate_limiter = rate_limiter
+        # Concurrent requests for the same resource share one upstream call
+        self._inflight = SingleFlight()
+        self.leases = leases
+        self.lease_waits = 0
+        self.retry_policy = retry_policy or RetryPolicy(
+            max_attempts=RAPIDAPI_RETRY_ATTEMPTS,
+            base_delay=RAPIDAPI_RETRY_BASE_DELAY,
+            max_delay=RAPIDAPI_RETRY_MAX_DELAY,
+            budget=RetryBudget(ratio=RAPIDAPI_RETRY_BUDGET_RATIO),
+        )
+        # One circuit per endpoint, so a failing posts endpoint doesn't block profiles
+        self._breakers: Dict[str, CircuitBreaker] = {}
+        self.typed_decode = typed_decode
+        self.snapshots = snapshots
+
+    def _get_session(self) -> aiohttp.ClientSession:
+        """Return the shared session, creating an owned one if none was injected"""
+        if self._session is None or self._session.closed:
+            self._session = create_client_session()
+            self._owns_session = True
+        return self._session
+
+    async def close(self):
+        """Close the underlying session if this service created it"""
+        if self._owns_session and self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
+
+    async def _fetch(
+        self,
+        resource: str,
+        cache_key: str,
+        endpoint: str,
+        error_label: str,
+        priority: Priority = Priority.INTERACTIVE,
+        use_cache: bool = True,
+    ) -> Optional[bytes]:
+        """
+        GET a RapidAPI endpoint, serving and populating the cache when configured
+
+        Concurrent calls for the same (normalized) resource are coalesced into a
+        single upstream request; errors propagate to every waiting caller.
+        Transient failures are retried with backoff. When the upstream keeps
+        failing, or its circuit is open, an expired cache entry is served instead
+        if one is still available, except for refreshes: an old body passed off as
+        current would be diffed and stored as the new snapshot.
+
+        Args:
+            resource: Cache resource type (one of the RESOURCE_* constants)
+            cache_key: Profile URL or username identifying the resource
+            endpoint: Path and query string of the RapidAPI endpoint
+            error_label: Human readable name used in error logs
+            priority: Rate limiter scheduling class of the call
+            use_cache: False to skip the cache lookup and the stale fallback and go
+                upstream (refreshes); the fresh body still replaces the cached one
+
+        Returns:
+            Raw response body, or None if the resource does not exist
+
+        Raises:
+            One of UPSTREAM_ERRORS when RapidAPI is unavailable and no stale copy is cached,
+            or on any upstream failure without `use_cache`
+        """
+        if use_cache and self.cache is not None:
+            cached = await self.cache.get(resource, cache_key)
+            if cached is not None:
+                return cached
+
+        key = LinkedInCache.make_key(resource, cache_key)
+        if use_cache:
+            fetch = lambda: self._fetch_leased(resource, cache_key, endpoint, error_label, priority)
+        else:
+            # A lease waiter reads the holder's result from the cache, which a refresh must not do
+            key += ':refresh'
+            fetch = lambda: self._fetch_with_retry(resource, cache_key, endpoint, error_label, priority)
+
+        try:
+            return await self._inflight.do(key, fetch)
+        except UPSTREAM_ERRORS as e:
+            if not use_cache:
+                raise
+            stale = await self.cache.get_stale(resource, cache_key) if self.cache is not None else None
+            if stale is None:
+                raise
+            print(f"Serving stale {error_label} after upstream failure: {e}")
+            return stale
+
+    async def _fetch_leased(
+        self,
+        resource: str,
+        cache_key: str,
+        endpoint: str,
+        error_label: str,
+        priority: Priority,
+    ) -> Optional[bytes]:
+        """Fetch upstream unless another worker process is already fetching the same resource"""
+        if self.leases is None or self.cache is None:
+            return await self._fetch_with_retry(resource, cache_key, endpoint, error_label, priority)
+
+        lease_key = LinkedInCache.make_key(resource, cache_key)
+        while not await self.leases.acquire(lease_key):
+            # The holder stores its result in the shared cache tier; if it fails, its lease is released
+            self.lease_waits += 1
+            await asyncio.sleep(SHARED_LEASE_POLL_INTERVAL)
+            cached = await self.cache.get(resource, cache_key)
+            if cached is not None:
+                return cached
+
+        try:
+            # Another worker may have stored it between our cache miss and taking the lease
+            cached = await self.cache.get(resource, cache_key)
+            if cached is not None:
+                return cached
+            return await self._fetch_with_retry(resource, cache_key, endpoint, error_label, priority)
+        finally:
+            await self.leases.release(lease_key)
+
+    def _get_breaker(self, resource: str) -> CircuitBreaker:
+        breaker = self._breakers.get(resource)
+        if breaker is None:
+            breaker = CircuitBreaker(CIRCUIT_FAILURE_THRESHOLD, CIRCUIT_RECOVERY_TIMEOUT)
+            self._breakers[resource] = breaker
+        return breaker
+
+    async def _fetch_with_retry(
+        self,
+        resource: str,
+        cache_key: str,
+        endpoint: str,
+        error_label: str,
+        priority: Priority,
+    ) -> Optional[bytes]:
+        breaker = self._get_breaker(resource)
+        self.retry_policy.budget.record_request()
+        attempt = 0
+        while True:
+            admission = breaker.allow_request()
+            if not admission:
+                raise CircuitOpenError(f"Circuit open for {error_label}")
+
+            attempt += 1
+            recorded = False
+            try:
+                body = await self._fetch_upstream(resource, cache_key, endpoint, error_label, priority)
+                breaker.record_success()
+                recorded = True
+                return body
+            except (UpstreamError, aiohttp.ClientError, asyncio.TimeoutError) as e:
+                if is_breaker_failure(e):
+                    breaker.record_failure()
+                    recorded = True
+                error = e
+            finally:
+                # A cancelled probe (e.g. by a branch timeout), a 429 or an unexpected
+                # exception has no verdict, but must not keep the half-open probe slot forever
+                if not recorded and admission == CircuitBreaker.PROBE:
+                    breaker.release()
+
+            if not self.retry_policy.should_retry(attempt, error):
+                raise error
+            delay = self.retry_policy.backoff(attempt)
+            print(f"Retrying {error_label} in {delay:.2f}s after attempt {attempt} failed: {error}")
+            await asyncio.sleep(delay)
+
+    async def _fetch_upstream(
+        self,
+        resource: str,
+        cache_key: str,
+        endpoint: str,
+        error_label: str,
+        priority: Priority,
+    ) -> Optional[bytes]:
+        """
+        Perform a single upstream attempt
+
+        Returns:
+            Raw response body, or None for a permanent failure (e.g. 404)
+
+        Raises:
+            UpstreamError: For transient statuses (429, 5xx) worth retrying
+        """
+        if self.rate_limiter is not None:
+            await self.rate_limiter.acquire(priority)
+
+        session = self._get_session()
+        async with session.get(
+            f"{self.base_url}{endpoint}",
+            headers=self.headers,
+            timeout=aiohttp.ClientTimeout(total=RAPIDAPI_ATTEMPT_TIMEOUT),
+        ) as response:
+            if self.rate_limiter is not None:
+                self.rate_limiter.update_from_headers(response.headers)
+                if response.status == 429:
+                    retry_after = response.headers.get('Retry-After')
+                    self.rate_limiter.record_throttled(float(retry_after) if retry_after and retry_after.isdigit() else None)
+                elif response.status == 200:
+                    self.rate_limiter.record_success()
+
+            if response.status == 200:
+                body = await response.read()
+                if self.cache is not None:
+                    await self.cache.set(resource, cache_key, body)
+                return body
+            else:
+                error_text = await response.text()
+                print(f"Error fetching {error_label}: {response.status} - {error_text}")
+                if response.status in RETRYABLE_STATUSES:
+                    raise UpstreamError(response.status, error_text)
+                return None
 
-    async def get_profile_data(self, linkedin_url: str, cleanup: bool = False):
+    def get_stats(self) -> Dict[str, Any]:
+        """Return cache, request coalescing, rate limiting and resilience counters"""
+        return {
+            'cache': self.cache.get_stats() if self.cache is not None else None,
+            'single_flight': self._inflight.get_stats(),
+            'rate_limiter': self.rate_limiter.get_stats() if self.rate_limiter is not None else None,
+            'retries': self.retry_policy.get_stats(),
+            'circuit_breakers': {resource: breaker.get_stats() for resource, breaker in self._breakers.items()},
+        }
+
+    async def get_profile_data(
+        self,
+        linkedin_url: str,
+        cleanup: bool = False,
+        priority: Priority = Priority.INTERACTIVE,
+        use_cache: bool = True,
+    ):
         """
         Fetch LinkedIn profile data using RapidAPI
         
         Args:
             linkedin_url: Full LinkedIn profile URL
+            cleanup: Remove URLs and sensitive fields from the data
+            priority: Rate limiter scheduling class of the call
+            use_cache: False to bypass the response cache
             
         Returns:
-            LinkedInProfileResponse object containing profile data or None if failed
+            Dictionary containing profile data, or None if the profile does not exist
+            or its body cannot be parsed
+
+        Raises:
+            One of UPSTREAM_ERRORS while RapidAPI is unavailable and nothing is cached
         """
         try:
-            # Ensure the URL is a string
-            if not isinstance(linkedin_url, str):
-                linkedin_url = str(linkedin_url)
-            
-            # Encode the LinkedIn URL
-            encoded_url = quote(linkedin_url)
-            
-            # Construct the API endpoint
-            endpoint = f"/get-profile-data-by-url?url={encoded_url}"
-            
-            async with aiohttp.ClientSession() as session:
-                async with session.get(
-                    f"{self.base_url}{endpoint}",
-                    headers=self.headers
-                ) as response:
-                    if response.status == 200:
-                        data = await response.json()
-                        
-                        if USE_TYPES:
-                            typed_data = None
-                            # Extract the positions data from the response and validate with Pydantic
-                            if 'data' in data:
-                                typed_data = LinkedInProfileScraperResponse(**data['data'])
-                            typed_data = LinkedInProfileScraperResponse(**data)
-                            data = typed_data.model_dump()
-                            
-                        if cleanup:
-                            data = self.clean_data(data)
-                        return data
-                    else:
-                        error_text = await response.text()
-                        print(f"Error fetching LinkedIn data: {response.status} - {error_text}")
-                        return None
+            body = await self._fetch_profile(linkedin_url, priority, use_cache)
+            if body is None:
+                return None
+
+            if self.typed_decode:
+                # The cleaned schema is the cleanup projection, so dropped fields are never built
+                return to_data(decode_profile(body, cleaned=cleanup))
+
+            data = json.loads(body)
+            if cleanup:
+                data = self.clean_data(data)
+            return data
+
+        except UPSTREAM_ERRORS:
+            raise
+        except Exception as e:
+            print(f"Exception in LinkedIn scraping: {str(e)}")
+            return None
+
+    async def get_profile_model(
+        self,
+        linkedin_url: str,
+        cleanup: bool = False,
+        priority: Priority = Priority.INTERACTIVE,
+    ) -> Optional[Union[LinkedInProfileScraperResponse, CleanedLinkedInProfileScraperResponse]]:
+        """
+        Fetch LinkedIn profile data as a typed model, parsed straight from the response body
+
+        Args:
+            linkedin_url: Full LinkedIn profile URL
+            cleanup: Decode into `CleanedLinkedInProfileScraperResponse`, skipping URLs and images
+            priority: Rate limiter scheduling class of the call
+
+        Returns:
+            The decoded profile, or None if the profile does not exist or the body does not match the schema
+
+        Raises:
+            One of UPSTREAM_ERRORS while RapidAPI is unavailable and nothing is cached
+        """
+        try:
+            body = await self._fetch_profile(linkedin_url, priority)
+            return decode_profile(body, cleaned=cleanup) if body is not None else None
 
+        except UPSTREAM_ERRORS:
+            raise
         except Exception as e:
             print(f"Exception in LinkedIn scraping: {str(e)}")
             return None
 
+    async def _fetch_profile(self, linkedin_url: str, priority: Priority, use_cache: bool = True) -> Optional[bytes]:
+        # Ensure the URL is a string
+        if not isinstance(linkedin_url, str):
+            linkedin_url = str(linkedin_url)
+
+        endpoint = f"/get-profile-data-by-url?url={quote(linkedin_url)}"
+        return await self._fetch(RESOURCE_PROFILE, linkedin_url, endpoint, "LinkedIn data", priority, use_cache)
 
-    async def get_company_data(self, company_username: str) -> Optional[Dict[Any, Any]]:
+
+    async def get_company_data(
+        self,
+        company_username: str,
+        priority: Priority = Priority.INTERACTIVE,
+        use_cache: bool = True,
+    ) -> Optional[Dict[Any, Any]]:
         """
         Fetch LinkedIn company data using RapidAPI
         
         Args:
             company_username: Company username/handle from LinkedIn
+            priority: Rate limiter scheduling class of the call
+            use_cache: False to bypass the response cache
             
         Returns:
-            Dictionary containing company data or None if failed
+            Dictionary containing company data, or None if the company does not exist
+
+        Raises:
+            One of UPSTREAM_ERRORS while RapidAPI is unavailable and nothing is cached
         """
         try:
             endpoint = f"/get-company-details?username={quote(company_username)}"
             
-            async with aiohttp.ClientSession() as session:
-                async with session.get(
-                    f"{self.base_url}{endpoint}",
-                    headers=self.headers
-                ) as response:
-                    if response.status == 200:
-                        return await response.json()
-                    else:
-                        error_text = await response.text()
-                        print(f"Error fetching company data: {response.status} - {error_text}")
-                        return None
+            body = await self._fetch(RESOURCE_COMPANY, company_username, endpoint, "company data", priority, use_cache)
+            if body is None:
+                return None
+            return to_data(decode_company(body)) if self.typed_decode else json.loads(body)
 
+        except UPSTREAM_ERRORS:
+            raise
         except Exception as e:
             print(f"Exception in company data fetching: {str(e)}")
             return None
 
     
     def clean_data(self, data: LinkedInProfileScraperResponse):
-        """Remove URLs and sensitive fields from the data"""            
-        # Convert to dict, remove unwanted fields
-        data_dict = data
-        
-        # Remove top-level fields
-        data_dict.pop('profilePicture', None)
-        data_dict.pop('profilePictures', None)
-        data_dict.pop('backgroundImage', None)
-        data_dict.pop('projects', None)  # Remove projects entirely
-        
-        # Clean skills
-        if 'skills' in data_dict:
-            for skill in data_dict['skills']:
-                skill.pop('passedSkillAssessment', None)
-                skill.pop('endorsementsCount', None)
-        
-        # Clean educations
-        if 'educations' in data_dict:
-            for education in data_dict['educations']:
-                education.pop('url', None)
-                education.pop('schoolId', None)
-                education.pop('logos', None)
-        
-        # Clean positions
-        if 'positions' in data_dict:
-            for position in data_dict['positions']:
-                position.pop('logos', None)
-                position.pop('companyLogo', None)
-                if 'extraInfo' in position and position['extraInfo']:
-                    position['extraInfo'].pop('website', None)
-                    
-        
-        if 'fullPositions' in data_dict:
-            for position in data_dict['fullPositions']:
-                if 'extraInfo' in position and position['extraInfo']:
-                    position['extraInfo'].pop('website', None)
-        
-        
-        return data_dict
+        """Remove URLs and sensitive fields from the data"""
+        # Single in-place pass driven by the declarative PROFILE_PROJECTION spec
+        return PROFILE_PROJECTION(data)
+
+    def clean_company_data(self, company_data):
+        """Remove logos, images and tracking URLs from a company details payload"""
+        return COMPANY_PROJECTION(company_data)
 
 
-    async def get_profile_posts(self, username: str) -> Optional[Dict[Any, Any]]:
+    async def get_profile_posts(
+        self,
+        username: str,
+        priority: Priority = Priority.INTERACTIVE,
+        start: int = 0,
+        use_cache: bool = True,
+    ) -> Optional[Dict[Any, Any]]:
         """
         Fetch all posts for a given LinkedIn profile username using RapidAPI
         
         Args:
             username: LinkedIn profile username
+            priority: Rate limiter scheduling class of the call
+            start: Offset of the first post returned, newest first
+            use_cache: False to bypass the response cache
             
         Returns:
-            Dictionary containing posts data or None if failed
+            Dictionary containing posts data, or None if the profile does not exist
+
+        Raises:
+            One of UPSTREAM_ERRORS while RapidAPI is unavailable and nothing is cached
         """
         try:
             endpoint = f"/get-profile-posts?username={quote(username)}"
+            if start:
+                endpoint += f"&start={start}"
             
-            async with aiohttp.ClientSession() as session:
-                async with session.get(
-                    f"{self.base_url}{endpoint}",
-                    headers=self.headers
-                ) as response:
-                    if response.status == 200:
-                        return await response.json()
-                    else:
-                        error_text = await response.text()
-                        print(f"Error fetching profile posts: {response.status} - {error_text}")
-                        return None
+            body = await self._fetch(
+                RESOURCE_PROFILE_POSTS, self._page_key(username, start), endpoint, "profile posts", priority, use_cache
+            )
+            return json.loads(body) if body is not None else None
 
+        except UPSTREAM_ERRORS:
+            raise
         except Exception as e:
             print(f"Exception in fetching profile posts: {str(e)}")
             return None
 
-    async def get_company_posts(self, company_username: str) -> Optional[Dict[Any, Any]]:
+    async def get_company_posts(
+        self,
+        company_username: str,
+        priority: Priority = Priority.INTERACTIVE,
+        start: int = 0,
+        use_cache: bool = True,
+    ) -> Optional[Dict[Any, Any]]:
         """
         Fetch all posts for a given LinkedIn company username using RapidAPI
         
         Args:
             company_username: LinkedIn company username
+            priority: Rate limiter scheduling class of the call
+            start: Offset of the first post returned, newest first
+            use_cache: False to bypass the response cache
             
         Returns:
-            Dictionary containing company posts data or None if failed
+            Dictionary containing company posts data, or None if the company does not exist
+
+        Raises:
+            One of UPSTREAM_ERRORS while RapidAPI is unavailable and nothing is cached
         """
         try:
-            endpoint = f"/get-company-posts?username={quote(company_username)}&start=0"
+            endpoint = f"/get-company-posts?username={quote(company_username)}&start={start}"
             
-            async with aiohttp.ClientSession() as session:
-                async with session.get(
-                    f"{self.base_url}{endpoint}",
-                    headers=self.headers
-                ) as response:
-                    if response.status == 200:
-                        return await response.json()
-                    else:
-                        error_text = await response.text()
-                        print(f"Error fetching company posts: {response.status} - {error_text}")
-                        return None
+            body = await self._fetch(
+                RESOURCE_COMPANY_POSTS, self._page_key(company_username, start), endpoint, "company posts", priority, use_cache
+            )
+            return json.loads(body) if body is not None else None
 
+        except UPSTREAM_ERRORS:
+            raise
         except Exception as e:
             print(f"Exception in fetching company posts: {str(e)}")
             return None
 
+    def iter_profile_posts(
+        self,
+        username: str,
+        cutoff: PostCutoff = PostCutoff(),
+        priority: Priority = Priority.INTERACTIVE,
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Stream a profile's posts newest first, page by page, cleaned, until `cutoff` is reached
+
+        Args:
+            username: LinkedIn profile username
+            cutoff: Post count, age, token and page limits
+            priority: Rate limiter scheduling class of the calls
+
+        Returns:
+            Async iterator of post dictionaries
+        """
+        return self._iter_posts(lambda start: self.get_profile_posts(username, priority, start), cutoff)
+
+    def iter_company_posts(
+        self,
+        company_username: str,
+        cutoff: PostCutoff = PostCutoff(),
+        priority: Priority = Priority.INTERACTIVE,
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """Stream a company's posts newest first, like `iter_profile_posts`"""
+        return self._iter_posts(lambda start: self.get_company_posts(company_username, priority, start), cutoff)
+
+    async def _iter_posts(
+        self,
+        fetch_page: Callable[[int], Awaitable[Optional[Dict[str, Any]]]],
+        cutoff: PostCutoff,
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Yield the posts of successive pages, fetching the next page while the current one is consumed
+
+        Args:
+            fetch_page: Fetches the page starting at the given offset
+            cutoff: When to stop
+
+        Yields:
+            Posts cleaned with `POST_PROJECTION`, without duplicates across pages
+        """
+        oldest = time.time() - cutoff.max_age_days * 86400 if cutoff.max_age_days else None
+        seen = set()
+        yielded = 0
+        tokens = 0
+        start = 0
+        pages = 0
+        pending = asyncio.ensure_future(fetch_page(start))
+        try:
+            while pending is not None:
+                items = post_items(await pending)
+                pending = None
+                pages += 1
+                if not items:
+                    return
+
+                start += len(items)
+                last_timestamp = items[-1].get('postedDateTimestamp')
+                more = (
+                    pages < cutoff.max_pages
+                    and not (cutoff.max_posts and yielded + len(items) >= cutoff.max_posts)
+                    and not (oldest and last_timestamp and last_timestamp / 1000 < oldest)
+                )
+                if more:
+                    pending = asyncio.ensure_future(fetch_page(start))
+
+                for post in items:
+                    timestamp = post.get('postedDateTimestamp')
+                    # Pinned posts can be older than the ones after them, so old posts are skipped rather than ending the stream
+                    if oldest and timestamp and timestamp / 1000 < oldest:
+                        continue
+                    key = post_key(post)
+                    if key in seen:
+                        continue
+                    seen.add(key)
+
+                    POST_PROJECTION(post)
+                    if cutoff.max_tokens:
+                        tokens += count_tokens(post.get('text') or '')
+                        if tokens > cutoff.max_tokens:
+                            return
+                    yield post
+                    yielded += 1
+                    if cutoff.max_posts and yielded >= cutoff.max_posts:
+                        return
+        finally:
+            if pending is not None:
+                # The upstream call itself runs on in the single-flight task and still fills the cache
+                pending.cancel()
+
+    async def collect_posts(
+        self,
+        posts: AsyncIterator[Dict[str, Any]],
+        timeout: Optional[float] = None,
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Gather a posts stream into the {"success", "data"} payload of the posts endpoints, None when empty
+
+        Args:
+            posts: Posts stream, e.g. from `iter_profile_posts`
+            timeout: Seconds after which the stream is cut off. The posts collected by
+                then are returned, as they are when a later page fails upstream.
+
+        Raises:
+            One of UPSTREAM_ERRORS (a timeout included) when no post was collected
+        """
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + timeout if timeout is not None else None
+        items = []
+        try:
+            while True:
+                remaining = deadline - loop.time() if deadline is not None else None
+                try:
+                    items.append(await asyncio.wait_for(anext(posts), remaining))
+                except StopAsyncIteration:
+                    break
+        except UPSTREAM_ERRORS as e:
+            if not items:
+                raise
+            print(f"Posts stream stopped after {len(items)} posts: {str(e) or type(e).__name__}")
+        finally:
+            await posts.aclose()
+        return {'success': True, 'message': '', 'data': items} if items else None
+
+    @staticmethod
+    def _page_key(username: str, start: int) -> str:
+        """Cache identifier of a posts page; the first page keeps the plain username"""
+        return f"{username}:start={start}" if start else username
+
+    def clean_posts(self, posts):
+        """Remove URLs and pictures from a posts payload, in place"""
+        # The posts endpoints wrap the list as {"success": ..., "data": [...]}
+        items = posts.get('data') if isinstance(posts, dict) else posts
+        for post in items or []:
+            POST_PROJECTION(post)
+        return posts
+
     async def add_posts_to_profile_data(self, profile_data):
         """
         Add posts to the profile data by fetching them using the profile's username
@@ -214,24 +713,8 @@ class LinkedInScraperService:
             posts = await self.get_profile_posts(username)
             if posts:
                 print("added profile posts to profile data")
-                        # Clean posts if they exist
-                for post in posts:
-                    # Remove specific URLs from post
-                    post.pop('profilePicture', None)
-                    post.pop('url', None)
-                    post.pop('postUrl', None)
-                    post.pop('shareUrl', None)
-                    
-                    # If there are any nested author or shared post objects
-                    if 'author' in post:
-                        post['author'].pop('profilePicture', None)
-                        post['author'].pop('url', None)
-                    if 'sharedPost' in post and post['sharedPost']:
-                        post['sharedPost'].pop('profilePicture', None)
-                        post['sharedPost'].pop('url', None)
-                        post['sharedPost'].pop('postUrl', None)
-                        post['sharedPost'].pop('shareUrl', None)
-                        
+                # Clean posts if they exist
+                self.clean_posts(posts)
                 profile_data['posts'] = posts
                 
             else:
@@ -254,15 +737,7 @@ class LinkedInScraperService:
             Profile data with company posts added
         """
         try:
-            # Get the most recent position
-            positions = profile_data.get('position', [])
-            if not positions:
-                print("No positions found in profile data.")
-                return profile_data
-
-            # Assuming the most recent position is the first in the list
-            recent_position = positions[0]
-            company_username = recent_position.get('companyUsername')
+            company_username = self.get_current_company_username(profile_data)
             if not company_username:
                 print("No company username found in the most recent position.")
                 return profile_data
@@ -278,4 +753,257 @@ class LinkedInScraperService:
 
         except Exception as e:
             print(f"Exception in adding company posts to profile data: {str(e)}")
-            return profile_data 
\ No newline at end of file
+            return profile_data
+
+    @staticmethod
+    def get_current_company_username(profile_data) -> Optional[str]:
+        """Return the company username of the most recent position, if any"""
+        positions = profile_data.get('position') or profile_data.get('positions') or []
+        if not positions:
+            return None
+        # Assuming the most recent position is the first in the list
+        return positions[0].get('companyUsername')
+
+    async def get_enriched_profile(
+        self,
+        linkedin_url: str,
+        cleanup: bool = False,
+        include_posts: bool = True,
+        include_company: bool = True,
+        timeouts: Optional[Dict[str, float]] = None,
+        priority: Priority = Priority.INTERACTIVE,
+        posts_cutoff: Optional[PostCutoff] = None,
+    ) -> Optional[Dict[Any, Any]]:
+        """
+        Fetch a profile and enrich it with posts and current company details
+
+        The profile is fetched first; profile posts, current company details and
+        company posts are then fetched concurrently, each under its own timeout.
+        A branch that fails or times out is reported in `enrichment.errors` while
+        the branches that succeeded are still returned.
+
+        Args:
+            linkedin_url: Full LinkedIn profile URL
+            cleanup: Remove URLs and pictures from the profile and posts
+            include_posts: Fetch the profile's posts
+            include_company: Fetch current company details and its posts
+            timeouts: Per-branch timeout overrides in seconds, keyed by branch name
+            priority: Rate limiter scheduling class of the upstream calls
+            posts_cutoff: Stream posts page by page up to this cutoff instead of
+                fetching the first page of each posts endpoint
+
+        Returns:
+            Enriched profile data, or None if the profile does not exist
+
+        Raises:
+            One of UPSTREAM_ERRORS when the profile itself cannot be fetched; failed
+            branches are reported in `enrichment.errors` instead
+        """
+        profile_data = await self.get_profile_data(linkedin_url, cleanup, priority)
+        if not profile_data:
+            return None
+
+        username = profile_data.get('username')
+        company_username = self.get_current_company_username(profile_data)
+
+        def collect(posts):
+            # Streamed posts take the branch timeout themselves, to keep the posts collected by then
+            return lambda timeout: self.collect_posts(posts, timeout)
+
+        branches = {}
+        if include_posts and username:
+            branches['posts'] = (
+                collect(self.iter_profile_posts(username, posts_cutoff, priority))
+                if posts_cutoff else self.get_profile_posts(username, priority)
+            )
+        if include_company and company_username:
+            branches['currentCompany'] = self.get_company_data(company_username, priority)
+            branches['recentCompanyPosts'] = (
+                collect(self.iter_company_posts(company_username, posts_cutoff, priority))
+                if posts_cutoff else self.get_company_posts(company_username, priority)
+            )
+
+        await self._gather_branches(profile_data, branches, cleanup, timeouts)
+        if cleanup and self.snapshots is not None:
+            await self.snapshots.set(linkedin_url, profile_data)
+        return profile_data
+
+    async def _gather_branches(
+        self,
+        profile_data: Dict[str, Any],
+        branches: Dict[str, Union[Awaitable, Callable[[Optional[float]], Awaitable]]],
+        cleanup: bool,
+        timeouts: Optional[Dict[str, float]],
+    ) -> Dict[str, str]:
+        """
+        Run the enrichment branches concurrently, each under its own timeout
+
+        A branch is an awaitable, cancelled at its timeout, or a function of its
+        timeout that observes the deadline itself. Successful results are added to
+        `profile_data` under the branch name and the outcome is recorded in
+        `profile_data['enrichment']`.
+
+        Returns:
+            Error message per failed branch
+        """
+        branch_timeouts = {**ENRICHMENT_BRANCH_TIMEOUTS, **(timeouts or {})}
+
+        def run(name, branch):
+            if callable(branch):
+                return branch(branch_timeouts.get(name))
+            return asyncio.wait_for(branch, branch_timeouts.get(name))
+
+        results = await asyncio.gather(
+            *(run(name, branch) for name, branch in branches.items()),
+            return_exceptions=True
+        )
+
+        errors = {}
+        for name, result in zip(branches, results):
+            if isinstance(result, asyncio.TimeoutError):
+                errors[name] = 'timeout'
+            elif isinstance(result, Exception):
+                errors[name] = str(result)
+            elif not result:
+                errors[name] = 'unavailable'
+            else:
+                if cleanup and name == 'currentCompany':
+                    self.clean_company_data(result)
+                elif cleanup:
+                    self.clean_posts(result)
+                profile_data[name] = result
+
+        profile_data['enrichment'] = {
+            'complete': not errors,
+            'branches': list(branches),
+            'errors': errors,
+        }
+        return errors
+
+    async def refresh_enriched_profile(
+        self,
+        linkedin_url: str,
+        include_posts: bool = True,
+        include_company: bool = True,
+        timeouts: Optional[Dict[str, float]] = None,
+        priority: Priority = Priority.BACKGROUND,
+    ) -> Optional[ProfileRefresh]:
+        """
+        Re-fetch a cleaned enriched profile and diff it against the stored snapshot
+
+        The profile and company details bypass the response cache. Posts are
+        fetched newest first, page by page, only until the last post already in
+        the snapshot shows up (at most `PROFILE_REFRESH_MAX_POST_PAGES` pages),
+        and merged with the stored ones. A branch that fails keeps its stored
+        section. Without a snapshot this is a plain `get_enriched_profile`,
+        reported as an initial diff.
+
+        Args:
+            linkedin_url: Full LinkedIn profile URL
+            include_posts: Refresh the profile's posts
+            include_company: Refresh current company details and its posts
+            timeouts: Per-branch timeout overrides in seconds, keyed by branch name
+            priority: Rate limiter scheduling class of the upstream calls
+
+        Returns:
+            The refreshed profile and the sections that changed, or None if the
+            profile does not exist
+
+        Raises:
+            One of UPSTREAM_ERRORS when the profile itself cannot be fetched
+        """
+        previous = await self.snapshots.get(linkedin_url) if self.snapshots is not None else None
+        if previous is None:
+            profile_data = await self.get_enriched_profile(
+                linkedin_url, True, include_posts, include_company, timeouts, priority
+            )
+            return ProfileRefresh(profile_data, diff_profiles(None, profile_data)) if profile_data else None
+
+        profile_data = await self.get_profile_data(linkedin_url, True, priority, use_cache=False)
+        if not profile_data:
+            return None
+
+        username = profile_data.get('username')
+        company_username = self.get_current_company_username(profile_data)
+        # Stored company sections are only a valid baseline for the same company
+        same_company = company_username == self.get_current_company_username(previous)
+
+        refresh = ProfileRefresh(profile_data, ProfileDiff())
+        branches = {}
+        if include_posts and username:
+            branches['posts'] = self._refresh_posts(
+                'posts',
+                lambda start: self.get_profile_posts(username, priority, start, use_cache=False),
+                previous.get('posts'),
+                refresh,
+            )
+        if include_company and company_username:
+            branches['currentCompany'] = self.get_company_data(company_username, priority, use_cache=False)
+            branches['recentCompanyPosts'] = self._refresh_posts(
+                'recentCompanyPosts',
+                lambda start: self.get_company_posts(company_username, priority, start, use_cache=False),
+                previous.get('recentCompanyPosts') if same_company else None,
+                refresh,
+            )
+
+        errors = await self._gather_branches(profile_data, branches, True, timeouts)
+        for name in errors:
+            if name in previous and (same_company or name == 'posts'):
+                profile_data[name] = previous[name]
+
+        refresh.diff = diff_profiles(previous, profile_data)
+        await self.snapshots.set(linkedin_url, profile_data)
+        print(f"Refreshed {linkedin_url}: changed sections {refresh.diff.changed or 'none'}")
+        return refresh
+
+    async def _refresh_posts(
+        self,
+        name: str,
+        fetch_page: Callable[[int], Awaitable[Optional[Dict[str, Any]]]],
+        previous: Optional[Dict[str, Any]],
+        refresh: ProfileRefresh,
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Fetch posts pages newest first until a stored post shows up, and merge them with the stored posts
+
+        Args:
+            name: Posts section name, for the refresh counters
+            fetch_page: Fetches the page starting at the given offset
+            previous: Stored posts payload, if any
+            refresh: Refresh result the new post and page counts are recorded on
+
+        Returns:
+            Posts payload in the shape of the first page, or None if it could not be fetched
+        """
+        stored = post_items(previous)
+        seen = {post_key(post) for post in stored}
+        first_page = None
+        fetched = []
+        new_posts = 0
+        pages = 0
+        while pages < PROFILE_REFRESH_MAX_POST_PAGES:
+            page = await fetch_page(len(fetched))
+            pages += 1
+            if first_page is None:
+                if not page:
+                    break
+                first_page = page
+            items = post_items(page)
+            if not items:
+                break
+            self.clean_posts(items)
+            new, found = split_new_posts(items, seen)
+            new_posts += len(new)
+            # Seen posts on the fetched pages still replace the stored ones, for current counters
+            fetched.extend(items)
+            if found or not seen:
+                break
+
+        refresh.new_posts[name] = new_posts
+        refresh.post_pages[name] = pages
+        if first_page is None:
+            return None
+        limit = max(len(stored), len(post_items(first_page)))
+        if isinstance(first_page, dict):
+            return {**first_page, 'data': merge_posts(fetched, stored, limit)}
+        return merge_posts(fetched, stored, limit)
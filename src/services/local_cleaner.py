@@ -0,0 +1,313 @@
+import re
+import time
+import unicodedata
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Union
+
+from config.settings import CLEANING_ESCALATE, CLEANING_FREE_TEXT_MIN_WORDS
+from utils.linkedin_payloads import company_facts, format_date, format_languages, format_range, post_items, unwrap_data
+
+ESCALATE_AUTO = 'auto'
+ESCALATE_ALL = 'all'
+ESCALATE_NONE = 'none'
+
+_URL = re.compile(r'(?:https?://|www\.)\S+')
+_ZERO_WIDTH = re.compile('[\u200b-\u200d\u2060\ufeff]')
+_BLANK_LINES = re.compile(r'\n{3,}')
+
+SECTION_SEPARATOR = '\n\n'
+
+# Signs that free text needs more than mechanical cleanup; anything else is kept as written
+_SLOPPY_TEXT = [
+    re.compile(r'[a-z]{2}[.!?][A-Z][a-z]'),  # sentence ends without a space
+    re.compile(r'\w\s+[,.!?;:](?:\s|$)'),  # space before punctuation
+    re.compile(r'([!?,])\1'),  # repeated punctuation
+    re.compile(r'(?:^|[.!?]\s+)[a-z]', re.MULTILINE),  # sentence starting lowercase
+    re.compile(r'\b(\w{2,})\s+\1\b', re.IGNORECASE),  # doubled word
+    re.compile(r'\bi\b'),  # lowercase "I"
+]
+
+
+def normalize_free_text(text: Optional[str]) -> str:
+    """
+    Mechanical cleanup of free text: styled Unicode letters, links, zero-width characters and spacing
+
+    Line breaks are kept since posts and descriptions use them for bullets.
+    """
+    text = unicodedata.normalize('NFKC', text or '')
+    text = _ZERO_WIDTH.sub('', text)
+    text = _URL.sub('', text)
+    lines = [' '.join(line.split()) for line in text.splitlines()]
+    return _BLANK_LINES.sub('\n\n', '\n'.join(lines)).strip()
+
+
+def needs_llm(text: str, min_words: int = CLEANING_FREE_TEXT_MIN_WORDS) -> bool:
+    """Whether normalized free text is long enough and sloppy enough to be worth an LLM pass"""
+    if len(text.split()) < min_words:
+        return False
+    return any(pattern.search(text) for pattern in _SLOPPY_TEXT)
+
+
+def _inline(text: Optional[str]) -> str:
+    return ' '.join(normalize_free_text(text).split())
+
+
+@dataclass
+class _FreeText:
+    index: int
+    indent: str
+
+
+@dataclass
+class PreCleanedProfile:
+    """
+    Profile rendered into the cleaning layout, with free text that still needs the LLM left as slots
+
+    Args:
+        sections: Lines of each layout section, either final text or a free text slot
+        free_texts: Every free text field, normalized
+        escalated: Indices into `free_texts` that should go through the LLM
+    """
+    sections: Dict[str, List[Union[str, _FreeText]]] = field(default_factory=dict)
+    free_texts: List[str] = field(default_factory=list)
+    escalated: List[int] = field(default_factory=list)
+
+    def escalated_texts(self) -> List[str]:
+        return [self.free_texts[index] for index in self.escalated]
+
+    def section_chunks(self) -> Dict[str, List[int]]:
+        """Positions in `escalated_texts()` that each section waits on, in layout order"""
+        position = {index: offset for offset, index in enumerate(self.escalated)}
+        return {
+            section: [position[line.index] for line in lines if isinstance(line, _FreeText) and line.index in position]
+            for section, lines in self.sections.items()
+        }
+
+    def render_section(self, section: str, cleaned: Optional[List[str]] = None) -> str:
+        """
+        One section of the layout, wrapped in its `<section>` tags
+
+        Args:
+            section: Section name, a key of `sections`
+            cleaned: LLM results for `escalated_texts()`, in the same order; missing
+                results keep the locally normalized text
+        """
+        replacements = dict(zip(self.escalated, cleaned or []))
+        rendered = []
+        for line in self.sections[section]:
+            if isinstance(line, _FreeText):
+                text = replacements.get(line.index) or self.free_texts[line.index]
+                rendered.extend(line.indent + part if part else '' for part in text.strip().splitlines())
+            else:
+                rendered.append(line)
+        return f"<{section}>\n" + '\n'.join(rendered) + f"\n</{section}>"
+
+    def render(self, cleaned: Optional[List[str]] = None) -> str:
+        """
+        Final text in the `<profile_information>/<profile_posts>/<company_posts>` layout
+
+        Args:
+            cleaned: LLM results for `escalated_texts()`, in the same order; missing
+                results keep the locally normalized text
+        """
+        return SECTION_SEPARATOR.join(self.render_section(section, cleaned) for section in self.sections)
+
+
+class LocalCleaner:
+    """
+    Rule-based cleaning stage that renders profile data without the LLM
+
+    Structured fields (names, titles, dates, skills, counts) are formatted in
+    Python: links, images, ids and tracking fields are never rendered and dates
+    become "Jun 2024 - present". Free text fields (summary, descriptions, post
+    bodies) are normalized mechanically; with `escalate='auto'` only those that
+    still look sloppy (see `needs_llm`) are marked for the LLM, `all` marks every
+    free text field and `none` keeps the cleaning fully local.
+    """
+
+    def __init__(self, escalate: str = CLEANING_ESCALATE, min_words: int = CLEANING_FREE_TEXT_MIN_WORDS):
+        if escalate not in (ESCALATE_AUTO, ESCALATE_ALL, ESCALATE_NONE):
+            raise ValueError(f"Unknown escalation mode {escalate!r}")
+        self.escalate = escalate
+        self.min_words = min_words
+
+    def prepare(self, profile: Dict[str, Any]) -> PreCleanedProfile:
+        """
+        Render profile data into the cleaning layout
+
+        Args:
+            profile: Profile dictionary, optionally with the `posts`,
+                `currentCompany` and `recentCompanyPosts` keys added by enrichment
+
+        Returns:
+            The rendered profile, with the free text to escalate to the LLM
+        """
+        result = PreCleanedProfile()
+        result.sections['profile_information'] = self._profile_lines(profile, result)
+        result.sections['profile_posts'] = self._post_lines(post_items(profile.get('posts')), result)
+        company_lines = self._company_lines(profile.get('currentCompany'), result)
+        company_posts = self._post_lines(post_items(profile.get('recentCompanyPosts')), result)
+        result.sections['company_posts'] = company_lines + [''] + company_posts if company_lines and company_posts else company_lines + company_posts
+        return result
+
+    def _free_text(self, text: Optional[str], result: PreCleanedProfile, indent: str = '') -> Optional[_FreeText]:
+        text = normalize_free_text(text)
+        if not text:
+            return None
+        index = len(result.free_texts)
+        result.free_texts.append(text)
+        if self.escalate == ESCALATE_ALL or (self.escalate == ESCALATE_AUTO and needs_llm(text, self.min_words)):
+            result.escalated.append(index)
+        return _FreeText(index, indent)
+
+    def _profile_lines(self, profile: Dict[str, Any], result: PreCleanedProfile) -> List[Union[str, _FreeText]]:
+        lines: List[Union[str, _FreeText]] = []
+
+        def section(title: str, items: List[Union[str, _FreeText]]):
+            if items:
+                lines.extend(['', f"{title}:", *items] if lines else [f"{title}:", *items])
+
+        identity = []
+        name = ' '.join(filter(None, [_inline(profile.get('firstName')), _inline(profile.get('lastName'))]))
+        if name:
+            identity.append(f"Name: {name}")
+        if profile.get('headline'):
+            identity.append(f"Headline: {_inline(profile['headline'])}")
+        location = (profile.get('geo') or {}).get('full')
+        if location:
+            identity.append(f"Location: {location}")
+        lines.extend(identity)
+        summary = self._free_text(profile.get('summary'), result)
+        if summary:
+            section('Summary', [summary])
+
+        experience = []
+        positions = profile.get('fullPositions') or profile.get('position') or profile.get('positions') or []
+        for position in positions:
+            title, company = _inline(position.get('title')), _inline(position.get('companyName'))
+            if not (title or company):
+                continue
+            line = f"- {title}{' at ' + company if company and title else company}"
+            dates = format_range(position.get('start'), position.get('end'))
+            if dates:
+                line += f" ({dates})"
+            details = [_inline(position.get(key)) for key in ('employmentType', 'location', 'companyIndustry')]
+            if position.get('companyStaffCountRange'):
+                details.append(f"{position['companyStaffCountRange']} employees")
+            details = [detail for detail in details if detail]
+            if details:
+                line += f", {', '.join(details)}"
+            experience.append(line)
+            description = self._free_text(position.get('description'), result, indent='  ')
+            if description:
+                experience.append(description)
+        section('Experience', experience)
+
+        education_lines = []
+        for education in profile.get('educations') or []:
+            school = _inline(education.get('schoolName'))
+            if not school:
+                continue
+            degree = ', '.join(_inline(part) for part in (education.get('degree'), education.get('fieldOfStudy')) if _inline(part))
+            line = f"- {degree + ' at ' if degree else ''}{school}"
+            dates = format_range(education.get('start'), education.get('end'))
+            if dates:
+                line += f" ({dates})"
+            if _inline(education.get('grade')):
+                line += f", grade {_inline(education['grade'])}"
+            education_lines.append(line)
+            for key in ('description', 'activities'):
+                text = self._free_text(education.get(key), result, indent='  ')
+                if text:
+                    education_lines.append(text)
+        section('Education', education_lines)
+
+        skills = list(dict.fromkeys(_inline(skill.get('name')) for skill in profile.get('skills') or [] if _inline(skill.get('name'))))
+        if skills:
+            section('Skills', [', '.join(skills)])
+
+        languages = format_languages(profile.get('languages'))
+        if languages:
+            section('Languages', [languages])
+
+        certifications = []
+        for certification in profile.get('certifications') or []:
+            if not certification.get('name'):
+                continue
+            line = f"- {_inline(certification['name'])}"
+            if certification.get('authority'):
+                line += f", {_inline(certification['authority'])}"
+            issued = format_date(certification.get('start'))
+            if issued:
+                line += f" ({issued})"
+            certifications.append(line)
+        section('Certifications', certifications)
+
+        section('Courses', [f"- {_inline(course['name'])}" for course in profile.get('courses') or [] if course.get('name')])
+
+        honors = []
+        for honor in profile.get('honors') or []:
+            if not honor.get('title'):
+                continue
+            line = f"- {_inline(honor['title'])}"
+            if honor.get('issuer'):
+                line += f", {_inline(honor['issuer'])}"
+            issued = format_date(honor.get('issuedOn'))
+            if issued:
+                line += f" ({issued})"
+            honors.append(line)
+            description = self._free_text(honor.get('description'), result, indent='  ')
+            if description:
+                honors.append(description)
+        section('Honors', honors)
+
+        volunteering = []
+        for item in profile.get('volunteering') or []:
+            title, company = _inline(item.get('title')), _inline(item.get('companyName'))
+            if not (title or company):
+                continue
+            line = f"- {title}{' at ' + company if company and title else company}"
+            dates = format_range(item.get('start'), item.get('end'))
+            if dates:
+                line += f" ({dates})"
+            volunteering.append(line)
+        section('Volunteering', volunteering)
+        return lines
+
+    def _post_lines(self, posts: List[Dict[str, Any]], result: PreCleanedProfile) -> List[Union[str, _FreeText]]:
+        lines: List[Union[str, _FreeText]] = []
+        for post in posts:
+            text = self._free_text(post.get('text'), result, indent='  ')
+            if text is None:
+                continue
+            header = ['Post']
+            if post.get('postedDateTimestamp'):
+                header.append(time.strftime('%b %d, %Y', time.gmtime(post['postedDateTimestamp'] / 1000)))
+            counts = [
+                f"{post[key]} {label}" for key, label in
+                (('totalReactionCount', 'reactions'), ('commentsCount', 'comments'), ('repostsCount', 'reposts'))
+                if post.get(key)
+            ]
+            if counts:
+                header.append(', '.join(counts))
+            if post.get('reposted'):
+                header.append('reshared')
+            if lines:
+                lines.append('')
+            lines.extend([f"- {' | '.join(header)}", text])
+        return lines
+
+    def _company_lines(self, company_payload, result: PreCleanedProfile) -> List[Union[str, _FreeText]]:
+        company = unwrap_data(company_payload)
+        if not isinstance(company, dict) or not company.get('name'):
+            return []
+
+        facts = [f"Company: {_inline(company['name'])}"] + company_facts(company, _inline)
+
+        lines: List[Union[str, _FreeText]] = [' | '.join(facts)]
+        description = self._free_text(company.get('description'), result, indent='  ')
+        if description:
+            lines.append(description)
+        if company.get('specialities'):
+            lines.append(f"Specialities: {', '.join(company['specialities'])}")
+        return lines
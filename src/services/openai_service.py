@@ -1,104 +1,105 @@
 import json
-import base64
-import websockets
 from fastapi import WebSocket
 from fastapi.websockets import WebSocketDisconnect
 import asyncio
-import aiofiles
-
-from config.settings import LOG_EVENT_TYPES, OPENAI_API_KEY, VOICE, INITIAL_SESSION_SYSTEM_MESSAGE, SHOW_TIMING_MATH, MAX_CALL_DURATION
-from utils.websocket_handlers import WebSocketState, handle_speech_started_event, send_mark
-
-async def initialize_session(openai_ws, linkedin_profile_details: str = '', type_of_call: str = ''):
-    """Control initial session with OpenAI."""
-    # Combine system message with personality and additional instructions
-    combined_instructions = INITIAL_SESSION_SYSTEM_MESSAGE
-    
-    if linkedin_profile_details:
-        combined_instructions += f"\n\nThis is the LinkedIn profile details: {linkedin_profile_details}"
-    
-        
-    print('Combined instructions:', combined_instructions)
-
-    session_update = {
-        "type": "session.update",
-        "session": {
-            "turn_detection": {"type": "server_vad"},
-            "input_audio_format": "g711_ulaw",
-            "output_audio_format": "g711_ulaw",
-            "voice": VOICE,
-            "instructions": combined_instructions,
-            "modalities": ["text", "audio"],
-            "temperature": 0.8,
-        }
-    }
-    print('Sending session update:', json.dumps(session_update))
-    await openai_ws.send(json.dumps(session_update))
-    await send_initial_conversation_item(openai_ws, type_of_call)
-
-async def send_initial_conversation_item(openai_ws, type_of_call = "sales"):
-    """Send initial conversation item if AI talks first."""
-    
-    first_message = "Generate a greeting for the user based on the person information that has been provided. Do it very short like a real person would do. Without 'how can I help you today?' or 'how can I assist you today?' you are a person, not a bot."
-    
-    if type_of_call == 'hiring_manager':
-        first_message += "\nYou are the hiring manager for this call. You are trying to hire the user for a job. Be professional, and consice. Use the information provided to you to make a good impression"
-        first_message += "\nIMPORTANT: You are the hiring manager for this call. You are trying to hire the user for a job. Be professional, and consice"
-        first_message += "\nGreat the user like a hiring manager would do, and ask them if they are interested in the job, and why they are interested in the job"
-    elif type_of_call == 'sales':
-        first_message += "\nYou are a decision maker for this call, someone is trying to sell you something. Be professional, and consice. Use the information provided to you to make a good impression"
-        first_message += "\nIMPORTANT: You should represent your company for this call. Dig inside the caller product to understand if it fits your company"
-    
-
-    initial_conversation_item = {
-        "type": "conversation.item.create",
-        "item": {
-            "type": "message",
-            "role": "system",
-            "content": [
-                {
-                    "type": "input_text",
-                    "text": first_message
-                }
-            ]
-        }
-    }
-    await openai_ws.send(json.dumps(initial_conversation_item))
-    await openai_ws.send(json.dumps({"type": "response.create"}))
+from typing import Dict
+
+from config.settings import LOG_EVENT_TYPES, SHOW_TIMING_MATH, MAX_CALL_DURATION
+from services.persona_store import PersonaStore, CompiledPersona, create_persona_store
+from services.realtime_pool import connect_realtime
+from utils.call_metrics import CallMetricsRegistry
+from utils.audio_relay import parse_twilio_media, parse_audio_delta, audio_append_frame, loads
+from utils.websocket_handlers import WebSocketState, handle_speech_started_event, send_mark, record_mark_played
+
+# Used when the app runs without its lifespan (e.g. TestClient outside a `with` block)
+_fallback_persona_store = None
+_fallback_call_metrics = CallMetricsRegistry()
+
+def get_persona_store(app) -> PersonaStore:
+    """Provide the app-wide persona store"""
+    global _fallback_persona_store
+    store = getattr(app.state, 'persona_store', None)
+    if store is not None:
+        return store
+    if _fallback_persona_store is None:
+        _fallback_persona_store = create_persona_store()
+    return _fallback_persona_store
+
+def get_call_metrics(app) -> CallMetricsRegistry:
+    """Provide the app-wide call metrics registry"""
+    return getattr(app.state, 'call_metrics', None) or _fallback_call_metrics
+
+async def send_persona(openai_ws, persona: CompiledPersona):
+    """Open the session with precompiled frames, no JSON building on the call path"""
+    for frame in persona.frames:
+        await openai_ws.send(frame)
+
+async def close_realtime(realtime_pool, openai_ws):
+    """Close a call's realtime session, through the pool when it came from one"""
+    if realtime_pool is not None:
+        await realtime_pool.release(openai_ws)
+    elif openai_ws.open:
+        await openai_ws.close()
+
+async def close_realtime_connect(realtime_pool, openai_connect: asyncio.Future):
+    """Close the session a call's connect task produced, or cancel the task if it is still connecting"""
+    if not openai_connect.done():
+        openai_connect.cancel()
+    elif not openai_connect.cancelled() and openai_connect.exception() is None:
+        await close_realtime(realtime_pool, openai_connect.result())
+
+async def wait_for_stream_start(websocket: WebSocket, ws_state: WebSocketState) -> Dict[str, str]:
+    """
+    Read Twilio messages until the stream `start` event
+
+    Args:
+        websocket: Twilio media stream websocket
+        ws_state: Call state, receives the stream SID
+
+    Returns:
+        The custom parameters set on the <Stream> by /incoming-call
+    """
+    async for message in websocket.iter_text():
+        data = loads(message)
+        if data['event'] == 'start':
+            ws_state.set_stream_sid(data['start']['streamSid'])
+            print(f"Incoming stream has started {ws_state.stream_sid}")
+            return data['start'].get('customParameters') or {}
+    raise WebSocketDisconnect()
 
 async def handle_media_stream(websocket: WebSocket):
     """Handle WebSocket connections between Twilio and OpenAI."""
-    
-    # For testing purposes, we'll use the enriched_profile_response file as the linkedin_profile_details
-    try:
-        async with aiofiles.open('test/profile_data_response.json', 'r') as f:
-            linkedin_profile_details = await f.read()
-            linkedin_profile_details = linkedin_profile_details.strip()
-    except FileNotFoundError:
-        print("Warning: enriched_profile_response file not found, using empty personality")
-        linkedin_profile_details = ''
-        
     print("Client connected")
     await websocket.accept()
+    persona_store = get_persona_store(websocket.app)
+
+    # Take a warm realtime session (or connect) while Twilio sends the start event that selects the persona
+    realtime_pool = getattr(websocket.app.state, 'realtime_pool', None)
+    openai_connect = asyncio.ensure_future(realtime_pool.acquire() if realtime_pool else connect_realtime())
+    call_metrics = get_call_metrics(websocket.app)
+    ws_state = WebSocketState(metrics=call_metrics.start_call())
+    try:
+        try:
+            parameters = await wait_for_stream_start(websocket, ws_state)
+        except WebSocketDisconnect:
+            print("Client disconnected before the stream started.")
+            return
+
+        call_type = parameters.get('call_type')
+        persona = await persona_store.get(parameters.get('profile'), call_type) or persona_store.get_or_compile_default(call_type)
+        print(f"Using persona {persona.profile} ({persona.call_type})")
+
+        openai_ws = await openai_connect
+        ws_state.metrics.mark_connected()
+        await send_persona(openai_ws, persona)
 
-    async with websockets.connect(
-        'wss://api.openai.com/v1/realtime?model=gpt-4o-realtime-preview-2024-10-01',
-        extra_headers={
-            "Authorization": f"Bearer {OPENAI_API_KEY}",
-            "OpenAI-Beta": "realtime=v1"
-        }
-    ) as openai_ws:
-        await initialize_session(openai_ws, linkedin_profile_details, "hiring_manager")
-        
-        # Initialize WebSocket state
-        ws_state = WebSocketState()
-        
         try:
             # Start the WebSocket handlers with timeout
             await asyncio.wait_for(
                 asyncio.gather(
                     receive_from_twilio(websocket, openai_ws, ws_state),
-                    send_to_twilio(websocket, openai_ws, ws_state)
+                    send_to_twilio(websocket, openai_ws, ws_state),
+                    drain_to_twilio(websocket, ws_state)
                 ),
                 timeout=MAX_CALL_DURATION
             )
@@ -122,72 +123,116 @@ async def handle_media_stream(websocket: WebSocket):
             await openai_ws.send(json.dumps({"type": "response.create"}))
             # Give a short time for the goodbye message to be processed
             await asyncio.sleep(2)
-        finally:
-            # Ensure we close the connection
-            if openai_ws.open:
-                await openai_ws.close()
-            try:
-                await websocket.close()
-            except:  # noqa: E722
-                pass
+    finally:
+        call_metrics.finish_call(ws_state.metrics)
+        # Ensure we close the connection, or stop connecting if the call ended before it was needed
+        await close_realtime_connect(realtime_pool, openai_connect)
+        try:
+            await websocket.close()
+        except:  # noqa: E722
+            pass
 
 async def receive_from_twilio(websocket: WebSocket, openai_ws, ws_state):
     """Receive audio data from Twilio and send it to the OpenAI Realtime API."""
+    metrics = ws_state.metrics
     try:
         async for message in websocket.iter_text():
-            data = json.loads(message)
+            # Fast path: media frames are relayed without parsing or re-serializing them
+            media = parse_twilio_media(message)
+            if media is not None:
+                if openai_ws.open:
+                    ws_state.latest_media_timestamp, payload = media
+                    frame = audio_append_frame(payload)
+                    await openai_ws.send(frame)
+                    metrics.record_frame_in(len(frame))
+                continue
+
+            data = loads(message)
             if data['event'] == 'media' and openai_ws.open:
                 ws_state.latest_media_timestamp = int(data['media']['timestamp'])
-                audio_append = {
-                    "type": "input_audio_buffer.append",
-                    "audio": data['media']['payload']
-                }
-                await openai_ws.send(json.dumps(audio_append))
+                frame = audio_append_frame(data['media']['payload'])
+                await openai_ws.send(frame)
+                metrics.record_frame_in(len(frame))
             elif data['event'] == 'start':
-                ws_state.stream_sid = data['start']['streamSid']
+                ws_state.set_stream_sid(data['start']['streamSid'])
                 print(f"Incoming stream has started {ws_state.stream_sid}")
                 ws_state.reset_response_state()
             elif data['event'] == 'mark':
-                if ws_state.mark_queue:
-                    ws_state.mark_queue.pop(0)
+                record_mark_played(ws_state)
     except WebSocketDisconnect:
         print("Client disconnected.")
         if openai_ws.open:
             await openai_ws.close()
 
 async def send_to_twilio(websocket: WebSocket, openai_ws, ws_state):
-    """Receive events from the OpenAI Realtime API, send audio back to Twilio."""
+    """Receive events from the OpenAI Realtime API, queue audio for Twilio."""
+    metrics = ws_state.metrics
+    outbound = ws_state.outbound
     try:
         async for openai_message in openai_ws:
-            response = json.loads(openai_message)
-            if response['type'] in LOG_EVENT_TYPES:
-                print(f"Received event: {response['type']}", response)
-
-            if response.get('type') == 'response.audio.delta' and 'delta' in response:
-                audio_payload = base64.b64encode(base64.b64decode(response['delta'])).decode('utf-8')
-                audio_delta = {
-                    "event": "media",
-                    "streamSid": ws_state.stream_sid,
-                    "media": {
-                        "payload": audio_payload
-                    }
-                }
-                await websocket.send_json(audio_delta)
+            # Fast path: the base64 g711 audio is forwarded as is, Twilio takes the same encoding
+            audio_delta = parse_audio_delta(openai_message)
+            if audio_delta is not None:
+                delta, item_id = audio_delta
+            else:
+                response = loads(openai_message)
+                if response['type'] in LOG_EVENT_TYPES:
+                    print(f"Received event: {response['type']}", response)
+
+                if response.get('type') == 'session.updated':
+                    metrics.mark_session_ready()
+                elif response.get('type') == 'input_audio_buffer.speech_stopped':
+                    metrics.mark_speech_stopped()
+
+                if response.get('type') == 'input_audio_buffer.speech_started':
+                    print("Speech started detected.")
+                    if ws_state.last_assistant_item:
+                        print(f"Interrupting response with id: {ws_state.last_assistant_item}")
+                        await handle_speech_started_event(websocket, openai_ws, ws_state)
+
+                if response.get('type') != 'response.audio.delta' or 'delta' not in response:
+                    continue
+                delta, item_id = response['delta'], response.get('item_id')
 
+            outbound.put(delta)
+
+            if item_id:
+                ws_state.last_assistant_item = item_id
+    except Exception as e:
+        print(f"Error in send_to_twilio: {e}")
+    finally:
+        outbound.close()
+
+async def drain_to_twilio(websocket: WebSocket, ws_state):
+    """Send queued audio to Twilio, with one mark per burst rather than per frame."""
+    metrics = ws_state.metrics
+    outbound = ws_state.outbound
+    try:
+        while True:
+            payload = await outbound.get()
+            if payload is None:
+                break
+            generation = outbound.generation
+            frame = ws_state.twilio_frames.media(payload)
+            async with ws_state.twilio_send_lock:
+                if outbound.generation != generation:
+                    # The caller interrupted while this frame waited for the clear to be sent
+                    continue
+                await websocket.send_text(frame)
+                metrics.record_frame_out(len(frame))
+                if outbound.generation != generation:
+                    # Interrupted mid-send: the clear that follows discards it, no mark or timestamp
+                    continue
+
+                # Playback starts with the first frame Twilio actually receives, truncation is measured from it
                 if ws_state.response_start_timestamp_twilio is None:
                     ws_state.response_start_timestamp_twilio = ws_state.latest_media_timestamp
                     if SHOW_TIMING_MATH:
                         print(f"Setting start timestamp for new response: {ws_state.response_start_timestamp_twilio}ms")
 
-                if response.get('item_id'):
-                    ws_state.last_assistant_item = response['item_id']
-
-                await send_mark(websocket, ws_state)
-
-            if response.get('type') == 'input_audio_buffer.speech_started':
-                print("Speech started detected.")
-                if ws_state.last_assistant_item:
-                    print(f"Interrupting response with id: {ws_state.last_assistant_item}")
-                    await handle_speech_started_event(websocket, openai_ws, ws_state)
+                # The mark echoes back once Twilio has played everything sent so far
+                if not len(outbound):
+                    await send_mark(websocket, ws_state)
     except Exception as e:
-        print(f"Error in send_to_twilio: {e}") 
\ No newline at end of file
+        print(f"Error in drain_to_twilio: {e}")
+        outbound.close()
@@ -0,0 +1,277 @@
+import math
+import time
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional
+
+from config.settings import PERSONA_TOKEN_BUDGET, PERSONA_MAX_POSTS, PERSONA_POST_MAX_TOKENS
+from utils.linkedin_payloads import company_facts, format_languages, format_range, post_items, unwrap_data
+from utils.tokens import count_tokens, truncate_to_tokens
+
+# Sections in the order they appear in the persona text
+SECTIONS = [
+    'About',
+    'Experience',
+    'Education',
+    'Skills',
+    'Languages',
+    'Current company',
+    'Recent posts',
+    'Current company posts',
+    'Certifications and honors',
+]
+
+# Units are kept in priority order (lower first) until the budget is spent
+P_IDENTITY = 0
+P_CURRENT_ROLE = 1
+P_SUMMARY = 2
+P_RECENT_ROLES = 3
+P_TOP_POSTS = 3
+P_EDUCATION = 4
+P_COMPANY = 4
+P_SKILLS = 5
+P_OLDER_ROLES = 6
+P_MORE_POSTS = 6
+P_LANGUAGES = 7
+P_COMPANY_POSTS = 8
+P_ROLE_DETAILS = 8
+P_EXTRAS = 9
+
+# A truncatable unit is dropped rather than cut below this many tokens
+MIN_TRUNCATED_TOKENS = 24
+
+
+@dataclass
+class _Unit:
+    section: str
+    priority: int
+    text: str
+    truncatable: bool = False
+
+
+def _clean_text(text: Optional[str]) -> str:
+    return ' '.join((text or '').split())
+
+
+def _post_engagement(post: Dict[str, Any]) -> int:
+    reactions = post.get('totalReactionCount') or post.get('likeCount') or 0
+    return reactions + 2 * (post.get('commentsCount') or 0) + 3 * (post.get('repostsCount') or 0)
+
+
+def _post_age_days(post: Dict[str, Any], now: float) -> Optional[float]:
+    timestamp = post.get('postedDateTimestamp')
+    if not timestamp:
+        return None
+    return max(0.0, (now - timestamp / 1000) / 86400)
+
+
+def rank_posts(posts: List[Dict[str, Any]], limit: int, now: Optional[float] = None) -> List[Dict[str, Any]]:
+    """
+    Rank posts by engagement and recency, dropping duplicates and empty posts
+
+    Args:
+        posts: Post dictionaries as returned by the posts endpoints
+        limit: Maximum number of posts to return
+        now: Reference unix time, defaults to the current time
+
+    Returns:
+        The `limit` highest scoring posts, best first
+    """
+    now = now or time.time()
+    seen = set()
+    scored = []
+    for index, post in enumerate(posts):
+        text = _clean_text(post.get('text'))
+        if not text or text.lower() in seen:
+            continue
+        seen.add(text.lower())
+
+        age_days = _post_age_days(post, now)
+        # Without timestamps the API order (newest first) stands in for recency
+        recency = math.exp(-age_days / 90) if age_days is not None else 1 / (1 + index)
+        score = math.log1p(_post_engagement(post)) + 3 * recency
+        scored.append((score, index, post))
+
+    scored.sort(key=lambda item: (-item[0], item[1]))
+    return [post for _, _, post in scored[:limit]]
+
+
+class PersonaCompactor:
+    """
+    Turn profile, posts and company data into persona text within a token budget
+
+    The data is broken into small units (identity, roles, posts, ...). Each unit gets
+    a priority, and units are kept in priority order until the budget is spent: low
+    value fields are dropped first, and long free text is cut rather than dropped
+    while there is room. The kept units are then rendered in a fixed section order.
+    """
+
+    def __init__(
+        self,
+        token_budget: int = PERSONA_TOKEN_BUDGET,
+        max_posts: int = PERSONA_MAX_POSTS,
+        post_max_tokens: int = PERSONA_POST_MAX_TOKENS,
+    ):
+        self.token_budget = token_budget
+        self.max_posts = max_posts
+        self.post_max_tokens = post_max_tokens
+
+    def compact(self, profile_data: Dict[str, Any]) -> str:
+        """
+        Build the persona text for a (possibly enriched) profile
+
+        Args:
+            profile_data: Profile dictionary, optionally with the `posts`,
+                `currentCompany` and `recentCompanyPosts` keys added by enrichment
+
+        Returns:
+            Persona text that fits `token_budget` tokens
+        """
+        units = self._build_units(profile_data)
+        kept = self._fit(units)
+        return self._render(kept)
+
+    def _build_units(self, profile: Dict[str, Any]) -> List[_Unit]:
+        units: List[_Unit] = []
+
+        name = ' '.join(filter(None, [profile.get('firstName'), profile.get('lastName')]))
+        identity = [f"Name: {name}"] if name else []
+        if profile.get('headline'):
+            identity.append(f"Headline: {_clean_text(profile['headline'])}")
+        location = (profile.get('geo') or {}).get('full')
+        if location:
+            identity.append(f"Location: {location}")
+        if identity:
+            units.append(_Unit('About', P_IDENTITY, '\n'.join(identity)))
+        if profile.get('summary'):
+            units.append(_Unit('About', P_SUMMARY, f"Summary: {_clean_text(profile['summary'])}", truncatable=True))
+
+        units.extend(self._position_units(profile))
+
+        for education in profile.get('educations') or []:
+            parts = [education.get('degree'), education.get('fieldOfStudy')]
+            degree = ', '.join(_clean_text(part) for part in parts if part and part.strip())
+            school = _clean_text(education.get('schoolName'))
+            if not school:
+                continue
+            dates = format_range(education.get('start'), education.get('end'))
+            line = f"- {degree + ' at ' if degree else ''}{school}{f' ({dates})' if dates else ''}"
+            units.append(_Unit('Education', P_EDUCATION, line))
+
+        skills = []
+        seen_skills = set()
+        ranked_skills = sorted(profile.get('skills') or [], key=lambda skill: -(skill.get('endorsementsCount') or 0))
+        for skill in ranked_skills:
+            skill_name = _clean_text(skill.get('name'))
+            if skill_name and skill_name.lower() not in seen_skills:
+                seen_skills.add(skill_name.lower())
+                skills.append(skill_name)
+        if skills:
+            units.append(_Unit('Skills', P_SKILLS, ', '.join(skills), truncatable=True))
+
+        languages = format_languages(profile.get('languages'))
+        if languages:
+            units.append(_Unit('Languages', P_LANGUAGES, languages))
+
+        units.extend(self._company_units(profile.get('currentCompany')))
+        units.extend(self._post_units('Recent posts', post_items(profile.get('posts')), P_TOP_POSTS, P_MORE_POSTS))
+        units.extend(self._post_units('Current company posts', post_items(profile.get('recentCompanyPosts')), P_COMPANY_POSTS, P_COMPANY_POSTS))
+
+        extras = [
+            f"- {_clean_text(certification.get('name'))} ({certification.get('authority')})" if certification.get('authority') else f"- {_clean_text(certification.get('name'))}"
+            for certification in profile.get('certifications') or [] if certification.get('name')
+        ]
+        extras += [f"- Honor: {_clean_text(honor.get('title'))}" for honor in profile.get('honors') or [] if honor.get('title')]
+        extras += [
+            f"- Volunteer: {_clean_text(volunteering.get('title'))} at {_clean_text(volunteering.get('companyName'))}"
+            for volunteering in profile.get('volunteering') or [] if volunteering.get('title') and volunteering.get('companyName')
+        ]
+        for line in extras:
+            units.append(_Unit('Certifications and honors', P_EXTRAS, line))
+
+        return units
+
+    def _position_units(self, profile: Dict[str, Any]) -> List[_Unit]:
+        positions = profile.get('fullPositions') or profile.get('position') or profile.get('positions') or []
+        units = []
+        seen = set()
+        for index, position in enumerate(positions):
+            title = _clean_text(position.get('title'))
+            company = _clean_text(position.get('companyName'))
+            key = (title.lower(), company.lower())
+            if not (title or company) or key in seen:
+                continue
+            seen.add(key)
+
+            dates = format_range(position.get('start'), position.get('end'))
+            details = [detail for detail in (position.get('employmentType'), position.get('location')) if detail]
+            line = f"- {title}{' at ' + company if company else ''}"
+            if dates:
+                line += f" ({dates})"
+            if details:
+                line += f", {', '.join(details)}"
+
+            priority = P_CURRENT_ROLE if index == 0 else P_RECENT_ROLES if index < 3 else P_OLDER_ROLES
+            units.append(_Unit('Experience', priority, line))
+
+            description = _clean_text(position.get('description'))
+            if description:
+                detail_priority = P_SUMMARY if index == 0 else P_ROLE_DETAILS
+                units.append(_Unit('Experience', detail_priority, f"  {description}", truncatable=True))
+        return units
+
+    def _company_units(self, company_payload) -> List[_Unit]:
+        company = unwrap_data(company_payload)
+        if not isinstance(company, dict) or not company.get('name'):
+            return []
+
+        facts = [company['name']] + company_facts(company, _clean_text)
+        units = [_Unit('Current company', P_COMPANY, ' | '.join(facts))]
+        if company.get('description'):
+            units.append(_Unit('Current company', P_ROLE_DETAILS, _clean_text(company['description']), truncatable=True))
+        return units
+
+    def _post_units(self, section: str, posts: List[Dict[str, Any]], top_priority: int, rest_priority: int) -> List[_Unit]:
+        units = []
+        for rank, post in enumerate(rank_posts(posts, self.max_posts)):
+            text = truncate_to_tokens(_clean_text(post.get('text')), self.post_max_tokens)
+            prefix = '- (reshared) ' if post.get('reposted') else '- '
+            priority = top_priority if rank < 2 else rest_priority
+            units.append(_Unit(section, priority, prefix + text, truncatable=True))
+        return units
+
+    def _fit(self, units: List[_Unit]) -> List[_Unit]:
+        remaining = self.token_budget
+        sections_started = set()
+        kept = {}
+
+        for index in sorted(range(len(units)), key=lambda i: (units[i].priority, i)):
+            unit = units[index]
+            header_cost = 0 if unit.section in sections_started else count_tokens(f"\n{unit.section}:\n")
+            cost = count_tokens(unit.text) + 1 + header_cost
+            if cost <= remaining:
+                kept[index] = unit
+            elif unit.truncatable and remaining - header_cost - 1 >= MIN_TRUNCATED_TOKENS:
+                text = truncate_to_tokens(unit.text, remaining - header_cost - 1)
+                kept[index] = _Unit(unit.section, unit.priority, text, True)
+                cost = count_tokens(text) + 1 + header_cost
+            else:
+                continue
+
+            remaining -= cost
+            sections_started.add(unit.section)
+
+        # Back to document order
+        return [kept[index] for index in sorted(kept)]
+
+    def _render(self, units: List[_Unit]) -> str:
+        blocks = []
+        for section in SECTIONS:
+            lines = [unit.text for unit in units if unit.section == section]
+            if lines:
+                blocks.append(f"{section}:\n" + '\n'.join(lines))
+        return '\n\n'.join(blocks)
+
+
+def compact_persona(profile_data: Dict[str, Any], token_budget: Optional[int] = None) -> str:
+    """Compact a profile into persona text with the configured defaults"""
+    return PersonaCompactor(token_budget=token_budget or PERSONA_TOKEN_BUDGET).compact(profile_data)
@@ -0,0 +1,342 @@
+import ast
+import json
+from collections import OrderedDict
+from dataclasses import dataclass, asdict
+from typing import Any, Dict, Optional, Tuple, Union
+
+from config.settings import (
+    INITIAL_SESSION_SYSTEM_MESSAGE, VOICE, PERSONA_TOKEN_BUDGET, PERSONA_STORE_MAX_ENTRIES,
+    CALL_TYPES, DEFAULT_CALL_TYPE, DEFAULT_PERSONA_PATH, SHARED_STATE_DB_PATH,
+)
+from services.linkedin_cache import normalize_linkedin_url, normalize_username
+from services.persona_compactor import compact_persona
+from utils.shared_state import connect_shared_db, disable_busy_wait, retry_when_locked
+from utils.tokens import truncate_to_tokens
+
+# Profile key of the persona used when a call does not select one (or selects an unknown one)
+DEFAULT_PROFILE = 'default'
+
+# response.create never changes, serialize it once
+RESPONSE_CREATE = json.dumps({"type": "response.create"})
+
+
+def normalize_profile_key(profile: str) -> str:
+    """Map a profile URL or username to the key it is stored under"""
+    profile = str(profile or '').strip()
+    if not profile:
+        return DEFAULT_PROFILE
+    if '/' in profile or '.' in profile:
+        return normalize_linkedin_url(profile)
+    return normalize_username(profile)
+
+
+def parse_profile_details(raw: str) -> Union[Dict[str, Any], str]:
+    """Parse profile details stored as JSON or as a Python dict repr, or return the text as is"""
+    try:
+        return json.loads(raw)
+    except ValueError:
+        pass
+    try:
+        parsed = ast.literal_eval(raw)
+    except (ValueError, SyntaxError):
+        return raw
+    return parsed if isinstance(parsed, dict) else raw
+
+
+def build_instructions(linkedin_profile_details: Union[Dict[str, Any], str] = '') -> str:
+    """Combine the system message with the compacted profile details"""
+    combined_instructions = INITIAL_SESSION_SYSTEM_MESSAGE
+
+    if isinstance(linkedin_profile_details, str) and linkedin_profile_details:
+        linkedin_profile_details = parse_profile_details(linkedin_profile_details)
+    if isinstance(linkedin_profile_details, dict):
+        # Keep the instructions within PERSONA_TOKEN_BUDGET instead of dumping the raw profile
+        linkedin_profile_details = compact_persona(linkedin_profile_details)
+    elif linkedin_profile_details:
+        linkedin_profile_details = truncate_to_tokens(linkedin_profile_details, PERSONA_TOKEN_BUDGET)
+
+    if linkedin_profile_details:
+        combined_instructions += f"\n\nThis is the LinkedIn profile details:\n{linkedin_profile_details}"
+    return combined_instructions
+
+
+def build_session_update(instructions: str) -> Dict[str, Any]:
+    return {
+        "type": "session.update",
+        "session": {
+            "turn_detection": {"type": "server_vad"},
+            "input_audio_format": "g711_ulaw",
+            "output_audio_format": "g711_ulaw",
+            "voice": VOICE,
+            "instructions": instructions,
+            "modalities": ["text", "audio"],
+            "temperature": 0.8,
+        }
+    }
+
+
+def build_first_message(type_of_call: str = "sales") -> str:
+    first_message = "Generate a greeting for the user based on the person information that has been provided. Do it very short like a real person would do. Without 'how can I help you today?' or 'how can I assist you today?' you are a person, not a bot."
+
+    if type_of_call == 'hiring_manager':
+        first_message += "\nYou are the hiring manager for this call. You are trying to hire the user for a job. Be professional, and consice. Use the information provided to you to make a good impression"
+        first_message += "\nIMPORTANT: You are the hiring manager for this call. You are trying to hire the user for a job. Be professional, and consice"
+        first_message += "\nGreat the user like a hiring manager would do, and ask them if they are interested in the job, and why they are interested in the job"
+    elif type_of_call == 'sales':
+        first_message += "\nYou are a decision maker for this call, someone is trying to sell you something. Be professional, and consice. Use the information provided to you to make a good impression"
+        first_message += "\nIMPORTANT: You should represent your company for this call. Dig inside the caller product to understand if it fits your company"
+    return first_message
+
+
+def build_initial_conversation_item(type_of_call: str = "sales") -> Dict[str, Any]:
+    return {
+        "type": "conversation.item.create",
+        "item": {
+            "type": "message",
+            "role": "system",
+            "content": [
+                {
+                    "type": "input_text",
+                    "text": build_first_message(type_of_call)
+                }
+            ]
+        }
+    }
+
+
+@dataclass(frozen=True)
+class CompiledPersona:
+    """
+    Ready-to-send opening frames of a realtime session
+
+    Frames are kept as serialized JSON text: the Realtime API only accepts text
+    websocket frames, and websockets sends `bytes` as binary frames.
+    """
+    profile: str
+    call_type: str
+    session_update: str
+    initial_item: str
+    response_create: str = RESPONSE_CREATE
+
+    @property
+    def frames(self) -> Tuple[str, str, str]:
+        return self.session_update, self.initial_item, self.response_create
+
+    @property
+    def size(self) -> int:
+        return sum(len(frame) for frame in self.frames)
+
+
+def compile_persona(profile: str, call_type: str, linkedin_profile_details: Union[Dict[str, Any], str] = '') -> CompiledPersona:
+    """
+    Build and serialize the opening frames for one profile and call type
+
+    Args:
+        profile: Profile key the persona is stored under
+        call_type: Call type, e.g. "hiring_manager" or "sales"
+        linkedin_profile_details: Profile dict (optionally enriched) or raw text
+
+    Returns:
+        CompiledPersona holding the serialized frames
+    """
+    instructions = build_instructions(linkedin_profile_details)
+    return CompiledPersona(
+        profile=profile,
+        call_type=call_type,
+        session_update=json.dumps(build_session_update(instructions)),
+        initial_item=json.dumps(build_initial_conversation_item(call_type)),
+    )
+
+
+class SQLitePersonaTier:
+    """Compiled personas shared by every worker process, so a persona compiled by one serves calls on all"""
+
+    def __init__(self, db_path: str):
+        self._conn = connect_shared_db(db_path)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS personas ("
+            "profile TEXT NOT NULL, call_type TEXT NOT NULL, session_update TEXT NOT NULL, "
+            "initial_item TEXT NOT NULL, PRIMARY KEY (profile, call_type))"
+        )
+        # Looked up during call setup, so a lock held by another worker is waited out asynchronously
+        disable_busy_wait(self._conn)
+
+    async def get(self, profile: str, call_type: str) -> Optional[CompiledPersona]:
+        row = await retry_when_locked(self._select, profile, call_type)
+        if row is None:
+            return None
+        return CompiledPersona(profile=profile, call_type=call_type, session_update=row[0], initial_item=row[1])
+
+    def _select(self, profile: str, call_type: str):
+        return self._conn.execute(
+            "SELECT session_update, initial_item FROM personas WHERE profile = ? AND call_type = ?",
+            (profile, call_type),
+        ).fetchone()
+
+    async def set(self, persona: CompiledPersona):
+        await retry_when_locked(
+            self._conn.execute,
+            "INSERT OR REPLACE INTO personas (profile, call_type, session_update, initial_item) VALUES (?, ?, ?, ?)",
+            (persona.profile, persona.call_type, persona.session_update, persona.initial_item),
+        )
+
+    async def delete(self, profile: str, call_type: Optional[str] = None):
+        if call_type is None:
+            await retry_when_locked(self._conn.execute, "DELETE FROM personas WHERE profile = ?", (profile,))
+        else:
+            await retry_when_locked(
+                self._conn.execute, "DELETE FROM personas WHERE profile = ? AND call_type = ?", (profile, call_type)
+            )
+
+    def close(self):
+        self._conn.close()
+
+
+@dataclass
+class PersonaStoreStats:
+    hits: int = 0
+    disk_hits: int = 0
+    misses: int = 0
+    default_fallbacks: int = 0
+    evictions: int = 0
+    compiled: int = 0
+
+    def to_dict(self) -> Dict[str, int]:
+        return asdict(self)
+
+
+class PersonaStore:
+    """
+    In-memory LRU of compiled personas keyed by (profile, call type)
+
+    Personas are compiled when they are stored, so picking one at call setup is a
+    dict lookup. The default persona is pinned and never evicted. With `db_path`,
+    personas are also written to a SQLite tier shared by all worker processes, and
+    memory misses are looked up there. A worker keeps serving its in-memory copy
+    of a persona until it is evicted or put again in that worker.
+    """
+
+    def __init__(self, max_entries: int = PERSONA_STORE_MAX_ENTRIES, db_path: Optional[str] = None):
+        self.max_entries = max_entries
+        self.stats = PersonaStoreStats()
+        self._entries: "OrderedDict[Tuple[str, str], CompiledPersona]" = OrderedDict()
+        self._defaults: Dict[str, CompiledPersona] = {}
+        self.disk = SQLitePersonaTier(db_path) if db_path else None
+
+    def __len__(self):
+        return len(self._entries) + len(self._defaults)
+
+    async def put(self, profile: str, call_type: str, linkedin_profile_details: Union[Dict[str, Any], str]) -> CompiledPersona:
+        """Compile and store the persona for a profile and call type"""
+        key = (normalize_profile_key(profile), call_type)
+        if key[0] == DEFAULT_PROFILE:
+            return self.put_default(call_type, linkedin_profile_details)
+
+        persona = compile_persona(key[0], call_type, linkedin_profile_details)
+        self.stats.compiled += 1
+        self._remember(key, persona)
+        if self.disk is not None:
+            await self.disk.set(persona)
+        return persona
+
+    def put_default(self, call_type: str, linkedin_profile_details: Union[Dict[str, Any], str]) -> CompiledPersona:
+        """Compile and pin the default persona for a call type, it is kept in memory only"""
+        persona = compile_persona(DEFAULT_PROFILE, call_type, linkedin_profile_details)
+        self.stats.compiled += 1
+        self._defaults[call_type] = persona
+        return persona
+
+    def _remember(self, key: Tuple[str, str], persona: CompiledPersona):
+        self._entries.pop(key, None)
+        self._entries[key] = persona
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.stats.evictions += 1
+
+    async def get(self, profile: Optional[str], call_type: Optional[str] = None) -> Optional[CompiledPersona]:
+        """
+        Look up the persona for a call, falling back to the default persona
+
+        Args:
+            profile: Profile URL or username selected for the call, if any
+            call_type: Call type, DEFAULT_CALL_TYPE when missing
+
+        Returns:
+            The compiled persona, or None if neither it nor a default exists
+        """
+        call_type = call_type or DEFAULT_CALL_TYPE
+        key = (normalize_profile_key(profile), call_type)
+
+        persona = self._entries.get(key)
+        if persona is not None:
+            self._entries.move_to_end(key)
+            self.stats.hits += 1
+            return persona
+
+        if key[0] != DEFAULT_PROFILE and self.disk is not None:
+            # Compiled by another worker process
+            persona = await self.disk.get(*key)
+            if persona is not None:
+                self._remember(key, persona)
+                self.stats.disk_hits += 1
+                return persona
+
+        if key[0] != DEFAULT_PROFILE:
+            self.stats.misses += 1
+        persona = self._defaults.get(call_type)
+        if persona is not None:
+            self.stats.default_fallbacks += 1
+        return persona
+
+    def get_or_compile_default(self, call_type: Optional[str] = None) -> CompiledPersona:
+        """
+        Default persona for a call type, compiled from the default profile on first use
+
+        Unknown call types (e.g. a custom <Stream> parameter) get the DEFAULT_CALL_TYPE
+        persona, so only one default per known call type is ever pinned.
+        """
+        if call_type not in CALL_TYPES:
+            call_type = DEFAULT_CALL_TYPE
+        persona = self._defaults.get(call_type)
+        if persona is None:
+            persona = self.put_default(call_type, load_default_profile())
+        return persona
+
+    async def invalidate(self, profile: str, call_type: Optional[str] = None):
+        profile_key = normalize_profile_key(profile)
+        for key in [key for key in self._entries if key[0] == profile_key and call_type in (None, key[1])]:
+            del self._entries[key]
+        if self.disk is not None:
+            await self.disk.delete(profile_key, call_type)
+
+    def get_stats(self) -> Dict[str, Any]:
+        stats = self.stats.to_dict()
+        stats['entries'] = len(self._entries)
+        stats['max_entries'] = self.max_entries
+        stats['default_call_types'] = sorted(self._defaults)
+        stats['bytes'] = sum(persona.size for persona in self._entries.values())
+        stats['shared'] = self.disk is not None
+        return stats
+
+    def close(self):
+        if self.disk is not None:
+            self.disk.close()
+
+
+def load_default_profile() -> Union[Dict[str, Any], str]:
+    """Read the default persona profile from DEFAULT_PERSONA_PATH"""
+    try:
+        with open(DEFAULT_PERSONA_PATH, 'r') as f:
+            return parse_profile_details(f.read().strip())
+    except FileNotFoundError:
+        print(f"Warning: default persona file {DEFAULT_PERSONA_PATH} not found, using empty personality")
+        return ''
+
+
+def create_persona_store() -> PersonaStore:
+    """Build the app-wide store with the default persona compiled for every call type"""
+    store = PersonaStore(max_entries=PERSONA_STORE_MAX_ENTRIES, db_path=SHARED_STATE_DB_PATH)
+    default_profile = load_default_profile()
+    for call_type in CALL_TYPES:
+        store.put_default(call_type, default_profile)
+    return store
@@ -0,0 +1,372 @@
+import asyncio
+import re
+import statistics
+import time
+from dataclasses import dataclass, asdict
+from typing import Any, Dict, List, Optional
+
+from config.settings import (
+    PREWARM_QUEUE_DB_PATH,
+    PREWARM_WORKERS,
+    PREWARM_MAX_ATTEMPTS,
+    PREWARM_RETRY_BASE_DELAY,
+    PREWARM_RETRY_MAX_DELAY,
+    PREWARM_POLL_INTERVAL,
+    PREWARM_JOB_TIMEOUT,
+    PREWARM_RETENTION,
+)
+from services.linkedin_scraper_service import LinkedInScraperService, PERSONA_POSTS_CUTOFF, UPSTREAM_ERRORS
+from services.persona_store import PersonaStore
+from utils.rate_limiter import Priority
+from utils.resilience import RetryPolicy
+from utils.shared_state import connect_shared_db, disable_busy_wait, retry_when_locked
+
+# Job states
+PENDING = 'pending'
+RUNNING = 'running'
+READY = 'ready'
+FAILED = 'failed'
+
+_JOB_COLUMNS = (
+    'call_key', 'profile_url', 'call_type', 'call_at', 'status', 'attempts', 'next_attempt_at',
+    'created_at', 'claimed_at', 'ready_at', 'connected_at', 'last_error', 'version',
+)
+_PHONE_CHARS = re.compile(r'^\+?[\d\s().-]+$')
+
+
+def normalize_call_key(call: str) -> str:
+    """Key a scheduled call is stored under: phone numbers reduced to `+` and digits, stream keys as given"""
+    call = str(call or '').strip()
+    if _PHONE_CHARS.match(call):
+        return ('+' if call.startswith('+') else '') + re.sub(r'\D', '', call)
+    return call
+
+
+@dataclass
+class PrewarmJob:
+    """
+    A scheduled call and the state of its persona build
+
+    Args:
+        call_key: Caller phone number or stream key the call is matched by
+        profile_url: Profile the persona is built from
+        call_type: Call type of the persona
+        call_at: Unix time the call is expected
+        status: One of pending, running, ready, failed
+        attempts: Builds started so far
+        next_attempt_at: Unix time the job is due (again)
+        ready_at: Unix time the persona was stored
+        connected_at: Unix time the call arrived
+        version: Bumped on every registration, so a stale build cannot overwrite a newer one
+    """
+    call_key: str
+    profile_url: str
+    call_type: str
+    call_at: float
+    status: str = PENDING
+    attempts: int = 0
+    next_attempt_at: float = 0.0
+    created_at: float = 0.0
+    claimed_at: Optional[float] = None
+    ready_at: Optional[float] = None
+    connected_at: Optional[float] = None
+    last_error: Optional[str] = None
+    version: int = 1
+
+    @property
+    def lead_seconds(self) -> Optional[float]:
+        """How long before the scheduled call time the persona was ready, negative when late"""
+        return self.call_at - self.ready_at if self.ready_at is not None else None
+
+    @property
+    def connect_lead_seconds(self) -> Optional[float]:
+        """How long before the call actually arrived the persona was ready"""
+        if self.ready_at is None or self.connected_at is None:
+            return None
+        return self.connected_at - self.ready_at
+
+    def to_dict(self) -> Dict[str, Any]:
+        result = asdict(self)
+        result['lead_seconds'] = self.lead_seconds
+        result['connect_lead_seconds'] = self.connect_lead_seconds
+        return result
+
+
+def _summarize(values: List[float]) -> Optional[Dict[str, float]]:
+    if not values:
+        return None
+    return {
+        'min': min(values),
+        'p50': statistics.median(values),
+        'mean': statistics.fmean(values),
+        'max': max(values),
+    }
+
+
+class PrewarmQueue:
+    """
+    Persistent queue of scheduled calls whose persona should be built ahead of time
+
+    Jobs live in SQLite, so they survive restarts and every worker process
+    draws from the same queue. Due jobs are claimed earliest call first inside
+    a `BEGIN IMMEDIATE` transaction, so each is built by one worker. A job left
+    running longer than `job_timeout` (its worker died) is claimed again.
+    Registering a call again for the same key replaces its job. Writes run on
+    the event loop, so a lock held by another worker is waited out
+    asynchronously rather than blocking it.
+    """
+
+    def __init__(self, db_path: str, job_timeout: float = PREWARM_JOB_TIMEOUT, retention: float = PREWARM_RETENTION):
+        self.job_timeout = job_timeout
+        self.retention = retention
+        self._conn = connect_shared_db(db_path)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS prewarm_jobs ("
+            "call_key TEXT PRIMARY KEY, profile_url TEXT NOT NULL, call_type TEXT NOT NULL, "
+            "call_at REAL NOT NULL, status TEXT NOT NULL, attempts INTEGER NOT NULL, "
+            "next_attempt_at REAL NOT NULL, created_at REAL NOT NULL, claimed_at REAL, ready_at REAL, "
+            "connected_at REAL, last_error TEXT, version INTEGER NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS prewarm_jobs_due ON prewarm_jobs (status, call_at)")
+        disable_busy_wait(self._conn)
+
+    def _row_to_job(self, row) -> Optional[PrewarmJob]:
+        return PrewarmJob(**dict(zip(_JOB_COLUMNS, row))) if row is not None else None
+
+    def get(self, call: str) -> Optional[PrewarmJob]:
+        row = self._conn.execute(
+            f"SELECT {', '.join(_JOB_COLUMNS)} FROM prewarm_jobs WHERE call_key = ?", (normalize_call_key(call),)
+        ).fetchone()
+        return self._row_to_job(row)
+
+    async def schedule(self, call: str, profile_url: str, call_type: str, call_at: float) -> PrewarmJob:
+        """Register a call, or replace the job already registered for the same phone number or stream"""
+        return await retry_when_locked(self._schedule, call, profile_url, call_type, call_at)
+
+    def _schedule(self, call: str, profile_url: str, call_type: str, call_at: float) -> PrewarmJob:
+        now = time.time()
+        key = normalize_call_key(call)
+        self._conn.execute("DELETE FROM prewarm_jobs WHERE call_at < ?", (now - self.retention,))
+        self._conn.execute(
+            "INSERT INTO prewarm_jobs (call_key, profile_url, call_type, call_at, status, attempts, "
+            "next_attempt_at, created_at, version) VALUES (?, ?, ?, ?, ?, 0, ?, ?, 1) "
+            "ON CONFLICT(call_key) DO UPDATE SET profile_url = excluded.profile_url, "
+            "call_type = excluded.call_type, call_at = excluded.call_at, status = excluded.status, attempts = 0, "
+            "next_attempt_at = excluded.next_attempt_at, created_at = excluded.created_at, claimed_at = NULL, "
+            "ready_at = NULL, connected_at = NULL, last_error = NULL, version = version + 1",
+            (key, profile_url, call_type, call_at, PENDING, now, now),
+        )
+        return self.get(key)
+
+    async def cancel(self, call: str) -> bool:
+        cursor = await retry_when_locked(
+            self._conn.execute, "DELETE FROM prewarm_jobs WHERE call_key = ?", (normalize_call_key(call),)
+        )
+        return cursor.rowcount == 1
+
+    async def claim(self) -> Optional[PrewarmJob]:
+        """
+        Take the due job with the earliest call time
+
+        Returns:
+            The job, now running with its attempt counted, or None if no job is due
+        """
+        return await retry_when_locked(self._claim)
+
+    def _claim(self) -> Optional[PrewarmJob]:
+        now = time.time()
+        self._conn.execute("BEGIN IMMEDIATE")
+        try:
+            row = self._conn.execute(
+                f"SELECT {', '.join(_JOB_COLUMNS)} FROM prewarm_jobs "
+                "WHERE (status = ? AND next_attempt_at <= ?) OR (status = ? AND claimed_at < ?) "
+                "ORDER BY call_at LIMIT 1",
+                (PENDING, now, RUNNING, now - self.job_timeout),
+            ).fetchone()
+            job = self._row_to_job(row)
+            if job is not None:
+                job.status = RUNNING
+                job.attempts += 1
+                job.claimed_at = now
+                self._conn.execute(
+                    "UPDATE prewarm_jobs SET status = ?, attempts = ?, claimed_at = ? WHERE call_key = ?",
+                    (job.status, job.attempts, job.claimed_at, job.call_key),
+                )
+            self._conn.execute("COMMIT")
+        except BaseException:
+            self._conn.execute("ROLLBACK")
+            raise
+        return job
+
+    async def _finish(self, job: PrewarmJob, **fields) -> bool:
+        """Update a claimed job, unless it was registered again (or taken over) since the claim"""
+        assignments = ', '.join(f"{name} = ?" for name in fields)
+        cursor = await retry_when_locked(
+            self._conn.execute,
+            f"UPDATE prewarm_jobs SET {assignments} "
+            "WHERE call_key = ? AND version = ? AND status = ? AND claimed_at = ?",
+            (*fields.values(), job.call_key, job.version, RUNNING, job.claimed_at),
+        )
+        return cursor.rowcount == 1
+
+    async def complete(self, job: PrewarmJob) -> bool:
+        job.status, job.ready_at, job.last_error = READY, time.time(), None
+        return await self._finish(job, status=job.status, ready_at=job.ready_at, last_error=None)
+
+    async def retry(self, job: PrewarmJob, error: str, delay: float) -> bool:
+        job.status, job.next_attempt_at, job.last_error = PENDING, time.time() + delay, error
+        return await self._finish(job, status=job.status, next_attempt_at=job.next_attempt_at, last_error=error)
+
+    async def fail(self, job: PrewarmJob, error: str) -> bool:
+        job.status, job.last_error = FAILED, error
+        return await self._finish(job, status=job.status, last_error=error)
+
+    async def release(self, job: PrewarmJob) -> bool:
+        """Hand a claimed job back for immediate pickup, e.g. when shutdown cancelled its build; the attempt is not counted"""
+        job.status, job.next_attempt_at, job.attempts = PENDING, time.time(), job.attempts - 1
+        return await self._finish(job, status=job.status, next_attempt_at=job.next_attempt_at, attempts=job.attempts)
+
+    async def mark_connected(self, call: str) -> Optional[PrewarmJob]:
+        """Record that the scheduled call arrived; returns its job, if one was registered"""
+        key = normalize_call_key(call)
+        await retry_when_locked(
+            self._conn.execute,
+            "UPDATE prewarm_jobs SET connected_at = ? WHERE call_key = ? AND connected_at IS NULL",
+            (time.time(), key),
+        )
+        return self.get(key)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Jobs per status, and how far ahead of the call the ready personas were built"""
+        counts = dict(self._conn.execute("SELECT status, COUNT(*) FROM prewarm_jobs GROUP BY status").fetchall())
+        rows = self._conn.execute(
+            "SELECT call_at - ready_at, connected_at - ready_at FROM prewarm_jobs WHERE ready_at IS NOT NULL"
+        ).fetchall()
+        leads = [lead for lead, _ in rows]
+        connect_leads = [lead for _, lead in rows if lead is not None]
+        return {
+            'jobs': {status: counts.get(status, 0) for status in (PENDING, RUNNING, READY, FAILED)},
+            'late': sum(1 for lead in leads if lead < 0),
+            'lead_seconds': _summarize(leads),
+            'connect_lead_seconds': _summarize(connect_leads),
+        }
+
+    def close(self):
+        self._conn.close()
+
+
+@dataclass
+class PrewarmStats:
+    built: int = 0
+    retried: int = 0
+    failed: int = 0
+    superseded: int = 0  # Builds finished after their call was registered again
+
+    def to_dict(self) -> Dict[str, int]:
+        return asdict(self)
+
+
+class PrewarmWorkerPool:
+    """
+    Background workers that build and store the personas of scheduled calls
+
+    Each job fetches the cleaned enriched profile at BACKGROUND priority, so
+    prewarming never delays interactive requests, then compiles the persona and
+    its serialized session frames into the persona store, where the call picks
+    them up. Builds failed by an upstream outage are retried with backoff up to
+    `max_attempts`; a profile that does not exist fails the job at once.
+    """
+
+    def __init__(
+        self,
+        queue: PrewarmQueue,
+        scraper: LinkedInScraperService,
+        persona_store: PersonaStore,
+        workers: int = PREWARM_WORKERS,
+        max_attempts: int = PREWARM_MAX_ATTEMPTS,
+        poll_interval: float = PREWARM_POLL_INTERVAL,
+    ):
+        self.queue = queue
+        self.scraper = scraper
+        self.persona_store = persona_store
+        self.workers = workers
+        self.poll_interval = poll_interval
+        self.retry_policy = RetryPolicy(
+            max_attempts=max_attempts,
+            base_delay=PREWARM_RETRY_BASE_DELAY,
+            max_delay=PREWARM_RETRY_MAX_DELAY,
+        )
+        self.stats = PrewarmStats()
+        self._wakeup = asyncio.Event()
+        self._tasks: List[asyncio.Task] = []
+        self._closed = False
+
+    async def start(self):
+        if not self._tasks:
+            self._tasks = [asyncio.ensure_future(self._work()) for _ in range(self.workers)]
+
+    async def close(self):
+        # A cancellation that races the poll timeout can be swallowed by wait_for, the flag ends the loop regardless
+        self._closed = True
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    async def schedule(self, call: str, profile_url: str, call_type: str, call_at: float) -> PrewarmJob:
+        """Register a call and wake an idle worker to build its persona"""
+        job = await self.queue.schedule(call, profile_url, call_type, call_at)
+        self._wakeup.set()
+        return job
+
+    async def _work(self):
+        while not self._closed:
+            job = await self.queue.claim()
+            if job is None:
+                # Jobs scheduled by this process wake us at once, others (and retries) by polling
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), timeout=self.poll_interval)
+                except asyncio.TimeoutError:
+                    pass
+                self._wakeup.clear()
+                continue
+            await self.run(job)
+
+    async def run(self, job: PrewarmJob):
+        """Build one claimed job and record the outcome in the queue"""
+        try:
+            profile_data = await self.scraper.get_enriched_profile(
+                job.profile_url, cleanup=True, priority=Priority.BACKGROUND, posts_cutoff=PERSONA_POSTS_CUTOFF
+            )
+            if not profile_data:
+                raise LookupError("Could not fetch LinkedIn profile data")
+            await self.persona_store.put(job.profile_url, job.call_type, profile_data)
+        except asyncio.CancelledError:
+            # Otherwise the job stays running until job_timeout, which may be after the call
+            await self.queue.release(job)
+            raise
+        except Exception as e:
+            error = str(e) or type(e).__name__
+            # Only upstream outages are worth retrying, a missing profile stays missing
+            if isinstance(e, UPSTREAM_ERRORS) and job.attempts < self.retry_policy.max_attempts:
+                self.stats.retried += 1
+                await self.queue.retry(job, error, self.retry_policy.backoff(job.attempts))
+            else:
+                self.stats.failed += 1
+                await self.queue.fail(job, error)
+            print(f"Prewarm attempt {job.attempts} for {job.call_key} failed: {error}")
+            return
+
+        if await self.queue.complete(job):
+            self.stats.built += 1
+            print(f"Persona for {job.call_key} ready {job.lead_seconds:.0f}s ahead of the call")
+        else:
+            self.stats.superseded += 1
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {**self.queue.get_stats(), 'workers': self.stats.to_dict()}
+
+
+def create_prewarm_queue() -> PrewarmQueue:
+    """Build the app-wide prewarm queue from settings"""
+    return PrewarmQueue(PREWARM_QUEUE_DB_PATH)
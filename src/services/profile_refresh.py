@@ -0,0 +1,268 @@
+import hashlib
+import json
+import time
+from collections import Counter, OrderedDict
+from dataclasses import dataclass, field, asdict
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from config.settings import PROFILE_SNAPSHOT_DB_PATH, PROFILE_SNAPSHOT_MAX_ENTRIES
+from services.linkedin_cache import normalize_linkedin_url
+from utils.linkedin_payloads import post_items
+from utils.shared_state import connect_shared_db, disable_busy_wait, retry_when_locked
+
+# Sections of an enriched profile and the top-level keys they are built from; every
+# other key (name, headline, summary, languages, certifications, ...) is the "profile" section
+SECTION_KEYS = {
+    'positions': ('position', 'positions', 'fullPositions'),
+    'educations': ('educations',),
+    'skills': ('skills',),
+    'posts': ('posts',),
+    'currentCompany': ('currentCompany',),
+    'recentCompanyPosts': ('recentCompanyPosts',),
+}
+PROFILE_SECTION = 'profile'
+POST_SECTIONS = ('posts', 'recentCompanyPosts')
+
+# Not part of the profile itself
+IGNORED_KEYS = frozenset(('enrichment',))
+
+# Engagement counters move on every fetch without changing what a post says
+VOLATILE_POST_KEYS = frozenset((
+    'totalReactionCount', 'likeCount', 'appreciationCount', 'empathyCount', 'InterestCount',
+    'praiseCount', 'funnyCount', 'maybeCount', 'commentsCount', 'repostsCount',
+))
+
+_SECTION_OF_KEY = {key: section for section, keys in SECTION_KEYS.items() for key in keys}
+
+
+def fingerprint(value: Any) -> str:
+    """Stable short hash of a JSON value, independent of key order"""
+    canonical = json.dumps(value, sort_keys=True, ensure_ascii=False, separators=(',', ':'), default=str)
+    return hashlib.sha256(canonical.encode('utf-8')).hexdigest()[:16]
+
+
+def post_key(post: Dict[str, Any]) -> str:
+    """Identity of a post across fetches: its URN, or its timestamp and text when the URN is missing"""
+    for key in ('urn', 'entityUrn', 'postUrl'):
+        if post.get(key):
+            return str(post[key])
+    return f"{post.get('postedDateTimestamp')}:{fingerprint(post.get('text'))}"
+
+
+def _stable_post(post: Dict[str, Any]) -> Dict[str, Any]:
+    return {key: value for key, value in post.items() if key not in VOLATILE_POST_KEYS}
+
+
+def section_items(profile: Dict[str, Any], section: str) -> List[Tuple[str, Any]]:
+    """
+    The parts of a section that are diffed one by one, as (label, value) pairs
+
+    List sections yield one pair per item, posts without their engagement
+    counters, and the profile section one pair per top-level key.
+    """
+    if section == PROFILE_SECTION:
+        return [
+            (key, value) for key, value in profile.items()
+            if key not in _SECTION_OF_KEY and key not in IGNORED_KEYS
+        ]
+    if section in POST_SECTIONS:
+        return [('post', _stable_post(post)) for post in post_items(profile.get(section))]
+    if section == 'currentCompany':
+        company = profile.get(section)
+        return [('company', company)] if company else []
+    return [(key, item) for key in SECTION_KEYS[section] for item in profile.get(key) or []]
+
+
+def fingerprint_sections(profile: Dict[str, Any]) -> Dict[str, str]:
+    """Fingerprint of every section of an enriched profile"""
+    return {
+        section: fingerprint(section_items(profile, section))
+        for section in (PROFILE_SECTION, *SECTION_KEYS)
+    }
+
+
+@dataclass
+class SectionDiff:
+    """
+    What changed in one section
+
+    Args:
+        added: Items only in the new version (positions, posts, ...)
+        removed: Items only in the old version; an edited item counts as one removed and one added
+        keys: Changed top-level keys, for the profile section
+    """
+    added: int = 0
+    removed: int = 0
+    keys: List[str] = field(default_factory=list)
+
+
+@dataclass
+class ProfileDiff:
+    """Structural diff between two versions of an enriched profile; only changed sections are listed"""
+    sections: Dict[str, SectionDiff] = field(default_factory=dict)
+    initial: bool = False  # No previous version, everything is new
+
+    @property
+    def changed(self) -> List[str]:
+        return list(self.sections)
+
+    def affects(self, sections: Iterable[str]) -> bool:
+        return any(section in self.sections for section in sections)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'initial': self.initial,
+            'changed': self.changed,
+            'sections': {section: asdict(diff) for section, diff in self.sections.items()},
+        }
+
+
+def diff_profiles(old: Optional[Dict[str, Any]], new: Dict[str, Any]) -> ProfileDiff:
+    """
+    Compare two versions of an enriched profile section by section
+
+    Args:
+        old: Previously stored version, or None
+        new: Freshly fetched version
+
+    Returns:
+        The sections whose content changed, with item level counts
+    """
+    diff = ProfileDiff(initial=old is None)
+    old = old or {}
+    for section in (PROFILE_SECTION, *SECTION_KEYS):
+        old_items = section_items(old, section)
+        new_items = section_items(new, section)
+        if fingerprint(old_items) == fingerprint(new_items):
+            continue
+
+        if section == PROFILE_SECTION:
+            old_values = {key: fingerprint(value) for key, value in old_items}
+            new_values = {key: fingerprint(value) for key, value in new_items}
+            keys = sorted(key for key in old_values.keys() | new_values.keys() if old_values.get(key) != new_values.get(key))
+            diff.sections[section] = SectionDiff(keys=keys)
+            continue
+
+        old_counts = Counter(fingerprint(item) for item in old_items)
+        new_counts = Counter(fingerprint(item) for item in new_items)
+        diff.sections[section] = SectionDiff(
+            added=sum((new_counts - old_counts).values()),
+            removed=sum((old_counts - new_counts).values()),
+        )
+    return diff
+
+
+def split_new_posts(page: List[Dict[str, Any]], seen: set) -> Tuple[List[Dict[str, Any]], bool]:
+    """
+    Posts of a newest-first page that come before the first already seen post
+
+    Returns:
+        The new posts, and whether a seen post was reached (no need for older pages)
+    """
+    for index, post in enumerate(page):
+        if post_key(post) in seen:
+            return page[:index], True
+    return list(page), False
+
+
+def merge_posts(fetched: List[Dict[str, Any]], previous: List[Dict[str, Any]], limit: int) -> List[Dict[str, Any]]:
+    """
+    Newly fetched posts followed by the stored ones, newest first
+
+    Fetched versions win for posts in both lists, so engagement counters are
+    current. The result is capped at `limit` posts, the window a full fetch
+    would have returned.
+    """
+    keys = {post_key(post) for post in fetched}
+    merged = list(fetched) + [post for post in previous if post_key(post) not in keys]
+    return merged[:limit]
+
+
+class ProfileSnapshotStore:
+    """
+    Last enriched profile fetched per profile URL, the baseline refreshes are diffed against
+
+    Snapshots are kept as serialized JSON, so every read returns a fresh dict
+    callers can mutate. With `db_path` they are stored in SQLite, survive
+    restarts and are shared by all worker processes; otherwise an in-memory LRU
+    keeps them. Either way at most `max_entries` are kept, in SQLite the least
+    recently written ones are evicted first.
+    """
+
+    def __init__(self, db_path: Optional[str] = None, max_entries: int = PROFILE_SNAPSHOT_MAX_ENTRIES):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, str]" = OrderedDict()
+        self._conn = connect_shared_db(db_path) if db_path else None
+        if self._conn is not None:
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS profile_snapshots ("
+                "key TEXT PRIMARY KEY, profile TEXT NOT NULL, updated_at REAL NOT NULL)"
+            )
+            self._conn.execute(
+                "CREATE INDEX IF NOT EXISTS profile_snapshots_updated_at ON profile_snapshots (updated_at)"
+            )
+            disable_busy_wait(self._conn)
+
+    def __len__(self):
+        if self._conn is not None:
+            return self._conn.execute("SELECT COUNT(*) FROM profile_snapshots").fetchone()[0]
+        return len(self._entries)
+
+    async def get(self, linkedin_url: str) -> Optional[Dict[str, Any]]:
+        key = normalize_linkedin_url(linkedin_url)
+        if self._conn is not None:
+            row = await retry_when_locked(self._select, key)
+            return json.loads(row[0]) if row is not None else None
+
+        value = self._entries.get(key)
+        if value is None:
+            return None
+        self._entries.move_to_end(key)
+        return json.loads(value)
+
+    def _select(self, key: str):
+        return self._conn.execute("SELECT profile FROM profile_snapshots WHERE key = ?", (key,)).fetchone()
+
+    async def set(self, linkedin_url: str, profile: Dict[str, Any]):
+        key = normalize_linkedin_url(linkedin_url)
+        value = json.dumps(profile, ensure_ascii=False)
+        if self._conn is not None:
+            await retry_when_locked(self._write, key, value)
+            return
+
+        self._entries.pop(key, None)
+        self._entries[key] = value
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def _write(self, key: str, value: str):
+        self._conn.execute("BEGIN IMMEDIATE")
+        try:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO profile_snapshots (key, profile, updated_at) VALUES (?, ?, ?)",
+                (key, value, time.time()),
+            )
+            self._conn.execute(
+                "DELETE FROM profile_snapshots WHERE key IN ("
+                "SELECT key FROM profile_snapshots ORDER BY updated_at DESC LIMIT -1 OFFSET ?)",
+                (self.max_entries,),
+            )
+            self._conn.execute("COMMIT")
+        except BaseException:
+            self._conn.execute("ROLLBACK")
+            raise
+
+    async def delete(self, linkedin_url: str):
+        key = normalize_linkedin_url(linkedin_url)
+        if self._conn is not None:
+            await retry_when_locked(self._conn.execute, "DELETE FROM profile_snapshots WHERE key = ?", (key,))
+        self._entries.pop(key, None)
+
+    def close(self):
+        if self._conn is not None:
+            self._conn.close()
+
+
+def create_profile_snapshot_store() -> ProfileSnapshotStore:
+    """Build the app-wide snapshot store from settings"""
+    return ProfileSnapshotStore(db_path=PROFILE_SNAPSHOT_DB_PATH or None)
@@ -0,0 +1,240 @@
+import asyncio
+import json
+import math
+import time
+from collections import deque
+from dataclasses import dataclass, asdict
+from typing import Any, Awaitable, Callable, Deque, Dict, Optional
+
+import websockets
+
+from config.settings import (
+    OPENAI_API_KEY, OPENAI_REALTIME_URL, REALTIME_CONNECT_TIMEOUT, REALTIME_POOL_MIN_SIZE,
+    REALTIME_POOL_MAX_SIZE, REALTIME_POOL_CALLS_PER_MINUTE, REALTIME_POOL_MAX_IDLE_AGE,
+    REALTIME_POOL_CHECK_INTERVAL,
+)
+
+# Window (seconds) over which the observed call rate is measured
+RATE_WINDOW = 60.0
+
+
+async def connect_realtime():
+    """Open a websocket to the OpenAI Realtime API"""
+    return await websockets.connect(
+        OPENAI_REALTIME_URL,
+        extra_headers={
+            "Authorization": f"Bearer {OPENAI_API_KEY}",
+            "OpenAI-Beta": "realtime=v1"
+        }
+    )
+
+
+@dataclass
+class RealtimePoolStats:
+    hits: int = 0  # Calls handed a warm session
+    misses: int = 0  # Calls that had to connect cold
+    connects: int = 0
+    connect_failures: int = 0
+    expired: int = 0  # Warm sessions closed for exceeding the max idle age
+    unhealthy: int = 0  # Warm sessions that failed a health check
+    released: int = 0
+
+    def to_dict(self) -> Dict[str, int]:
+        return asdict(self)
+
+
+@dataclass
+class _WarmSession:
+    ws: Any
+    connected_at: float
+
+
+class RealtimeConnectionPool:
+    """
+    Pool of pre-connected OpenAI Realtime sessions
+
+    Sessions are connected and confirmed ready (`session.created` received) ahead
+    of calls, so a call only has to send its persona. A realtime session carries
+    its conversation, so it is never handed to a second call: release closes it
+    and the pool connects a replacement.
+
+    The target size follows the expected call rate: the number of calls arriving
+    while one replacement connects (rate x connect latency) plus a two standard
+    deviation margin for bursts, clamped to [min_size, max_size]. The rate is the
+    configured expectation or the rate observed over the last minute, whichever is
+    higher. A background task closes sessions past `max_idle_age`, pings the rest
+    and refills the pool.
+    """
+
+    def __init__(
+        self,
+        min_size: int = REALTIME_POOL_MIN_SIZE,
+        max_size: int = REALTIME_POOL_MAX_SIZE,
+        calls_per_minute: float = REALTIME_POOL_CALLS_PER_MINUTE,
+        max_idle_age: float = REALTIME_POOL_MAX_IDLE_AGE,
+        check_interval: float = REALTIME_POOL_CHECK_INTERVAL,
+        connect_timeout: float = REALTIME_CONNECT_TIMEOUT,
+        connect: Callable[[], Awaitable[Any]] = connect_realtime,
+    ):
+        self.min_size = min_size
+        self.max_size = max(min_size, max_size)
+        self.calls_per_minute = calls_per_minute
+        self.max_idle_age = max_idle_age
+        self.check_interval = check_interval
+        self.connect_timeout = connect_timeout
+        self.stats = RealtimePoolStats()
+
+        self._connect = connect
+        self._idle: Deque[_WarmSession] = deque()
+        self._connecting = 0
+        self._acquired_at: Deque[float] = deque()
+        self._connect_latency = 1.0  # EWMA seconds, until measured
+        self._failures = 0
+        self._wakeup = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+        self._closed = False
+
+    def __len__(self):
+        return len(self._idle)
+
+    @property
+    def target_size(self) -> int:
+        now = time.monotonic()
+        while self._acquired_at and self._acquired_at[0] < now - RATE_WINDOW:
+            self._acquired_at.popleft()
+        calls_per_second = max(self.calls_per_minute / 60, len(self._acquired_at) / RATE_WINDOW)
+        expected = calls_per_second * self._connect_latency
+        size = math.ceil(expected + 2 * math.sqrt(expected))
+        return min(self.max_size, max(self.min_size, size))
+
+    async def start(self):
+        """Start the maintenance task, which fills the pool in the background"""
+        if self._task is None:
+            self._task = asyncio.ensure_future(self._maintain())
+
+    async def acquire(self):
+        """
+        Take a ready session for a call
+
+        Returns:
+            A warm websocket, or a freshly connected one if the pool is empty
+        """
+        self._acquired_at.append(time.monotonic())
+        self._wakeup.set()
+
+        now = time.monotonic()
+        while self._idle:
+            session = self._idle.popleft()
+            if session.ws.open and now - session.connected_at < self.max_idle_age:
+                self.stats.hits += 1
+                return session.ws
+            await self._discard(session)
+
+        self.stats.misses += 1
+        return await self._open()
+
+    async def release(self, ws):
+        """Close a session after its call ended, a replacement is connected in the background"""
+        self.stats.released += 1
+        if ws.open:
+            await ws.close()
+        self._wakeup.set()
+
+    async def close(self):
+        self._closed = True
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+        while self._idle:
+            await self._idle.popleft().ws.close()
+
+    async def _open(self):
+        started = time.monotonic()
+        self.stats.connects += 1
+        ws = await asyncio.wait_for(self._connect(), timeout=self.connect_timeout)
+        try:
+            # The session is usable once the server has created it
+            event = json.loads(await asyncio.wait_for(ws.recv(), timeout=self.connect_timeout))
+            if event.get('type') != 'session.created':
+                raise ConnectionError(f"Unexpected first realtime event: {event.get('type')}")
+        except BaseException:
+            await ws.close()
+            raise
+
+        latency = time.monotonic() - started
+        self._connect_latency = 0.8 * self._connect_latency + 0.2 * latency
+        return ws
+
+    async def _add_warm_session(self):
+        self._connecting += 1
+        try:
+            ws = await self._open()
+        except Exception as e:
+            self.stats.connect_failures += 1
+            self._failures += 1
+            print(f"Error pre-connecting realtime session: {e}")
+            return
+        finally:
+            self._connecting -= 1
+
+        self._failures = 0
+        if self._closed:
+            await ws.close()
+            return
+        self._idle.append(_WarmSession(ws, time.monotonic()))
+
+    async def _discard(self, session: _WarmSession):
+        if session.ws.open:
+            await session.ws.close()
+
+    async def _check_health(self):
+        now = time.monotonic()
+        healthy = deque()
+        for session in list(self._idle):
+            if now - session.connected_at >= self.max_idle_age:
+                self.stats.expired += 1
+                await self._discard(session)
+                continue
+            try:
+                pong = await session.ws.ping()
+                await asyncio.wait_for(pong, timeout=self.connect_timeout)
+            except Exception:
+                self.stats.unhealthy += 1
+                await self._discard(session)
+                continue
+            healthy.append(session)
+
+        # Sessions handed out while pinging are no longer idle
+        self._idle = deque(session for session in healthy if session in self._idle)
+
+    async def _maintain(self):
+        last_check = time.monotonic()
+        while not self._closed:
+            if time.monotonic() - last_check >= self.check_interval:
+                await self._check_health()
+                last_check = time.monotonic()
+
+            missing = self.target_size - len(self._idle) - self._connecting
+            if missing > 0:
+                await asyncio.gather(*(self._add_warm_session() for _ in range(missing)))
+
+            # Back off while the API is unreachable instead of reconnecting in a loop
+            delay = min(self.check_interval, 2 ** self._failures - 1) if self._failures else self.check_interval
+            self._wakeup.clear()
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=delay)
+                if self._failures:
+                    await asyncio.sleep(delay)
+            except asyncio.TimeoutError:
+                pass
+
+    def get_stats(self) -> Dict[str, Any]:
+        stats = self.stats.to_dict()
+        stats['idle'] = len(self._idle)
+        stats['connecting'] = self._connecting
+        stats['target_size'] = self.target_size
+        stats['connect_latency'] = round(self._connect_latency, 3)
+        return stats
@@ -0,0 +1,158 @@
+import json
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional
+
+from config.settings import CLEANING_CHUNK_TOKENS
+from services.field_projection import PROFILE_PROJECTION, POST_PROJECTION, COMPANY_PROJECTION
+from utils.linkedin_payloads import post_items
+from utils.tokens import count_tokens
+
+# Fields that carry nothing the cleaning LLM keeps (ids, images, links, locale copies), dropped at any depth
+NOISE_KEYS = frozenset({
+    'id', 'urn', 'companyId', 'CompanyId', 'schoolId', 'universalName', 'entityUrn', 'trackingId',
+    'logo', 'logos', 'companyLogo', 'issuerLogo', 'image', 'images', 'profilePicture', 'profilePictures',
+    'backgroundImage', 'url', 'companyURL', 'companyUrl', 'postUrl', 'shareUrl', 'supportedLocales',
+    'multiLocaleFirstName', 'multiLocaleLastName', 'multiLocaleHeadline', 'multiLocaleTitle',
+    'multiLocaleCompanyName', 'enrichment',
+})
+
+# Profile sections turned into units of their own, everything else goes into the profile header
+POSITION_SECTIONS = ('fullPositions', 'position', 'positions')
+LIST_SECTIONS = ('educations', 'skills', 'languages', 'certifications', 'courses', 'honors', 'volunteering')
+POSTS_KEY = 'posts'
+COMPANY_KEY = 'currentCompany'
+COMPANY_POSTS_KEY = 'recentCompanyPosts'
+
+
+def _is_empty(value: Any) -> bool:
+    if value is None or value == '' or value == [] or value == {}:
+        return True
+    # The API reports missing dates as {"year": 0, "month": 0, "day": 0}
+    return isinstance(value, dict) and value.keys() <= {'year', 'month', 'day'} and not any(value.values())
+
+
+def strip_noise(value: Any) -> Any:
+    """Drop noise fields, links and empty values from nested data"""
+    if isinstance(value, dict):
+        stripped = {}
+        for key, item in value.items():
+            if key in NOISE_KEYS or key.startswith('multiLocale'):
+                continue
+            item = strip_noise(item)
+            if not _is_empty(item):
+                stripped[key] = item
+        return stripped
+    if isinstance(value, list):
+        return [item for item in (strip_noise(item) for item in value) if not _is_empty(item)]
+    if isinstance(value, str):
+        value = value.strip()
+        return '' if value.startswith(('http://', 'https://')) and ' ' not in value else value
+    return value
+
+
+def _dumps(value: Any) -> str:
+    return json.dumps(value, ensure_ascii=False, separators=(',', ':'))
+
+
+@dataclass(frozen=True)
+class SplitUnit:
+    section: str
+    text: str
+    tokens: int
+
+
+class StructureSplitter:
+    """
+    Split profile data along its structure instead of every N characters
+
+    The data is broken into logical units: the profile header, each position,
+    each list section (education, skills, ...), each post, the current company
+    and each company post. Known noise fields (see `NOISE_KEYS` and the field
+    projections) and empty values are dropped before anything is counted. Units
+    are serialized as compact JSON and packed in order into chunks of at most
+    `chunk_tokens` tokens, without overlap; a unit only ever shares a chunk with
+    whole neighbours, and a unit larger than the budget is split at word
+    boundaries on its own.
+    """
+
+    def __init__(self, chunk_tokens: int = CLEANING_CHUNK_TOKENS):
+        self.chunk_tokens = chunk_tokens
+
+    def units(self, profile_data: Dict[str, Any]) -> List[SplitUnit]:
+        """Break profile data into labeled units, noise removed"""
+        # strip_noise builds new containers, so the projections (which edit in place) never touch the caller's data
+        profile = PROFILE_PROJECTION(strip_noise(profile_data))
+        units = []
+
+        def add(section: str, value: Any):
+            if _is_empty(value):
+                return
+            text = f"{section}: {_dumps(value)}"
+            units.append(SplitUnit(section, text, count_tokens(text)))
+
+        # `position` and `positions` repeat `fullPositions`, only the most complete one is kept
+        positions_key = next((key for key in POSITION_SECTIONS if profile.get(key)), None)
+        unit_keys = {*POSITION_SECTIONS, *LIST_SECTIONS, POSTS_KEY, COMPANY_KEY, COMPANY_POSTS_KEY}
+
+        add('profile', {key: value for key, value in profile.items() if key not in unit_keys})
+        if positions_key:
+            for position in profile[positions_key]:
+                add('position', position)
+        for section in LIST_SECTIONS:
+            add(section, profile.get(section))
+        for post in post_items(profile.get(POSTS_KEY)):
+            add('post', POST_PROJECTION(post))
+        company = profile.get(COMPANY_KEY)
+        if isinstance(company, dict):
+            add('company', COMPANY_PROJECTION(company).get('data', company))
+        for post in post_items(profile.get(COMPANY_POSTS_KEY)):
+            add('company_post', POST_PROJECTION(post))
+        return units
+
+    def split(self, profile_data: Dict[str, Any]) -> List[str]:
+        """
+        Pack the units of profile data into token-budgeted chunks
+
+        Args:
+            profile_data: Profile dictionary, optionally with the `posts`,
+                `currentCompany` and `recentCompanyPosts` keys added by enrichment
+
+        Returns:
+            Chunks in document order, one or more units each, one unit per line
+        """
+        chunks = []
+        current: List[str] = []
+        current_tokens = 0
+        for unit in self.units(profile_data):
+            parts = [unit.text] if unit.tokens <= self.chunk_tokens else self._split_oversized(unit.text)
+            for part in parts:
+                tokens = count_tokens(part)
+                if current and current_tokens + tokens > self.chunk_tokens:
+                    chunks.append('\n'.join(current))
+                    current, current_tokens = [], 0
+                current.append(part)
+                current_tokens += tokens
+        if current:
+            chunks.append('\n'.join(current))
+        return chunks
+
+    def _split_oversized(self, text: str) -> List[str]:
+        parts = []
+        words: List[str] = []
+        words_tokens = 0
+        for word in text.split(' '):
+            # Summing per-word counts slightly overestimates the joined text, which keeps parts within budget
+            tokens = count_tokens(' ' + word)
+            if words and words_tokens + tokens > self.chunk_tokens:
+                parts.append(' '.join(words))
+                words, words_tokens = [], 0
+            words.append(word)
+            words_tokens += tokens
+        if words:
+            parts.append(' '.join(words))
+        return parts
+
+
+def split_profile(profile_data: Dict[str, Any], chunk_tokens: Optional[int] = None) -> List[str]:
+    """Structure-aware chunks of profile data with the default (or given) token budget"""
+    return StructureSplitter(chunk_tokens or CLEANING_CHUNK_TOKENS).split(profile_data)
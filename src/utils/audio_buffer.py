@@ -0,0 +1,161 @@
+import asyncio
+import base64
+from collections import deque
+from dataclasses import dataclass, asdict
+from typing import Deque, Dict, Optional
+
+from config.settings import (
+    OUTBOUND_BUFFER_MAX_BYTES, OUTBOUND_BUFFER_HIGH_WATERMARK, OUTBOUND_BUFFER_LOW_WATERMARK,
+    OUTBOUND_OVERFLOW_POLICY,
+)
+
+POLICY_MERGE = 'merge'
+POLICY_DROP = 'drop'
+
+
+def merge_payloads(first: str, second: str) -> str:
+    """Join two base64 audio payloads into one"""
+    if len(first) % 4 == 0 and not first.endswith('='):
+        # Unpadded base64 concatenates as is
+        return first + second
+    return base64.b64encode(base64.b64decode(first) + base64.b64decode(second)).decode()
+
+
+@dataclass
+class OutboundBufferStats:
+    frames_in: int = 0
+    frames_out: int = 0
+    frames_merged: int = 0  # Frames appended into the previous one while above the high watermark
+    frames_dropped: int = 0
+    bytes_dropped: int = 0
+    frames_cleared: int = 0  # Unsent frames discarded when the caller interrupted
+    overflows: int = 0  # Times the high watermark was crossed
+    max_depth_bytes: int = 0
+
+    def to_dict(self) -> Dict[str, int]:
+        return asdict(self)
+
+
+class OutboundAudioBuffer:
+    """
+    Bounded buffer of Twilio-bound audio between the OpenAI reader and the Twilio writer
+
+    The OpenAI leg only enqueues, so a slow Twilio socket never stalls reading
+    realtime events (e.g. speech_started). Depth is measured in payload bytes.
+    Crossing `high_watermark` enters overflow until the writer drains below
+    `low_watermark`. In overflow the `merge` policy appends new audio into the
+    last queued frame, so the writer catches up with fewer, larger sends; the
+    `drop` policy drops the oldest audio down to the low watermark so playback
+    stays close to real time. Either way the buffer never holds more than
+    `max_bytes`; past that the oldest frames are dropped.
+    """
+
+    def __init__(
+        self,
+        max_bytes: int = OUTBOUND_BUFFER_MAX_BYTES,
+        high_watermark: int = OUTBOUND_BUFFER_HIGH_WATERMARK,
+        low_watermark: int = OUTBOUND_BUFFER_LOW_WATERMARK,
+        policy: str = OUTBOUND_OVERFLOW_POLICY,
+    ):
+        if policy not in (POLICY_MERGE, POLICY_DROP):
+            raise ValueError(f"Unknown overflow policy {policy!r}, expected {POLICY_MERGE!r} or {POLICY_DROP!r}")
+        self.max_bytes = max_bytes
+        self.high_watermark = min(high_watermark, max_bytes)
+        self.low_watermark = min(low_watermark, self.high_watermark)
+        self.policy = policy
+        self.stats = OutboundBufferStats()
+
+        self._frames: Deque[str] = deque()
+        self._bytes = 0
+        self._overflowing = False
+        self._closed = False
+        self._ready = asyncio.Event()
+        # Bumped by clear(), so the writer can tell a frame it took before an interruption
+        self.generation = 0
+
+    def __len__(self):
+        return len(self._frames)
+
+    @property
+    def depth_bytes(self) -> int:
+        return self._bytes
+
+    @property
+    def overflowing(self) -> bool:
+        return self._overflowing
+
+    def put(self, payload: str):
+        """Queue a base64 audio payload without waiting for the Twilio leg"""
+        if self._closed:
+            return
+        self.stats.frames_in += 1
+        size = len(payload)
+
+        if not self._overflowing and self._bytes + size > self.high_watermark:
+            self._overflowing = True
+            self.stats.overflows += 1
+
+        # Merged frames are capped at the low watermark so the hard cap can still drop old audio
+        if (self._overflowing and self.policy == POLICY_MERGE and self._frames
+                and len(self._frames[-1]) + size <= self.low_watermark):
+            self._frames[-1] = merge_payloads(self._frames[-1], payload)
+            self.stats.frames_merged += 1
+        else:
+            self._frames.append(payload)
+        self._bytes += size
+
+        if self._overflowing and self.policy == POLICY_DROP:
+            self._drop_oldest(self.low_watermark)
+        self._drop_oldest(self.max_bytes)
+
+        self.stats.max_depth_bytes = max(self.stats.max_depth_bytes, self._bytes)
+        self._ready.set()
+
+    async def get(self) -> Optional[str]:
+        """
+        Wait for the next queued payload
+
+        Returns:
+            The oldest payload, or None once the buffer is closed and drained
+        """
+        while not self._frames:
+            if self._closed:
+                return None
+            self._ready.clear()
+            await self._ready.wait()
+
+        payload = self._frames.popleft()
+        self._bytes -= len(payload)
+        if self._overflowing and self._bytes <= self.low_watermark:
+            self._overflowing = False
+        self.stats.frames_out += 1
+        return payload
+
+    def clear(self) -> int:
+        """Discard unsent audio, e.g. when the caller interrupts the response"""
+        cleared = len(self._frames)
+        self.stats.frames_cleared += cleared
+        self._frames.clear()
+        self._bytes = 0
+        self._overflowing = False
+        self.generation += 1
+        return cleared
+
+    def close(self):
+        """Stop accepting audio; the writer drains what is queued and stops"""
+        self._closed = True
+        self._ready.set()
+
+    def _drop_oldest(self, limit: int):
+        # Always keep the newest frame, a single frame is bounded by the OpenAI delta size
+        while self._bytes > limit and len(self._frames) > 1:
+            dropped = self._frames.popleft()
+            self._bytes -= len(dropped)
+            self.stats.frames_dropped += 1
+            self.stats.bytes_dropped += len(dropped)
+
+    def get_stats(self) -> Dict[str, int]:
+        stats = self.stats.to_dict()
+        stats['depth_bytes'] = self._bytes
+        stats['depth_frames'] = len(self._frames)
+        return stats
@@ -0,0 +1,114 @@
+import json
+from typing import Any, Callable, Optional, Tuple
+
+from config.settings import RELAY_JSON_CODEC
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional dependency
+    orjson = None
+
+try:
+    import msgspec
+except ImportError:  # pragma: no cover - optional dependency
+    msgspec = None
+
+
+def _select_codec(name: str) -> Tuple[str, Callable[[Any], Any], Callable[[Any], str]]:
+    """Pick the JSON codec for relay control events; `auto` prefers orjson, then msgspec"""
+    if name in ('auto', 'orjson') and orjson is not None:
+        return 'orjson', orjson.loads, lambda value: orjson.dumps(value).decode()
+    if name in ('auto', 'msgspec') and msgspec is not None:
+        return 'msgspec', msgspec.json.decode, lambda value: msgspec.json.encode(value).decode()
+    if name not in ('auto', 'json'):
+        print(f"Warning: JSON codec {name!r} is not installed, using json")
+    return 'json', json.loads, json.dumps
+
+
+CODEC_NAME, loads, dumps = _select_codec(RELAY_JSON_CODEC)
+
+# Twilio and OpenAI both send compact JSON, so these markers can be found with str.find.
+# Anything that does not match (other events, unexpected formatting) takes the full parse.
+_TWILIO_MEDIA_EVENT = '"event":"media"'
+_TWILIO_PAYLOAD = '"payload":"'
+_TWILIO_TIMESTAMP = '"timestamp":"'
+_OPENAI_AUDIO_DELTA = '"type":"response.audio.delta"'
+_OPENAI_DELTA = '"delta":"'
+_OPENAI_ITEM_ID = '"item_id":"'
+
+_AUDIO_APPEND_PREFIX = '{"type":"input_audio_buffer.append","audio":"'
+_AUDIO_APPEND_SUFFIX = '"}'
+
+
+def _string_value(message: str, marker: str) -> Optional[str]:
+    start = message.find(marker)
+    if start < 0:
+        return None
+    start += len(marker)
+    end = message.find('"', start)
+    if end < 0:
+        return None
+    value = message[start:end]
+    # An escape sequence means the value is not a plain token, let the full parse handle it
+    return None if '\\' in value else value
+
+
+def parse_twilio_media(message: str) -> Optional[Tuple[int, str]]:
+    """
+    Extract the timestamp and base64 payload of a Twilio `media` frame without parsing it
+
+    Args:
+        message: Raw text frame from the Twilio media stream
+
+    Returns:
+        (timestamp in ms, base64 payload), or None if the frame is not a plain media frame
+    """
+    if _TWILIO_MEDIA_EVENT not in message:
+        return None
+    payload = _string_value(message, _TWILIO_PAYLOAD)
+    timestamp = _string_value(message, _TWILIO_TIMESTAMP)
+    if payload is None or timestamp is None or not timestamp.isdigit():
+        return None
+    return int(timestamp), payload
+
+
+def parse_audio_delta(message: str) -> Optional[Tuple[str, Optional[str]]]:
+    """
+    Extract the base64 audio and item id of a `response.audio.delta` event without parsing it
+
+    Args:
+        message: Raw text frame from the OpenAI Realtime API
+
+    Returns:
+        (base64 audio, item id), or None if the event is not an audio delta
+    """
+    if _OPENAI_AUDIO_DELTA not in message:
+        return None
+    delta = _string_value(message, _OPENAI_DELTA)
+    if delta is None:
+        return None
+    return delta, _string_value(message, _OPENAI_ITEM_ID)
+
+
+def audio_append_frame(payload: str) -> str:
+    """`input_audio_buffer.append` event carrying the Twilio payload as is"""
+    return _AUDIO_APPEND_PREFIX + payload + _AUDIO_APPEND_SUFFIX
+
+
+class TwilioFrames:
+    """Outgoing Twilio frames for one stream, preformatted around the stream SID"""
+
+    __slots__ = ('stream_sid', 'media_prefix', 'mark', 'clear')
+
+    MEDIA_SUFFIX = '"}}'
+
+    def __init__(self, stream_sid: Optional[str]):
+        self.stream_sid = stream_sid
+        sid = json.dumps(stream_sid)
+        self.media_prefix = '{"event":"media","streamSid":' + sid + ',"media":{"payload":"'
+        self.mark = '{"event":"mark","streamSid":' + sid + ',"mark":{"name":"responsePart"}}'
+        self.clear = '{"event":"clear","streamSid":' + sid + '}'
+
+    def media(self, payload: str) -> str:
+        """Media frame carrying the OpenAI audio delta as is (both sides use base64 g711 u-law)"""
+        return self.media_prefix + payload + self.MEDIA_SUFFIX
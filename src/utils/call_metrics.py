@@ -0,0 +1,216 @@
+import bisect
+import time
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional
+
+from config.settings import CALL_METRICS_RECENT_CALLS
+
+# Upper bounds (ms) of the latency histogram buckets, the last bucket is unbounded
+LATENCY_BUCKETS_MS = (5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+
+
+class Histogram:
+    """Fixed-bucket latency histogram in milliseconds"""
+
+    __slots__ = ('counts', 'count', 'total', 'max')
+
+    def __init__(self):
+        self.counts = [0] * (len(LATENCY_BUCKETS_MS) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def observe(self, value_ms: float):
+        self.counts[bisect.bisect_left(LATENCY_BUCKETS_MS, value_ms)] += 1
+        self.count += 1
+        self.total += value_ms
+        if value_ms > self.max:
+            self.max = value_ms
+
+    def merge(self, other: "Histogram"):
+        for index, count in enumerate(other.counts):
+            self.counts[index] += count
+        self.count += other.count
+        self.total += other.total
+        self.max = max(self.max, other.max)
+
+    def quantile(self, q: float) -> Optional[float]:
+        """Upper bound of the bucket holding the q-quantile (the max for the last bucket)"""
+        if not self.count:
+            return None
+        rank = q * self.count
+        seen = 0
+        for index, count in enumerate(self.counts):
+            seen += count
+            if seen >= rank and count:
+                return LATENCY_BUCKETS_MS[index] if index < len(LATENCY_BUCKETS_MS) else self.max
+        return self.max
+
+    def to_dict(self) -> Dict[str, Any]:
+        buckets = {f"le_{bound}": count for bound, count in zip(LATENCY_BUCKETS_MS, self.counts)}
+        buckets['le_inf'] = self.counts[-1]
+        return {
+            'count': self.count,
+            'mean': round(self.total / self.count, 2) if self.count else None,
+            'p50': self.quantile(0.5),
+            'p95': self.quantile(0.95),
+            'max': round(self.max, 2),
+            'buckets': buckets,
+        }
+
+
+def _elapsed_ms(since: float) -> float:
+    return (time.monotonic() - since) * 1000
+
+
+class CallMetrics:
+    """
+    Timings and counters for one media stream
+
+    All timings are milliseconds. One-off timings (connect, session ready, first
+    audio) are measured from the moment the Twilio websocket is accepted; turn and
+    truncation latencies are histograms since they repeat through the call.
+    """
+
+    def __init__(self):
+        self.stream_sid: Optional[str] = None
+        self.started_at = time.monotonic()
+        self.connect_ms: Optional[float] = None  # Realtime session acquired (warm) or connected (cold)
+        self.session_ready_ms: Optional[float] = None  # session.updated received after the persona was sent
+        self.first_audio_ms: Optional[float] = None  # First response.audio.delta relayed to Twilio
+        self.turn_latency = Histogram()  # speech_stopped -> first audio delta of the reply
+        self.truncation_latency = Histogram()  # speech_started -> Twilio buffer cleared
+        self.frames_in = 0
+        self.frames_out = 0
+        self.bytes_in = 0
+        self.bytes_out = 0
+        self.outbound_buffer = None  # OutboundBufferStats of the call's Twilio-bound audio buffer
+        self._speech_stopped_at: Optional[float] = None
+
+    def mark_connected(self):
+        self.connect_ms = _elapsed_ms(self.started_at)
+
+    def mark_session_ready(self):
+        if self.session_ready_ms is None:
+            self.session_ready_ms = _elapsed_ms(self.started_at)
+
+    def mark_speech_stopped(self):
+        self._speech_stopped_at = time.monotonic()
+
+    def record_truncation(self, started_at: float):
+        self.truncation_latency.observe(_elapsed_ms(started_at))
+
+    def record_frame_in(self, size: int):
+        self.frames_in += 1
+        self.bytes_in += size
+
+    def record_frame_out(self, size: int):
+        self.frames_out += 1
+        self.bytes_out += size
+        if self.first_audio_ms is None:
+            self.first_audio_ms = _elapsed_ms(self.started_at)
+        if self._speech_stopped_at is not None:
+            self.turn_latency.observe(_elapsed_ms(self._speech_stopped_at))
+            self._speech_stopped_at = None
+
+    def duration_ms(self) -> float:
+        return _elapsed_ms(self.started_at)
+
+    def to_dict(self) -> Dict[str, Any]:
+        def rounded(value):
+            return round(value, 2) if value is not None else None
+
+        return {
+            'stream_sid': self.stream_sid,
+            'duration_ms': rounded(self.duration_ms()),
+            'connect_ms': rounded(self.connect_ms),
+            'session_ready_ms': rounded(self.session_ready_ms),
+            'first_audio_ms': rounded(self.first_audio_ms),
+            'turn_latency': self.turn_latency.to_dict(),
+            'truncation_latency': self.truncation_latency.to_dict(),
+            'frames_in': self.frames_in,
+            'frames_out': self.frames_out,
+            'bytes_in': self.bytes_in,
+            'bytes_out': self.bytes_out,
+            'outbound_buffer': self.outbound_buffer.to_dict() if self.outbound_buffer is not None else None,
+        }
+
+    def summary_line(self) -> str:
+        def fmt(value):
+            return f"{value:.0f}ms" if value is not None else "-"
+
+        turn = self.turn_latency
+        buffer = self.outbound_buffer
+        buffer_summary = (
+            f" merged={buffer.frames_merged} dropped={buffer.frames_dropped} overflows={buffer.overflows}"
+            if buffer is not None else ""
+        )
+        return (
+            f"Call summary {self.stream_sid}: duration={fmt(self.duration_ms())} connect={fmt(self.connect_ms)} "
+            f"session_ready={fmt(self.session_ready_ms)} first_audio={fmt(self.first_audio_ms)} "
+            f"turns={turn.count} turn_p50={fmt(turn.quantile(0.5))} turn_p95={fmt(turn.quantile(0.95))} "
+            f"truncations={self.truncation_latency.count} frames_in={self.frames_in} frames_out={self.frames_out} "
+            f"bytes_in={self.bytes_in} bytes_out={self.bytes_out}{buffer_summary}"
+        )
+
+
+class CallMetricsRegistry:
+    """Active and recently finished calls keyed by stream SID, plus histograms across all calls"""
+
+    ONE_OFF_TIMINGS = ('connect_ms', 'session_ready_ms', 'first_audio_ms')
+
+    def __init__(self, recent_calls: int = CALL_METRICS_RECENT_CALLS):
+        self.recent_calls = recent_calls
+        self.calls_started = 0
+        self.calls_finished = 0
+        self._active: Dict[int, CallMetrics] = {}
+        self._recent: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._histograms: Dict[str, Histogram] = {
+            name: Histogram() for name in (*self.ONE_OFF_TIMINGS, 'turn_latency', 'truncation_latency')
+        }
+        self._totals = {'frames_in': 0, 'frames_out': 0, 'bytes_in': 0, 'bytes_out': 0}
+        self._buffer_totals = {'frames_merged': 0, 'frames_dropped': 0, 'bytes_dropped': 0, 'overflows': 0}
+
+    def start_call(self) -> CallMetrics:
+        metrics = CallMetrics()
+        self._active[id(metrics)] = metrics
+        self.calls_started += 1
+        return metrics
+
+    def finish_call(self, metrics: CallMetrics):
+        """Fold a finished call into the totals and log its summary line"""
+        if self._active.pop(id(metrics), None) is None:
+            return
+        self.calls_finished += 1
+
+        for name in self.ONE_OFF_TIMINGS:
+            value = getattr(metrics, name)
+            if value is not None:
+                self._histograms[name].observe(value)
+        self._histograms['turn_latency'].merge(metrics.turn_latency)
+        self._histograms['truncation_latency'].merge(metrics.truncation_latency)
+        for name in self._totals:
+            self._totals[name] += getattr(metrics, name)
+        if metrics.outbound_buffer is not None:
+            for name in self._buffer_totals:
+                self._buffer_totals[name] += getattr(metrics.outbound_buffer, name)
+
+        self._recent[metrics.stream_sid or f"unstarted-{id(metrics)}"] = metrics.to_dict()
+        while len(self._recent) > self.recent_calls:
+            self._recent.popitem(last=False)
+        print(metrics.summary_line())
+
+    def active_calls(self) -> List[CallMetrics]:
+        return list(self._active.values())
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            'calls_started': self.calls_started,
+            'calls_finished': self.calls_finished,
+            'histograms': {name: histogram.to_dict() for name, histogram in self._histograms.items()},
+            'totals': {**self._totals, 'outbound_buffer': dict(self._buffer_totals)},
+            'active_calls': {
+                metrics.stream_sid or f"unstarted-{id(metrics)}": metrics.to_dict() for metrics in self._active.values()
+            },
+            'recent_calls': dict(self._recent),
+        }
@@ -0,0 +1,70 @@
+from typing import Any, Callable, Dict, List, Optional
+
+MONTHS = ['Jan', 'Feb', 'Mar', 'Apr', 'May', 'Jun', 'Jul', 'Aug', 'Sep', 'Oct', 'Nov', 'Dec']
+
+
+def unwrap_data(payload):
+    """Body of a {"success", "data"} envelope, or the payload itself when it is not wrapped"""
+    if isinstance(payload, dict) and 'data' in payload:
+        return payload['data']
+    return payload
+
+
+def post_items(payload) -> List[Dict[str, Any]]:
+    """Unwrap the {"success", "data"} envelope of the posts endpoints"""
+    payload = unwrap_data(payload)
+    if isinstance(payload, dict):
+        return []
+    return [item for item in payload or [] if isinstance(item, dict)]
+
+
+def company_facts(company: Dict[str, Any], clean: Callable[[str], str] = str) -> List[str]:
+    """
+    One-line facts about a company: tagline, industries, size and headquarters
+
+    Args:
+        company: Company payload, already unwrapped
+        clean: Applied to the free-text tagline
+
+    Returns:
+        The facts present in the payload, in display order
+    """
+    facts = []
+    if company.get('tagline'):
+        facts.append(clean(company['tagline']))
+    if company.get('industries'):
+        facts.append(f"Industry: {', '.join(company['industries'])}")
+    staff = company.get('staffCountRange') or company.get('staffCount')
+    if staff:
+        facts.append(f"Employees: {staff}")
+    headquarter = company.get('headquarter') or {}
+    hq = ', '.join(filter(None, [headquarter.get('city'), headquarter.get('country')]))
+    if hq:
+        facts.append(f"HQ: {hq}")
+    return facts
+
+
+def format_languages(languages: Optional[List[Dict[str, Any]]]) -> str:
+    """Languages as "English (native or bilingual), Hebrew", empty without any"""
+    return ', '.join(
+        f"{language['name']} ({language['proficiency'].replace('_', ' ').lower()})" if language.get('proficiency') else language['name']
+        for language in languages or [] if language.get('name')
+    )
+
+
+def format_date(date: Optional[Dict[str, int]]) -> str:
+    """RapidAPI {"year", "month"} date as "Mar 2021", or just the year"""
+    if not date or not date.get('year'):
+        return ''
+    month = date.get('month') or 0
+    if 1 <= month <= 12:
+        return f"{MONTHS[month - 1]} {date['year']}"
+    return str(date['year'])
+
+
+def format_range(start: Optional[Dict[str, int]], end: Optional[Dict[str, int]]) -> str:
+    """Date range such as "Mar 2021 - present", empty without a start date"""
+    start_text = format_date(start)
+    if not start_text:
+        return ''
+    return f"{start_text} - {format_date(end) or 'present'}"
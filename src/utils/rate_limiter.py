@@ -0,0 +1,200 @@
+import asyncio
+import heapq
+import itertools
+import time
+from dataclasses import dataclass, asdict
+from enum import IntEnum
+from typing import Any, Dict, Mapping, Optional
+
+
+class Priority(IntEnum):
+    """Scheduling class of an upstream call, lower values are served first"""
+    INTERACTIVE = 0  # A user is waiting on the response (e.g. /linkedin/profile)
+    BATCH = 1  # Bulk requests such as /linkedin/profiles:batch
+    BACKGROUND = 2  # Prewarming and refresh jobs
+
+
+@dataclass
+class RateLimiterStats:
+    acquired: int = 0
+    queued: int = 0  # Acquisitions that had to wait for a token
+    wait_seconds: float = 0.0
+    throttled: int = 0  # 429 responses reported by callers
+    quota_pauses: int = 0  # Times the upstream quota was exhausted
+
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+
+def _header_number(headers: Mapping[str, str], *names: str) -> Optional[float]:
+    for name in names:
+        value = headers.get(name)
+        if value is None:
+            continue
+        try:
+            return float(value)
+        except ValueError:
+            continue
+    return None
+
+
+class RateLimiter:
+    """
+    Priority-aware token bucket shared by all upstream calls
+
+    Tokens refill at `rate` per second up to `burst`. When no token is available
+    callers queue and are served strictly by priority, then arrival order. The rate
+    adapts at runtime: it is halved on every 429 (and the bucket paused for the
+    Retry-After period), it recovers additively on success, and it is capped so the
+    remaining quota reported by `x-ratelimit-*` headers lasts until its reset once
+    the quota runs low.
+    """
+
+    def __init__(
+        self,
+        rate: float,
+        burst: int = 1,
+        min_rate: float = 0.1,
+        quota_reserve_ratio: float = 0.1,
+    ):
+        self.max_rate = rate
+        self.rate = rate
+        self.min_rate = min(min_rate, rate)
+        self.burst = max(1, burst)
+        self.quota_reserve_ratio = quota_reserve_ratio
+        self.stats = RateLimiterStats()
+
+        self._quota_rate: Optional[float] = None
+        self._tokens = float(self.burst)
+        self._updated = time.monotonic()
+        self._paused_until = 0.0
+        self._waiters = []
+        self._sequence = itertools.count()
+        self._wakeup: Optional[asyncio.TimerHandle] = None
+
+    async def acquire(self, priority: Priority = Priority.INTERACTIVE):
+        """Wait until a request of the given priority may be sent upstream"""
+        now = time.monotonic()
+        if not self._waiters and self._take_token(now):
+            self.stats.acquired += 1
+            return
+
+        future = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._waiters, (int(priority), next(self._sequence), future))
+        self.stats.queued += 1
+        self._schedule(now)
+        try:
+            await future
+        except asyncio.CancelledError:
+            if future.done() and not future.cancelled():
+                # A token was granted right before the caller was cancelled
+                self._return_token()
+            raise
+
+        self.stats.acquired += 1
+        self.stats.wait_seconds += time.monotonic() - now
+
+    def update_from_headers(self, headers: Mapping[str, str]):
+        """
+        Adapt to the quota reported by an upstream response
+
+        Args:
+            headers: Response headers, e.g. x-ratelimit-requests-remaining
+        """
+        limit = _header_number(headers, 'x-ratelimit-requests-limit', 'x-ratelimit-limit')
+        remaining = _header_number(headers, 'x-ratelimit-requests-remaining', 'x-ratelimit-remaining')
+        reset = _header_number(headers, 'x-ratelimit-requests-reset', 'x-ratelimit-reset')
+        if remaining is None or not reset or reset <= 0:
+            return
+
+        if remaining <= 0:
+            self.stats.quota_pauses += 1
+            self.pause(reset)
+            return
+
+        if limit and remaining / limit < self.quota_reserve_ratio:
+            # Quota is running low: spread what is left evenly until it resets
+            self._quota_rate = max(self.min_rate, remaining / reset)
+        else:
+            self._quota_rate = None
+        self.rate = min(self.rate, self._ceiling())
+
+    def record_success(self):
+        """Additively recover the rate after a successful upstream call"""
+        self.rate = min(self._ceiling(), self.rate + self.max_rate * 0.05)
+
+    def record_throttled(self, retry_after: Optional[float] = None):
+        """Back off after the upstream answered 429 Too Many Requests"""
+        self.stats.throttled += 1
+        self.rate = max(self.min_rate, self.rate / 2)
+        self.pause(retry_after if retry_after else 1 / self.rate)
+
+    def pause(self, seconds: float):
+        """Stop handing out tokens for `seconds`"""
+        now = time.monotonic()
+        self._refill(now)
+        self._tokens = 0.0
+        self._paused_until = max(self._paused_until, now + seconds)
+
+    def get_stats(self) -> Dict[str, Any]:
+        stats = self.stats.to_dict()
+        stats['rate'] = self.rate
+        stats['max_rate'] = self.max_rate
+        stats['quota_rate'] = self._quota_rate
+        stats['waiting'] = sum(1 for _, _, future in self._waiters if not future.done())
+        stats['paused_for'] = max(0.0, self._paused_until - time.monotonic())
+        return stats
+
+    def close(self):
+        """Release shared resources; the in-process limiter holds none"""
+
+    def _ceiling(self) -> float:
+        if self._quota_rate is None:
+            return self.max_rate
+        return min(self.max_rate, self._quota_rate)
+
+    def _take_token(self, now: float) -> bool:
+        self._refill(now)
+        if now >= self._paused_until and self._tokens >= 1:
+            self._tokens -= 1
+            return True
+        return False
+
+    def _return_token(self):
+        self._tokens = min(self.burst, self._tokens + 1)
+
+    def _next_token_delay(self, now: float) -> float:
+        if now < self._paused_until:
+            return self._paused_until - now
+        return max(0.0, (1 - self._tokens) / self.rate)
+
+    def _refill(self, now: float):
+        if now > self._updated:
+            refill_from = max(self._updated, self._paused_until)
+            if now > refill_from:
+                self._tokens = min(self.burst, self._tokens + (now - refill_from) * self.rate)
+            self._updated = now
+
+    def _schedule(self, now: float):
+        if self._wakeup is not None:
+            return
+
+        self._wakeup = asyncio.get_running_loop().call_later(self._next_token_delay(now), self._dispatch)
+
+    def _dispatch(self):
+        self._wakeup = None
+        now = time.monotonic()
+
+        while self._waiters:
+            _, _, future = self._waiters[0]
+            if future.done():
+                # The waiter was cancelled while queued
+                heapq.heappop(self._waiters)
+                continue
+            if not self._take_token(now):
+                break
+            heapq.heappop(self._waiters)
+            future.set_result(None)
+
+        if self._waiters:
+            self._schedule(now)
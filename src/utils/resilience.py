@@ -0,0 +1,211 @@
+import asyncio
+import random
+import time
+from dataclasses import dataclass, asdict
+from typing import Any, Dict, Optional
+
+import aiohttp
+
+# Upstream statuses worth retrying; anything else (e.g. 404) is a permanent answer
+RETRYABLE_STATUSES = {408, 429, 500, 502, 503, 504}
+
+# Methods that can be repeated without side effects
+IDEMPOTENT_METHODS = {'GET', 'HEAD', 'OPTIONS', 'PUT', 'DELETE'}
+
+
+class UpstreamError(Exception):
+    """Transient upstream failure carrying the HTTP status"""
+
+    def __init__(self, status: int, message: str = ''):
+        super().__init__(f"{status} - {message}" if message else str(status))
+        self.status = status
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling an upstream whose circuit is open"""
+
+
+def is_retryable_error(error: BaseException) -> bool:
+    if isinstance(error, UpstreamError):
+        return error.status in RETRYABLE_STATUSES
+    return isinstance(error, (aiohttp.ClientError, asyncio.TimeoutError))
+
+
+def is_breaker_failure(error: BaseException) -> bool:
+    """A 429 means the upstream is healthy but throttling us, which must not open the circuit"""
+    if isinstance(error, UpstreamError):
+        return error.status != 429
+    return isinstance(error, (aiohttp.ClientError, asyncio.TimeoutError))
+
+
+class RetryBudget:
+    """
+    Caps retries to a fraction of regular requests
+
+    Each request deposits `ratio` tokens (up to `max_tokens`) and each retry
+    withdraws one, so during an outage retries add at most `ratio` extra load
+    instead of multiplying it by the number of attempts.
+    """
+
+    def __init__(self, ratio: float = 0.2, max_tokens: float = 10.0):
+        self.ratio = ratio
+        self.max_tokens = max_tokens
+        self._tokens = max_tokens
+
+    def record_request(self):
+        self._tokens = min(self.max_tokens, self._tokens + self.ratio)
+
+    def try_spend(self) -> bool:
+        if self._tokens >= 1:
+            self._tokens -= 1
+            return True
+        return False
+
+    @property
+    def tokens(self) -> float:
+        return self._tokens
+
+
+class RetryPolicy:
+    """Exponential backoff with full jitter, bounded by a shared retry budget"""
+
+    def __init__(
+        self,
+        max_attempts: int = 3,
+        base_delay: float = 0.25,
+        max_delay: float = 4.0,
+        budget: Optional[RetryBudget] = None,
+    ):
+        self.max_attempts = max(1, max_attempts)
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.budget = budget or RetryBudget()
+        self.retries = 0
+        self.budget_exhausted = 0
+
+    def backoff(self, attempt: int) -> float:
+        """Delay before retry number `attempt` (starting at 1)"""
+        return random.uniform(0, min(self.max_delay, self.base_delay * (2 ** (attempt - 1))))
+
+    def should_retry(self, attempt: int, error: BaseException, method: str = 'GET') -> bool:
+        """
+        Decide whether a failed attempt may be repeated
+
+        Args:
+            attempt: Number of attempts made so far
+            error: Exception raised by the last attempt
+            method: HTTP method of the request, only idempotent ones are retried
+
+        Returns:
+            True if the caller should back off and try again
+        """
+        if attempt >= self.max_attempts or method.upper() not in IDEMPOTENT_METHODS:
+            return False
+        if not is_retryable_error(error):
+            return False
+        if not self.budget.try_spend():
+            self.budget_exhausted += 1
+            return False
+        self.retries += 1
+        return True
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            'retries': self.retries,
+            'budget_exhausted': self.budget_exhausted,
+            'budget_tokens': self.budget.tokens,
+        }
+
+
+@dataclass
+class CircuitBreakerStats:
+    opened: int = 0
+    rejected: int = 0
+    failures: int = 0
+    successes: int = 0
+
+    def to_dict(self) -> Dict[str, int]:
+        return asdict(self)
+
+
+class CircuitBreaker:
+    """
+    Fail fast while an upstream endpoint is degraded
+
+    After `failure_threshold` consecutive failures the circuit opens and calls are
+    rejected for `recovery_timeout` seconds. It then half-opens and lets a single
+    probe through: success closes it again, failure re-opens it.
+    """
+
+    CLOSED = 'closed'
+    OPEN = 'open'
+    HALF_OPEN = 'half_open'
+
+    # allow_request() results, only REJECTED is falsy
+    REJECTED = ''
+    ADMITTED = 'admitted'
+    PROBE = 'probe'
+
+    def __init__(self, failure_threshold: int = 5, recovery_timeout: float = 30.0):
+        self.failure_threshold = failure_threshold
+        self.recovery_timeout = recovery_timeout
+        self.stats = CircuitBreakerStats()
+        self._state = self.CLOSED
+        self._consecutive_failures = 0
+        self._opened_at = 0.0
+        self._probe_in_flight = False
+
+    @property
+    def state(self) -> str:
+        if self._state == self.OPEN and time.monotonic() - self._opened_at >= self.recovery_timeout:
+            self._state = self.HALF_OPEN
+            self._probe_in_flight = False
+        return self._state
+
+    def allow_request(self) -> str:
+        """
+        Admit or reject a call
+
+        Returns:
+            PROBE if the caller took the half-open probe slot, ADMITTED while the
+            circuit is closed, REJECTED otherwise
+        """
+        state = self.state
+        if state == self.CLOSED:
+            return self.ADMITTED
+        if state == self.HALF_OPEN and not self._probe_in_flight:
+            self._probe_in_flight = True
+            return self.PROBE
+        self.stats.rejected += 1
+        return self.REJECTED
+
+    def record_success(self):
+        self.stats.successes += 1
+        self._consecutive_failures = 0
+        self._state = self.CLOSED
+        self._probe_in_flight = False
+
+    def record_failure(self):
+        self.stats.failures += 1
+        self._consecutive_failures += 1
+        if self._state == self.HALF_OPEN or self._consecutive_failures >= self.failure_threshold:
+            if self._state != self.OPEN:
+                self.stats.opened += 1
+            self._state = self.OPEN
+            self._opened_at = time.monotonic()
+            self._probe_in_flight = False
+
+    def release(self):
+        """
+        Free the half-open probe slot after the probe ended without a verdict (cancelled, 429)
+
+        Only the caller admitted as PROBE may release, any other call ending
+        without a verdict would hand a second probe through.
+        """
+        self._probe_in_flight = False
+
+    def get_stats(self) -> Dict[str, Any]:
+        stats = self.stats.to_dict()
+        stats['state'] = self.state
+        stats['consecutive_failures'] = self._consecutive_failures
+        return stats
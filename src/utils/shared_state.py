@@ -0,0 +1,262 @@
+import asyncio
+import os
+import sqlite3
+import time
+import uuid
+from typing import Any, Callable, Dict, Optional
+
+from config.settings import (
+    RAPIDAPI_RATE_LIMIT_PER_SECOND, RAPIDAPI_RATE_LIMIT_BURST, RAPIDAPI_QUOTA_RESERVE_RATIO,
+    SHARED_STATE_DB_PATH, SHARED_LEASE_TTL,
+)
+from utils.rate_limiter import RateLimiter
+
+# How long a worker waits on a locked database before giving up, in seconds
+BUSY_TIMEOUT = 5.0
+
+# Connections used on the event loop do not wait on a locked database at all: the
+# operation is retried asynchronously instead of blocking every other coroutine
+LOCK_RETRY_DELAY = 0.005
+
+
+def connect_shared_db(db_path: str) -> sqlite3.Connection:
+    """
+    Open the SQLite database shared by all worker processes
+
+    WAL mode lets readers in one worker proceed while another writes. The
+    connection is in autocommit mode; multi-statement updates use explicit
+    `BEGIN IMMEDIATE` transactions.
+    """
+    directory = os.path.dirname(os.path.abspath(db_path))
+    os.makedirs(directory, exist_ok=True)
+
+    conn = sqlite3.connect(db_path, timeout=BUSY_TIMEOUT, check_same_thread=False, isolation_level=None)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    return conn
+
+
+def disable_busy_wait(conn: sqlite3.Connection):
+    """Stop a connection from waiting on locks once its setup statements have run"""
+    conn.execute("PRAGMA busy_timeout = 0")
+
+
+def is_database_locked(error: sqlite3.OperationalError) -> bool:
+    message = str(error).lower()
+    return 'locked' in message or 'busy' in message
+
+
+async def retry_when_locked(operation: Callable[..., Any], *args) -> Any:
+    """
+    Run a short SQLite operation, retrying without blocking the loop while another worker holds the lock
+
+    Raises:
+        sqlite3.OperationalError: The database stayed locked for BUSY_TIMEOUT seconds
+    """
+    deadline = time.monotonic() + BUSY_TIMEOUT
+    while True:
+        try:
+            return operation(*args)
+        except sqlite3.OperationalError as e:
+            if not is_database_locked(e) or time.monotonic() >= deadline:
+                raise
+        await asyncio.sleep(LOCK_RETRY_DELAY)
+
+
+class SharedLeases:
+    """
+    Short-lived named locks across worker processes
+
+    A worker that holds the lease for a resource fetches it; the others wait for
+    the result to appear in the shared cache tier instead of repeating the call.
+    Leases expire after `ttl` seconds so a crashed worker cannot block a key.
+    """
+
+    def __init__(self, db_path: str, ttl: float = 30.0):
+        self.ttl = ttl
+        self.owner = f"{os.getpid()}-{uuid.uuid4().hex[:8]}"
+        self._conn = connect_shared_db(db_path)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS leases ("
+            "key TEXT PRIMARY KEY, owner TEXT NOT NULL, expires_at REAL NOT NULL)"
+        )
+        disable_busy_wait(self._conn)
+
+    async def acquire(self, key: str) -> bool:
+        """Take the lease for `key`, returns False while another worker holds it"""
+        return await retry_when_locked(self._try_acquire, key)
+
+    async def release(self, key: str):
+        await retry_when_locked(
+            self._conn.execute, "DELETE FROM leases WHERE key = ? AND owner = ?", (key, self.owner)
+        )
+
+    def _try_acquire(self, key: str) -> bool:
+        now = time.time()
+        self._conn.execute("DELETE FROM leases WHERE key = ? AND expires_at <= ?", (key, now))
+        cursor = self._conn.execute(
+            "INSERT OR IGNORE INTO leases (key, owner, expires_at) VALUES (?, ?, ?)",
+            (key, self.owner, now + self.ttl),
+        )
+        return cursor.rowcount == 1
+
+    def close(self):
+        self._conn.close()
+
+
+class SharedRateLimiter(RateLimiter):
+    """
+    RateLimiter whose token bucket lives in SQLite, shared by every worker process
+
+    Priority queueing stays local to each worker; the tokens, the pause deadline
+    and the adaptive rate are read and updated in one `BEGIN IMMEDIATE`
+    transaction, so N workers together stay within the upstream limit. Bucket
+    timestamps use wall-clock time since they are compared across processes.
+    """
+
+    # Floor on the wait before retrying the shared bucket, other workers may drain it first
+    MIN_RETRY_DELAY = 0.005
+
+    def __init__(self, db_path: str, name: str = 'rapidapi', **kwargs):
+        super().__init__(**kwargs)
+        self.name = name
+        self._conn = connect_shared_db(db_path)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS rate_limits ("
+            "name TEXT PRIMARY KEY, tokens REAL NOT NULL, updated REAL NOT NULL, "
+            "paused_until REAL NOT NULL, rate REAL NOT NULL)"
+        )
+        # Workers (re)starting reset the rate to the configured one, the bucket itself is kept
+        self._conn.execute(
+            "INSERT INTO rate_limits (name, tokens, updated, paused_until, rate) VALUES (?, ?, ?, 0, ?) "
+            "ON CONFLICT(name) DO UPDATE SET rate = excluded.rate",
+            (name, float(self.burst), time.time(), self.rate),
+        )
+        disable_busy_wait(self._conn)
+        self._shared_delay = 0.0
+        # Bucket state of the transaction in progress, so nested updates (pause from a 429) join it
+        self._current = None
+
+    def _transaction(self, update):
+        if self._current is not None:
+            return update(*self._current)
+
+        self._conn.execute("BEGIN IMMEDIATE")
+        try:
+            tokens, updated, paused_until, rate = self._conn.execute(
+                "SELECT tokens, updated, paused_until, rate FROM rate_limits WHERE name = ?", (self.name,)
+            ).fetchone()
+            now = time.time()
+            refill_from = max(updated, paused_until)
+            if now > refill_from:
+                tokens = min(self.burst, tokens + (now - refill_from) * rate)
+
+            state = {'tokens': tokens, 'paused_until': paused_until, 'rate': rate}
+            self._current = (state, now)
+            try:
+                result = update(state, now)
+            finally:
+                self._current = None
+            self._conn.execute(
+                "UPDATE rate_limits SET tokens = ?, updated = ?, paused_until = ?, rate = ? WHERE name = ?",
+                (state['tokens'], max(now, updated), state['paused_until'], state['rate'], self.name),
+            )
+            self._conn.execute("COMMIT")
+        except BaseException:
+            self._conn.execute("ROLLBACK")
+            raise
+        return result
+
+    def _write(self, update):
+        """
+        Apply an update that cannot wait for the caller, retrying later while the database is locked
+
+        BEGIN IMMEDIATE fails before `update` runs, so a retried update is applied exactly once.
+        """
+        try:
+            self._transaction(update)
+        except sqlite3.OperationalError as e:
+            if not is_database_locked(e):
+                raise
+            asyncio.get_running_loop().call_later(LOCK_RETRY_DELAY, self._write, update)
+
+    def _take_token(self, now: float) -> bool:
+        def take(state, wall_now):
+            self.rate = state['rate']
+            if wall_now >= state['paused_until'] and state['tokens'] >= 1:
+                state['tokens'] -= 1
+                return True
+            if wall_now < state['paused_until']:
+                self._shared_delay = state['paused_until'] - wall_now
+            else:
+                self._shared_delay = (1 - state['tokens']) / state['rate']
+            return False
+
+        try:
+            return self._transaction(take)
+        except sqlite3.OperationalError as e:
+            if not is_database_locked(e):
+                raise
+            # Another worker holds the bucket: queue and let the dispatcher try again shortly
+            self._shared_delay = LOCK_RETRY_DELAY
+            return False
+
+    def _return_token(self):
+        def refund(state, _):
+            state['tokens'] = min(self.burst, state['tokens'] + 1)
+
+        self._write(refund)
+
+    def _next_token_delay(self, now: float) -> float:
+        return max(self.MIN_RETRY_DELAY, self._shared_delay)
+
+    def pause(self, seconds: float):
+        def pause(state, wall_now):
+            state['tokens'] = 0.0
+            state['paused_until'] = max(state['paused_until'], wall_now + seconds)
+
+        self._write(pause)
+        self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+
+    def update_from_headers(self, headers):
+        self._sync_rate(lambda: super(SharedRateLimiter, self).update_from_headers(headers))
+
+    def record_success(self):
+        self._sync_rate(super().record_success)
+
+    def record_throttled(self, retry_after: Optional[float] = None):
+        self._sync_rate(lambda: super(SharedRateLimiter, self).record_throttled(retry_after))
+
+    def _sync_rate(self, adjust):
+        """Apply a rate adjustment to the shared rate rather than this worker's copy, in one transaction"""
+        def sync(state, _):
+            self.rate = state['rate']
+            adjust()
+            state['rate'] = self.rate
+
+        self._write(sync)
+
+    def get_stats(self) -> Dict[str, Any]:
+        stats = super().get_stats()
+        stats['shared'] = True
+        return stats
+
+    def close(self):
+        self._conn.close()
+
+
+def create_rate_limiter() -> RateLimiter:
+    """Build the RapidAPI rate limiter from settings, shared across workers in multi-process mode"""
+    limits = dict(
+        rate=RAPIDAPI_RATE_LIMIT_PER_SECOND,
+        burst=RAPIDAPI_RATE_LIMIT_BURST,
+        quota_reserve_ratio=RAPIDAPI_QUOTA_RESERVE_RATIO,
+    )
+    if SHARED_STATE_DB_PATH:
+        return SharedRateLimiter(SHARED_STATE_DB_PATH, **limits)
+    return RateLimiter(**limits)
+
+
+def create_leases() -> Optional[SharedLeases]:
+    """Cross-process fetch leases, only needed in multi-process mode"""
+    return SharedLeases(SHARED_STATE_DB_PATH, ttl=SHARED_LEASE_TTL) if SHARED_STATE_DB_PATH else None
@@ -0,0 +1,71 @@
+import asyncio
+from dataclasses import dataclass, asdict
+from typing import Any, Awaitable, Callable, Dict
+
+
+@dataclass
+class SingleFlightStats:
+    executions: int = 0  # Calls that actually ran the wrapped coroutine
+    coalesced: int = 0  # Calls that joined an already running execution
+    errors: int = 0  # Executions that finished with an exception
+    max_waiters: int = 0  # Most callers that ever shared a single execution
+
+    def to_dict(self) -> Dict[str, int]:
+        return asdict(self)
+
+
+class SingleFlight:
+    """
+    Coalesce concurrent calls for the same key into a single execution
+
+    The first caller for a key starts the work as its own task; every caller that
+    arrives while it is still running awaits that same task. The result (or the
+    exception) is delivered to all of them. The work runs as a separate task, so
+    one caller being cancelled does not cancel it for the others.
+    """
+
+    def __init__(self):
+        self.stats = SingleFlightStats()
+        self._inflight: Dict[str, asyncio.Task] = {}
+        self._waiters: Dict[str, int] = {}
+
+    def __len__(self):
+        return len(self._inflight)
+
+    async def do(self, key: str, fn: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        Run `fn` for `key`, or join the execution already in flight
+
+        Args:
+            key: Identifier of the work, e.g. a normalized profile URL
+            fn: Zero argument coroutine function performing the work
+
+        Returns:
+            The result of the shared execution
+        """
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(fn())
+            self._inflight[key] = task
+            self._waiters[key] = 1
+            self.stats.executions += 1
+            task.add_done_callback(lambda done, key=key: self._finish(key, done))
+        else:
+            self._waiters[key] += 1
+            self.stats.coalesced += 1
+            self.stats.max_waiters = max(self.stats.max_waiters, self._waiters[key])
+
+        return await asyncio.shield(task)
+
+    def _finish(self, key: str, task: asyncio.Task):
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+            self._waiters.pop(key, None)
+
+        if not task.cancelled() and task.exception() is not None:
+            self.stats.errors += 1
+
+    def get_stats(self) -> Dict[str, int]:
+        stats = self.stats.to_dict()
+        stats['in_flight'] = len(self._inflight)
+        return stats
@@ -0,0 +1,64 @@
+import math
+from functools import lru_cache
+
+from config.settings import TOKENIZER_ENCODING
+
+try:
+    import tiktoken
+except ImportError:  # pragma: no cover - optional dependency
+    tiktoken = None
+
+# Rough characters-per-token ratio for English text, used without a tokenizer
+_CHARS_PER_TOKEN = 4
+
+
+@lru_cache(maxsize=1)
+def _get_encoding():
+    if tiktoken is None:
+        return None
+    try:
+        return tiktoken.get_encoding(TOKENIZER_ENCODING)
+    except Exception as e:
+        # The BPE files are downloaded on first use; offline hosts fall back to estimates
+        print(f"Tokenizer unavailable, estimating token counts: {e}")
+        return None
+
+
+def count_tokens(text: str) -> int:
+    """Count tokens with the local tokenizer, or estimate them when it is unavailable"""
+    if not text:
+        return 0
+    encoding = _get_encoding()
+    if encoding is None:
+        return math.ceil(len(text) / _CHARS_PER_TOKEN)
+    return len(encoding.encode(text, disallowed_special=()))
+
+
+def truncate_to_tokens(text: str, max_tokens: int, suffix: str = '...') -> str:
+    """
+    Cut text to at most `max_tokens` tokens (suffix included)
+
+    Args:
+        text: Text to truncate
+        max_tokens: Token budget for the returned text
+        suffix: Marker appended when the text was cut
+
+    Returns:
+        The original text if it fits, otherwise its truncated prefix plus suffix
+    """
+    if max_tokens <= 0:
+        return ''
+    if count_tokens(text) <= max_tokens:
+        return text
+
+    budget = max(0, max_tokens - count_tokens(suffix))
+    encoding = _get_encoding()
+    if encoding is None:
+        cut = text[:budget * _CHARS_PER_TOKEN]
+    else:
+        cut = encoding.decode(encoding.encode(text, disallowed_special=())[:budget])
+
+    # Prefer ending on a word boundary
+    if ' ' in cut:
+        cut = cut[:cut.rfind(' ')]
+    return cut.rstrip() + suffix
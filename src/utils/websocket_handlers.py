@@ -1,18 +1,38 @@
-import json
-from dataclasses import dataclass
-from typing import Optional, List
+import asyncio
+import time
+from dataclasses import dataclass, field
+from typing import Optional
 from config.settings import SHOW_TIMING_MATH
+from utils.audio_buffer import OutboundAudioBuffer
+from utils.audio_relay import TwilioFrames, dumps
+from utils.call_metrics import CallMetrics
 
 @dataclass
 class WebSocketState:
     stream_sid: Optional[str] = None
     latest_media_timestamp: int = 0
     last_assistant_item: Optional[str] = None
-    mark_queue: List[str] = None
+    pending_marks: int = 0  # Marks sent to Twilio and not yet played back
     response_start_timestamp_twilio: Optional[int] = None
+    metrics: CallMetrics = field(default_factory=CallMetrics, repr=False)
+    outbound: OutboundAudioBuffer = field(default_factory=OutboundAudioBuffer, repr=False)
+    # Serializes audio and clear frames, so no audio taken before a clear is sent after it
+    twilio_send_lock: asyncio.Lock = field(default_factory=asyncio.Lock, repr=False)
+    _twilio_frames: Optional[TwilioFrames] = field(default=None, repr=False)
 
     def __post_init__(self):
-        self.mark_queue = []
+        self.metrics.outbound_buffer = self.outbound.stats
+
+    @property
+    def twilio_frames(self) -> TwilioFrames:
+        """Preformatted outgoing frames, rebuilt only when the stream SID changes"""
+        if self._twilio_frames is None or self._twilio_frames.stream_sid != self.stream_sid:
+            self._twilio_frames = TwilioFrames(self.stream_sid)
+        return self._twilio_frames
+
+    def set_stream_sid(self, stream_sid: str):
+        self.stream_sid = stream_sid
+        self.metrics.stream_sid = stream_sid
 
     def reset_response_state(self):
         self.response_start_timestamp_twilio = None
@@ -22,8 +42,12 @@ class WebSocketState:
 async def handle_speech_started_event(websocket, openai_ws, ws_state):
     """Handle interruption when the caller's speech starts."""
     print("Handling speech started event.")
-    if ws_state.mark_queue and ws_state.response_start_timestamp_twilio is not None:
-        elapsed_time = ws_state.latest_media_timestamp - ws_state.response_start_timestamp_twilio
+    started_at = time.monotonic()
+    if ws_state.pending_marks or len(ws_state.outbound):
+        # Nothing has been played when the response is still entirely queued
+        elapsed_time = 0
+        if ws_state.response_start_timestamp_twilio is not None:
+            elapsed_time = ws_state.latest_media_timestamp - ws_state.response_start_timestamp_twilio
         if SHOW_TIMING_MATH:
             print(f"Calculating elapsed time for truncation: {ws_state.latest_media_timestamp} - {ws_state.response_start_timestamp_twilio} = {elapsed_time}ms")
 
@@ -37,23 +61,24 @@ async def handle_speech_started_event(websocket, openai_ws, ws_state):
                 "content_index": 0,
                 "audio_end_ms": elapsed_time
             }
-            await openai_ws.send(json.dumps(truncate_event))
+            await openai_ws.send(dumps(truncate_event))
 
-        await websocket.send_json({
-            "event": "clear",
-            "streamSid": ws_state.stream_sid
-        })
+        # Drop audio Twilio has not been sent yet, then clear what it has buffered
+        ws_state.outbound.clear()
+        async with ws_state.twilio_send_lock:
+            await websocket.send_text(ws_state.twilio_frames.clear)
+        ws_state.metrics.record_truncation(started_at)
 
-        ws_state.mark_queue.clear()
+        ws_state.pending_marks = 0
         ws_state.last_assistant_item = None
         ws_state.response_start_timestamp_twilio = None
 
 async def send_mark(websocket, ws_state):
     if ws_state.stream_sid:
-        mark_event = {
-            "event": "mark",
-            "streamSid": ws_state.stream_sid,
-            "mark": {"name": "responsePart"}
-        }
-        await websocket.send_json(mark_event)
-        ws_state.mark_queue.append('responsePart') 
\ No newline at end of file
+        await websocket.send_text(ws_state.twilio_frames.mark)
+        ws_state.pending_marks += 1
+
+def record_mark_played(ws_state):
+    """Twilio echoes a mark once the audio queued before it has played"""
+    if ws_state.pending_marks:
+        ws_state.pending_marks -= 1 
\ No newline at end of file
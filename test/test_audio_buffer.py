@@ -0,0 +1,101 @@
+import asyncio
+import base64
+import unittest
+from src.utils.audio_buffer import OutboundAudioBuffer, merge_payloads
+
+def payload(size):
+    """Base64 payload of exactly `size` characters"""
+    return base64.b64encode(bytes(size // 4 * 3)).decode()
+
+class TestOutboundAudioBuffer(unittest.IsolatedAsyncioTestCase):
+    async def test_frames_come_out_in_order(self):
+        buffer = OutboundAudioBuffer(max_bytes=1000, high_watermark=800, low_watermark=200)
+        for frame in ("AAAA", "BBBB", "CCCC"):
+            buffer.put(frame)
+
+        self.assertEqual([await buffer.get() for _ in range(3)], ["AAAA", "BBBB", "CCCC"])
+        self.assertEqual(buffer.get_stats()['frames_out'], 3)
+
+    async def test_get_waits_for_audio_and_ends_on_close(self):
+        buffer = OutboundAudioBuffer(max_bytes=1000, high_watermark=800, low_watermark=200)
+        waiter = asyncio.ensure_future(buffer.get())
+        await asyncio.sleep(0)
+        self.assertFalse(waiter.done())
+
+        buffer.put("AAAA")
+        self.assertEqual(await waiter, "AAAA")
+
+        buffer.put("BBBB")
+        buffer.close()
+        self.assertEqual(await buffer.get(), "BBBB")
+        self.assertIsNone(await buffer.get())
+
+    async def test_merge_policy_coalesces_frames_above_high_watermark(self):
+        buffer = OutboundAudioBuffer(max_bytes=1000, high_watermark=200, low_watermark=160, policy='merge')
+        for _ in range(4):
+            buffer.put(payload(80))
+
+        stats = buffer.get_stats()
+        self.assertEqual(stats['overflows'], 1)
+        self.assertEqual(stats['frames_merged'], 1)
+        self.assertEqual(stats['depth_frames'], 3)
+        self.assertEqual(buffer.depth_bytes, 320)
+        self.assertEqual([len(base64.b64decode(await buffer.get())) for _ in range(3)], [60, 120, 60])
+
+    async def test_overflow_ends_at_low_watermark(self):
+        buffer = OutboundAudioBuffer(max_bytes=1000, high_watermark=200, low_watermark=100, policy='merge')
+        for _ in range(3):
+            buffer.put(payload(80))
+        self.assertTrue(buffer.overflowing)
+
+        buffer.put(payload(80))
+        await buffer.get()
+        self.assertTrue(buffer.overflowing)
+        buffer.clear()
+        self.assertFalse(buffer.overflowing)
+
+        buffer.put(payload(80))
+        buffer.put(payload(80))
+        self.assertEqual(buffer.get_stats()['depth_frames'], 2)
+
+    async def test_drop_policy_drops_oldest_down_to_low_watermark(self):
+        buffer = OutboundAudioBuffer(max_bytes=1000, high_watermark=200, low_watermark=100, policy='drop')
+        for frame in ("A" * 80, "B" * 80, "C" * 80):
+            buffer.put(frame)
+
+        stats = buffer.get_stats()
+        self.assertEqual(stats['frames_dropped'], 2)
+        self.assertEqual(stats['bytes_dropped'], 160)
+        self.assertEqual(await buffer.get(), "C" * 80)
+
+    async def test_hard_cap_drops_oldest(self):
+        buffer = OutboundAudioBuffer(max_bytes=200, high_watermark=200, low_watermark=100, policy='merge')
+        buffer.put("A" * 80)
+        buffer.put("B" * 80)
+        buffer.put("C" * 80)
+
+        self.assertEqual(buffer.get_stats()['frames_dropped'], 1)
+        self.assertEqual(await buffer.get(), "B" * 80)
+
+    async def test_clear_discards_unsent_audio(self):
+        buffer = OutboundAudioBuffer(max_bytes=1000, high_watermark=800, low_watermark=200)
+        buffer.put("AAAA")
+        buffer.put("BBBB")
+
+        self.assertEqual(buffer.clear(), 2)
+        self.assertEqual(len(buffer), 0)
+        self.assertEqual(buffer.get_stats()['frames_cleared'], 2)
+        self.assertEqual(buffer.generation, 1)
+
+    def test_merge_payloads_decodes_padded_audio(self):
+        first, second = base64.b64encode(b"\x01\x02").decode(), base64.b64encode(b"\x03").decode()
+
+        self.assertEqual(base64.b64decode(merge_payloads(first, second)), b"\x01\x02\x03")
+        self.assertEqual(merge_payloads("AAAA", "BBBB"), "AAAABBBB")
+
+    def test_unknown_policy_rejected(self):
+        with self.assertRaises(ValueError):
+            OutboundAudioBuffer(policy='block')
+
+if __name__ == "__main__":
+    unittest.main()
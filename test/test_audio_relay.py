@@ -0,0 +1,35 @@
+import json
+import unittest
+from src.utils.audio_relay import TwilioFrames, audio_append_frame, parse_audio_delta, parse_twilio_media
+
+TWILIO_MEDIA = '{"event":"media","sequenceNumber":"4","media":{"track":"inbound","chunk":"3","timestamp":"140","payload":"f39/fn5+/w=="},"streamSid":"MZ123"}'
+AUDIO_DELTA = '{"type":"response.audio.delta","event_id":"event_1","response_id":"resp_1","item_id":"item_1","output_index":0,"content_index":0,"delta":"//79/Pv6+fg="}'
+
+class TestAudioRelay(unittest.TestCase):
+    def test_twilio_media_fast_path(self):
+        self.assertEqual(parse_twilio_media(TWILIO_MEDIA), (140, "f39/fn5+/w=="))
+        self.assertEqual(
+            json.loads(audio_append_frame("f39/fn5+/w==")),
+            {"type": "input_audio_buffer.append", "audio": "f39/fn5+/w=="},
+        )
+
+    def test_non_media_frames_take_full_parse(self):
+        self.assertIsNone(parse_twilio_media('{"event":"mark","streamSid":"MZ123","mark":{"name":"responsePart"}}'))
+        self.assertIsNone(parse_twilio_media('{"event": "media", "media": {"timestamp": "1", "payload": "AA=="}}'))
+        self.assertIsNone(parse_audio_delta('{"type":"response.audio_transcript.delta","delta":"Hi"}'))
+
+    def test_audio_delta_forwarded_untouched(self):
+        delta, item_id = parse_audio_delta(AUDIO_DELTA)
+        frame = json.loads(TwilioFrames("MZ123").media(delta))
+
+        self.assertEqual(item_id, "item_1")
+        self.assertEqual(frame, {"event": "media", "streamSid": "MZ123", "media": {"payload": "//79/Pv6+fg="}})
+
+    def test_control_frames(self):
+        frames = TwilioFrames("MZ123")
+
+        self.assertEqual(json.loads(frames.mark), {"event": "mark", "streamSid": "MZ123", "mark": {"name": "responsePart"}})
+        self.assertEqual(json.loads(frames.clear), {"event": "clear", "streamSid": "MZ123"})
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,48 @@
+import time
+import unittest
+from src.utils.call_metrics import CallMetricsRegistry, Histogram
+
+class TestCallMetrics(unittest.TestCase):
+    def test_histogram_quantiles(self):
+        histogram = Histogram()
+        for value in (3, 8, 40, 40, 700):
+            histogram.observe(value)
+
+        self.assertEqual(histogram.quantile(0.5), 50)
+        self.assertEqual(histogram.quantile(1.0), 1000)
+        self.assertEqual(histogram.to_dict()["buckets"]["le_50"], 2)
+
+    def test_turn_latency_measured_from_speech_stopped(self):
+        registry = CallMetricsRegistry()
+        metrics = registry.start_call()
+        metrics.stream_sid = "MZ1"
+
+        metrics.record_frame_out(100)  # Greeting, not a turn
+        metrics.mark_speech_stopped()
+        time.sleep(0.02)
+        metrics.record_frame_out(100)
+        metrics.record_frame_out(100)  # Same reply, counted once
+
+        self.assertIsNotNone(metrics.first_audio_ms)
+        self.assertEqual(metrics.turn_latency.count, 1)
+        self.assertGreaterEqual(metrics.turn_latency.max, 20)
+        self.assertEqual(metrics.frames_out, 3)
+
+    def test_finished_calls_are_aggregated(self):
+        registry = CallMetricsRegistry(recent_calls=1)
+        for sid in ("MZ1", "MZ2"):
+            metrics = registry.start_call()
+            metrics.stream_sid = sid
+            metrics.mark_connected()
+            metrics.record_frame_in(50)
+            registry.finish_call(metrics)
+
+        stats = registry.get_stats()
+        self.assertEqual(stats["calls_finished"], 2)
+        self.assertEqual(stats["histograms"]["connect_ms"]["count"], 2)
+        self.assertEqual(stats["totals"]["bytes_in"], 100)
+        self.assertEqual(list(stats["recent_calls"]), ["MZ2"])
+        self.assertEqual(stats["active_calls"], {})
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,117 @@
+import os
+import tempfile
+import unittest
+from src.services.chunk_cache import CleanedChunkCache, make_chunk_key
+from src.services.chunk_cleaning_service import iter_cached_cleaned_chunks
+
+class TestCleanedChunkCache(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.db_path = os.path.join(self.tmpdir.name, "chunks.db")
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def test_key_ignores_whitespace_but_not_prompt_or_model(self):
+        key = make_chunk_key("Senior  Engineer\n at Acme", "v1", "gpt-3.5-turbo-instruct")
+
+        self.assertEqual(key, make_chunk_key(" Senior Engineer at Acme ", "v1", "gpt-3.5-turbo-instruct"))
+        self.assertNotEqual(key, make_chunk_key("Senior Engineer at Acme", "v2", "gpt-3.5-turbo-instruct"))
+        self.assertNotEqual(key, make_chunk_key("Senior Engineer at Acme", "v1", "gpt-4o-mini"))
+
+    async def test_entries_survive_reopening(self):
+        cache = CleanedChunkCache(self.db_path)
+        await cache.set("key", "cleaned")
+        cache.close()
+
+        cache = CleanedChunkCache(self.db_path)
+        self.assertEqual(await cache.get("key"), "cleaned")
+        self.assertIsNone(await cache.get("other"))
+        self.assertEqual(cache.get_stats()["hits"], 1)
+        self.assertEqual(cache.get_stats()["misses"], 1)
+        cache.close()
+
+    async def test_least_recently_used_evicted_past_max_bytes(self):
+        cache = CleanedChunkCache(self.db_path, max_bytes=25)
+        await cache.set("a", "x" * 10)
+        await cache.set("b", "y" * 10)
+        await cache.get("a")
+        await cache.set("c", "z" * 10)
+
+        self.assertEqual(await cache.get("a"), "x" * 10)
+        self.assertIsNone(await cache.get("b"))
+        self.assertEqual(cache.get_stats()["evictions"], 1)
+        self.assertLessEqual(cache.total_bytes(), 25)
+        cache.close()
+
+    async def test_total_size_is_tracked_without_summing(self):
+        cache = CleanedChunkCache(self.db_path)
+        await cache.set("a", "x" * 10)
+        await cache.set("a", "x" * 4)
+        await cache.set("b", "y" * 6)
+        cache.close()
+
+        cache = CleanedChunkCache(self.db_path)
+        self.assertEqual(cache.total_bytes(), 10)
+        await cache.clear()
+        self.assertEqual(cache.total_bytes(), 0)
+        cache.close()
+
+    async def test_hits_are_recorded_in_batches(self):
+        cache = CleanedChunkCache(self.db_path)
+        cache.TOUCH_BATCH = 2
+        await cache.set("a", "x")
+        await cache.set("b", "y")
+        used_at = lambda key: cache._conn.execute("SELECT used_at FROM cleaned_chunks WHERE key = ?", (key,)).fetchone()[0]
+        before = used_at("a")
+
+        await cache.get("a")
+        self.assertEqual(used_at("a"), before)
+        await cache.get("b")
+        self.assertGreater(used_at("a"), before)
+        cache.close()
+
+class TestCachedChunkCleaning(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.cache = CleanedChunkCache(os.path.join(self.tmpdir.name, "chunks.db"))
+
+    def tearDown(self):
+        self.cache.close()
+        self.tmpdir.cleanup()
+
+    async def clean_all(self, chunks, calls, prompt_version="v1"):
+        async def clean(chunk):
+            calls.append(chunk)
+            return chunk.upper()
+
+        events = [event async for event in iter_cached_cleaned_chunks(chunks, clean, self.cache, prompt_version, "model")]
+        return {event["index"]: event for event in events if event["status"] != "retry"}
+
+    async def test_only_changed_chunks_reach_the_llm(self):
+        first_calls, second_calls = [], []
+        await self.clean_all(["about", "post one", "company post"], first_calls)
+        events = await self.clean_all(["about", "post two", "company post"], second_calls)
+
+        self.assertEqual(len(first_calls), 3)
+        self.assertEqual(second_calls, ["post two"])
+        self.assertEqual([events[i]["text"] for i in range(3)], ["ABOUT", "POST TWO", "COMPANY POST"])
+        self.assertEqual([events[i]["cached"] for i in range(3)], [True, False, True])
+        self.assertEqual(sorted(event["completed"] for event in events.values()), [1, 2, 3])
+
+    async def test_duplicate_chunks_cleaned_once(self):
+        calls = []
+        events = await self.clean_all(["company post", "about", "company post"], calls)
+
+        self.assertEqual(sorted(calls), ["about", "company post"])
+        self.assertEqual(events[2]["text"], "COMPANY POST")
+
+    async def test_prompt_version_change_misses(self):
+        calls = []
+        await self.clean_all(["about"], calls)
+        await self.clean_all(["about"], calls, prompt_version="v2")
+
+        self.assertEqual(calls, ["about", "about"])
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,110 @@
+import asyncio
+import unittest
+from unittest import mock
+from src.services.chunk_cleaning_service import SectionAssembler, iter_cleaned_chunks
+
+class TestChunkCleaning(unittest.IsolatedAsyncioTestCase):
+    async def test_chunks_cleaned_concurrently_under_limit(self):
+        running = 0
+        peak = 0
+
+        async def clean(chunk):
+            nonlocal running, peak
+            running += 1
+            peak = max(peak, running)
+            await asyncio.sleep(0.01)
+            running -= 1
+            return chunk.upper()
+
+        events = [event async for event in iter_cleaned_chunks([f"chunk {i}" for i in range(10)], clean, concurrency=3)]
+
+        self.assertEqual(peak, 3)
+        self.assertEqual(len(events), 10)
+        self.assertEqual([event["completed"] for event in events], list(range(1, 11)))
+        texts = {event["index"]: event["text"] for event in events}
+        self.assertEqual([texts[i] for i in range(10)], [f"CHUNK {i}" for i in range(10)])
+
+    async def test_failed_chunk_retried_on_its_own(self):
+        calls = {}
+
+        async def clean(chunk):
+            calls[chunk] = calls.get(chunk, 0) + 1
+            if chunk == "flaky" and calls[chunk] == 1:
+                raise RuntimeError("rate limited")
+            return chunk
+
+        with mock.patch("src.services.chunk_cleaning_service.retry_delay", return_value=0):
+            events = [event async for event in iter_cleaned_chunks(["a", "flaky", "b"], clean, concurrency=3)]
+
+        self.assertEqual(calls, {"a": 1, "flaky": 2, "b": 1})
+        self.assertEqual([event["status"] for event in events if event["index"] == 1], ["retry", "ok"])
+        self.assertEqual(events[-1]["completed"], 3)
+
+    async def test_chunk_failing_every_attempt_reported(self):
+        async def clean(chunk):
+            if chunk == "bad":
+                raise RuntimeError("boom")
+            return chunk
+
+        with mock.patch("src.services.chunk_cleaning_service.retry_delay", return_value=0):
+            events = [event async for event in iter_cleaned_chunks(["good", "bad"], clean, max_attempts=2)]
+
+        final = {event["index"]: event for event in events if event["status"] != "retry"}
+        self.assertEqual(final[0]["status"], "ok")
+        self.assertEqual(final[1]["status"], "error")
+        self.assertEqual(final[1]["attempts"], 2)
+
+    async def test_rate_limiter_gates_every_attempt(self):
+        limiter = mock.Mock()
+        limiter.acquire = mock.AsyncMock()
+
+        async def clean(chunk):
+            return chunk
+
+        events = [event async for event in iter_cleaned_chunks(["a", "b"], clean, rate_limiter=limiter)]
+
+        self.assertEqual(len(events), 2)
+        self.assertEqual(limiter.acquire.await_count, 2)
+
+    async def test_closing_early_cancels_remaining_work(self):
+        cancelled = 0
+
+        async def clean(chunk):
+            nonlocal cancelled
+            if chunk != "fast":
+                try:
+                    await asyncio.sleep(10)
+                except asyncio.CancelledError:
+                    cancelled += 1
+                    raise
+            return chunk
+
+        stream = iter_cleaned_chunks(["fast", "slow", "slow"], clean, concurrency=3)
+        self.assertEqual((await stream.__anext__())["text"], "fast")
+        await stream.aclose()
+
+        self.assertEqual(cancelled, 2)
+
+class TestSectionAssembler(unittest.TestCase):
+    def test_sections_released_in_order(self):
+        assembler = SectionAssembler({"profile": [0], "posts": [1, 2], "company": []}, ["a", "b", "c"])
+
+        self.assertEqual(assembler.ready(), [])
+        assembler.complete(1, "B")
+        assembler.complete(2, "C")
+        self.assertEqual(assembler.ready(), [])
+        assembler.complete(0, "A")
+        self.assertEqual(assembler.ready(), ["profile", "posts", "company"])
+        self.assertEqual(assembler.ready(), [])
+        self.assertEqual(assembler.cleaned, ["A", "B", "C"])
+
+    def test_sections_without_chunks_ready_at_once(self):
+        assembler = SectionAssembler({"profile": [], "posts": [0]}, ["a"])
+
+        self.assertEqual(assembler.ready(), ["profile"])
+        assembler.complete(0)
+        self.assertEqual(assembler.ready(), ["posts"])
+        self.assertEqual(assembler.cleaned, ["a"])
+
+if __name__ == "__main__":
+    unittest.main()
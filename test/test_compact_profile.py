@@ -0,0 +1,88 @@
+import ast
+import copy
+import os
+import unittest
+from src.models.compact_profile import CompactProfile, CompanyTable, compact_value, expand_value
+from src.services.field_projection import PROFILE_PROJECTION
+
+SAMPLE_PATH = os.path.join(os.path.dirname(__file__), "..", "uncleaned_data.txt")
+
+def position(company_id, name, title):
+    return {
+        "companyId": company_id,
+        "companyName": name,
+        "companyStaffCountRange": "51 - 200",
+        "title": title,
+        "employmentType": "Full-time",
+        "start": {"year": 2022, "month": 1, "day": 0},
+        "end": {"year": 0, "month": 0, "day": 0},
+    }
+
+class TestCompactProfile(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        with open(SAMPLE_PATH, "r", encoding="utf-8") as file:
+            cls.sample = ast.literal_eval(file.read())
+
+    def test_round_trip(self):
+        projected = PROFILE_PROJECTION(copy.deepcopy(self.sample))
+
+        self.assertEqual(CompactProfile(self.sample, CompanyTable()).to_dict(), self.sample)
+        self.assertEqual(CompactProfile(projected, CompanyTable()).to_dict(), projected)
+
+    def test_round_trip_keeps_none_values(self):
+        data = {
+            "username": "jane",
+            "headline": None,
+            "summary": "",
+            "position": [{**position(1, "Acme", "CTO"), "companyIndustry": None, "description": None}],
+            "educations": [{"schoolName": "MIT", "grade": None}],
+            "languages": None,
+        }
+
+        self.assertEqual(CompactProfile(copy.deepcopy(data), CompanyTable()).to_dict(), data)
+
+    def test_companies_shared_across_profiles(self):
+        companies = CompanyTable()
+        jane = CompactProfile({"username": "jane", "fullPositions": [position(1, "Acme", "CTO")]}, companies)
+        john = CompactProfile({"username": "john", "fullPositions": [position(1, "Acme", "Engineer"), position(2, "Globex", "Intern")]}, companies)
+
+        self.assertIs(jane.sections["fullPositions"][0].company, john.sections["fullPositions"][0].company)
+        self.assertEqual(len(companies), 2)
+        self.assertEqual(john.to_dict()["fullPositions"][1]["companyName"], "Globex")
+
+    def test_disagreeing_company_fields_kept_apart(self):
+        companies = CompanyTable()
+        old = CompactProfile({"position": [position(1, "Acme", "CTO")]}, companies)
+        renamed = CompactProfile({"position": [position(1, "Acme Corp", "CTO")]}, companies)
+
+        self.assertIsNot(old.sections["position"][0].company, renamed.sections["position"][0].company)
+        self.assertEqual(renamed.to_dict()["position"][0]["companyName"], "Acme Corp")
+
+    def test_company_records_released_with_profiles(self):
+        companies = CompanyTable()
+        profile = CompactProfile({"position": [position(1, "Acme", "CTO")]}, companies)
+        self.assertEqual(len(companies), 1)
+
+        del profile
+        self.assertEqual(len(companies), 0)
+
+    def test_duplicate_position_sections_share_records(self):
+        profile = CompactProfile(self.sample, CompanyTable())
+
+        self.assertEqual(
+            [id(record) for record in profile.sections["position"]],
+            [id(record) for record in profile.sections["fullPositions"][:len(profile.sections["position"])]],
+        )
+        self.assertFalse(hasattr(profile.sections["position"][0], "__dict__"))
+
+    def test_short_strings_interned_and_dates_shared(self):
+        first = compact_value({"employmentType": "".join(["Full", "-time"]), "start": {"year": 2022, "month": 1, "day": 0}})
+        second = compact_value({"employmentType": "".join(["Full-", "time"]), "start": {"year": 2022, "month": 1, "day": 0}})
+
+        self.assertIs(first["employmentType"], second["employmentType"])
+        self.assertIs(first["start"], second["start"])
+        self.assertEqual(expand_value(first), {"employmentType": "Full-time", "start": {"year": 2022, "month": 1, "day": 0}})
+
+if __name__ == "__main__":
+    unittest.main()
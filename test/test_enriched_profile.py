@@ -0,0 +1,88 @@
+import asyncio
+import time
+import unittest
+from src.services.linkedin_scraper_service import LinkedInScraperService
+
+URL = "https://www.linkedin.com/in/jane-doe/"
+TIMEOUTS = {"posts": 0.05, "currentCompany": 0.05, "recentCompanyPosts": 0.05}
+
+class StubScraper(LinkedInScraperService):
+    """Branch results come from `behaviour`: a value, an exception to raise, or "hang" """
+
+    def __init__(self, **behaviour):
+        super().__init__()
+        self.behaviour = behaviour
+
+    async def _respond(self, name):
+        value = self.behaviour.get(name)
+        if value == "hang":
+            await asyncio.sleep(60)
+        if isinstance(value, Exception):
+            raise value
+        return value
+
+    async def get_profile_data(self, linkedin_url, cleanup=False, priority=None):
+        return {
+            "username": "jane-doe",
+            "position": [{"title": "VP Engineering", "companyName": "Acme", "companyUsername": "acme"}],
+        }
+
+    async def get_profile_posts(self, username, priority=None, start=0, use_cache=True):
+        return await self._respond("posts")
+
+    async def get_company_data(self, company_username, priority=None):
+        return await self._respond("currentCompany")
+
+    async def get_company_posts(self, company_username, priority=None, start=0, use_cache=True):
+        return await self._respond("recentCompanyPosts")
+
+POSTS = {"success": True, "data": [{"urn": "1", "text": "Hello"}]}
+COMPANY = {"success": True, "data": {"name": "Acme"}}
+
+class TestEnrichedProfile(unittest.IsolatedAsyncioTestCase):
+    async def test_all_branches_succeed(self):
+        scraper = StubScraper(posts=POSTS, currentCompany=COMPANY, recentCompanyPosts=POSTS)
+
+        profile = await scraper.get_enriched_profile(URL, timeouts=TIMEOUTS)
+
+        self.assertEqual(profile["enrichment"], {
+            "complete": True,
+            "branches": ["posts", "currentCompany", "recentCompanyPosts"],
+            "errors": {},
+        })
+        self.assertEqual(profile["currentCompany"], COMPANY)
+
+    async def test_hanging_branch_times_out_without_holding_the_others(self):
+        scraper = StubScraper(posts="hang", currentCompany=COMPANY, recentCompanyPosts=POSTS)
+        started = time.perf_counter()
+
+        profile = await scraper.get_enriched_profile(URL, timeouts=TIMEOUTS)
+
+        self.assertLess(time.perf_counter() - started, 1)
+        self.assertEqual(profile["enrichment"]["errors"], {"posts": "timeout"})
+        self.assertFalse(profile["enrichment"]["complete"])
+        self.assertNotIn("posts", profile)
+        self.assertEqual(profile["recentCompanyPosts"], POSTS)
+
+    async def test_failed_and_empty_branches_are_omitted(self):
+        scraper = StubScraper(posts=POSTS, currentCompany=ValueError("bad company body"), recentCompanyPosts=None)
+
+        profile = await scraper.get_enriched_profile(URL, timeouts=TIMEOUTS)
+
+        self.assertEqual(profile["enrichment"]["errors"], {
+            "currentCompany": "bad company body",
+            "recentCompanyPosts": "unavailable",
+        })
+        self.assertNotIn("currentCompany", profile)
+        self.assertNotIn("recentCompanyPosts", profile)
+        self.assertEqual(profile["posts"], POSTS)
+
+    async def test_skipped_branches_are_not_reported(self):
+        scraper = StubScraper(posts="hang")
+
+        profile = await scraper.get_enriched_profile(URL, include_posts=False, include_company=False, timeouts=TIMEOUTS)
+
+        self.assertEqual(profile["enrichment"], {"complete": True, "branches": [], "errors": {}})
+
+if __name__ == "__main__":
+    unittest.main()
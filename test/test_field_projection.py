@@ -0,0 +1,43 @@
+import unittest
+from src.services.field_projection import FieldProjection, PROFILE_PROJECTION, POST_PROJECTION
+
+class TestFieldProjection(unittest.TestCase):
+    def test_deny_paths_with_list_wildcards(self):
+        projection = FieldProjection(deny=["positions[*].extraInfo.website", "profilePicture"])
+        data = {
+            "profilePicture": "https://example.com/p.png",
+            "positions": [
+                {"title": "CTO", "extraInfo": {"website": "https://example.com", "founded": "2020"}},
+                {"title": "Engineer", "extraInfo": None},
+            ],
+        }
+
+        result = projection(data)
+
+        self.assertIs(result, data)  # Edited in place, no copy
+        self.assertEqual(result, {
+            "positions": [
+                {"title": "CTO", "extraInfo": {"founded": "2020"}},
+                {"title": "Engineer", "extraInfo": None},
+            ],
+        })
+
+    def test_allow_paths_keep_only_listed_keys(self):
+        projection = FieldProjection(allow=["username", "skills[*].name"])
+        data = {"username": "x", "urn": "abc", "skills": [{"name": "C++", "endorsementsCount": 3}]}
+
+        self.assertEqual(projection(data), {"username": "x", "skills": [{"name": "C++"}]})
+
+    def test_profile_spec_covers_full_positions_and_post_pictures(self):
+        profile = {"fullPositions": [{"companyName": "Engageli", "companyLogo": "https://logo"}]}
+        post = {"text": "hello", "author": {"firstName": "Matan", "profilePictures": [{"url": "https://pic"}]}}
+
+        self.assertEqual(PROFILE_PROJECTION(profile), {"fullPositions": [{"companyName": "Engageli"}]})
+        self.assertEqual(POST_PROJECTION(post), {"text": "hello", "author": {"firstName": "Matan"}})
+
+    def test_invalid_path_is_rejected(self):
+        with self.assertRaises(ValueError):
+            FieldProjection(deny=["positions[0].title"])
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,94 @@
+import asyncio
+import json
+import unittest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from src.routes.linkedin_routes import get_streaming_linkedin_scraper, router
+from src.services.linkedin_batch_service import iter_profiles_batch
+
+def url(index):
+    return f"https://www.linkedin.com/in/user-{index}/"
+
+class FakeScraper:
+    """Profiles take DELAY seconds; "missing" URLs return None and "broken" ones raise"""
+    DELAY = 0.01
+
+    def __init__(self):
+        self.active = 0
+        self.max_active = 0
+        self.started = []
+        self.cancelled = 0
+        self.closed = False
+
+    async def get_profile_data(self, profile_url, cleanup=False, priority=None):
+        if self.closed:
+            raise RuntimeError("scraper used after close")
+        self.started.append(profile_url)
+        self.active += 1
+        self.max_active = max(self.max_active, self.active)
+        try:
+            await asyncio.sleep(self.DELAY)
+        except asyncio.CancelledError:
+            self.cancelled += 1
+            raise
+        finally:
+            self.active -= 1
+        if "missing" in profile_url:
+            return None
+        if "broken" in profile_url:
+            raise ConnectionError("upstream down")
+        return {"profile_url": profile_url}
+
+    async def close(self):
+        self.closed = True
+
+async def collect(iterator):
+    return [result async for result in iterator]
+
+class TestIterProfilesBatch(unittest.IsolatedAsyncioTestCase):
+    async def test_concurrency_is_bounded(self):
+        scraper = FakeScraper()
+
+        results = await collect(iter_profiles_batch(scraper, [url(index) for index in range(10)], concurrency=3))
+
+        self.assertEqual(len(results), 10)
+        self.assertEqual(scraper.max_active, 3)
+
+    async def test_one_result_per_url_including_failures(self):
+        scraper = FakeScraper()
+        urls = [url(0), "https://www.linkedin.com/in/missing/", "https://www.linkedin.com/in/broken/", url(3)]
+
+        results = await collect(iter_profiles_batch(scraper, urls, concurrency=2))
+
+        by_index = {result["index"]: result for result in results}
+        self.assertEqual(sorted(by_index), [0, 1, 2, 3])
+        self.assertEqual([by_index[index]["status"] for index in range(4)], ["ok", "error", "error", "ok"])
+        self.assertEqual(by_index[2]["error"], "upstream down")
+        self.assertEqual(by_index[1]["profile_url"], urls[1])
+
+    async def test_closing_early_cancels_remaining_work(self):
+        scraper = FakeScraper()
+        iterator = iter_profiles_batch(scraper, [url(index) for index in range(20)], concurrency=4)
+
+        await iterator.__anext__()
+        await iterator.aclose()
+
+        self.assertEqual(scraper.active, 0)
+        self.assertGreater(scraper.cancelled, 0)
+        self.assertLess(len(scraper.started), 20)
+
+class TestBatchRoute(unittest.TestCase):
+    def test_fallback_scraper_outlives_the_stream(self):
+        scraper = FakeScraper()
+        app = FastAPI()
+        app.include_router(router)
+        app.dependency_overrides[get_streaming_linkedin_scraper] = lambda: scraper
+
+        response = TestClient(app).post("/linkedin/profiles:batch", json={"profile_urls": [url(0), url(1)]})
+
+        lines = [json.loads(line) for line in response.text.splitlines()]
+        self.assertEqual([line["status"] for line in lines], ["ok", "ok"])
+        self.assertTrue(scraper.closed)
+
+if __name__ == "__main__":
+    unittest.main()
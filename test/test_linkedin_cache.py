@@ -0,0 +1,67 @@
+import os
+import tempfile
+import unittest
+from src.services.linkedin_cache import (
+    LinkedInCache,
+    normalize_linkedin_url,
+    RESOURCE_PROFILE,
+    RESOURCE_PROFILE_POSTS,
+)
+
+class TestLinkedInCache(unittest.IsolatedAsyncioTestCase):
+    def test_url_variants_share_key(self):
+        variants = [
+            "linkedin.com/in/matan-yemini",
+            "https://www.linkedin.com/in/matan-yemini/",
+            "https://www.linkedin.com/in/Matan-Yemini?trk=public_profile",
+            "http://il.linkedin.com/in/matan-yemini#about",
+        ]
+        keys = {normalize_linkedin_url(url) for url in variants}
+        self.assertEqual(keys, {"linkedin.com/in/matan-yemini"})
+        # Lookalike domains are not folded into linkedin.com
+        self.assertEqual(normalize_linkedin_url("https://evillinkedin.com/in/matan-yemini"), "evillinkedin.com/in/matan-yemini")
+
+    async def test_hit_and_miss_counters(self):
+        cache = LinkedInCache(max_memory_bytes=1024)
+        self.assertIsNone(await cache.get(RESOURCE_PROFILE, "linkedin.com/in/x"))
+
+        await cache.set(RESOURCE_PROFILE, "https://www.linkedin.com/in/x/", b'{"id": 1}')
+        self.assertEqual(await cache.get(RESOURCE_PROFILE, "linkedin.com/in/x?trk=abc"), b'{"id": 1}')
+
+        stats = cache.get_stats()
+        self.assertEqual(stats["hits"], 1)
+        self.assertEqual(stats["misses"], 1)
+
+    async def test_lru_evicts_by_bytes(self):
+        cache = LinkedInCache(max_memory_bytes=200)
+        for name in ("a", "b", "c"):
+            await cache.set(RESOURCE_PROFILE_POSTS, name, b"x" * 50)
+
+        # Touch "a" so "b" becomes the least recently used entry
+        await cache.get(RESOURCE_PROFILE_POSTS, "a")
+        await cache.set(RESOURCE_PROFILE_POSTS, "d", b"x" * 50)
+
+        self.assertIsNone(await cache.get(RESOURCE_PROFILE_POSTS, "b"))
+        self.assertIsNotNone(await cache.get(RESOURCE_PROFILE_POSTS, "a"))
+        self.assertEqual(cache.get_stats()["evictions"], 1)
+        self.assertLessEqual(cache.memory.current_bytes, 200)
+
+    async def test_expired_entries_are_not_served(self):
+        cache = LinkedInCache(max_memory_bytes=1024, ttls={RESOURCE_PROFILE_POSTS: 0})
+        await cache.set(RESOURCE_PROFILE_POSTS, "x", b"[]")
+        self.assertIsNone(await cache.get(RESOURCE_PROFILE_POSTS, "x"))
+
+    async def test_disk_tier_survives_restart(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            db_path = os.path.join(tmp_dir, "linkedin_cache.db")
+            cache = LinkedInCache(max_memory_bytes=1024, disk_path=db_path)
+            await cache.set(RESOURCE_PROFILE, "linkedin.com/in/x", b'{"id": 1}')
+            cache.close()
+
+            restarted = LinkedInCache(max_memory_bytes=1024, disk_path=db_path)
+            self.assertEqual(await restarted.get(RESOURCE_PROFILE, "www.linkedin.com/in/x/"), b'{"id": 1}')
+            self.assertEqual(restarted.get_stats()["disk_hits"], 1)
+            restarted.close()
+
+if __name__ == "__main__":
+    unittest.main()
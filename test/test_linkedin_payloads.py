@@ -0,0 +1,40 @@
+import unittest
+from src.utils.linkedin_payloads import company_facts, format_date, format_languages, format_range, post_items, unwrap_data
+
+class TestLinkedInPayloads(unittest.TestCase):
+    def test_post_items_unwraps_envelope(self):
+        self.assertEqual(post_items({"success": True, "data": [{"urn": "1"}, "noise"]}), [{"urn": "1"}])
+        self.assertEqual(post_items([{"urn": "2"}]), [{"urn": "2"}])
+        self.assertEqual(post_items(None), [])
+
+    def test_unwrap_data(self):
+        self.assertEqual(unwrap_data({"success": True, "data": {"name": "Acme"}}), {"name": "Acme"})
+        self.assertEqual(unwrap_data({"name": "Acme"}), {"name": "Acme"})
+        self.assertIsNone(unwrap_data(None))
+
+    def test_company_facts(self):
+        company = {
+            "name": "Acme",
+            "tagline": "  Rockets ",
+            "industries": ["Aerospace"],
+            "staffCountRange": "51-200",
+            "headquarter": {"city": "Tel Aviv", "country": "IL"},
+        }
+
+        self.assertEqual(company_facts(company, str.strip), ["Rockets", "Industry: Aerospace", "Employees: 51-200", "HQ: Tel Aviv, IL"])
+        self.assertEqual(company_facts({"name": "Acme", "staffCount": 12}), ["Employees: 12"])
+
+    def test_format_languages(self):
+        languages = [{"name": "English", "proficiency": "NATIVE_OR_BILINGUAL"}, {"name": "Hebrew"}, {"proficiency": "ELEMENTARY"}]
+
+        self.assertEqual(format_languages(languages), "English (native or bilingual), Hebrew")
+        self.assertEqual(format_languages(None), "")
+
+    def test_dates(self):
+        self.assertEqual(format_date({"year": 2021, "month": 3}), "Mar 2021")
+        self.assertEqual(format_date({"year": 2021, "month": 0}), "2021")
+        self.assertEqual(format_range({"year": 2019}, None), "2019 - present")
+        self.assertEqual(format_range(None, {"year": 2020}), "")
+
+if __name__ == "__main__":
+    unittest.main()
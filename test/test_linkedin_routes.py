@@ -0,0 +1,70 @@
+import unittest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from src.routes.linkedin_routes import get_linkedin_scraper, get_streaming_linkedin_scraper, get_text_cleaning_agent, router
+from src.services.linkedin_scraper_service import LinkedInScraperService
+
+URL = "https://www.linkedin.com/in/jane-doe/"
+
+class FakeScraper:
+    def __init__(self):
+        self.requests = []
+        self.closed = False
+
+    async def get_enriched_profile(self, profile_url, cleanup=False, include_posts=True, include_company=True):
+        self.requests.append((profile_url, include_posts, include_company))
+        return {"username": "jane-doe"}
+
+    async def close(self):
+        self.closed = True
+
+class FakeAgent:
+    async def astream_clean(self, profile_data):
+        yield {"status": "chunk", "index": 0}
+        yield {"status": "section", "section": "profile", "text": profile_data["username"]}
+        yield {"status": "done", "text": profile_data["username"]}
+
+class TestCleanEventsRoute(unittest.TestCase):
+    def setUp(self):
+        self.scraper = FakeScraper()
+        app = FastAPI()
+        app.include_router(router)
+        app.dependency_overrides[get_streaming_linkedin_scraper] = lambda: self.scraper
+        app.dependency_overrides[get_text_cleaning_agent] = lambda: FakeAgent()
+        self.client = TestClient(app)
+
+    def events(self, response):
+        return [line.split(": ", 1)[1] for line in response.text.splitlines() if line.startswith("event: ")]
+
+    def test_get_variant_streams_the_same_events(self):
+        post = self.client.post("/linkedin/enriched-profile/clean/events", json={"profile_url": URL})
+        get = self.client.get("/linkedin/enriched-profile/clean/events", params={"profile_url": URL})
+
+        self.assertTrue(get.headers["content-type"].startswith("text/event-stream"))
+        self.assertEqual(self.events(get), ["chunk", "section", "done"])
+        self.assertEqual(get.text, post.text)
+
+    def test_get_variant_takes_options_as_query_parameters(self):
+        get = self.client.get(
+            "/linkedin/enriched-profile/clean/events",
+            params={"profile_url": URL, "include_company": "false", "sections_only": "true"},
+        )
+
+        self.assertEqual(self.events(get), ["section", "done"])
+        self.assertEqual(self.scraper.requests, [(URL, True, False)])
+        self.assertEqual(self.client.get("/linkedin/enriched-profile/clean/events").status_code, 422)
+
+class TestStatsRoutes(unittest.TestCase):
+    def test_cache_stats_is_an_alias_of_stats(self):
+        app = FastAPI()
+        app.include_router(router)
+        app.dependency_overrides[get_linkedin_scraper] = lambda: LinkedInScraperService()
+        client = TestClient(app)
+
+        stats = client.get("/linkedin/stats").json()
+
+        self.assertEqual(client.get("/linkedin/cache/stats").json().keys(), stats.keys())
+        self.assertIn("cache", stats)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,82 @@
+import ast
+import json
+import os
+import unittest
+from src.models.decoders import decode_company, decode_profile, get_adapter, to_data
+from src.models.linkedin_types import LinkedInProfileScraperResponse
+from src.services.field_projection import COMPANY_PROJECTION, PROFILE_PROJECTION
+from src.services.linkedin_cache import LinkedInCache, RESOURCE_PROFILE
+from src.services.linkedin_scraper_service import LinkedInScraperService
+
+SAMPLE_PATH = os.path.join(os.path.dirname(__file__), "..", "uncleaned_data.txt")
+
+COMPANY = {
+    "success": True,
+    "message": "",
+    "data": {
+        "id": "66705032",
+        "name": "Engageli",
+        "logos": [{"url": "https://media.licdn.com/logo.png", "width": 200, "height": 200}],
+        "crunchbaseUrl": "https://www.crunchbase.com/organization/engageli",
+        "callToAction": {"callToActionType": "VIEW_WEBSITE", "visible": True, "url": "https://engageli.com"},
+        "fundingData": {
+            "numFundingRounds": 2,
+            "lastFundingRound": {"fundingType": "SERIES_A", "fundingRoundCrunchbaseUrl": "https://www.crunchbase.com/r"},
+        },
+    },
+}
+
+class TestLinkedInTypes(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        with open(SAMPLE_PATH, "r", encoding="utf-8") as file:
+            cls.sample = ast.literal_eval(file.read())
+        cls.body = json.dumps(cls.sample).encode("utf-8")
+
+    def test_profile_decoded_without_losing_fields(self):
+        profile = decode_profile(self.body)
+
+        self.assertEqual(type(profile).__name__, "LinkedInProfileScraperResponse")
+        self.assertEqual(to_data(profile), self.sample)
+
+    def test_cleaned_profile_matches_projection(self):
+        profile = decode_profile(self.body, cleaned=True)
+
+        self.assertEqual(type(profile).__name__, "CleanedLinkedInProfileScraperResponse")
+        self.assertEqual(to_data(profile), PROFILE_PROJECTION(json.loads(self.body)))
+
+    def test_company_fields_optional(self):
+        company = decode_company(b'{"success": true, "message": "", "data": {"name": "Acme"}}')
+
+        self.assertEqual(company.data.name, "Acme")
+        self.assertIsNone(company.data.fundingData)
+
+    def test_cleaned_company_matches_projection(self):
+        body = json.dumps(COMPANY).encode("utf-8")
+
+        self.assertEqual(to_data(decode_company(body)), COMPANY)
+        self.assertEqual(to_data(decode_company(body, cleaned=True)), COMPANY_PROJECTION(json.loads(body)))
+
+    def test_adapters_built_once(self):
+        self.assertIs(get_adapter(LinkedInProfileScraperResponse), get_adapter(LinkedInProfileScraperResponse))
+
+class TestTypedScraper(unittest.IsolatedAsyncioTestCase):
+    async def test_typed_decode_returns_same_profile(self):
+        with open(SAMPLE_PATH, "r", encoding="utf-8") as file:
+            body = json.dumps(ast.literal_eval(file.read())).encode("utf-8")
+        url = "https://www.linkedin.com/in/matan-yemini/"
+        cache = LinkedInCache(max_memory_bytes=1024 * 1024)
+        await cache.set(RESOURCE_PROFILE, url, body)
+
+        typed = LinkedInScraperService(cache=cache, typed_decode=True)
+        plain = LinkedInScraperService(cache=cache, typed_decode=False)
+        for cleanup in (False, True):
+            self.assertEqual(await typed.get_profile_data(url, cleanup), await plain.get_profile_data(url, cleanup))
+
+        model = await typed.get_profile_model(url, cleanup=True)
+        self.assertEqual(model.username, "matan-yemini")
+        await typed.close()
+        await plain.close()
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,92 @@
+import ast
+import os
+import unittest
+from src.services.local_cleaner import LocalCleaner, needs_llm, normalize_free_text
+
+SAMPLE_PATH = os.path.join(os.path.dirname(__file__), "..", "uncleaned_data.txt")
+
+PROFILE = {
+    "firstName": "Jane",
+    "lastName": "Doe",
+    "headline": "VP Engineering",
+    "geo": {"full": "Tel Aviv, Israel"},
+    "summary": "i build teams that ship.we care about quality , and we we move fast!!",
+    "profilePicture": "https://media.licdn.com/jane.jpg",
+    "fullPositions": [
+        {
+            "companyName": "Acme",
+            "companyLogo": "https://media.licdn.com/acme.png",
+            "title": "VP Engineering",
+            "start": {"year": 2022, "month": 6, "day": 0},
+            "end": {"year": 0, "month": 0, "day": 0},
+            "description": "Leading 40 engineers. See https://acme.com/jobs?trk=abc",
+        },
+    ],
+    "skills": [{"name": "Python"}, {"name": "Python"}, {"name": "Go"}],
+    "posts": {"data": [{"text": "We are hiring.", "postedDateTimestamp": 1735689600000, "totalReactionCount": 12}]},
+    "currentCompany": {"data": {"name": "Acme", "tagline": "Widgets", "description": "Acme makes widgets."}},
+    "recentCompanyPosts": {"data": [{"text": "We launched", "reposted": True}]},
+}
+
+class TestLocalCleaner(unittest.TestCase):
+    def test_renders_layout_without_noise(self):
+        text = LocalCleaner(escalate="none").prepare(PROFILE).render()
+
+        self.assertTrue(text.startswith("<profile_information>\nName: Jane Doe\nHeadline: VP Engineering"))
+        self.assertIn("- VP Engineering at Acme (Jun 2022 - present)", text)
+        self.assertIn("  Leading 40 engineers. See", text)
+        self.assertIn("Skills:\nPython, Go", text)
+        self.assertIn("<profile_posts>\n- Post | Jan 01, 2025 | 12 reactions\n  We are hiring.\n</profile_posts>", text)
+        self.assertIn("<company_posts>\nCompany: Acme | Widgets\n  Acme makes widgets.\n\n- Post | reshared\n  We launched\n</company_posts>", text)
+        for noise in ("media.licdn.com", "acme.com", "trk=", "year"):
+            self.assertNotIn(noise, text)
+
+    def test_only_sloppy_free_text_escalated(self):
+        pre_cleaned = LocalCleaner(escalate="auto", min_words=5).prepare(PROFILE)
+
+        self.assertEqual(pre_cleaned.escalated_texts(), [PROFILE["summary"]])
+
+    def test_llm_results_replace_escalated_text(self):
+        pre_cleaned = LocalCleaner(escalate="auto", min_words=5).prepare(PROFILE)
+        text = pre_cleaned.render(["I build teams that ship. We care about quality and we move fast!"])
+
+        self.assertIn("Summary:\nI build teams that ship. We care about quality and we move fast!", text)
+        self.assertNotIn("we we", text)
+
+    def test_sections_render_to_full_text(self):
+        pre_cleaned = LocalCleaner(escalate="all").prepare(PROFILE)
+        cleaned = [text.upper() for text in pre_cleaned.escalated_texts()]
+
+        sections = [pre_cleaned.render_section(section, cleaned) for section in pre_cleaned.sections]
+
+        self.assertEqual("\n\n".join(sections), pre_cleaned.render(cleaned))
+        self.assertEqual(pre_cleaned.section_chunks(), {"profile_information": [0, 1], "profile_posts": [2], "company_posts": [3, 4]})
+
+    def test_escalate_all_and_none(self):
+        self.assertEqual(len(LocalCleaner(escalate="all").prepare(PROFILE).escalated), 5)
+        self.assertEqual(LocalCleaner(escalate="none").prepare(PROFILE).escalated, [])
+
+    def test_normalize_free_text(self):
+        styled = "\U0001d5e6\U0001d602\U0001d5ff\U0001d5fd\U0001d5ee\U0001d600\U0001d600\U0001d5f2\U0001d5f1 1M hours"
+
+        self.assertEqual(normalize_free_text(styled), "Surpassed 1M hours")
+        self.assertEqual(normalize_free_text("a  b\u200b\n\n\n\n• c https://x.y/z"), "a b\n\n• c")
+
+    def test_needs_llm(self):
+        self.assertFalse(needs_llm("Built the R&D group from the ground up across frontend, backend and DevOps teams.", 5))
+        self.assertTrue(needs_llm("built the group from the ground up across frontend and backend teams", 5))
+        self.assertFalse(needs_llm("too short.and sloppy", 5))
+
+    def test_sample_profile_keeps_every_position(self):
+        with open(SAMPLE_PATH, "r", encoding="utf-8") as file:
+            sample = ast.literal_eval(file.read())
+
+        text = LocalCleaner().prepare(sample).render()
+
+        for position in sample["fullPositions"]:
+            self.assertIn(position["title"], text)
+        self.assertIn("Surpassed 1,000,000 live student hours", text)
+        self.assertNotIn("https://", text)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,145 @@
+import asyncio
+import json
+import unittest
+from types import SimpleNamespace
+from src.services.openai_service import drain_to_twilio, handle_media_stream
+from src.services.persona_store import PersonaStore
+from src.utils.call_metrics import CallMetricsRegistry
+from src.utils.websocket_handlers import WebSocketState, handle_speech_started_event
+
+START = json.dumps({"event": "start", "start": {"streamSid": "MZ1", "customParameters": {"call_type": "sales"}}})
+
+class FakeTwilioSocket:
+    def __init__(self, app, messages):
+        self.app = app
+        self.messages = messages
+        self.closed = False
+
+    async def accept(self):
+        pass
+
+    async def iter_text(self):
+        await asyncio.sleep(0)
+        for message in self.messages:
+            yield message
+
+    async def close(self):
+        self.closed = True
+
+class FakeRealtimeSocket:
+    def __init__(self, fail_send=False):
+        self.open = True
+        self.fail_send = fail_send
+        self.sent = []
+
+    async def send(self, frame):
+        if self.fail_send:
+            raise ConnectionError("realtime session dropped")
+        self.sent.append(json.loads(frame))
+
+class SlowTwilioSocket:
+    """Records the events sent to Twilio; media sends wait until `sending` is set"""
+
+    def __init__(self):
+        self.events = []
+        self.sending = asyncio.Event()
+
+    async def send_text(self, text):
+        event = json.loads(text)["event"]
+        if event == "media":
+            await self.sending.wait()
+        self.events.append(event)
+
+class FakePool:
+    def __init__(self, socket, delay=0):
+        self.socket = socket
+        self.delay = delay
+        self.released = []
+        self.cancelled = False
+
+    async def acquire(self):
+        try:
+            await asyncio.sleep(self.delay)
+        except asyncio.CancelledError:
+            self.cancelled = True
+            raise
+        return self.socket
+
+    async def release(self, socket):
+        self.released.append(socket)
+
+def make_app(pool):
+    state = SimpleNamespace(realtime_pool=pool, persona_store=PersonaStore(), call_metrics=CallMetricsRegistry())
+    return SimpleNamespace(state=state)
+
+class TestHandleMediaStream(unittest.IsolatedAsyncioTestCase):
+    async def test_failed_persona_send_releases_session(self):
+        realtime = FakeRealtimeSocket(fail_send=True)
+        app = make_app(FakePool(realtime))
+        websocket = FakeTwilioSocket(app, [START])
+
+        with self.assertRaises(ConnectionError):
+            await handle_media_stream(websocket)
+
+        self.assertEqual(app.state.realtime_pool.released, [realtime])
+        self.assertEqual(app.state.call_metrics.active_calls(), [])
+        self.assertTrue(websocket.closed)
+
+    async def test_disconnect_before_start_cancels_connect(self):
+        app = make_app(FakePool(FakeRealtimeSocket(), delay=60))
+        websocket = FakeTwilioSocket(app, [])
+
+        await handle_media_stream(websocket)
+        await asyncio.sleep(0)
+
+        self.assertTrue(app.state.realtime_pool.cancelled)
+        self.assertEqual(app.state.call_metrics.active_calls(), [])
+
+class TestBargeIn(unittest.IsolatedAsyncioTestCase):
+    def make_state(self):
+        ws_state = WebSocketState()
+        ws_state.set_stream_sid("MZ1")
+        ws_state.last_assistant_item = "item_1"
+        return ws_state
+
+    async def test_start_timestamp_is_taken_when_audio_is_sent(self):
+        twilio = SlowTwilioSocket()
+        ws_state = self.make_state()
+        ws_state.latest_media_timestamp = 100
+        ws_state.outbound.put("AAAA")
+        drain = asyncio.ensure_future(drain_to_twilio(twilio, ws_state))
+        await asyncio.sleep(0)
+
+        ws_state.latest_media_timestamp = 160
+        twilio.sending.set()
+        await asyncio.sleep(0)
+        ws_state.outbound.close()
+        await drain
+
+        self.assertEqual(ws_state.response_start_timestamp_twilio, 160)
+        self.assertEqual(twilio.events, ["media", "mark"])
+
+    async def test_frame_in_flight_during_clear_gets_no_mark(self):
+        twilio = SlowTwilioSocket()
+        realtime = FakeRealtimeSocket()
+        ws_state = self.make_state()
+        for frame in ("AAAA", "BBBB"):
+            ws_state.outbound.put(frame)
+        drain = asyncio.ensure_future(drain_to_twilio(twilio, ws_state))
+        await asyncio.sleep(0)
+
+        # The caller speaks while the first frame is still being sent
+        interrupt = asyncio.ensure_future(handle_speech_started_event(twilio, realtime, ws_state))
+        await asyncio.sleep(0)
+        twilio.sending.set()
+        await interrupt
+        ws_state.outbound.close()
+        await drain
+
+        self.assertEqual(twilio.events, ["media", "clear"])
+        self.assertEqual(realtime.sent[0]["audio_end_ms"], 0)
+        self.assertEqual((ws_state.pending_marks, ws_state.response_start_timestamp_twilio), (0, None))
+        self.assertEqual(ws_state.outbound.get_stats()["frames_cleared"], 1)
+
+if __name__ == "__main__":
+    unittest.main()
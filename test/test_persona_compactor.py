@@ -0,0 +1,55 @@
+import time
+import unittest
+from src.services.persona_compactor import PersonaCompactor, rank_posts
+from src.utils.tokens import count_tokens
+
+def make_profile():
+    now_ms = time.time() * 1000
+    return {
+        "firstName": "Dana",
+        "lastName": "Levi",
+        "headline": "VP Engineering at Acme",
+        "geo": {"full": "Tel Aviv, Israel"},
+        "summary": "Builds teams and products. " * 40,
+        "position": [
+            {"title": "VP Engineering", "companyName": "Acme", "start": {"year": 2023, "month": 6}, "end": {"year": 0, "month": 0},
+             "description": "Leads the engineering org. " * 30},
+            {"title": "Director", "companyName": "Globex", "start": {"year": 2019, "month": 1}, "end": {"year": 2023, "month": 5}},
+        ],
+        "skills": [{"name": "Python", "endorsementsCount": 3}, {"name": "Leadership", "endorsementsCount": 40}],
+        "certifications": [{"name": "Certified Kubernetes Administrator", "authority": "CNCF"}],
+        "posts": {"data": [
+            {"text": "Old and quiet post", "likeCount": 1, "postedDateTimestamp": now_ms - 400 * 86400000},
+            {"text": "We just launched our new product!", "totalReactionCount": 500, "commentsCount": 40,
+             "postedDateTimestamp": now_ms - 2 * 86400000},
+            {"text": "We just launched our new product!", "totalReactionCount": 500},
+        ]},
+    }
+
+class TestPersonaCompactor(unittest.TestCase):
+    def test_output_fits_budget(self):
+        for budget in (150, 400, 1500):
+            persona = PersonaCompactor(token_budget=budget).compact(make_profile())
+            self.assertLessEqual(count_tokens(persona), budget)
+
+    def test_low_value_fields_dropped_first(self):
+        persona = PersonaCompactor(token_budget=150).compact(make_profile())
+
+        self.assertIn("Name: Dana Levi", persona)
+        self.assertIn("VP Engineering at Acme (Jun 2023 - present)", persona)
+        self.assertNotIn("Certified Kubernetes Administrator", persona)
+
+    def test_everything_kept_with_large_budget(self):
+        persona = PersonaCompactor(token_budget=10000).compact(make_profile())
+
+        self.assertIn("Leadership, Python", persona)
+        self.assertIn("Certified Kubernetes Administrator (CNCF)", persona)
+        self.assertEqual(persona.count("We just launched our new product!"), 1)
+
+    def test_rank_posts_prefers_engaging_recent_posts(self):
+        posts = rank_posts(make_profile()["posts"]["data"], limit=2)
+
+        self.assertEqual([post["text"] for post in posts], ["We just launched our new product!", "Old and quiet post"])
+
+if __name__ == "__main__":
+    unittest.main()
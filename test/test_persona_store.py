@@ -0,0 +1,53 @@
+import json
+import unittest
+from src.services.persona_store import PersonaStore, DEFAULT_CALL_TYPE, DEFAULT_PROFILE
+
+PROFILE = {"firstName": "Dana", "lastName": "Levi", "headline": "VP Engineering at Acme"}
+
+class TestPersonaStore(unittest.IsolatedAsyncioTestCase):
+    async def test_frames_are_preserialized(self):
+        store = PersonaStore()
+        await store.put("https://www.linkedin.com/in/dana-levi/", "sales", PROFILE)
+
+        persona = await store.get("linkedin.com/in/Dana-Levi?trk=abc", "sales")
+        session_update, initial_item, response_create = (json.loads(frame) for frame in persona.frames)
+
+        self.assertEqual(session_update["type"], "session.update")
+        self.assertIn("Name: Dana Levi", session_update["session"]["instructions"])
+        self.assertIn("someone is trying to sell you something", initial_item["item"]["content"][0]["text"])
+        self.assertEqual(response_create, {"type": "response.create"})
+
+    async def test_unknown_profile_falls_back_to_default(self):
+        store = PersonaStore()
+        await store.put(DEFAULT_PROFILE, "hiring_manager", "")
+
+        persona = await store.get("linkedin.com/in/someone-else", "hiring_manager")
+
+        self.assertEqual(persona.profile, DEFAULT_PROFILE)
+        self.assertEqual(store.get_stats()["default_fallbacks"], 1)
+        self.assertIsNone(await store.get("linkedin.com/in/someone-else", "sales"))
+
+    async def test_lru_eviction_keeps_defaults(self):
+        store = PersonaStore(max_entries=2)
+        await store.put(DEFAULT_PROFILE, "sales", "")
+        for username in ("a", "b", "c"):
+            await store.put(username, "sales", PROFILE)
+        await store.get("b", "sales")
+        await store.put("d", "sales", PROFILE)
+
+        self.assertEqual((await store.get("b", "sales")).profile, "b")
+        self.assertEqual((await store.get("a", "sales")).profile, DEFAULT_PROFILE)
+        self.assertEqual((await store.get("c", "sales")).profile, DEFAULT_PROFILE)
+        self.assertEqual(store.get_stats()["evictions"], 2)
+
+    def test_unknown_call_type_gets_default_call_type(self):
+        store = PersonaStore()
+
+        for call_type in ("sales", "made-up-1", "made-up-2", None):
+            store.get_or_compile_default(call_type)
+
+        self.assertEqual(sorted(store._defaults), sorted({"sales", DEFAULT_CALL_TYPE}))
+        self.assertEqual(store.get_or_compile_default("made-up-3").call_type, DEFAULT_CALL_TYPE)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,138 @@
+import asyncio
+import time
+import unittest
+from src.services.linkedin_scraper_service import LinkedInScraperService, PostCutoff
+
+DAY_MS = 86400 * 1000
+
+def make_posts(count, offset=0, age_days=0):
+    now_ms = int(time.time() * 1000)
+    return [
+        {
+            "urn": str(offset + index),
+            "text": f"Post number {offset + index} " * 5,
+            "postedDateTimestamp": now_ms - (age_days + offset + index) * DAY_MS,
+            "postUrl": "https://www.linkedin.com/feed/update/x",
+        }
+        for index in range(count)
+    ]
+
+class PagedScraper(LinkedInScraperService):
+    """Serves posts pages of PAGE_SIZE from a list, each page taking DELAY seconds; pages from `stall_at` on hang"""
+    PAGE_SIZE = 3
+    DELAY = 0.02
+
+    def __init__(self, posts, stall_at=None):
+        super().__init__()
+        self.posts = posts
+        self.stall_at = stall_at
+        self.starts = []
+        self.finished = []
+
+    async def get_profile_posts(self, username, priority=None, start=0, use_cache=True):
+        self.starts.append(start)
+        await asyncio.sleep(60 if self.stall_at is not None and start >= self.stall_at else self.DELAY)
+        self.finished.append(start)
+        page = self.posts[start:start + self.PAGE_SIZE]
+        return {"success": True, "data": [dict(post) for post in page]}
+
+async def take(iterator, count=None):
+    posts = []
+    async for post in iterator:
+        posts.append(post)
+        if count is not None and len(posts) >= count:
+            break
+    return posts
+
+class TestPostStream(unittest.IsolatedAsyncioTestCase):
+    async def test_streams_all_pages_cleaned(self):
+        scraper = PagedScraper(make_posts(7))
+
+        posts = await take(scraper.iter_profile_posts("jane"))
+
+        self.assertEqual([post["urn"] for post in posts], [str(index) for index in range(7)])
+        self.assertEqual(scraper.starts, [0, 3, 6, 7])
+        self.assertNotIn("postUrl", posts[0])
+
+    async def test_next_page_is_prefetched(self):
+        scraper = PagedScraper(make_posts(9))
+        started = time.perf_counter()
+
+        async for _ in scraper.iter_profile_posts("jane"):
+            # Slower consumer than the upstream: the next page is fetched meanwhile
+            await asyncio.sleep(PagedScraper.DELAY / 2)
+
+        elapsed = time.perf_counter() - started
+        sequential = 4 * PagedScraper.DELAY + 9 * PagedScraper.DELAY / 2
+        self.assertLess(elapsed, sequential * 0.8)
+
+    async def test_count_cutoff_stops_fetching(self):
+        scraper = PagedScraper(make_posts(20))
+
+        posts = await take(scraper.iter_profile_posts("jane", PostCutoff(max_posts=5)))
+
+        self.assertEqual(len(posts), 5)
+        # The second page is enough for the count, so no third page is requested
+        self.assertEqual(scraper.starts, [0, 3])
+
+    async def test_age_and_token_cutoffs(self):
+        scraper = PagedScraper(make_posts(20))
+        recent = await take(scraper.iter_profile_posts("jane", PostCutoff(max_age_days=4.5)))
+
+        self.assertEqual([post["urn"] for post in recent], ["0", "1", "2", "3", "4"])
+        self.assertEqual(scraper.starts, [0, 3])
+
+        scraper = PagedScraper(make_posts(20))
+        budget = await take(scraper.iter_profile_posts("jane", PostCutoff(max_tokens=60)))
+
+        self.assertTrue(0 < len(budget) < 20)
+
+    async def test_consumer_break_cancels_prefetch(self):
+        scraper = PagedScraper(make_posts(20))
+        iterator = scraper.iter_profile_posts("jane")
+
+        await take(iterator, count=1)
+        await asyncio.sleep(PagedScraper.DELAY / 2)
+        await iterator.aclose()
+        await asyncio.sleep(PagedScraper.DELAY * 2)
+
+        self.assertEqual(scraper.starts, [0, 3])
+        self.assertEqual(scraper.finished, [0])
+
+    async def test_collect_posts_payload(self):
+        scraper = PagedScraper(make_posts(4))
+
+        payload = await scraper.collect_posts(scraper.iter_profile_posts("jane", PostCutoff(max_pages=1)))
+
+        self.assertEqual(len(payload["data"]), 3)
+        self.assertIsNone(await PagedScraper([]).collect_posts(PagedScraper([]).iter_profile_posts("jane")))
+
+    async def test_collect_posts_keeps_posts_at_deadline(self):
+        scraper = PagedScraper(make_posts(20), stall_at=6)
+
+        payload = await scraper.collect_posts(scraper.iter_profile_posts("jane"), timeout=PagedScraper.DELAY * 5)
+
+        # Two pages arrived before the deadline, the third was cut off
+        self.assertEqual([post["urn"] for post in payload["data"]], [str(index) for index in range(6)])
+        with self.assertRaises(TimeoutError):
+            await scraper.collect_posts(scraper.iter_profile_posts("jane"), timeout=PagedScraper.DELAY / 2)
+
+    async def test_enrichment_deadline_returns_partial_posts(self):
+        class ProfileScraper(PagedScraper):
+            async def get_profile_data(self, linkedin_url, cleanup=False, priority=None):
+                return {"username": "jane"}
+
+        scraper = ProfileScraper(make_posts(20), stall_at=6)
+
+        profile = await scraper.get_enriched_profile(
+            "https://www.linkedin.com/in/jane/",
+            include_company=False,
+            timeouts={"posts": PagedScraper.DELAY * 5},
+            posts_cutoff=PostCutoff(),
+        )
+
+        self.assertEqual(len(profile["posts"]["data"]), 6)
+        self.assertEqual(profile["enrichment"]["errors"], {})
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,176 @@
+import asyncio
+import os
+import tempfile
+import time
+import unittest
+from src.services.persona_store import PersonaStore
+from src.services.linkedin_scraper_service import UpstreamError
+from src.services.prewarm_queue import PrewarmQueue, PrewarmWorkerPool, normalize_call_key
+from src.utils.shared_state import connect_shared_db
+
+PROFILE = {"firstName": "Jane", "lastName": "Doe", "headline": "VP Engineering"}
+URL = "https://www.linkedin.com/in/jane-doe/"
+
+class FakeScraper:
+    """Fails the first `failures` builds with an upstream outage; `missing` profiles return None"""
+
+    def __init__(self, failures=0, delay=0, missing=False):
+        self.failures = failures
+        self.delay = delay
+        self.missing = missing
+        self.calls = []
+
+    async def get_enriched_profile(self, linkedin_url, cleanup=False, priority=None, posts_cutoff=None):
+        self.calls.append((linkedin_url, priority))
+        await asyncio.sleep(self.delay)
+        if self.failures:
+            self.failures -= 1
+            raise UpstreamError(503, "upstream down")
+        return None if self.missing else dict(PROFILE)
+
+class QueueTestCase(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, "prewarm.db")
+        self.queue = PrewarmQueue(self.path, job_timeout=60)
+
+    def tearDown(self):
+        self.queue.close()
+        self.directory.cleanup()
+
+class TestPrewarmQueue(QueueTestCase):
+    def test_normalize_call_key(self):
+        self.assertEqual(normalize_call_key(" +1 (415) 555-0100 "), "+14155550100")
+        self.assertEqual(normalize_call_key("MZ-stream-42"), "MZ-stream-42")
+
+    async def test_claims_earliest_call_first(self):
+        now = time.time()
+        await self.queue.schedule("+15550002", URL, "sales", now + 600)
+        await self.queue.schedule("+15550001", URL, "sales", now + 60)
+
+        first = await self.queue.claim()
+        second = await self.queue.claim()
+
+        self.assertEqual((first.call_key, first.status, first.attempts), ("+15550001", "running", 1))
+        self.assertEqual(second.call_key, "+15550002")
+        self.assertIsNone(await self.queue.claim())
+
+    async def test_retry_waits_and_jobs_survive_reopen(self):
+        await self.queue.schedule("+15550001", URL, "sales", time.time() + 60)
+        job = await self.queue.claim()
+        await self.queue.retry(job, "upstream down", delay=30)
+
+        self.assertIsNone(await self.queue.claim())
+        self.queue.close()
+        self.queue = PrewarmQueue(self.path)
+        stored = self.queue.get("+1 555 0001")
+        self.assertEqual((stored.status, stored.attempts, stored.last_error), ("pending", 1, "upstream down"))
+
+    async def test_rescheduled_call_supersedes_running_build(self):
+        await self.queue.schedule("+15550001", URL, "sales", time.time() + 60)
+        job = await self.queue.claim()
+        await self.queue.schedule("+15550001", "https://www.linkedin.com/in/other/", "sales", time.time() + 120)
+
+        self.assertFalse(await self.queue.complete(job))
+        self.assertEqual(self.queue.get("+15550001").status, "pending")
+
+    async def test_abandoned_job_is_taken_over(self):
+        self.queue.job_timeout = 0
+        await self.queue.schedule("+15550001", URL, "sales", time.time() + 60)
+        abandoned = await self.queue.claim()
+        await asyncio.sleep(0.01)
+
+        taken_over = await self.queue.claim()
+
+        self.assertEqual(taken_over.attempts, 2)
+        self.assertFalse(await self.queue.complete(abandoned))
+        self.assertTrue(await self.queue.complete(taken_over))
+
+    async def test_stats_report_lead_time(self):
+        await self.queue.schedule("+15550001", URL, "sales", time.time() + 300)
+        await self.queue.complete(await self.queue.claim())
+        job = await self.queue.mark_connected("+15550001")
+
+        stats = self.queue.get_stats()
+
+        self.assertEqual(stats["jobs"]["ready"], 1)
+        self.assertEqual(stats["late"], 0)
+        self.assertAlmostEqual(stats["lead_seconds"]["p50"], 300, delta=5)
+        self.assertAlmostEqual(job.connect_lead_seconds, 0, delta=5)
+
+    async def test_claim_waits_for_locked_queue_without_blocking(self):
+        await self.queue.schedule("+15550001", URL, "sales", time.time() + 60)
+        # Another worker process holding the write lock
+        holder = connect_shared_db(self.path)
+        holder.execute("BEGIN IMMEDIATE")
+
+        claim = asyncio.ensure_future(self.queue.claim())
+        await asyncio.sleep(0.05)
+        self.assertFalse(claim.done())
+
+        holder.execute("COMMIT")
+        self.assertEqual((await claim).call_key, "+15550001")
+        holder.close()
+
+class TestPrewarmWorkerPool(QueueTestCase):
+    async def test_workers_build_scheduled_persona(self):
+        store = PersonaStore()
+        scraper = FakeScraper()
+        pool = PrewarmWorkerPool(self.queue, scraper, store, workers=2, poll_interval=0.01)
+
+        await pool.start()
+        await pool.schedule("+15550001", URL, "sales", time.time() + 60)
+        for _ in range(100):
+            if self.queue.get("+15550001").status == "ready":
+                break
+            await asyncio.sleep(0.01)
+        await pool.close()
+
+        self.assertEqual(self.queue.get("+15550001").status, "ready")
+        self.assertEqual((await store.get(URL, "sales")).profile, "linkedin.com/in/jane-doe")
+        self.assertEqual(pool.stats.built, 1)
+        self.assertEqual(scraper.calls[0][1].name, "BACKGROUND")
+
+    async def test_failed_build_retries_then_fails(self):
+        pool = PrewarmWorkerPool(self.queue, FakeScraper(failures=5), PersonaStore(), max_attempts=2)
+        await self.queue.schedule("+15550001", URL, "sales", time.time() + 60)
+
+        await pool.run(await self.queue.claim())
+        self.assertEqual(self.queue.get("+15550001").status, "pending")
+
+        self.queue._conn.execute("UPDATE prewarm_jobs SET next_attempt_at = 0")
+        await pool.run(await self.queue.claim())
+        job = self.queue.get("+15550001")
+
+        self.assertEqual((job.status, job.attempts), ("failed", 2))
+        self.assertIn("upstream down", job.last_error)
+        self.assertEqual((pool.stats.retried, pool.stats.failed), (1, 1))
+
+    async def test_missing_profile_fails_without_retry(self):
+        scraper = FakeScraper(missing=True)
+        pool = PrewarmWorkerPool(self.queue, scraper, PersonaStore(), max_attempts=3)
+        await self.queue.schedule("+15550001", URL, "sales", time.time() + 60)
+
+        await pool.run(await self.queue.claim())
+        job = self.queue.get("+15550001")
+
+        self.assertEqual((job.status, job.attempts), ("failed", 1))
+        self.assertEqual((pool.stats.retried, pool.stats.failed), (0, 1))
+        self.assertEqual(len(scraper.calls), 1)
+
+    async def test_cancelled_build_is_handed_back(self):
+        pool = PrewarmWorkerPool(self.queue, FakeScraper(delay=60), PersonaStore())
+        await self.queue.schedule("+15550001", URL, "sales", time.time() + 60)
+
+        build = asyncio.ensure_future(pool.run(await self.queue.claim()))
+        await asyncio.sleep(0.01)
+        build.cancel()
+        with self.assertRaises(asyncio.CancelledError):
+            await build
+        job = self.queue.get("+15550001")
+
+        self.assertEqual((job.status, job.attempts), ("pending", 0))
+        self.assertEqual((await self.queue.claim()).call_key, "+15550001")
+
+if __name__ == "__main__":
+    unittest.main()
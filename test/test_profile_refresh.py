@@ -0,0 +1,195 @@
+import json
+import os
+import tempfile
+import time
+import unittest
+from src.services.linkedin_cache import LinkedInCache, RESOURCE_PROFILE_POSTS
+from src.services.linkedin_scraper_service import LinkedInScraperService, RetryPolicy, UpstreamError
+from src.services.profile_refresh import (
+    ProfileSnapshotStore,
+    diff_profiles,
+    merge_posts,
+    split_new_posts,
+)
+
+URL = "https://www.linkedin.com/in/jane-doe/"
+PROFILE_ENDPOINT = "/get-profile-data-by-url?url=https%3A//www.linkedin.com/in/jane-doe/"
+POSTS_ENDPOINT = "/get-profile-posts?username=jane-doe"
+
+def post(urn, text, reactions=0):
+    return {"urn": urn, "text": text, "totalReactionCount": reactions}
+
+def profile(**overrides):
+    data = {
+        "username": "jane-doe",
+        "headline": "VP Engineering",
+        "position": [{"title": "VP Engineering", "companyName": "Acme", "companyUsername": "acme"}],
+        "skills": [{"name": "Python"}],
+        "posts": {"success": True, "data": [post("3", "Third"), post("2", "Second"), post("1", "First")]},
+    }
+    data.update(overrides)
+    return data
+
+def profile_response():
+    return {key: value for key, value in profile().items() if key != "posts"}
+
+class FakeScraper(LinkedInScraperService):
+    """Serves upstream responses from a dict keyed by endpoint and records the calls; exceptions are raised"""
+
+    def __init__(self, responses, **kwargs):
+        super().__init__(**kwargs)
+        self.responses = responses
+        self.calls = []
+
+    async def _fetch_upstream(self, resource, cache_key, endpoint, error_label, priority):
+        self.calls.append(endpoint)
+        value = self.responses.get(endpoint)
+        if isinstance(value, Exception):
+            raise value
+        if value is None:
+            return None
+        body = json.dumps(value).encode("utf-8")
+        if self.cache is not None:
+            await self.cache.set(resource, cache_key, body)
+        return body
+
+class TestProfileDiff(unittest.TestCase):
+    def test_unchanged_profile_has_empty_diff(self):
+        old = profile(enrichment={"complete": True})
+        new = profile(enrichment={"complete": False})
+        new["posts"]["data"][0]["totalReactionCount"] = 40
+
+        diff = diff_profiles(old, new)
+
+        self.assertEqual(diff.changed, [])
+        self.assertFalse(diff.initial)
+
+    def test_changed_sections_are_counted(self):
+        new = profile(headline="CTO", skills=[{"name": "Python"}, {"name": "Go"}])
+        new["position"].insert(0, {"title": "CTO", "companyName": "Beta"})
+
+        diff = diff_profiles(profile(), new)
+
+        self.assertEqual(sorted(diff.changed), ["positions", "profile", "skills"])
+        self.assertEqual(diff.sections["profile"].keys, ["headline"])
+        self.assertEqual((diff.sections["positions"].added, diff.sections["positions"].removed), (1, 0))
+        self.assertTrue(diff.affects(["skills"]))
+        self.assertTrue(diff_profiles(None, new).initial)
+
+    def test_split_and_merge_posts(self):
+        stored = profile()["posts"]["data"]
+        page = [post("5", "Fifth"), post("4", "Fourth"), post("3", "Third", reactions=9)]
+
+        new, found = split_new_posts(page, {"3", "2", "1"})
+        merged = merge_posts(page, stored, limit=4)
+
+        self.assertEqual([item["urn"] for item in new], ["5", "4"])
+        self.assertTrue(found)
+        self.assertEqual([item["urn"] for item in merged], ["5", "4", "3", "2"])
+        self.assertEqual(merged[2]["totalReactionCount"], 9)
+        self.assertEqual(split_new_posts(page, set()), (page, False))
+
+class TestProfileSnapshotStore(unittest.IsolatedAsyncioTestCase):
+    async def test_memory_store_evicts_oldest(self):
+        store = ProfileSnapshotStore(max_entries=1)
+        await store.set(URL, profile())
+        await store.set("https://www.linkedin.com/in/other/", profile())
+
+        self.assertIsNone(await store.get(URL))
+        self.assertEqual(len(store), 1)
+
+    async def test_sqlite_store_survives_reopen(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "snapshots.db")
+            store = ProfileSnapshotStore(db_path=path)
+            await store.set(URL, profile())
+            store.close()
+
+            store = ProfileSnapshotStore(db_path=path)
+            self.assertEqual(await store.get("linkedin.com/in/jane-doe"), profile())
+            await store.delete(URL)
+            self.assertIsNone(await store.get(URL))
+            store.close()
+
+    async def test_sqlite_store_evicts_oldest(self):
+        with tempfile.TemporaryDirectory() as directory:
+            store = ProfileSnapshotStore(db_path=os.path.join(directory, "snapshots.db"), max_entries=2)
+            for name in ("first", "second", "third"):
+                await store.set(f"https://www.linkedin.com/in/{name}/", profile())
+                time.sleep(0.001)
+
+            self.assertEqual(len(store), 2)
+            self.assertIsNone(await store.get("https://www.linkedin.com/in/first/"))
+            self.assertIsNotNone(await store.get("https://www.linkedin.com/in/third/"))
+            store.close()
+
+class TestRefreshEnrichedProfile(unittest.IsolatedAsyncioTestCase):
+    async def test_refresh_fetches_only_new_posts(self):
+        responses = {PROFILE_ENDPOINT: profile_response(), POSTS_ENDPOINT: profile()["posts"]}
+        scraper = FakeScraper(responses, cache=LinkedInCache(max_memory_bytes=1024 * 1024), snapshots=ProfileSnapshotStore())
+
+        first = await scraper.refresh_enriched_profile(URL, include_company=False)
+        self.assertTrue(first.diff.initial)
+
+        # Two new posts on the first page, then the newest stored one
+        responses[POSTS_ENDPOINT] = {
+            "success": True,
+            "data": [post("5", "Fifth"), post("4", "Fourth")],
+        }
+        responses[POSTS_ENDPOINT + "&start=2"] = {
+            "success": True,
+            "data": [post("3", "Third", reactions=7), post("2", "Second")],
+        }
+        scraper.calls.clear()
+        refresh = await scraper.refresh_enriched_profile(URL, include_company=False)
+
+        self.assertEqual(refresh.diff.changed, ["posts"])
+        self.assertEqual(refresh.diff.sections["posts"].added, 2)
+        self.assertEqual(refresh.new_posts, {"posts": 2})
+        self.assertEqual(refresh.post_pages, {"posts": 2})
+        self.assertEqual([item["urn"] for item in refresh.profile["posts"]["data"]], ["5", "4", "3"])
+        # The profile bypassed the cache even though it was cached by the first call
+        self.assertEqual(len(scraper.calls), 3)
+
+        scraper.calls.clear()
+        responses[POSTS_ENDPOINT] = refresh.profile["posts"]
+        unchanged = await scraper.refresh_enriched_profile(URL, include_company=False)
+
+        self.assertEqual(unchanged.diff.changed, [])
+        self.assertEqual(unchanged.post_pages, {"posts": 1})
+        await scraper.close()
+
+    async def test_failed_branch_keeps_stored_section(self):
+        snapshots = ProfileSnapshotStore()
+        await snapshots.set(URL, profile())
+        scraper = FakeScraper({PROFILE_ENDPOINT: profile_response()}, snapshots=snapshots)
+
+        refresh = await scraper.refresh_enriched_profile(URL, include_company=False)
+
+        self.assertEqual(refresh.diff.changed, [])
+        self.assertEqual(refresh.profile["posts"], profile()["posts"])
+        self.assertEqual(refresh.profile["enrichment"]["errors"], {"posts": "unavailable"})
+        await scraper.close()
+
+    async def test_refresh_does_not_serve_stale_cache(self):
+        cache = LinkedInCache(max_memory_bytes=1024 * 1024, max_stale=3600)
+        snapshots = ProfileSnapshotStore()
+        await snapshots.set(URL, profile())
+        stale_posts = {"success": True, "data": [post("0", "Stale")]}
+        cache.memory.set(LinkedInCache.make_key(RESOURCE_PROFILE_POSTS, "jane-doe"), json.dumps(stale_posts).encode("utf-8"), time.time() - 1)
+        responses = {PROFILE_ENDPOINT: profile_response(), POSTS_ENDPOINT: UpstreamError(503, "down")}
+        scraper = FakeScraper(responses, cache=cache, snapshots=snapshots, retry_policy=RetryPolicy(max_attempts=1))
+
+        refresh = await scraper.refresh_enriched_profile(URL, include_company=False)
+
+        self.assertEqual(refresh.profile["posts"], profile()["posts"])
+        self.assertEqual(refresh.profile["enrichment"]["errors"], {"posts": "503 - down"})
+        self.assertEqual(cache.stats.stale_hits, 0)
+
+        responses[PROFILE_ENDPOINT] = UpstreamError(503, "down")
+        with self.assertRaises(UpstreamError):
+            await scraper.refresh_enriched_profile(URL, include_company=False)
+        await scraper.close()
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,45 @@
+import asyncio
+import unittest
+from src.utils.rate_limiter import RateLimiter, Priority
+
+class TestRateLimiter(unittest.IsolatedAsyncioTestCase):
+    async def test_interactive_requests_jump_the_queue(self):
+        limiter = RateLimiter(rate=50, burst=1)
+        await limiter.acquire()  # Drain the bucket so everything below queues
+
+        order = []
+
+        async def call(name, priority):
+            await limiter.acquire(priority)
+            order.append(name)
+
+        await asyncio.gather(
+            call("background", Priority.BACKGROUND),
+            call("batch", Priority.BATCH),
+            call("interactive", Priority.INTERACTIVE),
+        )
+
+        self.assertEqual(order, ["interactive", "batch", "background"])
+
+    async def test_throttling_halves_rate_and_pauses(self):
+        limiter = RateLimiter(rate=10, burst=1)
+        limiter.record_throttled(retry_after=0.05)
+
+        self.assertEqual(limiter.rate, 5)
+        loop = asyncio.get_running_loop()
+        started = loop.time()
+        await limiter.acquire()
+        self.assertGreaterEqual(loop.time() - started, 0.04)
+
+    async def test_low_quota_caps_rate(self):
+        limiter = RateLimiter(rate=10, burst=1, quota_reserve_ratio=0.1)
+        limiter.update_from_headers({
+            "x-ratelimit-requests-limit": "1000",
+            "x-ratelimit-requests-remaining": "50",
+            "x-ratelimit-requests-reset": "100",
+        })
+
+        self.assertAlmostEqual(limiter.rate, 0.5)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,75 @@
+import asyncio
+import json
+import unittest
+from src.services.realtime_pool import RealtimeConnectionPool
+
+class FakeRealtimeSocket:
+    def __init__(self):
+        self.open = True
+
+    async def recv(self):
+        return json.dumps({"type": "session.created"})
+
+    async def ping(self):
+        future = asyncio.get_running_loop().create_future()
+        future.set_result(None)
+        return future
+
+    async def close(self):
+        self.open = False
+
+class TestRealtimeConnectionPool(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.sockets = []
+
+        async def connect():
+            socket = FakeRealtimeSocket()
+            self.sockets.append(socket)
+            return socket
+
+        self.connect = connect
+
+    async def test_acquire_hands_out_warm_session_and_refills(self):
+        pool = RealtimeConnectionPool(min_size=1, max_size=1, calls_per_minute=0, check_interval=0.05, connect=self.connect)
+        await pool.start()
+        await asyncio.sleep(0.01)
+
+        ws = await pool.acquire()
+        await pool.release(ws)
+        await asyncio.sleep(0.01)
+
+        self.assertIs(ws, self.sockets[0])
+        self.assertFalse(ws.open)
+        self.assertEqual(pool.get_stats()["hits"], 1)
+        self.assertEqual(len(pool), 1)
+        await pool.close()
+        self.assertFalse(self.sockets[1].open)
+
+    async def test_empty_pool_connects_cold(self):
+        pool = RealtimeConnectionPool(min_size=0, max_size=0, calls_per_minute=0, connect=self.connect)
+
+        ws = await pool.acquire()
+
+        self.assertTrue(ws.open)
+        self.assertEqual(pool.get_stats()["misses"], 1)
+
+    async def test_idle_sessions_expire(self):
+        pool = RealtimeConnectionPool(min_size=1, max_size=1, calls_per_minute=0, max_idle_age=0.02, check_interval=0.03, connect=self.connect)
+        await pool.start()
+        await asyncio.sleep(0.1)
+        await pool.close()
+
+        self.assertGreaterEqual(pool.get_stats()["expired"], 1)
+        self.assertFalse(self.sockets[0].open)
+
+    def test_target_size_follows_call_rate(self):
+        pool = RealtimeConnectionPool(min_size=1, max_size=10, calls_per_minute=600, connect=self.connect)
+        pool._connect_latency = 1.0
+
+        # 10 calls/s during a 1s reconnect: 10 + 2 * sqrt(10), capped at max_size
+        self.assertEqual(pool.target_size, 10)
+        pool.calls_per_minute = 60
+        self.assertEqual(pool.target_size, 3)
+
+if __name__ == "__main__":
+    unittest.main()
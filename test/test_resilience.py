@@ -0,0 +1,46 @@
+import time
+import unittest
+from src.utils.resilience import CircuitBreaker, RetryBudget, RetryPolicy, UpstreamError, is_breaker_failure
+
+class TestResilience(unittest.TestCase):
+    def test_circuit_opens_and_half_opens(self):
+        breaker = CircuitBreaker(failure_threshold=2, recovery_timeout=0.05)
+        breaker.record_failure()
+        self.assertTrue(breaker.allow_request())
+        breaker.record_failure()
+
+        self.assertEqual(breaker.state, CircuitBreaker.OPEN)
+        self.assertFalse(breaker.allow_request())
+
+        time.sleep(0.06)
+        # Only a single probe is let through while half-open
+        self.assertTrue(breaker.allow_request())
+        self.assertFalse(breaker.allow_request())
+        breaker.record_success()
+        self.assertEqual(breaker.state, CircuitBreaker.CLOSED)
+
+    def test_released_probe_lets_the_next_one_through(self):
+        breaker = CircuitBreaker(failure_threshold=1, recovery_timeout=0)
+        breaker.record_failure()
+
+        self.assertEqual(breaker.allow_request(), CircuitBreaker.PROBE)
+        self.assertFalse(breaker.allow_request())
+        breaker.release()
+        self.assertEqual(breaker.allow_request(), CircuitBreaker.PROBE)
+        breaker.record_success()
+        self.assertEqual(breaker.allow_request(), CircuitBreaker.ADMITTED)
+        self.assertFalse(is_breaker_failure(UpstreamError(429)))
+        self.assertTrue(is_breaker_failure(UpstreamError(503)))
+
+    def test_retry_policy_respects_status_and_budget(self):
+        policy = RetryPolicy(max_attempts=5, budget=RetryBudget(ratio=0.0, max_tokens=1))
+
+        self.assertFalse(policy.should_retry(1, UpstreamError(404)))
+        self.assertFalse(policy.should_retry(1, UpstreamError(503), method="POST"))
+        self.assertTrue(policy.should_retry(1, UpstreamError(503)))
+        # The single budget token is spent, further retries are refused
+        self.assertFalse(policy.should_retry(2, UpstreamError(503)))
+        self.assertEqual(policy.budget_exhausted, 1)
+
+if __name__ == "__main__":
+    unittest.main()
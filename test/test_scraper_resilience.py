@@ -0,0 +1,201 @@
+import asyncio
+import json
+import time
+import unittest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from src.routes.linkedin_routes import get_linkedin_scraper, router, upstream_error_handler
+from src.services.linkedin_cache import LinkedInCache, RESOURCE_PROFILE
+from src.services.linkedin_scraper_service import (
+    CircuitBreaker,
+    CircuitOpenError,
+    LinkedInScraperService,
+    RetryPolicy,
+    UPSTREAM_ERRORS,
+    UpstreamError,
+)
+
+URL = "https://www.linkedin.com/in/jane-doe/"
+PROFILE = {"username": "jane-doe", "headline": "VP Engineering"}
+
+class FakeResponse:
+    def __init__(self, status, body=b"", headers=None):
+        self.status = status
+        self.body = body
+        self.headers = headers or {}
+
+    async def read(self):
+        return self.body
+
+    async def text(self):
+        return self.body.decode("utf-8")
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        return False
+
+class HangingResponse(FakeResponse):
+    def __init__(self):
+        super().__init__(200)
+
+    async def __aenter__(self):
+        await asyncio.sleep(60)
+
+class GatedResponse(FakeResponse):
+    """Answers once `gate` is set"""
+
+    def __init__(self, status, gate):
+        super().__init__(status, b"gated")
+        self.gate = gate
+
+    async def __aenter__(self):
+        await self.gate.wait()
+        return self
+
+class FakeSession:
+    """aiohttp session stand-in answering GETs from a script; the last response repeats"""
+    closed = False
+
+    def __init__(self, *responses):
+        self.responses = list(responses)
+        self.calls = []
+
+    def get(self, url, headers=None, timeout=None):
+        self.calls.append(url)
+        response = self.responses.pop(0) if len(self.responses) > 1 else self.responses[0]
+        if isinstance(response, Exception):
+            raise response
+        return response
+
+def ok(data=PROFILE):
+    return FakeResponse(200, json.dumps(data).encode("utf-8"))
+
+def make_scraper(session, cache=None, attempts=3):
+    return LinkedInScraperService(
+        session=session,
+        cache=cache,
+        retry_policy=RetryPolicy(max_attempts=attempts, base_delay=0, max_delay=0),
+    )
+
+class TestScraperResilience(unittest.IsolatedAsyncioTestCase):
+    async def test_transient_failure_is_retried(self):
+        session = FakeSession(FakeResponse(503, b"busy"), ok())
+
+        profile = await make_scraper(session).get_profile_data(URL)
+
+        self.assertEqual(profile, PROFILE)
+        self.assertEqual(len(session.calls), 2)
+
+    async def test_missing_profile_is_none_without_retry(self):
+        session = FakeSession(FakeResponse(404, b"not found"))
+
+        self.assertIsNone(await make_scraper(session).get_profile_data(URL))
+        self.assertEqual(len(session.calls), 1)
+
+    async def test_outage_raises_instead_of_none(self):
+        session = FakeSession(FakeResponse(503, b"down"))
+        scraper = make_scraper(session)
+
+        with self.assertRaises(UpstreamError):
+            await scraper.get_profile_data(URL)
+        with self.assertRaises(UPSTREAM_ERRORS):
+            await scraper.get_enriched_profile(URL)
+
+    async def test_stale_entry_served_during_outage(self):
+        cache = LinkedInCache(max_memory_bytes=1024 * 1024, max_stale=3600)
+        cache.memory.set(LinkedInCache.make_key(RESOURCE_PROFILE, URL), json.dumps(PROFILE).encode("utf-8"), time.time() - 1)
+        session = FakeSession(FakeResponse(503, b"down"))
+
+        profile = await make_scraper(session, cache).get_profile_data(URL)
+
+        self.assertEqual(profile, PROFILE)
+        self.assertEqual(len(session.calls), 3)
+        self.assertEqual(cache.stats.stale_hits, 1)
+
+    async def test_open_circuit_fails_fast(self):
+        session = FakeSession(FakeResponse(503, b"down"))
+        scraper = make_scraper(session, attempts=1)
+        scraper._breakers[RESOURCE_PROFILE] = CircuitBreaker(failure_threshold=1, recovery_timeout=60)
+
+        with self.assertRaises(UpstreamError):
+            await scraper.get_profile_data(URL)
+        with self.assertRaises(CircuitOpenError):
+            await scraper.get_profile_data(URL)
+        self.assertEqual(len(session.calls), 1)
+
+    async def test_cancelled_probe_releases_half_open_circuit(self):
+        session = FakeSession(HangingResponse(), ok())
+        scraper = make_scraper(session, attempts=1)
+        breaker = scraper._breakers[RESOURCE_PROFILE] = CircuitBreaker(failure_threshold=1, recovery_timeout=0)
+        breaker.record_failure()
+
+        # The attempt itself is cancelled, as on shutdown; callers are shielded by SingleFlight
+        probe = asyncio.ensure_future(scraper._fetch_with_retry(RESOURCE_PROFILE, URL, "/profile", "LinkedIn data", None))
+        await asyncio.sleep(0.01)
+        probe.cancel()
+        with self.assertRaises(asyncio.CancelledError):
+            await probe
+
+        self.assertEqual(await scraper.get_profile_data(URL), PROFILE)
+        self.assertEqual(breaker.state, CircuitBreaker.CLOSED)
+
+    async def test_attempt_from_before_the_outage_does_not_free_the_probe_slot(self):
+        gate = asyncio.Event()
+        session = FakeSession(GatedResponse(429, gate), HangingResponse())
+        scraper = make_scraper(session, attempts=1)
+        breaker = scraper._breakers[RESOURCE_PROFILE] = CircuitBreaker(failure_threshold=1, recovery_timeout=0)
+        fetch = lambda: scraper._fetch_with_retry(RESOURCE_PROFILE, URL, "/profile", "LinkedIn data", None)
+
+        # Admitted while closed, then the circuit opens and half-opens with a probe in flight
+        earlier = asyncio.ensure_future(fetch())
+        await asyncio.sleep(0)
+        breaker.record_failure()
+        probe = asyncio.ensure_future(fetch())
+        await asyncio.sleep(0)
+
+        gate.set()
+        with self.assertRaises(UpstreamError):
+            await earlier
+        with self.assertRaises(CircuitOpenError):
+            await fetch()
+        self.assertEqual(len(session.calls), 2)
+        probe.cancel()
+        await asyncio.gather(probe, return_exceptions=True)
+
+    async def test_rate_limit_does_not_open_circuit(self):
+        session = FakeSession(FakeResponse(429, b"slow down"))
+        scraper = make_scraper(session, attempts=1)
+        breaker = scraper._breakers[RESOURCE_PROFILE] = CircuitBreaker(failure_threshold=1, recovery_timeout=60)
+
+        for _ in range(3):
+            with self.assertRaises(UpstreamError):
+                await scraper.get_profile_data(URL)
+
+        self.assertEqual(len(session.calls), 3)
+        self.assertEqual(breaker.state, CircuitBreaker.CLOSED)
+
+class TestUpstreamErrorRoutes(unittest.TestCase):
+    def make_client(self, session):
+        app = FastAPI()
+        app.include_router(router)
+        for error in UPSTREAM_ERRORS:
+            app.add_exception_handler(error, upstream_error_handler)
+        app.dependency_overrides[get_linkedin_scraper] = lambda: make_scraper(session, attempts=1)
+        return TestClient(app)
+
+    def test_outage_is_503_and_missing_profile_404(self):
+        down = self.make_client(FakeSession(FakeResponse(503, b"down")))
+        missing = self.make_client(FakeSession(FakeResponse(404, b"not found")))
+
+        self.assertEqual(down.post("/linkedin/profile", json={"profile_url": URL}).status_code, 503)
+        self.assertEqual(missing.post("/linkedin/profile", json={"profile_url": URL}).status_code, 404)
+
+    def test_timeout_is_504(self):
+        client = self.make_client(FakeSession(TimeoutError()))
+
+        self.assertEqual(client.post("/linkedin/enriched-profile", json={"profile_url": URL}).status_code, 504)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,126 @@
+import asyncio
+import os
+import tempfile
+import unittest
+from src.services.chunk_cache import CleanedChunkCache
+from src.services.linkedin_cache import LinkedInCache, RESOURCE_PROFILE
+from src.services.persona_store import PersonaStore
+from src.services.profile_refresh import ProfileSnapshotStore
+from src.utils.shared_state import SharedLeases, SharedRateLimiter, connect_shared_db
+
+class TestSharedState(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.db_path = os.path.join(self.tmp.name, "shared.db")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    async def test_workers_draw_from_one_bucket(self):
+        # Two limiters on the same file stand in for two worker processes
+        first = SharedRateLimiter(self.db_path, rate=20, burst=2)
+        second = SharedRateLimiter(self.db_path, rate=20, burst=2)
+
+        loop = asyncio.get_running_loop()
+        started = loop.time()
+        await asyncio.gather(*(limiter.acquire() for limiter in (first, second) * 3))
+
+        # 2 burst tokens, then 4 more at 20/s
+        self.assertGreaterEqual(loop.time() - started, 0.15)
+
+    async def test_throttling_is_shared(self):
+        first = SharedRateLimiter(self.db_path, rate=10, burst=1)
+        second = SharedRateLimiter(self.db_path, rate=10, burst=1)
+
+        first.record_throttled(retry_after=0.05)
+        await second.acquire()
+
+        self.assertEqual(second.rate, 5)
+
+    async def test_lease_is_exclusive_until_released(self):
+        first = SharedLeases(self.db_path)
+        second = SharedLeases(self.db_path)
+
+        self.assertTrue(await first.acquire("profile:linkedin.com/in/x"))
+        self.assertFalse(await second.acquire("profile:linkedin.com/in/x"))
+        await first.release("profile:linkedin.com/in/x")
+        self.assertTrue(await second.acquire("profile:linkedin.com/in/x"))
+
+    async def test_expired_lease_can_be_taken_over(self):
+        first = SharedLeases(self.db_path, ttl=0)
+        second = SharedLeases(self.db_path)
+
+        self.assertTrue(await first.acquire("key"))
+        self.assertTrue(await second.acquire("key"))
+
+    async def test_locked_database_is_retried_without_blocking(self):
+        leases = SharedLeases(self.db_path)
+        limiter = SharedRateLimiter(self.db_path, rate=100, burst=1)
+        # Another worker holding the write lock
+        holder = connect_shared_db(self.db_path)
+        holder.execute("BEGIN IMMEDIATE")
+
+        loop = asyncio.get_running_loop()
+        started = loop.time()
+        acquire = asyncio.ensure_future(leases.acquire("key"))
+        token = asyncio.ensure_future(limiter.acquire())
+        limiter.record_throttled(retry_after=0.01)
+        ticks = 0
+        while loop.time() - started < 0.1:
+            # The loop keeps running while both wait on the lock
+            await asyncio.sleep(0.01)
+            ticks += 1
+        self.assertFalse(acquire.done() or token.done())
+        self.assertGreaterEqual(ticks, 5)
+
+        holder.execute("COMMIT")
+        self.assertTrue(await acquire)
+        await token
+        await asyncio.sleep(0.02)
+        rate = limiter._conn.execute("SELECT rate FROM rate_limits").fetchone()[0]
+        self.assertEqual(rate, 50)
+        holder.close()
+
+    async def test_shared_tiers_wait_for_locks_without_blocking(self):
+        cache = LinkedInCache(max_memory_bytes=1024, disk_path=self.db_path)
+        personas = PersonaStore(db_path=self.db_path)
+        snapshots = ProfileSnapshotStore(db_path=self.db_path)
+        chunks = CleanedChunkCache(self.db_path)
+        holder = connect_shared_db(self.db_path)
+        holder.execute("BEGIN IMMEDIATE")
+
+        writes = asyncio.gather(
+            cache.set(RESOURCE_PROFILE, "linkedin.com/in/x", b'{"id": 1}'),
+            personas.put("linkedin.com/in/x", "sales", {"firstName": "Dana"}),
+            snapshots.set("linkedin.com/in/x", {"username": "x"}),
+            chunks.set("key", "cleaned"),
+        )
+        loop = asyncio.get_running_loop()
+        started = loop.time()
+        ticks = 0
+        while loop.time() - started < 0.1:
+            await asyncio.sleep(0.01)
+            ticks += 1
+        self.assertFalse(writes.done())
+        self.assertGreaterEqual(ticks, 5)
+
+        holder.execute("COMMIT")
+        await writes
+        self.assertEqual(await snapshots.get("linkedin.com/in/x"), {"username": "x"})
+        self.assertEqual(await chunks.get("key"), "cleaned")
+        holder.close()
+        for store in (cache, personas, snapshots, chunks):
+            store.close()
+
+    async def test_persona_compiled_in_one_worker_serves_another(self):
+        first = PersonaStore(db_path=self.db_path)
+        second = PersonaStore(db_path=self.db_path)
+
+        await first.put("linkedin.com/in/dana", "sales", {"firstName": "Dana"})
+        persona = await second.get("https://www.linkedin.com/in/dana/", "sales")
+
+        self.assertIn("Name: Dana", persona.session_update)
+        self.assertEqual(second.get_stats()["disk_hits"], 1)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,53 @@
+import asyncio
+import unittest
+from src.utils.single_flight import SingleFlight
+
+class TestSingleFlight(unittest.IsolatedAsyncioTestCase):
+    async def test_concurrent_calls_share_one_execution(self):
+        flight = SingleFlight()
+        calls = 0
+
+        async def fetch():
+            nonlocal calls
+            calls += 1
+            await asyncio.sleep(0.01)
+            return {"id": 1}
+
+        results = await asyncio.gather(*(flight.do("profile:x", fetch) for _ in range(5)))
+
+        self.assertEqual(calls, 1)
+        self.assertTrue(all(result == {"id": 1} for result in results))
+        self.assertEqual(flight.stats.coalesced, 4)
+        self.assertEqual(len(flight), 0)
+
+    async def test_errors_propagate_to_all_waiters(self):
+        flight = SingleFlight()
+
+        async def fetch():
+            await asyncio.sleep(0.01)
+            raise RuntimeError("upstream failed")
+
+        results = await asyncio.gather(
+            *(flight.do("profile:x", fetch) for _ in range(3)),
+            return_exceptions=True
+        )
+
+        self.assertTrue(all(isinstance(result, RuntimeError) for result in results))
+        self.assertEqual(flight.stats.errors, 1)
+
+    async def test_cancelled_waiter_does_not_cancel_others(self):
+        flight = SingleFlight()
+
+        async def fetch():
+            await asyncio.sleep(0.02)
+            return "ok"
+
+        first = asyncio.ensure_future(flight.do("profile:x", fetch))
+        second = asyncio.ensure_future(flight.do("profile:x", fetch))
+        await asyncio.sleep(0)
+        first.cancel()
+
+        self.assertEqual(await second, "ok")
+
+if __name__ == "__main__":
+    unittest.main()
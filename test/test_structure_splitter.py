@@ -0,0 +1,89 @@
+import ast
+import copy
+import json
+import os
+import unittest
+from src.services.structure_splitter import StructureSplitter, strip_noise
+from src.utils.tokens import count_tokens
+
+SAMPLE_PATH = os.path.join(os.path.dirname(__file__), "..", "uncleaned_data.txt")
+
+PROFILE = {
+    "id": 1,
+    "urn": "ACoAAA",
+    "username": "jane-doe",
+    "firstName": "Jane",
+    "headline": "VP Engineering",
+    "profilePicture": "https://media.licdn.com/jane.jpg",
+    "position": [{"companyName": "Acme", "title": "VP Engineering"}],
+    "fullPositions": [
+        {
+            "companyName": "Acme",
+            "companyLogo": "https://media.licdn.com/acme.png",
+            "title": "VP Engineering",
+            "start": {"year": 2022, "month": 1, "day": 0},
+            "end": {"year": 0, "month": 0, "day": 0},
+            "description": "",
+        },
+        {"companyName": "Globex", "title": "Engineer"},
+    ],
+    "skills": [{"name": "Python", "passedSkillAssessment": False, "endorsementsCount": 3}],
+    "posts": {"success": True, "data": [{"text": "Hiring!", "postUrl": "https://linkedin.com/p/1"}]},
+    "currentCompany": {"success": True, "data": {"name": "Acme", "logos": ["x"], "description": "Widgets"}},
+    "recentCompanyPosts": {"data": [{"text": "We launched"}]},
+    "enrichment": {"complete": True, "branches": [], "errors": {}},
+}
+
+class TestStructureSplitter(unittest.TestCase):
+    def test_one_unit_per_logical_item(self):
+        units = StructureSplitter().units(PROFILE)
+
+        self.assertEqual(
+            [unit.section for unit in units],
+            ["profile", "position", "position", "skills", "post", "company", "company_post"],
+        )
+
+    def test_noise_and_empty_fields_dropped(self):
+        text = "\n".join(StructureSplitter().split(PROFILE))
+
+        for noise in ("media.licdn.com", "ACoAAA", "passedSkillAssessment", "endorsementsCount", "postUrl",
+                      '"end"', '"description":""', "enrichment", "logos"):
+            self.assertNotIn(noise, text)
+        for kept in ("jane-doe", "Globex", "Hiring!", "Widgets", "We launched", '"year":2022'):
+            self.assertIn(kept, text)
+
+    def test_caller_data_untouched(self):
+        original = copy.deepcopy(PROFILE)
+        StructureSplitter().split(PROFILE)
+
+        self.assertEqual(PROFILE, original)
+
+    def test_units_packed_within_budget_without_overlap(self):
+        with open(SAMPLE_PATH, "r", encoding="utf-8") as file:
+            sample = ast.literal_eval(file.read())
+        splitter = StructureSplitter(chunk_tokens=300)
+
+        chunks = splitter.split(sample)
+        lines = [line for chunk in chunks for line in chunk.split("\n")]
+
+        self.assertTrue(all(count_tokens(chunk) <= 300 for chunk in chunks))
+        self.assertEqual(len(lines), len(set(lines)))
+        self.assertLess(sum(count_tokens(chunk) for chunk in chunks), count_tokens(str(sample)) / 2)
+
+    def test_oversized_unit_split_at_words(self):
+        post = {"text": " ".join(f"word{i}" for i in range(400))}
+        chunks = StructureSplitter(chunk_tokens=100).split({"username": "jane", "posts": [post]})
+
+        self.assertGreater(len(chunks), 2)
+        self.assertTrue(all(count_tokens(chunk) <= 100 for chunk in chunks))
+        self.assertIn("word399", chunks[-1])
+
+    def test_strip_noise_keeps_meaningful_values(self):
+        self.assertEqual(
+            strip_noise({"isPremium": False, "count": 0, "url": "https://x", "bio": "see https://x for more"}),
+            {"isPremium": False, "count": 0, "bio": "see https://x for more"},
+        )
+        self.assertEqual(json.loads(json.dumps(strip_noise([{}, None, "a"]))), ["a"])
+
+if __name__ == "__main__":
+    unittest.main()